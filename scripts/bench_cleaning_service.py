@@ -0,0 +1,127 @@
+"""Benchmark CleaningService against the former per-caller cleaning helpers
+
+The UI worker and the schedule executor both run through CleaningService,
+so this covers interactive and scheduled runs alike. A synthetic profile
+(cache directories with many small entries, plus a few loose files) is
+described by a CleanerML file; each method collects and deletes it:
+- legacy: parse CleanerML, glob-expand each action, then per target
+  os.walk() for its size and shutil.rmtree()/os.remove(), one thread
+- service (cold): first run, CleanerML parsed
+- service (warm): plan cache hit, as for every later run of the process
+
+Usage:
+    python scripts/bench_cleaning_service.py [directory] [entries]   (default: temp dir, 20000)
+"""
+
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser.cleanerml_loader import load_cleaner_options_from_file  # noqa: E402
+from privacy_eraser.core.cleaning_service import CleaningService, PlanCache, StatCache  # noqa: E402
+from privacy_eraser.core.dir_index import DirectoryIndex  # noqa: E402
+
+OPTIONS = ["cache", "logs"]
+
+
+def make_profile(base, entries):
+    """Cache dirs of 256 entries each (Chromium/Firefox style), a log dir and loose files."""
+    cache = base / "Cache" / "Cache_Data"
+    for i in range(entries):
+        sub = cache / f"{i // 256:02x}"
+        if i % 256 == 0:
+            sub.mkdir(parents=True, exist_ok=True)
+        (sub / f"{i:016x}").write_bytes(b"x" * 512)
+    logs = base / "Logs"
+    logs.mkdir(exist_ok=True)
+    for i in range(64):
+        (logs / f"log{i}.txt").write_bytes(b"y" * 4096)
+        (base / f"tmp{i}.tmp").write_bytes(b"z" * 128)
+
+    xml_path = base / "cleaner.xml"
+    if xml_path.exists():
+        return str(xml_path)  # Unchanged, so a warm plan cache stays valid
+    xml_path.write_text(
+        "<cleaner>"
+        '<option id="cache"><label>Cache</label>'
+        f'<action command="delete" search="walk.all" path="{base / "Cache"}" />'
+        f'<action command="delete" search="glob" path="{base / "*.tmp"}" />'
+        "</option>"
+        '<option id="logs"><label>Logs</label>'
+        f'<action command="delete" search="walk.files" path="{logs}" />'
+        "</option>"
+        "</cleaner>"
+    )
+    return str(xml_path)
+
+
+def legacy_clean(xml_path):
+    """What both callers did before: expand, measure, delete one by one."""
+    deleted = 0
+    for option in load_cleaner_options_from_file(xml_path):
+        if option.id not in OPTIONS:
+            continue
+        for action in option.actions:
+            pattern = os.path.normpath(os.path.expandvars(action.path))
+            targets = glob.glob(pattern, recursive=True) if "*" in pattern else [pattern]
+            for path in targets:
+                if os.path.isdir(path):
+                    for dirpath, _dirs, files in os.walk(path):
+                        for name in files:
+                            os.path.getsize(os.path.join(dirpath, name))
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.path.getsize(path)
+                    os.remove(path)
+                deleted += 1
+    return deleted
+
+
+def service_clean(service):
+    stat_cache = StatCache()
+    plan = service.collect(["Bench"], OPTIONS, stats=stat_cache)
+    service.estimate(plan, stat_cache)
+    stats = service.run(plan, ["Bench"], OPTIONS)
+    if stats.failed:
+        raise RuntimeError(stats.errors[:3])
+    return stats.deleted
+
+
+def timed(label, base, entries, clean):
+    base.mkdir(exist_ok=True)
+    xml_path = make_profile(base, entries)
+    if hasattr(os, "sync"):
+        os.sync()
+    start = time.perf_counter()
+    clean(xml_path)
+    elapsed = time.perf_counter() - start
+    print(f"{label:24s} {entries / elapsed:10.0f} entries/s  ({elapsed:.2f}s)")
+
+
+def main():
+    parent = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else None
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    root = Path(tempfile.mkdtemp(prefix="bench_clean_", dir=parent))
+    service = CleaningService(
+        PlanCache(xml_path_for=lambda browser: str(root / "service" / "cleaner.xml")),
+        DirectoryIndex(root / "dir_index.db"),
+    )
+    try:
+        print(f"{entries} cache entries on {root}")
+        timed("legacy", root / "legacy", entries, legacy_clean)
+        timed("service (cold)", root / "service", entries, lambda xml_path: service_clean(service))
+        # Profile refilled, CleanerML file untouched: plan cache hit
+        timed("service (warm)", root / "service", entries, lambda xml_path: service_clean(service))
+        print(f"plan cache: {service.plans.hits} hits, {service.plans.misses} misses")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark browser detection: sequential probes vs thread pool vs cache
+
+detect_windows used to evaluate each probe's registry keys and file
+patterns one after another. collect_programs now runs them on a thread
+pool, and DetectionCache answers startups from the rows of an earlier
+run (settings_db) until they pass their TTL.
+
+Every probe check sleeps for the given latency, standing in for a cold
+registry hive or a file pattern on a slow or network-mounted drive.
+
+Usage:
+    python scripts/bench_detection.py [latency_ms]   (default: 20)
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser import detect_windows as dw  # noqa: E402
+from privacy_eraser import settings_db  # noqa: E402
+
+NAMES = ["Chrome", "Edge", "Firefox", "Brave", "Opera", "Whale", "Safari"]
+ROUNDS = 3
+
+
+def timed(label, detect):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        rows = detect()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{label:24s} {elapsed * 1000:8.2f} ms  ({len(rows)} browsers)")
+
+
+def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 20.0) / 1000
+    probes = [dw.ProgramProbe(name=name, process_names=(f"{name.lower()}.exe",)) for name in NAMES]
+
+    def slow_exists(probe, index=None, registry_hits=None):
+        time.sleep(latency)
+        return probe.name != "Safari"
+
+    dw.program_exists = slow_exists
+    with tempfile.TemporaryDirectory(prefix="bench_detect_") as tmp:
+        settings_db.DB_PATH = Path(tmp) / "settings.db"
+        timed("sequential", lambda: dw.collect_programs(probes, workers=1))
+        timed("thread pool", lambda: dw.collect_programs(probes))
+
+        cache = dw.DetectionCache(lambda: dw.collect_programs(probes))
+        cache.refresh()
+        timed("cached (this process)", lambda: cache.get()[0])
+        timed("cached (next startup)", lambda: dw.DetectionCache(lambda: []).get()[0])
+
+
+if __name__ == "__main__":
+    main()
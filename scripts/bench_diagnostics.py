@@ -0,0 +1,126 @@
+"""Benchmark the diagnostics report: per-query walks vs one shared parallel walk
+
+Sizing each profile, cache directory and cleaning option on its own walks
+the nested trees several times. run_diagnostics lists every directory
+once, on worker threads, and answers all of them from the subtree totals.
+
+A synthetic Chromium user data directory is built with the given number
+of profiles, each with a sharded Cache and Code Cache, Service Worker
+storage and the usual database files. The options mirror the CleanerML
+cache / history / cookies options.
+
+Usage:
+    python scripts/bench_diagnostics.py [profiles] [files_per_cache]   (default: 4 3000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser.core.cleaner_engine import ActionType, CleaningAction, SearchType  # noqa: E402
+from privacy_eraser.core.cleaning_service import PlanCache  # noqa: E402
+from privacy_eraser.core.profile_scanner import ProfileLayout  # noqa: E402
+from privacy_eraser.diagnostics import run_diagnostics  # noqa: E402
+
+CACHE_DIRS = ("Cache/Cache_Data", "Code Cache/js", "Code Cache/wasm", "Service Worker/CacheStorage", "GPUCache")
+ROUNDS = 3
+
+
+def build(root, profiles, files):
+    names = ["Default"] + [f"Profile {i}" for i in range(1, profiles)]
+    for name in names:
+        profile = root / name
+        profile.mkdir(parents=True)
+        for db in ("Preferences", "History", "Cookies", "Web Data", "Favicons"):
+            (profile / db).write_bytes(b"x" * 4096)
+        for cache_dir in CACHE_DIRS:
+            for i in range(files // len(CACHE_DIRS)):
+                shard = profile / cache_dir / f"{i % 64:02x}"
+                shard.mkdir(parents=True, exist_ok=True)
+                (shard / f"f_{i:06x}").write_bytes(b"x" * (512 + i % 4096))
+    return names
+
+
+def plans_for(root, names):
+    def loader(_xml_path):
+        delete = ActionType.DELETE
+        options = {"cache": [], "history": [], "cookies": []}
+        for name in names:
+            profile = root / name
+            options["cache"] += [
+                CleaningAction(delete, SearchType.WALK_FILES, str(profile / "Cache")),
+                CleaningAction(delete, SearchType.WALK_FILES, str(profile / "Code Cache")),
+                CleaningAction(delete, SearchType.WALK_ALL, str(profile / "Service Worker")),
+                CleaningAction(delete, SearchType.WALK_FILES, str(profile / "GPUCache")),
+            ]
+            options["history"] += [
+                CleaningAction(delete, SearchType.FILE, str(profile / "History")),
+                CleaningAction(delete, SearchType.FILE, str(profile / "Favicons")),
+            ]
+            options["cookies"].append(CleaningAction(delete, SearchType.FILE, str(profile / "Cookies")))
+        return options
+
+    return PlanCache(xml_path_for=lambda browser: "chrome.xml", loader=loader)
+
+
+def walk_size(path):
+    if os.path.isfile(path):
+        return os.lstat(path).st_size
+    total = 0
+    for dirpath, _dirs, names in os.walk(path):
+        for name in names:
+            total += os.lstat(os.path.join(dirpath, name)).st_size
+    return total
+
+
+def per_query(root, names, layout, plans):
+    """Every profile, cache directory and option target walked on its own."""
+    total = 0
+    for name in names:
+        profile = str(root / name)
+        total += walk_size(profile)
+        total += sum(walk_size(os.path.join(profile, d)) for d in layout.cache_dirs)
+    for actions in plans.options("chrome").values():
+        total += sum(walk_size(action.path) for action in actions if os.path.exists(action.path))
+    return total
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = func()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{label:22s} {elapsed * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    profiles = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    with tempfile.TemporaryDirectory(prefix="bench_diag_") as tmp:
+        root = Path(tmp) / "User Data"
+        names = build(root, profiles, files)
+        layout = ProfileLayout(
+            roots=(str(root),),
+            marker="Preferences",
+            cache_dirs=("Cache", "Code Cache", "GPUCache", "Service Worker/CacheStorage"),
+        )
+        plans = plans_for(root, names)
+        print(f"{profiles} profiles, {profiles * files} cache files")
+
+        timed("per-query os.walk", lambda: per_query(root, names, layout, plans))
+        for workers in (1, 8):
+            report = timed(
+                f"shared walk, {workers} thread{'s' if workers > 1 else ''}",
+                lambda: run_diagnostics(["chrome"], layouts={"chrome": layout}, plans=plans, workers=workers),
+            )
+        phases = ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in report.timings.items())
+        print(f"  {report.directories} directories; {phases}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark registry cleaning on the in-memory mock registry
+
+Writes a synthetic regedit export (UTF-16, like regedit's) with the given
+number of keys: per-user application keys with MRU lists and settings,
+nested a few levels deep. It then times the phases a registry cleaning
+run goes through on mock_windows.MockRegistry:
+- load: parse the .reg file into the in-memory tree
+- probe: keys_exist for every application key, through core.registry
+- enumerate: walk the whole HKCU tree with EnumKey
+- clean: delete_tree of every application's MRU subtree
+
+Usage:
+    python scripts/bench_mock_registry.py [keys]   (default: 300000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser.core.registry import Registry  # noqa: E402
+from privacy_eraser.mock_windows import MockRegistry  # noqa: E402
+
+# Keys per application: the app key, Settings, MRU, MRU\<n> entries
+MRU_ENTRIES = 8
+KEYS_PER_APP = 3 + MRU_ENTRIES
+
+
+def write_export(path, keys):
+    apps = max(1, keys // KEYS_PER_APP)
+    lines = ["Windows Registry Editor Version 5.00", ""]
+    for a in range(apps):
+        base = f"HKEY_CURRENT_USER\\Software\\Vendor{a % 500}\\App{a}"
+        lines += [f"[{base}]", f'"InstallPath"="C:\\\\Program Files\\\\App{a}"', ""]
+        lines += [f"[{base}\\MRU]", '"MRUList"="abcdefgh"', ""]
+        for n in range(MRU_ENTRIES):
+            lines += [f"[{base}\\MRU\\{n}]", f'"File"="C:\\\\Users\\\\user\\\\Documents\\\\doc{n}.txt"', ""]
+        lines += [f"[{base}\\Settings]", '"Window"=dword:00000001', ""]
+    with open(path, "wb") as f:
+        f.write("\r\n".join(lines).encode("utf-16"))
+    return [f"HKCU\\Software\\Vendor{a % 500}\\App{a}" for a in range(apps)]
+
+
+def walk(backend, key):
+    count = 1
+    index = 0
+    while True:
+        try:
+            name = backend.EnumKey(key, index)
+        except OSError:
+            return count
+        count += walk(backend, backend.OpenKey(key, name))
+        index += 1
+
+
+def phase(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:10s} {elapsed * 1000:9.1f} ms  {result:8d} keys  {result / elapsed:12,.0f} keys/s")
+    return result
+
+
+def main():
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    with tempfile.TemporaryDirectory(prefix="bench_mockreg_") as tmp:
+        path = os.path.join(tmp, "export.reg")
+        apps = write_export(path, keys)
+        print(f"export: {os.path.getsize(path) / 1024 / 1024:.1f} MB, {len(apps)} applications")
+
+        backend = MockRegistry()
+        phase("load", lambda: backend.load_reg_file(path))
+        registry = Registry(backend)
+        phase("probe", lambda: sum(registry.keys_exist(apps).values()))
+        phase("enumerate", lambda: walk(backend, backend.HKEY_CURRENT_USER))
+        phase("clean", lambda: sum(registry.delete_tree(f"{app}\\MRU") for app in apps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark PathTable memory against a plain list of path strings
+
+Builds a synthetic browser profile (Chromium Cache_Data, Firefox cache2,
+Code Cache) and reports the memory traced for each representation.
+
+Usage:
+    python scripts/bench_path_table.py [entries]   (default 2,000,000)
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser.core.path_table import PathTable  # noqa: E402
+
+
+def synthetic_profile(n, seed=0):
+    rng = random.Random(seed)
+    chrome = "/home/user/.cache/google-chrome/Profile {}/Cache/Cache_Data/"
+    firefox = "/home/user/.cache/mozilla/firefox/a1b2c3d4.default-release/cache2/entries/"
+    code = "/home/user/.config/google-chrome/Profile {}/Code Cache/js/"
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            yield chrome.format(i % 4) + f"f_{i:06x}"
+        elif kind == 1:
+            yield firefox + "%040X" % rng.getrandbits(160)
+        else:
+            yield code.format(i % 4) + "%016x_0" % rng.getrandbits(64)
+
+
+def traced(build):
+    """(result, bytes still allocated by build, seconds)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    mb = 1024 * 1024
+
+    paths, list_bytes, list_time = traced(lambda: list(synthetic_profile(n)))
+    del paths
+    table, table_bytes, table_time = traced(lambda: PathTable(synthetic_profile(n)))
+
+    print(f"entries:   {n:,}")
+    print(f"list[str]: {list_bytes / mb:8.1f} MB  ({list_bytes / n:.1f} B/entry, {list_time:.1f}s)")
+    print(f"PathTable: {table_bytes / mb:8.1f} MB  ({table_bytes / n:.1f} B/entry, {table_time:.1f}s)")
+    print(f"ratio:     {list_bytes / table_bytes:8.1f}x")
+
+    start = time.perf_counter()
+    for i in range(0, n, max(n // 1000, 1)):
+        assert table.find(table[i]) == i
+    print(f"find():    index built + 1000 lookups in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark browser running-state detection: per-probe walks vs one snapshot
+
+detect_windows used to walk the whole process table once per probe,
+calling name() and username() on every process. ProcessSnapshot walks it
+once per detection pass with process_iter(['name', 'username']).
+
+A synthetic table of N processes is served through psutil.process_iter;
+every attribute read costs one stat() system call, standing in for the
+OpenProcess/query a real read needs. The real process table of this
+machine is measured as well.
+
+Usage:
+    python scripts/bench_process_snapshot.py [processes]   (default: 1000)
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser import detect_windows as dw  # noqa: E402
+
+BROWSER_EXES = ["chrome.exe", "msedge.exe", "firefox.exe", "brave.exe", "opera.exe", "whale.exe", "safari.exe"]
+ROUNDS = 5
+
+
+class FakeProcess:
+    def __init__(self, name, username):
+        self._name = name
+        self._username = username
+
+    def name(self):
+        os.stat(".")
+        return self._name
+
+    def username(self):
+        os.stat(".")
+        return self._username
+
+    @property
+    def info(self):
+        return {"name": self.name(), "username": self.username()}
+
+
+def fake_table(count):
+    names = BROWSER_EXES[:2] + [f"svc{i}.exe" for i in range(count - 2)]
+    return [FakeProcess(name, "host\\me" if i % 3 else "SYSTEM") for i, name in enumerate(names)]
+
+
+def per_probe(exename, process_iter, current_user):
+    """The former is_process_running_windows loop."""
+    target = exename.lower()
+    for proc in process_iter():
+        if proc.name().lower() != target:
+            continue
+        if proc.username().lower() == current_user:
+            return True
+    return False
+
+
+def timed(label, count, detect):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        running = detect()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{label:34s} {elapsed * 1000:8.2f} ms/pass  ({count} processes, running: {sorted(running)})")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    table = fake_table(count)
+    real_psutil = (dw.psutil.process_iter, dw.psutil.Process)
+
+    class CurrentProcess:
+        def username(self):
+            return "host\\me"
+
+    dw.USE_MOCK = False
+    dw.psutil.process_iter = lambda attrs=None: iter(table)
+    dw.psutil.Process = CurrentProcess
+    try:
+        timed("synthetic, walk per probe", count,
+              lambda: {e for e in BROWSER_EXES if per_probe(e, dw.psutil.process_iter, "host\\me")})
+        timed("synthetic, one snapshot", count, _snapshot_pass)
+    finally:
+        dw.psutil.process_iter, dw.psutil.Process = real_psutil
+
+    real_count = len(dw.psutil.pids())
+    try:
+        me = dw.psutil.Process().username().lower()
+    except Exception:
+        me = ""
+
+    def real_per_probe():
+        found = set()
+        for exe in BROWSER_EXES:
+            target = exe.lower()
+            for proc in dw.psutil.process_iter():
+                try:
+                    if proc.name().lower() == target and proc.username().lower() == me:
+                        found.add(exe)
+                        break
+                except (dw.psutil.NoSuchProcess, dw.psutil.AccessDenied):
+                    continue
+        return found
+
+    timed("this machine, walk per probe", real_count, real_per_probe)
+    timed("this machine, one snapshot", real_count, _snapshot_pass)
+
+
+def _snapshot_pass():
+    snapshot = dw.ProcessSnapshot.capture()
+    return {e for e in BROWSER_EXES if snapshot.is_running(e)}
+
+
+if __name__ == "__main__":
+    main()
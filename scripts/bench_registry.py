@@ -0,0 +1,96 @@
+"""Benchmark registry probes: open from the hive root vs the registry layer
+
+winreg callers used to open every key from its hive root, one OpenKey
+per check. core.registry opens keys relative to cached parent handles,
+checks keys sharing a parent in one batch and skips the children of a
+missing parent.
+
+Runs on the in-memory registry of mock_windows, seeded with a synthetic
+SOFTWARE tree (vendors with products and versions) and a probe list in
+the shape of detection and cleaning: mostly existing keys, plus missing
+vendors. Each OpenKey optionally sleeps for the given latency per path
+component it resolves, standing in for a cold hive (the kernel looks a
+path up one component at a time).
+
+Usage:
+    python scripts/bench_registry.py [vendors] [latency_us]   (default: 2000 0)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser.core.registry import Registry, split_key  # noqa: E402
+from privacy_eraser.mock_windows import MockRegistry  # noqa: E402
+
+PRODUCTS = 5
+VERSIONS = 3
+ROUNDS = 3
+
+
+class SlowRegistry(MockRegistry):
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def OpenKey(self, key, sub_key, reserved=0, access=MockRegistry.KEY_READ):
+        if self.latency:
+            time.sleep(self.latency * len([part for part in sub_key.split("\\") if part]))
+        return super().OpenKey(key, sub_key, reserved, access)
+
+
+def seed(backend, vendors):
+    keys = []
+    for hive in ("HKLM\\SOFTWARE", "HKCU\\Software"):
+        hive_name, (software,) = split_key(hive)
+        for v in range(vendors):
+            for p in range(PRODUCTS):
+                for n in range(VERSIONS):
+                    backend.CreateKey(getattr(backend, hive_name), f"{software}\\Vendor{v}\\Product{p}\\{n}.0")
+                keys.append(f"{hive}\\Vendor{v}\\Product{p}")
+                keys.append(f"{hive}\\Vendor{v}\\Product{p}\\{VERSIONS - 1}.0")
+            # Uninstalled vendors
+            keys.append(f"{hive}\\Gone{v}\\Product")
+            keys.append(f"{hive}\\Gone{v}\\Product\\Settings")
+    return keys
+
+
+def naive(backend, keys):
+    found = 0
+    for full_key in keys:
+        hive, parts = split_key(full_key)
+        try:
+            backend.CloseKey(backend.OpenKey(getattr(backend, hive), "\\".join(parts), 0, backend.KEY_READ))
+            found += 1
+        except FileNotFoundError:
+            pass
+    return found
+
+
+def timed(label, backend, func):
+    backend.opens = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        found = func()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{label:28s} {elapsed * 1000:8.2f} ms  {backend.opens // ROUNDS:7d} opens  ({found} found)")
+
+
+def main():
+    vendors = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 0.0) / 1e6
+    backend = SlowRegistry(latency)
+    keys = seed(backend, vendors)
+    print(f"{len(keys)} keys to check, {vendors} vendors per hive")
+
+    timed("open from hive root", backend, lambda: naive(backend, keys))
+    timed("layer, cold (per pass)", backend, lambda: sum(Registry(backend).keys_exist(keys).values()))
+    registry = Registry(backend)
+    registry.keys_exist(keys)
+    timed("layer, parents cached", backend, lambda: sum(registry.keys_exist(keys).values()))
+
+
+if __name__ == "__main__":
+    main()
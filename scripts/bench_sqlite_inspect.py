@@ -0,0 +1,75 @@
+"""Benchmark reading a browser database: copy then query vs in-place inspection
+
+A common way to read a database a running browser keeps locked is to copy
+it to a temporary file first. sqlite_inspect opens it in place with an
+immutable read-only URI and only reads the pages the queries touch.
+
+A synthetic History database (urls table with a url index, Chromium
+style) is built with the given number of rows.
+
+Usage:
+    python scripts/bench_sqlite_inspect.py [rows]   (default: 200000)
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from privacy_eraser.core.sqlite_inspect import QueryTimings, inspect_database  # noqa: E402
+
+ROUNDS = 5
+
+
+def make_history(path, rows):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT, title TEXT, visit_count INTEGER)")
+        conn.execute("CREATE INDEX urls_url_index ON urls (url)")
+        conn.executemany(
+            "INSERT INTO urls (url, title, visit_count) VALUES (?, ?, ?)",
+            ((f"https://example.com/page/{i}", f"Page {i} " + "t" * 80, i % 7) for i in range(rows)),
+        )
+    conn.close()
+
+
+def copy_and_count(path, tmp):
+    copy = os.path.join(tmp, "History.copy")
+    shutil.copy2(path, copy)
+    conn = sqlite3.connect(copy)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+    finally:
+        conn.close()
+        os.remove(copy)
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = func()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{label:20s} {elapsed * 1000:8.2f} ms  ({result} rows)")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory(prefix="bench_sqlite_") as tmp:
+        path = os.path.join(tmp, "History")
+        make_history(path, rows)
+        print(f"History: {os.path.getsize(path) / 1024 / 1024:.1f} MB, {rows} urls")
+
+        timed("copy, then count", lambda: copy_and_count(path, tmp))
+        timings = QueryTimings()
+        timed("inspect in place", lambda: inspect_database(path, timings=timings).rows["urls"])
+        for label, seconds in timings.seconds.items():
+            print(f"  {label:18s} {seconds / ROUNDS * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -94,8 +94,8 @@ def load_cleaner_options_from_file(pathname: str) -> list[CleanerOption]:
                 continue
             command = act.getAttribute("command")
             # Support delete, chrome.history, chrome.favicons commands
-            # (treat them all as file deletion)
-            if command not in ("delete", "chrome.history", "chrome.favicons", "json"):
+            # (treat them all as file deletion), and truncate
+            if command not in ("delete", "truncate", "chrome.history", "chrome.favicons", "json"):
                 # unsupported in minimal loader; skip
                 continue
             search = act.getAttribute("search") or "file"
@@ -103,7 +103,11 @@ def load_cleaner_options_from_file(pathname: str) -> list[CleanerOption]:
             if not raw_path:
                 continue
             for expanded in _expand_multi_vars(raw_path, vars_map):
-                actions.append(DeleteAction(search=search, path=expanded))
+                actions.append(DeleteAction(
+                    search=search,
+                    path=expanded,
+                    command="truncate" if command == "truncate" else "delete",
+                ))
         if actions:
             options.append(CleanerOption(id=opt_id, label=opt_label, description=opt_desc, warning=opt_warn, actions=actions))
 
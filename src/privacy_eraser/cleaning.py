@@ -35,22 +35,20 @@ class DeleteAction:
     """Legacy delete action wrapper."""
     search: SearchType
     path: str
+    command: Literal["delete", "truncate"] = "delete"
 
-    def preview(self) -> list[str]:
-        action = CleaningAction(
-            action_type=ActionType.DELETE,
+    def to_core(self) -> CleaningAction:
+        return CleaningAction(
+            action_type=ActionType.TRUNCATE if self.command == "truncate" else ActionType.DELETE,
             search_type=_SEARCH_TYPE_MAP[self.search],
             path=self.path,
         )
-        return action.preview()
+
+    def preview(self) -> list[str]:
+        return self.to_core().preview()
 
     def execute(self) -> tuple[int, int]:
-        action = CleaningAction(
-            action_type=ActionType.DELETE,
-            search_type=_SEARCH_TYPE_MAP[self.search],
-            path=self.path,
-        )
-        return action.execute()
+        return self.to_core().execute()
 
 
 @dataclass
@@ -13,5 +13,7 @@ __all__ = [
     "file_utils",
     "windows_utils",
     "cleaner_engine",
+    "deletion_executor",
+    "dir_index",
 ]
 
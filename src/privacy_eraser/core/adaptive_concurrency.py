@@ -0,0 +1,160 @@
+"""Adaptive concurrency control for deletion workers
+
+AIMD-style tuning of the per-device worker count:
+- Measure unlinks/sec and mean latency over fixed-size windows
+- Additive increase while throughput keeps improving
+- Multiplicative decrease when throughput or latency degrades
+- Persist the best limit per device in settings_db
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# settings_db key prefix; the device id (st_dev) is appended
+SETTING_PREFIX = "deletion_concurrency."
+
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 32
+DEFAULT_WINDOW_SIZE = 64
+
+
+@dataclass
+class WindowSample:
+    """Measurements of one completed window."""
+    limit: int
+    ops: int
+    elapsed: float
+    throughput: float  # ops/sec
+    mean_latency: float  # seconds
+
+
+@dataclass
+class AIMDController:
+    """Find the throughput knee of one device.
+
+    Not thread-safe: callers record samples under their own lock.
+    """
+    initial: int
+    min_limit: int = DEFAULT_MIN_LIMIT
+    max_limit: int = DEFAULT_MAX_LIMIT
+    window_size: int = DEFAULT_WINDOW_SIZE
+    increase: int = 1
+    decrease: float = 0.5
+    # Relative throughput gain that counts as an improvement
+    tolerance: float = 0.05
+    # Mean latency growth (vs. best window) that triggers a decrease
+    latency_factor: float = 3.0
+    # Per-window decay of the best throughput, so the controller re-probes
+    # when conditions change mid-run
+    decay: float = 0.98
+    history: list[WindowSample] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.limit = self._clamp(self.initial)
+        self.best_limit = self.limit
+        self.best_throughput = 0.0
+        self.best_latency = 0.0
+        self._reset_window(time.monotonic())
+
+    def _clamp(self, value: int) -> int:
+        return max(self.min_limit, min(self.max_limit, int(value)))
+
+    def _reset_window(self, now: float) -> None:
+        self._window_start = now
+        self._window_ops = 0
+        self._window_latency = 0.0
+
+    def record(self, latency: float, now: float | None = None) -> int | None:
+        """Record one completed operation.
+
+        Returns the new limit when this sample closed a window and the limit
+        changed, otherwise None.
+        """
+        now = time.monotonic() if now is None else now
+        self._window_ops += 1
+        self._window_latency += latency
+        if self._window_ops < self.window_size:
+            return None
+
+        elapsed = max(now - self._window_start, 1e-9)
+        sample = WindowSample(
+            limit=self.limit,
+            ops=self._window_ops,
+            elapsed=elapsed,
+            throughput=self._window_ops / elapsed,
+            mean_latency=self._window_latency / self._window_ops,
+        )
+        self.history.append(sample)
+        self._reset_window(now)
+        return self._adjust(sample)
+
+    def _adjust(self, sample: WindowSample) -> int | None:
+        previous = self.limit
+        self.best_throughput *= self.decay
+
+        if sample.throughput > self.best_throughput * (1 + self.tolerance):
+            self.best_throughput = sample.throughput
+            self.best_latency = sample.mean_latency
+            self.best_limit = sample.limit
+            self.limit = self._clamp(self.limit + self.increase)
+        elif (
+            sample.throughput < self.best_throughput * (1 - self.tolerance)
+            or sample.mean_latency > self.best_latency * self.latency_factor
+        ):
+            if self.limit > self.best_limit:
+                # Overshot the knee: step back to the best known setting
+                self.limit = self._clamp(self.best_limit)
+            else:
+                # Degrading even at the best setting: the device got slower
+                self.limit = self._clamp(self.limit * self.decrease)
+        # Otherwise on the plateau: hold
+
+        if self.limit != previous:
+            logger.debug(
+                f"Concurrency {previous} -> {self.limit} "
+                f"({sample.throughput:.0f} ops/s, {sample.mean_latency * 1000:.1f} ms)"
+            )
+            return self.limit
+        return None
+
+
+def _setting_key(device: int) -> str:
+    return f"{SETTING_PREFIX}{device}"
+
+
+def load_tuned_limit(device: int) -> int | None:
+    """Return the limit stored for device by a previous run, if any."""
+    try:
+        from .. import settings_db
+
+        raw = settings_db.get_database_manager().load_setting(_setting_key(device))
+        if not raw:
+            return None
+        return int(json.loads(raw)["limit"])
+    except Exception as e:
+        logger.debug(f"No tuned concurrency for device {device}: {e}")
+        return None
+
+
+def save_tuned_limit(device: int, controller: AIMDController) -> None:
+    """Persist the best limit found for device."""
+    if not controller.history:
+        return
+    try:
+        from .. import settings_db
+
+        settings_db.get_database_manager().save_setting(
+            _setting_key(device),
+            json.dumps({
+                "limit": controller.best_limit,
+                "throughput": round(controller.best_throughput, 1),
+            }),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save tuned concurrency for device {device}: {e}")
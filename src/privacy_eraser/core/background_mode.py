@@ -0,0 +1,217 @@
+"""Low-impact background execution for scheduled cleaning
+
+Provides a "background" execution profile:
+- Lower CPU and I/O priority of the worker thread (psutil nice/ionice,
+  Linux only: elsewhere priority is per process and would slow the UI)
+- Throttle deletion to an ops/sec and MB/sec ceiling
+- Yield while system CPU load is above a threshold
+
+The run takes longer, but foreground work is not disturbed.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# settings_db key prefix for profile overrides
+SETTING_PREFIX = "background."
+
+# Only Linux schedules threads individually; lowering priority anywhere
+# else would slow the whole app, UI included
+PER_THREAD_PRIORITY = sys.platform.startswith("linux")
+
+_active_profile: contextvars.ContextVar[BackgroundProfile | None] = contextvars.ContextVar(
+    "background_profile", default=None
+)
+
+
+@dataclass
+class BackgroundProfile:
+    """Resource limits for a background run (None disables a limit)."""
+    max_ops_per_sec: float | None = 200.0
+    max_mb_per_sec: float | None = 20.0
+    # System-wide CPU percent above which deletion pauses
+    load_threshold: float | None = 75.0
+    load_check_interval: float = 1.0
+    yield_seconds: float = 0.5
+    # Upper bound of one continuous pause, so a busy machine still finishes
+    max_yield_seconds: float = 30.0
+    workers: int = 1
+    lower_priority: bool = True
+
+    @classmethod
+    def load(cls) -> BackgroundProfile:
+        """Build a profile from settings_db overrides (background.<field>)."""
+        profile = cls()
+        try:
+            from .. import settings_db
+
+            settings = settings_db.get_database_manager().get_all_settings()
+        except Exception as e:
+            logger.debug(f"Using default background profile: {e}")
+            return profile
+
+        for name, default in vars(cls()).items():
+            raw = settings.get(f"{SETTING_PREFIX}{name}")
+            if raw is None:
+                continue
+            try:
+                if raw.lower() in ("", "none", "off"):
+                    value = None
+                elif isinstance(default, bool):
+                    value = raw.lower() in ("1", "true", "yes", "on")
+                elif isinstance(default, int):
+                    value = int(raw)
+                else:
+                    value = float(raw)
+                setattr(profile, name, value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid setting {SETTING_PREFIX}{name}={raw!r}")
+        return profile
+
+    def create_pacer(self) -> Pacer:
+        return Pacer(self)
+
+
+class Pacer:
+    """Thread-safe throttle shared by all deletion workers of a run.
+
+    Uses a virtual clock: every operation and every deleted byte pushes the
+    earliest next start time forward, and workers sleep until it arrives.
+    """
+
+    def __init__(self, profile: BackgroundProfile, sleep: Callable[[float], None] = time.sleep):
+        self.profile = profile
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self._next_load_check = 0.0
+        self._yield_started: float | None = None
+        self.total_wait = 0.0
+        if profile.load_threshold is not None:
+            psutil.cpu_percent(interval=None)  # prime: first reading is meaningless
+
+    def _check_load(self, now: float) -> None:
+        """Push the virtual clock forward while the system is busy (holds lock)."""
+        profile = self.profile
+        if profile.load_threshold is None or now < self._next_load_check:
+            return
+        self._next_load_check = now + profile.load_check_interval
+
+        load = psutil.cpu_percent(interval=None)
+        if load <= profile.load_threshold:
+            self._yield_started = None
+            return
+        if self._yield_started is None:
+            self._yield_started = now
+        if now - self._yield_started >= profile.max_yield_seconds:
+            return  # paused long enough; make progress regardless
+        logger.debug(f"System load {load:.0f}% > {profile.load_threshold:.0f}%, yielding")
+        self._next_start = max(self._next_start, now + profile.yield_seconds)
+        self._next_load_check = self._next_start
+
+    def before_delete(self) -> None:
+        """Block until the next deletion may start."""
+        with self._lock:
+            now = time.monotonic()
+            self._check_load(now)
+            start = max(now, self._next_start)
+            if self.profile.max_ops_per_sec:
+                self._next_start = start + 1.0 / self.profile.max_ops_per_sec
+            else:
+                self._next_start = start
+            wait = start - now
+            self.total_wait += wait
+        if wait > 0:
+            self._sleep(wait)
+
+    def after_delete(self, nbytes: int) -> None:
+        """Charge deleted bytes against the MB/sec budget."""
+        if not self.profile.max_mb_per_sec or nbytes <= 0:
+            return
+        with self._lock:
+            cost = nbytes / (self.profile.max_mb_per_sec * 1024 * 1024)
+            self._next_start = max(self._next_start, time.monotonic()) + cost
+
+
+def current_profile() -> BackgroundProfile | None:
+    """Profile of the background run executing in this context, if any."""
+    return _active_profile.get()
+
+
+def lower_priority() -> Callable[[], None]:
+    """Lower the calling thread's CPU and I/O priority; return a restore function.
+
+    Linux only, where priorities are per thread and inherited by threads
+    spawned afterwards, so just the caller and its deletion workers are
+    affected. Elsewhere nothing is changed. Raising priority again needs
+    CAP_SYS_NICE, so callers on a thread that ends with the work should
+    not restore; a failed restore is logged.
+    """
+    if not PER_THREAD_PRIORITY:
+        logger.debug("Per-thread priority unavailable; running at normal priority")
+        return lambda: None
+
+    proc = psutil.Process(threading.get_native_id())
+    restorers: list[Callable[[], Any]] = []
+    try:
+        old_nice = proc.nice()
+        proc.nice(19)
+        restorers.append(lambda: proc.nice(old_nice))
+    except (psutil.Error, OSError) as e:
+        logger.debug(f"Could not lower CPU priority: {e}")
+
+    try:
+        old_ionice = proc.ionice()
+        proc.ionice(psutil.IOPRIO_CLASS_IDLE)
+        restorers.append(lambda: proc.ionice(old_ionice.ioclass, old_ionice.value))
+    except (psutil.Error, OSError) as e:
+        logger.debug(f"Could not lower I/O priority: {e}")
+
+    def restore() -> None:
+        for restorer in reversed(restorers):
+            try:
+                restorer()
+            except (psutil.Error, OSError) as e:
+                logger.warning(f"Could not restore thread priority: {e}")
+
+    return restore
+
+
+def run_in_background(profile: BackgroundProfile, func: Callable[..., Any], *args: Any) -> Any:
+    """Run func(*args) on a dedicated low-priority thread and wait for it.
+
+    The profile is visible to func through current_profile(). Exceptions are
+    re-raised in the calling thread.
+    """
+    outcome: dict[str, Any] = {}
+
+    def target() -> None:
+        token = _active_profile.set(profile)
+        if profile.lower_priority:
+            # The lowered priority ends with this thread; nothing to restore
+            lower_priority()
+        try:
+            outcome["result"] = func(*args)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            _active_profile.reset(token)
+
+    thread = threading.Thread(target=target, name="background-clean", daemon=True)
+    thread.start()
+    thread.join()
+
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
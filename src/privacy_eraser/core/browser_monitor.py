@@ -0,0 +1,281 @@
+"""Long-lived monitor of running browsers
+
+Keeps the set of running browser processes current without full process
+table scans:
+- Each poll lists PIDs only (psutil.pids, one system call)
+- Name and owner are read for PIDs that appeared since the last poll;
+  PIDs that vanished are dropped
+- The interval shrinks to min_interval after a change, or while someone
+  waits for a browser to exit, and grows towards max_interval while
+  nothing happens
+- Transitions are published as BrowserEvent ("started" / "exited") to
+  subscribers: the UI's browser cards, scheduled runs waiting to clean
+
+A PID reused by another process between two polls is not noticed; at the
+default intervals this needs a browser to exit and its PID to be handed
+out again within a few seconds.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping
+
+import psutil
+
+from .browser_processes import current_username, normalize_username
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL = 0.5
+DEFAULT_MAX_INTERVAL = 5.0
+# Interval growth per quiet poll
+BACKOFF = 1.5
+
+# process_info(pid) -> (name, username), or None if it cannot be read
+ProcessInfo = Callable[[int], "tuple[str | None, str | None] | None"]
+
+
+def read_process_info(pid: int) -> tuple[str | None, str | None] | None:
+    """Name and owner of pid (owner None if not readable)."""
+    try:
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            name = proc.name()
+            try:
+                username = proc.username()
+            except psutil.AccessDenied:
+                username = None
+        return name, username
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+@dataclass(frozen=True)
+class BrowserEvent:
+    """A browser's first process started, or its last one exited."""
+    browser: str  # lowercased browser name (key of process_names)
+    kind: str  # "started" or "exited"
+    pids: frozenset[int]
+
+
+class BrowserMonitor:
+    """Track running browsers by polling the PID set.
+
+    Args:
+        process_names: Browser name -> executable names
+        same_user: Only count processes of the current user
+        min_interval, max_interval: Bounds of the adaptive poll interval
+        pids: Source of the PID set (psutil.pids)
+        process_info: Reads name and owner of a new PID (read_process_info)
+    """
+
+    def __init__(
+        self,
+        process_names: Mapping[str, Iterable[str]],
+        same_user: bool = True,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        pids: Callable[[], Iterable[int]] = psutil.pids,
+        process_info: ProcessInfo = read_process_info,
+    ):
+        self.browser_of = {
+            exe.lower(): browser.lower()
+            for browser, exes in process_names.items()
+            for exe in exes
+        }
+        self.same_user = same_user
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.pids = pids
+        self.process_info = process_info
+        self.polls = 0
+        self.reads = 0  # process_info calls
+
+        self._current_user: str | None = None
+        self._user_known = False
+        self._own_pid = os.getpid()
+        self._known: set[int] = set()
+        self._owner: dict[int, str] = {}  # browser PIDs -> browser
+        self._running: dict[str, set[int]] = {}
+        self._subscribers: list[Callable[[BrowserEvent], None]] = []
+        self._waiters = 0
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ── polling ────────────────────────────────────────────────
+
+    def _user(self) -> str | None:
+        if not self._user_known:
+            self._user_known = True
+            if self.same_user:
+                self._current_user = current_username()
+        return self._current_user
+
+    def poll(self) -> list[BrowserEvent]:
+        """Update the running set from one PID listing; returns the transitions."""
+        current = set(self.pids())
+        user = self._user()
+        with self._changed:
+            before = {browser: set(pids) for browser, pids in self._running.items()}
+            for pid in self._known - current:
+                browser = self._owner.pop(pid, None)
+                if browser is not None:
+                    self._running[browser].discard(pid)
+            for pid in current - self._known:
+                if pid == self._own_pid:
+                    continue
+                self.reads += 1
+                info = self.process_info(pid)
+                if info is None:
+                    continue
+                name, username = info
+                browser = self.browser_of.get((name or "").lower())
+                if browser is None:
+                    continue
+                if user is not None and normalize_username(username) != user:
+                    continue
+                self._owner[pid] = browser
+                self._running.setdefault(browser, set()).add(pid)
+            self._known = current
+            self.polls += 1
+
+            events = []
+            for browser in sorted(set(before) | set(self._running)):
+                was, now = before.get(browser, set()), self._running.get(browser, set())
+                if now and not was:
+                    events.append(BrowserEvent(browser, "started", frozenset(now)))
+                elif was and not now:
+                    events.append(BrowserEvent(browser, "exited", frozenset(was)))
+            if events:
+                self._changed.notify_all()
+
+            if events or self._waiters:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * BACKOFF, self.max_interval)
+
+        for event in events:
+            logger.info(f"Browser {event.kind}: {event.browser} ({len(event.pids)} processes)")
+            for callback in list(self._subscribers):
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.warning(f"Browser event subscriber failed: {e}")
+        return events
+
+    # ── queries ────────────────────────────────────────────────
+
+    def running(self, browsers: Iterable[str] | None = None) -> list[str]:
+        """Running browsers, in the order given (default: all, lowercased).
+
+        Answered from the monitored state; polls once if the monitor has
+        not polled yet.
+        """
+        if not self.polls:
+            self.poll()
+        with self._changed:
+            if browsers is None:
+                return sorted(browser for browser, pids in self._running.items() if pids)
+            return [browser for browser in browsers if self._running.get(browser.lower())]
+
+    def wait_until_exited(self, browsers: Iterable[str], timeout: float | None = None) -> bool:
+        """Block until none of browsers runs; False if timeout passed first.
+
+        With the monitor thread running this wakes on its "exited" event;
+        otherwise it polls itself at min_interval.
+        """
+        wanted = [browser.lower() for browser in browsers]
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def any_running() -> bool:
+            return any(self._running.get(browser) for browser in wanted)
+
+        if not self.polls:
+            self.poll()
+        with self._changed:
+            self._waiters += 1
+        self._wake.set()  # Poll at min_interval while waiting
+        try:
+            while True:
+                with self._changed:
+                    if not any_running():
+                        return True
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    if self.is_alive():
+                        step = remaining if remaining is not None else self.max_interval
+                        self._changed.wait(min(step, self.max_interval))
+                        continue
+                time.sleep(self.min_interval if remaining is None else min(self.min_interval, remaining))
+                self.poll()
+        finally:
+            with self._changed:
+                self._waiters -= 1
+
+    # ── events ─────────────────────────────────────────────────
+
+    def subscribe(self, callback: Callable[[BrowserEvent], None]) -> Callable[[], None]:
+        """Call callback(event) on every transition (monitor thread); returns unsubscribe."""
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            try:
+                self._subscribers.remove(callback)
+            except ValueError:
+                pass
+
+        return unsubscribe
+
+    # ── thread ─────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Poll on a daemon thread until stop()."""
+        if self.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="browser-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Browser monitor poll failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_monitor: BrowserMonitor | None = None
+_monitor_lock = threading.Lock()
+
+
+def get_browser_monitor() -> BrowserMonitor:
+    """Process-wide monitor of the known browsers, started on first use."""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            from privacy_eraser.ui.core.data_config import BROWSER_PROCESSES
+
+            _monitor = BrowserMonitor(BROWSER_PROCESSES)
+        _monitor.start()
+        return _monitor
@@ -0,0 +1,559 @@
+"""Continuous cache cleaning driven by filesystem change notifications
+
+Alternative to scheduled runs:
+- Resolve the cache directories targeted by CleanerML walk.* delete
+  actions (the cache_dirs and cache_roots of PROFILE_LAYOUTS)
+- Watch them (inotify on Linux, mtime polling elsewhere)
+- Delete matching entries in small batches once a directory has been
+  quiet for a while, or after max_delay if it never goes quiet
+- Everything else the selection targets (cookies, history, storage) is
+  live browser state: it is cleaned by a CleaningService run once the
+  browser monitor reports the browser has exited
+
+Cleanup cost is spread over the day instead of one large burst.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from . import file_utils
+from .browser_monitor import BrowserEvent, BrowserMonitor, get_browser_monitor
+from .cleaner_engine import ActionType, CleaningAction, SearchType
+from .cleaning_service import WALK_SEARCHES, CleaningService, get_cleaning_service
+from .profile_scanner import PROFILE_LAYOUTS, ProfileLayout
+
+logger = logging.getLogger(__name__)
+
+# settings_db key prefix for WatchSettings overrides
+SETTING_PREFIX = "watch."
+
+
+@dataclass
+class WatchSettings:
+    """Timing and batching of a watch-mode cleaner."""
+    # Seconds without changes in a directory before it is cleaned
+    # (0 cleans entries as soon as they appear)
+    quiet_period: float = 5.0
+    # Clean a directory that keeps changing at least this often
+    max_delay: float = 60.0
+    batch_size: int = 50
+    # Pause between batches
+    batch_pause: float = 0.1
+    # Polling backend only
+    poll_interval: float = 2.0
+    # Re-resolve targets so newly created profile directories get watched
+    resolve_interval: float = 300.0
+
+    @classmethod
+    def load(cls) -> WatchSettings:
+        """Build settings from settings_db overrides (watch.<field>)."""
+        result = cls()
+        try:
+            from .. import settings_db
+
+            settings = settings_db.get_database_manager().get_all_settings()
+        except Exception as e:
+            logger.debug(f"Using default watch settings: {e}")
+            return result
+
+        for name, default in vars(cls()).items():
+            raw = settings.get(f"{SETTING_PREFIX}{name}")
+            if raw is None:
+                continue
+            try:
+                setattr(result, name, type(default)(raw))
+            except ValueError:
+                logger.warning(f"Ignoring invalid setting {SETTING_PREFIX}{name}={raw!r}")
+        return result
+
+
+@dataclass
+class WatchTarget:
+    """A directory watched on behalf of one delete action."""
+    root: str
+    recursive: bool
+    action: CleaningAction
+
+
+def _components(path: str) -> list[str]:
+    return [part.lower() for part in re.split(r"[\\/]+", path) if part]
+
+
+def is_cache_action(action: CleaningAction, layouts: dict[str, ProfileLayout] = PROFILE_LAYOUTS) -> bool:
+    """Whether action is a walk.* delete of browser cache directories.
+
+    Its path must end in one of the layouts' cache_dirs ("Cache",
+    "Service Worker/CacheStorage", ...) or lie below a cache root. Other
+    walks (Local Storage, Session Storage, IndexedDB) hold state the
+    running browser still uses.
+    """
+    if action.action_type != ActionType.DELETE or action.search_type not in WALK_SEARCHES or not action.path:
+        return False
+    parts = _components(action.path)
+    expanded = os.path.normpath(os.path.expanduser(os.path.expandvars(action.path)))
+    for layout in layouts.values():
+        for cache_dir in layout.cache_dirs:
+            suffix = _components(cache_dir)
+            if parts[-len(suffix):] == suffix:
+                return True
+        for root in layout.cache_roots:
+            root = os.path.normpath(os.path.expanduser(os.path.expandvars(root)))
+            if os.path.normcase(expanded) == os.path.normcase(root) or file_utils.is_inside(expanded, root):
+                return True
+    return False
+
+
+def resolve_watch_targets(actions: Iterable[CleaningAction]) -> list[WatchTarget]:
+    """Existing cache directories to watch (recursively) for the given actions.
+
+    Only actions accepted by is_cache_action are watched; the others are
+    left to the run after the browser exits.
+    """
+    targets: list[WatchTarget] = []
+    for action in actions:
+        if not is_cache_action(action):
+            continue
+        for root in file_utils.expand_glob_pattern(action.path):
+            if os.path.isdir(root):
+                targets.append(WatchTarget(os.path.normpath(root), True, action))
+    return targets
+
+
+# ── backends ──────────────────────────────────────────────────
+
+class PollingBackend:
+    """Detects changes by comparing directory mtimes every poll_interval."""
+
+    def __init__(self, poll_interval: float = 2.0):
+        self.poll_interval = poll_interval
+        self._mtimes: dict[str, int] = {}
+        self._recursive: set[str] = set()
+        self._wakeup = threading.Event()
+
+    def _snapshot(self, directory: str, recursive: bool) -> None:
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                self._mtimes[current] = os.stat(current).st_mtime_ns
+                if recursive:
+                    self._recursive.add(current)
+                    with os.scandir(current) as it:
+                        stack.extend(
+                            e.path for e in it if e.is_dir(follow_symlinks=False)
+                        )
+            except OSError:
+                self._mtimes.pop(current, None)
+
+    def add(self, directory: str, recursive: bool) -> None:
+        if directory not in self._mtimes:
+            self._snapshot(directory, recursive)
+
+    def wait(self, timeout: float) -> set[str]:
+        """Block up to timeout; return directories whose entries changed."""
+        self._wakeup.wait(min(timeout, self.poll_interval))
+        self._wakeup.clear()
+        changed: set[str] = set()
+        for directory, old in list(self._mtimes.items()):
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._mtimes.pop(directory, None)
+                self._recursive.discard(directory)
+                continue
+            if mtime != old:
+                changed.add(directory)
+                self._mtimes[directory] = mtime
+                if directory in self._recursive:
+                    # Pick up (and report) newly created subdirectories
+                    before = set(self._mtimes)
+                    self._snapshot(directory, True)
+                    changed.update(set(self._mtimes) - before)
+        return changed
+
+    def interrupt(self) -> None:
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self.interrupt()
+
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """Linux inotify via ctypes; one watch per directory."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wds: dict[int, tuple[str, bool]] = {}
+        self._paths: set[str] = set()
+        self._wake_r, self._wake_w = os.pipe()
+
+    def _watch(self, directory: str, recursive: bool) -> list[str]:
+        """Watch directory (and subdirectories if recursive); return those added."""
+        added: list[str] = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            if current in self._paths:
+                continue
+            wd = self._add_watch(self._fd, os.fsencode(current), _WATCH_MASK)
+            if wd < 0:
+                logger.debug(f"inotify_add_watch failed for {current}: errno {ctypes.get_errno()}")
+                continue
+            self._wds[wd] = (current, recursive)
+            self._paths.add(current)
+            added.append(current)
+            if recursive:
+                try:
+                    with os.scandir(current) as it:
+                        stack.extend(e.path for e in it if e.is_dir(follow_symlinks=False))
+                except OSError:
+                    pass
+        return added
+
+    def add(self, directory: str, recursive: bool) -> None:
+        self._watch(directory, recursive)
+
+    def wait(self, timeout: float) -> set[str]:
+        """Block up to timeout; return directories whose entries changed."""
+        ready, _, _ = select.select([self._fd, self._wake_r], [], [], max(timeout, 0))
+        if self._wake_r in ready:
+            os.read(self._wake_r, 512)
+        if self._fd not in ready:
+            return set()
+
+        changed: set[str] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.debug("inotify queue overflow, rescanning all watched directories")
+                changed.update(self._paths)
+                continue
+            if mask & IN_IGNORED:
+                directory, _ = self._wds.pop(wd, (None, False))
+                self._paths.discard(directory)
+                continue
+            directory, recursive = self._wds.get(wd, (None, False))
+            if directory is None:
+                continue
+            changed.add(directory)
+            if recursive and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Entries created before the watch was added are covered by
+                # reporting the new directories as changed
+                changed.update(self._watch(os.path.join(directory, os.fsdecode(name)), True))
+        return changed
+
+    def interrupt(self) -> None:
+        os.write(self._wake_w, b"x")
+
+    def close(self) -> None:
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def create_backend(settings: WatchSettings) -> InotifyBackend | PollingBackend:
+    """inotify where available, polling otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyBackend()
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable ({e}), falling back to polling")
+    return PollingBackend(settings.poll_interval)
+
+
+# ── watcher ───────────────────────────────────────────────────
+
+# Error messages a watcher keeps; it runs for the whole session
+MAX_RECENT_ERRORS = 100
+
+
+@dataclass
+class WatchStats:
+    """Totals since the watcher started."""
+    deleted: int = 0
+    failed: int = 0
+    bytes_deleted: int = 0
+    batches: int = 0
+    error_count: int = 0
+    errors: deque[str] = field(default_factory=lambda: deque(maxlen=MAX_RECENT_ERRORS))  # most recent
+
+    def add_errors(self, *messages: str) -> None:
+        self.error_count += len(messages)
+        self.errors.extend(messages)
+
+
+class CacheWatcher:
+    """Deletes cache entries as they appear; the rest once the browser exits.
+
+    Args:
+        actions: Delete actions of the selection; the cache walks among
+            them are watched (is_cache_action)
+        browsers, options: The selection; after a browser exits, its
+            options are cleaned by a CleaningService run
+        service: Runs the deletions (default: get_cleaning_service())
+        monitor: Reports browser exits (default: get_browser_monitor())
+        delete_func: Deletes one watched cache entry (default: service.delete,
+            following no symlink below the watched directories)
+    """
+
+    def __init__(
+        self,
+        actions: Iterable[CleaningAction],
+        settings: WatchSettings | None = None,
+        browsers: Iterable[str] = (),
+        options: Iterable[str] = (),
+        service: CleaningService | None = None,
+        monitor: BrowserMonitor | None = None,
+        delete_func: Callable[[str], tuple[bool, int]] | None = None,
+        backend: InotifyBackend | PollingBackend | None = None,
+        name: str = "cache-watcher",
+    ):
+        service = service or get_cleaning_service()
+        self.actions = list(actions)
+        self.settings = settings or WatchSettings()
+        self.browsers = {browser.lower(): browser for browser in browsers}
+        self.options = list(options)
+        self.service = service
+        self.monitor = monitor
+        self.delete_func = delete_func or self._delete
+        self.backend = backend or create_backend(self.settings)
+        self.name = name
+        self.stats = WatchStats()
+        self.targets: list[WatchTarget] = []
+        # dir -> (first change, last change), monotonic
+        self._pending: dict[str, tuple[float, float]] = {}
+        # Browsers that exited and whose options are not cleaned yet
+        self._exited: set[str] = set()
+        self._exited_lock = threading.Lock()
+        self._unsubscribe: Callable[[], None] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._next_resolve = 0.0
+
+    # ── lifecycle ──────────────────────────────────────────────
+
+    def start(self, initial_clean: bool = True) -> None:
+        """Start watching on a daemon thread.
+
+        initial_clean cleans the watched cache directories right away and
+        the rest of the selection of browsers that are not running.
+        """
+        if self._thread is not None:
+            return
+        self._resolve(initial_clean)
+        if self.browsers:
+            self._watch_browsers(initial_clean)
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"{self.name}: watching {len(self.targets)} directories")
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self.backend.interrupt()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.backend.close()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ── internals ──────────────────────────────────────────────
+
+    def _watch_browsers(self, initial_clean: bool) -> None:
+        if self.monitor is None:
+            self.monitor = get_browser_monitor()
+        self._unsubscribe = self.monitor.subscribe(self._on_browser_event)
+        if initial_clean:
+            running = set(self.monitor.running(self.browsers))
+            with self._exited_lock:
+                self._exited.update(b for b in self.browsers if b not in running)
+
+    def _on_browser_event(self, event: BrowserEvent) -> None:
+        # Monitor thread: hand the run to the watcher thread
+        if event.kind == "exited" and event.browser in self.browsers:
+            with self._exited_lock:
+                self._exited.add(event.browser)
+            self.backend.interrupt()
+
+    def _resolve(self, mark_pending: bool) -> None:
+        # Already watched directories are kept; watches on removed ones
+        # lapse on their own
+        self.targets = resolve_watch_targets(self.actions)
+        now = time.monotonic()
+        for target in self.targets:
+            self.backend.add(target.root, target.recursive)
+            if mark_pending:
+                self._pending.setdefault(target.root, (now, now))
+        self._next_resolve = now + self.settings.resolve_interval
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll(self._next_timeout())
+            except Exception as e:
+                logger.error(f"{self.name}: {e}")
+                self._stop.wait(self.settings.poll_interval)
+
+    def _next_timeout(self) -> float:
+        """Seconds until the earliest pending directory becomes due."""
+        timeout = max(self._next_resolve - time.monotonic(), 0.0)
+        now = time.monotonic()
+        for first, last in self._pending.values():
+            due = min(last + self.settings.quiet_period, first + self.settings.max_delay)
+            timeout = min(timeout, max(due - now, 0.0))
+        return timeout
+
+    def poll(self, timeout: float = 0.0) -> int:
+        """Wait up to timeout for changes, then clean due directories.
+
+        Returns the number of entries deleted. Called by the watcher thread;
+        usable directly for a synchronous single step.
+        """
+        changed = self.backend.wait(timeout)
+        deleted = self._clean_exited()
+        now = time.monotonic()
+        for directory in changed:
+            first, _ = self._pending.get(directory, (now, now))
+            self._pending[directory] = (first, now)
+
+        if now >= self._next_resolve:
+            self._resolve(mark_pending=False)
+
+        settings = self.settings
+        due = [
+            directory for directory, (first, last) in self._pending.items()
+            if now - last >= settings.quiet_period or now - first >= settings.max_delay
+        ]
+        if not due:
+            return deleted
+        for directory in due:
+            del self._pending[directory]
+        return deleted + self._clean(due)
+
+    def _clean_exited(self) -> int:
+        """Run the full selection of browsers that exited since the last call."""
+        with self._exited_lock:
+            exited = sorted(self._exited)
+            self._exited.clear()
+        deleted = 0
+        for key in exited:
+            if self._stop.is_set():
+                break
+            browser = self.browsers[key]
+            if self.monitor is not None and self.monitor.running([browser]):
+                continue  # Restarted before the run began; wait for the next exit
+            try:
+                plan = self.service.collect([browser], self.options)
+                result = self.service.run(plan, [browser], self.options, should_cancel=self._stop.is_set)
+            except Exception as e:
+                self.stats.add_errors(f"{browser}: {e}")
+                logger.error(f"{self.name}: cleaning {browser} after exit failed: {e}")
+                continue
+            deleted += result.deleted
+            self.stats.deleted += result.deleted
+            self.stats.failed += result.failed
+            self.stats.bytes_deleted += result.bytes_deleted
+            self.stats.add_errors(*result.errors)
+            logger.info(f"{self.name}: {browser} exited, deleted {result.deleted}/{len(plan)} targets")
+        return deleted
+
+    def _delete(self, path: str) -> tuple[bool, int]:
+        return self.service.delete(path, [target.root for target in self.targets])
+
+    def _candidates(self, directories: list[str]) -> list[str]:
+        """Entries in the given directories that some action would delete."""
+        found: set[str] = set()
+        for directory in directories:
+            for target in self.targets:
+                if not _covers(target, directory):
+                    continue
+                search = target.action.search_type
+                try:
+                    with os.scandir(directory) as it:
+                        for entry in it:
+                            if search == SearchType.WALK_FILES and entry.is_dir(follow_symlinks=False):
+                                continue
+                            found.add(entry.path)
+                except OSError:
+                    continue
+        return sorted(found)
+
+    def _clean(self, directories: list[str]) -> int:
+        candidates = self._candidates(directories)
+        deleted = 0
+        batch_size = max(self.settings.batch_size, 1)
+        for start in range(0, len(candidates), batch_size):
+            if self._stop.is_set():
+                break
+            if start:
+                self._stop.wait(self.settings.batch_pause)
+            for path in candidates[start:start + batch_size]:
+                try:
+                    success, size = self.delete_func(path)
+                except Exception as e:
+                    success, size = False, 0
+                    self.stats.add_errors(f"{path}: {e}")
+                if success:
+                    deleted += 1
+                    self.stats.deleted += 1
+                    self.stats.bytes_deleted += size
+                else:
+                    self.stats.failed += 1
+            self.stats.batches += 1
+        if candidates:
+            logger.debug(f"{self.name}: deleted {deleted}/{len(candidates)} entries")
+        return deleted
+
+
+def _covers(target: WatchTarget, directory: str) -> bool:
+    if directory == target.root:
+        return True
+    if not target.recursive:
+        return False
+    return directory.startswith(target.root.rstrip(os.sep) + os.sep)
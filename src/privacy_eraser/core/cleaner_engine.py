@@ -13,6 +13,7 @@ from __future__ import annotations
 import logging
 import os
 import platform
+import stat
 import subprocess
 import tempfile
 import xml.etree.ElementTree as ET
@@ -22,10 +23,19 @@ from pathlib import Path
 from typing import Any, Callable, Iterator
 
 from . import file_utils
+from .dir_index import DirectoryIndex
+from .secure_wipe import SecureWiper
 
 logger = logging.getLogger(__name__)
 
 
+def _lstat_or_none(path: str) -> os.stat_result | None:
+    try:
+        return os.lstat(path)
+    except OSError:
+        return None
+
+
 class ActionType(Enum):
     """Type of cleaning action."""
     DELETE = "delete"
@@ -44,6 +54,12 @@ class SearchType(Enum):
     WALK_TOP = "walk.top"  # walk.all + parent dir itself
 
 
+_WALK_TYPES = (SearchType.WALK_FILES, SearchType.WALK_ALL, SearchType.WALK_TOP)
+
+# Options whose files are overwritten before unlinking when a wiper is given
+SENSITIVE_OPTIONS = frozenset({"cookies", "passwords", "history"})
+
+
 class WinCleanHost(Enum):
     """WinClean script execution host."""
     POWERSHELL = "PowerShell"
@@ -99,11 +115,16 @@ class CleaningAction:
     registry_key: str = ""
     registry_value: str = ""
     
-    def preview(self) -> list[str]:
-        """Preview what would be cleaned (don't actually delete)."""
+    def preview(self, index: DirectoryIndex | None = None) -> list[str]:
+        """Preview what would be cleaned (don't actually delete).
+
+        Args:
+            index: Optional directory index; unchanged, file-less
+                directories are then skipped instead of listed
+        """
         items: list[str] = []
         
-        if self.action_type == ActionType.DELETE:
+        if self.action_type in (ActionType.DELETE, ActionType.TRUNCATE):
             if self.search_type == SearchType.FILE:
                 for path in file_utils.expand_glob_pattern(self.path):
                     if os.path.lexists(path):
@@ -115,21 +136,21 @@ class CleaningAction:
             elif self.search_type == SearchType.WALK_FILES:
                 for path in file_utils.expand_glob_pattern(self.path):
                     if os.path.isdir(path):
-                        items.extend(file_utils.walk_directory_files(path))
+                        items.extend(file_utils.walk_directory_files(path, index))
                     elif os.path.lexists(path):
                         items.append(path)
                         
             elif self.search_type == SearchType.WALK_ALL:
                 for path in file_utils.expand_glob_pattern(self.path):
                     if os.path.isdir(path):
-                        items.extend(file_utils.walk_directory_all(path))
+                        items.extend(file_utils.walk_directory_all(path, index))
                     elif os.path.lexists(path):
                         items.append(path)
                         
             elif self.search_type == SearchType.WALK_TOP:
                 for path in file_utils.expand_glob_pattern(self.path):
                     if os.path.isdir(path):
-                        items.extend(file_utils.walk_directory_all(path))
+                        items.extend(file_utils.walk_directory_all(path, index))
                         items.append(path)  # Include parent dir
                     elif os.path.lexists(path):
                         items.append(path)
@@ -142,23 +163,82 @@ class CleaningAction:
             items.append(f"Registry: {self.registry_key}\\{self.registry_value}")
         
         return sorted(set(items))
+
+    def targets(
+        self,
+        lstat: Callable[[str], os.stat_result | None] | None = None,
+        index: DirectoryIndex | None = None,
+    ) -> list[str]:
+        """Top-most paths whose deletion carries out a DELETE action.
+
+        Unlike preview(), a directory removed as a whole is one target
+        rather than one per entry: walk.all yields the children of each
+        matched directory, walk.top the directory itself. walk.files
+        still yields files, since its directories stay.
+
+        Args:
+            lstat: Optional lstat() returning None for missing paths, e.g.
+                a cache shared with later size queries
+            index: Optional directory index for the walk.files walks (see
+                preview)
+        """
+        if self.action_type != ActionType.DELETE:
+            return []
+        lstat = lstat or _lstat_or_none
+
+        found: list[str] = []
+        for path in dict.fromkeys(file_utils.expand_glob_pattern(self.path)):
+            st = lstat(path)
+            if st is None:
+                continue
+            if not stat.S_ISDIR(st.st_mode) or self.search_type not in (SearchType.WALK_FILES, SearchType.WALK_ALL):
+                found.append(path)  # Removed as a whole, walk.top included
+            elif self.search_type == SearchType.WALK_ALL:
+                try:
+                    with os.scandir(path) as entries:
+                        found.extend(entry.path for entry in entries)
+                except OSError as e:
+                    logger.error(f"Error listing {path}: {e}")
+            else:
+                found.extend(file_utils.walk_directory_files(path, index))
+        return found
     
-    def execute(self) -> tuple[int, int]:
+    def execute(
+        self,
+        index: DirectoryIndex | None = None,
+        wiper: SecureWiper | None = None,
+    ) -> tuple[int, int]:
         """Execute the cleaning action.
         
-        Returns: (items_deleted, bytes_deleted)
+        Args:
+            index: Optional directory index (see preview)
+            wiper: Overwrite regular files with it before unlinking
+
+        Returns: (items_deleted, bytes_deleted); for TRUNCATE the files
+            emptied and the bytes reclaimed
         """
         items_deleted = 0
         bytes_deleted = 0
         
+        if self.action_type == ActionType.TRUNCATE:
+            return file_utils.truncate_files(self.preview(index))
+
         if self.action_type == ActionType.DELETE:
-            for path in self.preview():
+            if wiper is not None:
+                return self._execute_wipe(index, wiper)
+            if index is None and file_utils.FD_OPS_SUPPORTED and self.search_type in _WALK_TYPES:
+                return self._execute_walk()
+            emptied: set[str] = set()
+            for path in self.preview(index):
                 if path.startswith("Registry:"):
                     continue  # Skip registry placeholders
                 success, size = file_utils.delete_file_simple(path)
                 if success:
                     items_deleted += 1
                     bytes_deleted += size
+                    emptied.add(os.path.dirname(path))
+            if self.search_type == SearchType.WALK_FILES:
+                self._prune_emptied(emptied)
                     
         elif self.action_type == ActionType.REGISTRY_DELETE_KEY:
             # Import here to avoid Windows dependency on other platforms
@@ -175,6 +255,72 @@ class CleaningAction:
         
         return items_deleted, bytes_deleted
 
+    def _execute_walk(self) -> tuple[int, int]:
+        """Delete walk targets in one fd-relative pass, without a preview list."""
+        items_deleted = 0
+        bytes_deleted = 0
+
+        for path in dict.fromkeys(file_utils.expand_glob_pattern(self.path)):
+            if os.path.isdir(path):
+                files_only = self.search_type == SearchType.WALK_FILES
+                items, size = file_utils.delete_directory_contents(
+                    path, files_only=files_only, prune_emptied=files_only
+                )
+                items_deleted += items
+                bytes_deleted += size
+                if self.search_type != SearchType.WALK_TOP:
+                    continue
+            elif not os.path.lexists(path):
+                continue
+            success, size = file_utils.delete_file_simple(path)
+            if success:
+                items_deleted += 1
+                bytes_deleted += size
+
+        return items_deleted, bytes_deleted
+
+    def _execute_wipe(self, index: DirectoryIndex | None, wiper: SecureWiper) -> tuple[int, int]:
+        """Wipe regular files in batches, then delete the remaining entries."""
+        items_deleted = 0
+        bytes_deleted = 0
+
+        files: list[str] = []
+        others: list[str] = []
+        for path in self.preview(index):
+            try:
+                regular = stat.S_ISREG(os.lstat(path).st_mode)
+            except OSError:
+                continue
+            if file_utils.is_whitelisted(path):
+                continue
+            (files if regular else others).append(path)
+
+        emptied: set[str] = set()
+        for path, success, size, error in wiper.wipe_paths(files):
+            if success:
+                items_deleted += 1
+                bytes_deleted += size
+                emptied.add(os.path.dirname(path))
+            else:
+                logger.warning(f"Error wiping {path}: {error}")
+        # Reverse order: directory contents before the directory itself
+        for path in reversed(others):
+            success, size = file_utils.delete_file_simple(path)
+            if success:
+                items_deleted += 1
+                bytes_deleted += size
+
+        if self.search_type == SearchType.WALK_FILES:
+            self._prune_emptied(emptied)
+        return items_deleted, bytes_deleted
+
+    def _prune_emptied(self, emptied: set[str]) -> None:
+        """Remove directories below the action's roots that a walk.files
+        run left empty, so later walks do not list them again."""
+        for root in file_utils.expand_glob_pattern(self.path):
+            if os.path.isdir(root):
+                file_utils.prune_emptied_dirs(emptied, root)
+
 
 @dataclass
 class CleanerOption:
@@ -185,21 +331,30 @@ class CleanerOption:
     warning: str | None = None
     actions: list[CleaningAction] = field(default_factory=list)
     
-    def preview(self) -> list[str]:
+    def preview(self, index: DirectoryIndex | None = None) -> list[str]:
         """Preview all items that would be cleaned."""
         all_items: list[str] = []
         for action in self.actions:
-            all_items.extend(action.preview())
+            all_items.extend(action.preview(index))
         return sorted(set(all_items))
     
-    def execute(self, progress_callback: Callable[[str, int, int], None] | None = None) -> tuple[int, int]:
+    def execute(
+        self,
+        progress_callback: Callable[[str, int, int], None] | None = None,
+        index: DirectoryIndex | None = None,
+        wiper: SecureWiper | None = None,
+    ) -> tuple[int, int]:
         """Execute all cleaning actions.
         
         Args:
             progress_callback: Optional callback(message, items_done, total_items)
+            index: Optional directory index (see CleaningAction.preview)
+            wiper: Optional secure wiper, used for SENSITIVE_OPTIONS only
             
         Returns: (total_items_deleted, total_bytes_deleted)
         """
+        if self.id not in SENSITIVE_OPTIONS:
+            wiper = None
         total_items = 0
         total_bytes = 0
         
@@ -208,7 +363,7 @@ class CleanerOption:
                 progress_callback(f"Cleaning {self.label}...", i, len(self.actions))
             
             try:
-                items, size = action.execute()
+                items, size = action.execute(index, wiper)
                 total_items += items
                 total_bytes += size
             except Exception as e:
@@ -233,23 +388,29 @@ class Cleaner:
         """Get a specific cleaning option."""
         return self.options.get(option_id)
     
-    def preview_all(self) -> dict[str, list[str]]:
+    def preview_all(self, index: DirectoryIndex | None = None) -> dict[str, list[str]]:
         """Preview all options.
         
         Returns: {option_id: [items]}
         """
         result: dict[str, list[str]] = {}
         for option_id, option in self.options.items():
-            result[option_id] = option.preview()
+            result[option_id] = option.preview(index)
         return result
     
     def execute_options(
         self, 
         option_ids: list[str],
-        progress_callback: Callable[[str, int, int], None] | None = None
+        progress_callback: Callable[[str, int, int], None] | None = None,
+        index: DirectoryIndex | None = None,
+        wiper: SecureWiper | None = None,
     ) -> tuple[int, int]:
         """Execute selected options.
         
+        With an index, it is saved afterwards so the next run can skip
+        directories this run left unchanged. With a wiper, files of
+        SENSITIVE_OPTIONS are overwritten before they are unlinked.
+
         Returns: (total_items_deleted, total_bytes_deleted)
         """
         total_items = 0
@@ -262,7 +423,7 @@ class Cleaner:
                 continue
             
             try:
-                items, size = option.execute(progress_callback)
+                items, size = option.execute(progress_callback, index, wiper)
                 total_items += items
                 total_bytes += size
                 logger.info(f"Cleaned {option.label}: {items} items, {file_utils.format_bytes(size)}")
@@ -270,6 +431,12 @@ class Cleaner:
                 logger.error(f"Error cleaning {option.label}: {e}")
                 continue
         
+        if index is not None:
+            try:
+                index.save()
+            except Exception as e:
+                logger.warning(f"Failed to save directory index: {e}")
+        
         return total_items, total_bytes
 
 
@@ -0,0 +1,505 @@
+"""Cleaning service: one entry point for interactive and scheduled runs
+
+The UI worker and the schedule executor both turn "these browsers, these
+options" into deleted files through CleaningService:
+- PlanCache: CleanerML files are parsed into core CleaningActions once
+  per file version (mtime, size); later runs reuse them
+- StatCache: lstat() results and directory sizes seen while collecting,
+  reused by the size estimate; callers create one per run
+- Targets come from CleaningAction.targets: whole directories are one
+  entry, removed fd-relative in a single pass (file_utils.remove_path)
+- DirectoryIndex: walk.files walks skip unchanged, file-less directories;
+  the index is saved after every run
+- DeletionExecutor runs the plan: per-device pools, locality batches,
+  background pacing, locked-file retries, pruning below the directories
+  the walk actions matched
+- TRUNCATE actions are applied once the deletions are done
+- With the secure_wipe.enabled setting, targets of SENSITIVE_OPTIONS are
+  tagged while collecting (SENSITIVE_TARGET) and overwritten before they
+  are unlinked (secure_wipe)
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import stat
+import threading
+from typing import Callable, Iterable
+
+from . import file_utils
+from .background_mode import current_profile
+from .cleaner_engine import SENSITIVE_OPTIONS, ActionType, CleaningAction, SearchType
+from .deletion_executor import (
+    CleaningPlan,
+    DeleteFunc,
+    DeletionExecutor,
+    DeletionStats,
+    ResultCallback,
+)
+from .dir_index import DirectoryIndex
+from .locked_files import LockedFileQueue
+from .path_table import PathTable
+from .secure_wipe import SecureWiper, WipeSettings
+from .size_estimator import SizeEstimate, estimate_paths
+
+logger = logging.getLogger(__name__)
+
+# xml_path_for(browser) -> CleanerML path, or None when there is none
+XmlPathResolver = Callable[[str], "str | None"]
+
+# browser_targets(browser, options) -> deletion targets
+TargetCollector = Callable[[str, list[str]], list[str]]
+
+# Searches whose matched directories a run may prune below
+WALK_SEARCHES = (SearchType.WALK_FILES, SearchType.WALK_ALL, SearchType.WALK_TOP)
+
+# PathTable flag of plan targets collected for a SENSITIVE_OPTIONS option
+SENSITIVE_TARGET = 0x01
+
+
+def _browser_xml_path(browser: str) -> str | None:
+    from privacy_eraser.ui.core.data_config import get_browser_xml_path
+    return get_browser_xml_path(browser)
+
+
+def _load_cleanerml(xml_path: str) -> dict[str, list[CleaningAction]]:
+    from privacy_eraser.cleanerml_loader import load_cleaner_options_from_file
+    return {
+        option.id: [action.to_core() for action in option.actions]
+        for option in load_cleaner_options_from_file(xml_path)
+    }
+
+
+class PlanCache:
+    """Core actions per browser and option, parsed once per file version.
+
+    A CleanerML file is parsed again only when its mtime or size changed;
+    files that cannot be stat()ed are parsed every time.
+    """
+
+    def __init__(
+        self,
+        xml_path_for: XmlPathResolver = _browser_xml_path,
+        loader: Callable[[str], dict[str, list[CleaningAction]]] = _load_cleanerml,
+    ):
+        self.xml_path_for = xml_path_for
+        self.loader = loader
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # xml path -> ((mtime_ns, size), option id -> actions)
+        self._entries: dict[str, tuple[tuple[int, int], dict[str, list[CleaningAction]]]] = {}
+
+    def options(self, browser: str) -> dict[str, list[CleaningAction]]:
+        """Actions of every option of browser's CleanerML file.
+
+        Raises whatever the loader raises for a broken file.
+        """
+        xml_path = self.xml_path_for(browser)
+        if not xml_path:
+            logger.warning(f"CleanerML path not found: {browser}")
+            return {}
+        try:
+            st = os.stat(xml_path)
+            version: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+
+        with self._lock:
+            cached = self._entries.get(xml_path)
+            if version is not None and cached is not None and cached[0] == version:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        parsed = self.loader(xml_path)
+        if version is not None:
+            with self._lock:
+                self._entries[xml_path] = (version, parsed)
+        return parsed
+
+    def actions(self, browser: str, options: Iterable[str]) -> list[CleaningAction]:
+        """Actions of the selected options, in option order."""
+        parsed = self.options(browser)
+        return [action for option_id in options for action in parsed.get(option_id, ())]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class StatCache:
+    """lstat() results and directory sizes, kept for one run.
+
+    Missing paths are cached as None. Directory sizes are computed once
+    (symlinks are not followed) and reused. Safe to share between
+    threads; the syscalls run outside the lock.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._stats: dict[str, os.stat_result | None] = {}
+        self._tree_sizes: dict[str, int] = {}
+
+    def lstat(self, path: str) -> os.stat_result | None:
+        with self._lock:
+            if path in self._stats:
+                self.hits += 1
+                return self._stats[path]
+            self.misses += 1
+        try:
+            st = os.lstat(path)
+        except OSError:
+            st = None
+        with self._lock:
+            self._stats[path] = st
+        return st
+
+    def size(self, path: str) -> int:
+        """Bytes of a regular file, or of the regular files below a directory."""
+        st = self.lstat(path)
+        if st is None:
+            return 0
+        if stat.S_ISREG(st.st_mode):
+            return st.st_size
+        if not stat.S_ISDIR(st.st_mode):
+            return 0
+        with self._lock:
+            size = self._tree_sizes.get(path)
+        if size is None:
+            size = self._scan_tree(path)
+            with self._lock:
+                self._tree_sizes[path] = size
+        return size
+
+    def _scan_tree(self, directory: str) -> int:
+        total = 0
+        pending = [directory]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                total += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._tree_sizes.clear()
+
+
+class CleaningService:
+    """Collect and delete the cleaning targets of selected browsers.
+
+    Usage:
+        service = get_cleaning_service()
+        stat_cache = StatCache()
+        plan = service.collect(browsers, options, stats=stat_cache)
+        estimate = service.estimate(plan, stat_cache)
+        stats = service.run(plan, browsers, options, on_result=...)
+
+    The plan cache and the directory index live as long as the service
+    and are shared by all runs; the index is saved to disk after each
+    run(). Stat caches belong to one run, so concurrent runs never see
+    (or clear) each other's results.
+    """
+
+    def __init__(self, plans: PlanCache | None = None, index: DirectoryIndex | None = None):
+        self.plans = plans or PlanCache()
+        self.index = index if index is not None else DirectoryIndex()
+        # DirectoryIndex is not thread-safe; walks and saves take turns
+        self._index_lock = threading.Lock()
+
+    # ── planning ───────────────────────────────────────────────
+
+    def actions(self, browser: str, options: Iterable[str]) -> list[CleaningAction]:
+        """Selected actions of browser; empty if its CleanerML cannot be loaded."""
+        try:
+            return self.plans.actions(browser, options)
+        except Exception as e:
+            logger.warning(f"Failed to load CleanerML for {browser}: {e}")
+            return []
+
+    def browser_targets(
+        self,
+        browser: str,
+        options: list[str],
+        stats: StatCache | None = None,
+    ) -> list[str]:
+        """Deletion targets of browser's selected options.
+
+        stats keeps the lstat() results for a later estimate().
+        """
+        lstat = stats.lstat if stats is not None else None
+        targets: list[str] = []
+        for action in self.actions(browser, options):
+            try:
+                with self._index_lock:
+                    targets.extend(action.targets(lstat, self.index))
+            except Exception as e:
+                logger.debug(f"Failed to expand {action.path}: {e}")
+        return targets
+
+    def collect(
+        self,
+        browsers: Iterable[str],
+        options: list[str],
+        browser_targets: TargetCollector | None = None,
+        stats: StatCache | None = None,
+        tag_sensitive: bool | None = None,
+    ) -> CleaningPlan:
+        """De-duplicated plan over browsers, with per-browser counts.
+
+        browser_targets replaces the per-browser collection (default:
+        self.browser_targets, filling stats when given). With tag_sensitive
+        (default: the secure_wipe.enabled setting) the SENSITIVE_OPTIONS
+        are collected first and their targets flagged SENSITIVE_TARGET.
+        """
+        if browser_targets is None:
+            def browser_targets(browser: str, options: list[str]) -> list[str]:
+                return self.browser_targets(browser, options, stats)
+        # Compact storage: profiles can hold millions of entries. Duplicates
+        # are dropped while filling, so only one table is built.
+        if tag_sensitive is None:
+            tag_sensitive = WipeSettings.load().enabled
+        sensitive = [option_id for option_id in options if option_id in SENSITIVE_OPTIONS] if tag_sensitive else []
+        if sensitive:
+            rest = [option_id for option_id in options if option_id not in SENSITIVE_OPTIONS]
+            groups = [(sensitive, SENSITIVE_TARGET), (rest, 0)]
+        else:
+            groups = [(options, 0)]
+
+        collected = PathTable()
+        seen: dict[str, set[str]] = {}
+        found_total = 0
+        browser_counts: dict[str, int] = {}
+        for browser in browsers:
+            try:
+                found = [(browser_targets(browser, group), flags) for group, flags in groups if group]
+            except Exception as e:
+                logger.warning(f"Failed to collect files for {browser}: {e}")
+                browser_counts[browser] = 0
+                continue
+            count = 0
+            for paths, flags in found:
+                collected.extend_unique(paths, seen, flags)
+                count += len(paths)
+            found_total += count
+            browser_counts[browser] = count
+            logger.info(f"{browser}: {count} targets")
+        seen.clear()
+
+        plan = CleaningPlan(collected, browser_counts)
+        if len(plan) < found_total:
+            logger.info(f"Removed duplicates: {found_total} -> {len(plan)} targets")
+        return plan
+
+    def prune_roots(self, browsers: Iterable[str], options: list[str]) -> list[str]:
+        """Directories the selected walk.* delete actions matched.
+
+        Directories emptied by a run are only pruned below these. file and
+        glob actions add none: the directory holding their target (a
+        profile, for ".../User Data/*/Cache") is never theirs to remove.
+        """
+        roots: set[str] = set()
+        for browser in browsers:
+            for action in self.actions(browser, options):
+                if action.action_type != ActionType.DELETE or action.search_type not in WALK_SEARCHES:
+                    continue
+                roots.update(
+                    os.path.normpath(path)
+                    for path in file_utils.expand_glob_pattern(action.path)
+                    if os.path.isdir(path)
+                )
+        return sorted(roots)
+
+    def delete_roots(self, browsers: Iterable[str], options: list[str]) -> list[str]:
+        """Directories holding the targets of the selected delete actions.
+
+        Below these (file_utils.glob_base of each pattern), delete() opens
+        a target's directories without following symlinks.
+        """
+        return sorted({
+            file_utils.glob_base(action.path)
+            for browser in browsers
+            for action in self.actions(browser, options)
+            if action.action_type == ActionType.DELETE and action.path
+        })
+
+    def estimate(self, plan: CleaningPlan, stats: StatCache | None = None) -> SizeEstimate:
+        """Sampled size of plan, answered from stats (the collection's) where possible."""
+        return estimate_paths(plan.targets, lstat=stats.lstat if stats is not None else None)
+
+    # ── running ────────────────────────────────────────────────
+
+    def delete(self, path: str, roots: Iterable[str] = ()) -> tuple[bool, int]:
+        """Default delete_func: one fd-relative pass, sizes counted on the way.
+
+        Directories below the deepest of roots (delete_roots) holding path
+        must not be symlinks. A target already gone (removed with an
+        overlapping directory, or evicted by the browser) counts as
+        deleted with 0 bytes.
+        """
+        try:
+            return True, file_utils.remove_path(path, _root_of(path, roots))
+        except FileNotFoundError:
+            return True, 0
+
+    def wipe(self, path: str, wiper: SecureWiper, roots: Iterable[str] = ()) -> tuple[bool, int]:
+        """delete() that overwrites regular files first (sensitive targets).
+
+        For a directory, the regular files below it are wiped before the
+        tree is removed. Failures raise the OSError of the failing call,
+        so locked files are retried like plain deletions.
+        """
+        if file_utils.is_whitelisted(path):
+            raise PermissionError(errno.EPERM, "Whitelisted path", path)
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            return True, 0
+        if stat.S_ISREG(st.st_mode):
+            return True, wiper.wipe_file(path)
+
+        wiped = 0
+        if stat.S_ISDIR(st.st_mode):
+            files = [
+                file for file in file_utils.walk_directory_files(path)
+                if stat.S_ISREG(os.lstat(file).st_mode)
+            ]
+            for file, success, size, error in wiper.wipe_paths(files):
+                if not success:
+                    raise OSError(f"Wipe failed for {file}: {error}")
+                wiped += size
+        return True, wiped + file_utils.remove_path(path, _root_of(path, roots))
+
+    def run(
+        self,
+        plan: CleaningPlan | Iterable[str],
+        browsers: Iterable[str],
+        options: list[str],
+        on_result: ResultCallback | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+        delete_func: DeleteFunc | None = None,
+    ) -> DeletionStats:
+        """Delete plan, then truncate the TRUNCATE targets of browsers.
+
+        Under a background profile (background_mode) the run uses the
+        profile's worker count and pacer. Files a running browser keeps
+        locked are retried, then left for deletion on reboot.
+
+        Args:
+            plan: Targets from collect(), or the remainder of a journaled plan;
+                with secure wiping on, its SENSITIVE_TARGET paths are wiped
+            browsers, options: Selection the plan was collected for; gives
+                the prune roots and the files to truncate
+            on_result: Optional callback(path, success, bytes, error)
+            should_cancel: Optional predicate polled before each deletion
+            delete_func: Replaces delete() (and secure wiping)
+        """
+        browsers = list(browsers)
+        wiper: SecureWiper | None = None
+        if delete_func is None:
+            roots = self.delete_roots(browsers, options)
+
+            def delete(path: str) -> tuple[bool, int]:
+                return self.delete(path, roots)
+
+            delete_func = delete
+            settings = WipeSettings.load()
+            sensitive = _sensitive_targets(plan) if settings.enabled else set()
+            if sensitive:
+                wiper = settings.create_wiper()
+
+                def wipe_sensitive(path: str) -> tuple[bool, int]:
+                    if path in sensitive:
+                        return self.wipe(path, wiper, roots)
+                    return delete(path)
+
+                delete_func = wipe_sensitive
+
+        profile = current_profile()
+        if profile is not None:
+            executor = DeletionExecutor(
+                delete_func,
+                default_limit=profile.workers,
+                pacer=profile.create_pacer(),
+                locked_files=LockedFileQueue(),
+            )
+        else:
+            executor = DeletionExecutor(delete_func, locked_files=LockedFileQueue())
+
+        try:
+            stats = executor.run(
+                plan,
+                on_result=on_result,
+                should_cancel=should_cancel,
+                prune_roots=self.prune_roots(browsers, options),
+            )
+        finally:
+            if wiper is not None:
+                wiper.close()
+        if not stats.cancelled:
+            self._truncate(browsers, options, stats)
+        self.save_index()
+        return stats
+
+    def save_index(self) -> None:
+        """Record the post-run state of the walked directories on disk."""
+        try:
+            with self._index_lock:
+                self.index.save()
+        except Exception as e:
+            logger.warning(f"Failed to save directory index: {e}")
+
+    def _truncate(self, browsers: list[str], options: list[str], stats: DeletionStats) -> None:
+        paths: list[str] = []
+        for browser in browsers:
+            for action in self.actions(browser, options):
+                if action.action_type == ActionType.TRUNCATE:
+                    paths.extend(action.preview())
+        if paths:
+            stats.truncated, stats.bytes_truncated = file_utils.truncate_files(paths)
+            logger.info(
+                f"Truncated {stats.truncated} files, "
+                f"{file_utils.format_bytes(stats.bytes_truncated)} reclaimed"
+            )
+
+
+def _sensitive_targets(plan: CleaningPlan | Iterable[str]) -> set[str]:
+    """Targets collect() flagged SENSITIVE_TARGET (none for a plain list)."""
+    table = plan.targets if isinstance(plan, CleaningPlan) else plan
+    if not isinstance(table, PathTable):
+        return set()
+    return set(table.flagged(SENSITIVE_TARGET))
+
+
+def _root_of(path: str, roots: Iterable[str]) -> str | None:
+    """Deepest of roots that path lies inside, if any."""
+    inside = [root for root in roots if file_utils.is_inside(path, root)]
+    return max(inside, key=len) if inside else None
+
+
+_service: CleaningService | None = None
+_service_lock = threading.Lock()
+
+
+def get_cleaning_service() -> CleaningService:
+    """Process-wide service, so interactive and scheduled runs share its plan cache."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CleaningService()
+        return _service
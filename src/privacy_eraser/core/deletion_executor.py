@@ -0,0 +1,579 @@
+"""Deletion executor with per-device worker pools
+
+Runs a cleaning plan against the filesystem:
+- Group targets by storage device (st_dev)
+- Order each device's targets into per-directory batches (deepest
+  directories first, inode order within a directory)
+- One worker pool per device, each with its own concurrency limit
+- Adaptive (AIMD) worker counts, see adaptive_concurrency
+- Optional pacing (ops/sec, MB/sec, load yielding), see background_mode
+- Serialized progress callbacks and cooperative cancellation
+- Optional pruning of directories the run left empty
+- Optional deferred retries of locked files, see locked_files
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Sequence
+
+from . import file_utils
+from .adaptive_concurrency import (
+    DEFAULT_WINDOW_SIZE,
+    AIMDController,
+    load_tuned_limit,
+    save_tuned_limit,
+)
+from .background_mode import Pacer
+from .locked_files import LockedFileQueue
+from .path_table import PathTable
+
+logger = logging.getLogger(__name__)
+
+# Device key used when no ancestor of a target can be stat()ed
+UNKNOWN_DEVICE = -1
+
+# Worker count per storage class. Spinning disks seek on every unlink, so
+# piling on workers only makes the head thrash; flash storage scales well.
+DEVICE_CONCURRENCY = {
+    "hdd": 2,
+    "ssd": 8,
+    "unknown": 4,
+}
+
+# Targets one worker deletes back to back from the same directory: keeps
+# that directory's metadata hot and avoids workers contending on its lock
+DEFAULT_BATCH_SIZE = 256
+
+# Sort key for entries a directory listing did not report (deleted since)
+_UNLISTED = 1 << 64
+
+# delete_func(path) -> (success, bytes_deleted); same contract as
+# file_utils.delete_file_simple. Exceptions are recorded as failures.
+DeleteFunc = Callable[[str], tuple[bool, int]]
+
+# on_result(path, success, bytes_deleted, error)
+ResultCallback = Callable[[str, bool, int, "str | None"], None]
+
+
+@dataclass
+class CleaningPlan:
+    """Ordered, de-duplicated list of deletion targets.
+
+    Targets are kept in a compact PathTable; plain iterables are converted.
+    """
+    targets: PathTable = field(default_factory=PathTable)
+    browser_counts: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not isinstance(self.targets, PathTable):
+            self.targets = PathTable(self.targets)
+
+    @classmethod
+    def from_paths(
+        cls,
+        paths: Iterable[str],
+        browser_counts: dict[str, int] | None = None,
+    ) -> CleaningPlan:
+        """Build a plan, dropping duplicates while preserving order."""
+        return cls(PathTable.from_paths(paths), dict(browser_counts or {}))
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.targets)
+
+
+@dataclass
+class DeviceStats:
+    """Per-device counters for one run."""
+    device: int
+    limit: int
+    deleted: int = 0
+    failed: int = 0
+    bytes_deleted: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class DeletionStats:
+    """Aggregate result of running a plan."""
+    total: int = 0
+    deleted: int = 0
+    failed: int = 0
+    bytes_deleted: int = 0
+    cancelled: bool = False
+    errors: list[str] = field(default_factory=list)
+    devices: dict[int, DeviceStats] = field(default_factory=dict)
+    pruned_dirs: int = 0
+    # Failures handed to the locked-file queue / left for deletion on reboot
+    locked: int = 0
+    reboot_pending: int = 0
+    # Files emptied in place by TRUNCATE actions (see cleaning_service)
+    truncated: int = 0
+    bytes_truncated: int = 0
+
+
+def device_of(path: str, cache: dict[str, int] | None = None) -> int:
+    """Return the st_dev of the filesystem holding path.
+
+    The parent directory is stat()ed rather than the target itself, so all
+    entries of one directory share a single lookup through cache. Missing
+    parents fall back to the nearest existing ancestor.
+    """
+    parent = os.path.dirname(path) or path
+    if cache is not None and parent in cache:
+        return cache[parent]
+
+    device = UNKNOWN_DEVICE
+    probe = parent
+    while probe:
+        try:
+            device = os.stat(probe).st_dev
+            break
+        except OSError:
+            upper = os.path.dirname(probe)
+            if upper == probe:
+                break
+            probe = upper
+
+    if cache is not None:
+        cache[parent] = device
+    return device
+
+
+def group_by_device(paths: Iterable[str]) -> dict[int, PathTable]:
+    """Split paths into per-device tables, keeping the original order."""
+    cache: dict[str, int] = {}
+    groups: dict[int, PathTable] = {}
+    for path in paths:
+        device = device_of(path, cache)
+        group = groups.get(device)
+        if group is None:
+            group = groups[device] = PathTable()
+        group.append(path)
+    return groups
+
+
+@dataclass
+class LocalityOrder:
+    """Targets reordered into per-directory batches.
+
+    Batch i covers paths[batch_ends[i - 1]:batch_ends[i]], all of them
+    entries of dirs[batch_dirs[i]].
+    """
+    paths: PathTable
+    batch_ends: array
+    batch_dirs: array
+    dirs: list[str]
+
+    def batch(self, index: int) -> range:
+        return range(self.batch_ends[index - 1] if index else 0, self.batch_ends[index])
+
+
+def _entry_inodes(directory: str) -> dict[str, int]:
+    """name -> inode from one listing (readdir's d_ino, no stat per entry)."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry.inode() for entry in entries}
+    except OSError:
+        return {}
+
+
+def order_by_locality(
+    paths: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> LocalityOrder:
+    """Group targets by parent directory in an on-disk friendly order.
+
+    - Deepest directories first, so a directory target always comes after
+      whatever the plan lists inside it
+    - Directories of equal depth by their inode number
+    - Entries of a directory by inode number, which follows on-disk layout
+      on ext4/xfs/btrfs. Windows uses name order: scandir cannot report
+      inodes there without a stat per entry
+    """
+    table = paths if isinstance(paths, PathTable) else PathTable(paths)
+
+    groups = []
+    for prefix, members in table.directories():
+        directory = os.path.normpath(prefix) if prefix else os.curdir
+        try:
+            inode = os.stat(directory).st_ino
+        except OSError:
+            inode = 0
+        groups.append((-directory.count(os.sep), inode, directory, members))
+    groups.sort(key=lambda group: group[:2])
+
+    ordered = PathTable()
+    batch_ends = array("Q")
+    batch_dirs = array("I")
+    dirs: list[str] = []
+    for _depth, _inode, directory, members in groups:
+        if len(members) > 1:
+            if os.name == "nt":
+                members = sorted(members, key=table.name)
+            else:
+                inodes = _entry_inodes(directory)
+                members = sorted(members, key=lambda i: inodes.get(table.name(i), _UNLISTED))
+        for start in range(0, len(members), batch_size):
+            for index in members[start:start + batch_size]:
+                ordered.append(table[index], table.size(index), table.flags(index))
+            batch_ends.append(len(ordered))
+            batch_dirs.append(len(dirs))
+        dirs.append(directory)
+
+    return LocalityOrder(ordered, batch_ends, batch_dirs, dirs)
+
+
+def classify_device(device: int) -> str:
+    """Classify a device as 'hdd', 'ssd' or 'unknown'.
+
+    Only Linux exposes this cheaply (sysfs queue/rotational); elsewhere the
+    device is reported as unknown and gets the middle concurrency tier.
+    """
+    if device == UNKNOWN_DEVICE or not sys.platform.startswith("linux"):
+        return "unknown"
+
+    sys_dir = f"/sys/dev/block/{os.major(device)}:{os.minor(device)}"
+    # Partitions carry no queue/ directory; it lives on the parent disk
+    for candidate in (sys_dir, os.path.join(sys_dir, "..")):
+        try:
+            with open(os.path.join(candidate, "queue", "rotational")) as f:
+                return "hdd" if f.read().strip() == "1" else "ssd"
+        except OSError:
+            continue
+    return "unknown"
+
+
+class _DevicePool:
+    """Workers draining the targets of one device, one batch at a time.
+
+    The worker count follows controller.limit when a controller is attached:
+    extra workers are spawned when it rises and surplus ones exit when it
+    falls. All mutable state is guarded by the shared run condition.
+    """
+
+    def __init__(
+        self,
+        executor: DeletionExecutor,
+        device_stats: DeviceStats,
+        order: LocalityOrder,
+        controller: AIMDController | None,
+        run: _RunState,
+    ):
+        self.executor = executor
+        self.device_stats = device_stats
+        # Batches are consumed through a cursor; nothing is copied into a queue
+        self.order = order
+        self.paths = order.paths
+        self._next = 0
+        self._take_lock = threading.Lock()
+        # Per directory: whether any of its entries was deleted (only
+        # directories this run emptied are pruned)
+        self._deleted_in = bytearray(len(order.dirs))
+        self.controller = controller
+        self.run = run
+        self.live: set[int] = set()
+
+    @property
+    def limit(self) -> int:
+        if self.controller is not None:
+            return self.controller.limit
+        return self.device_stats.limit
+
+    @property
+    def remaining(self) -> int:
+        """Batches not yet taken by a worker."""
+        return len(self.order.batch_ends) - self._next
+
+    def _take(self) -> int | None:
+        """Next batch index, or None once all batches are taken."""
+        with self._take_lock:
+            index = self._next
+            if index >= len(self.order.batch_ends):
+                return None
+            self._next = index + 1
+        return index
+
+    def deleted_dirs(self) -> list[str]:
+        """Directories at least one entry was deleted from."""
+        return [directory for directory, deleted in zip(self.order.dirs, self._deleted_in) if deleted]
+
+    def spawn_up_to_limit(self) -> None:
+        """Start workers until limit is reached (caller holds run.cond)."""
+        wanted = min(self.limit, self.remaining + len(self.live))
+        index = 0
+        while len(self.live) < wanted:
+            while index in self.live:
+                index += 1
+            self.live.add(index)
+            threading.Thread(
+                target=self._worker,
+                args=(index,),
+                name=f"delete-dev{self.device_stats.device}-{index}",
+                daemon=True,
+            ).start()
+
+    def _worker(self, index: int) -> None:
+        run = self.run
+        pacer = self.executor.pacer
+        try:
+            while True:
+                if run.should_cancel is not None and run.should_cancel():
+                    with run.cond:
+                        run.stats.cancelled = True
+                    return
+                if index >= self.limit:
+                    return
+                batch = self._take()
+                if batch is None:
+                    return
+
+                deleted = False
+                for position in self.order.batch(batch):
+                    if run.should_cancel is not None and run.should_cancel():
+                        with run.cond:
+                            run.stats.cancelled = True
+                        return
+                    if pacer is not None:
+                        pacer.before_delete()
+                    path = self.paths[position]
+
+                    error: str | None = None
+                    started = time.monotonic()
+                    try:
+                        success, size = self.executor.delete_func(path)
+                    except Exception as e:
+                        locked = self.executor.locked_files
+                        if locked is not None and locked.offer(path, e, self.device_stats):
+                            continue  # Recorded once the retry queue resolves it
+                        success, size, error = False, 0, str(e)
+                    finished = time.monotonic()
+                    if pacer is not None and success:
+                        pacer.after_delete(size)
+                    deleted = deleted or success
+
+                    with run.cond:
+                        run.record(self.device_stats, path, success, size, error, finished)
+                        if self.controller is not None:
+                            if self.controller.record(finished - started, finished) is not None:
+                                self.device_stats.limit = self.controller.limit
+                                self.spawn_up_to_limit()
+                if deleted:
+                    with run.cond:
+                        self._deleted_in[self.order.batch_dirs[batch]] = 1
+        finally:
+            with run.cond:
+                self.live.discard(index)
+                run.cond.notify_all()
+
+
+class _RunState:
+    """Shared state of one DeletionExecutor.run call."""
+
+    def __init__(
+        self,
+        stats: DeletionStats,
+        on_result: ResultCallback | None,
+        should_cancel: Callable[[], bool] | None,
+        prune_roots: Sequence[str] = (),
+    ):
+        self.stats = stats
+        self.on_result = on_result
+        self.should_cancel = should_cancel
+        self.prune_roots = prune_roots
+        self.cond = threading.Condition()
+        self.start = time.monotonic()
+        # Parents of locked files deleted by a retry
+        self.retried_dirs: set[str] = set()
+
+    def prune_root(self, directory: str) -> str | None:
+        """Innermost prune root strictly containing directory, if any."""
+        roots = [root for root in self.prune_roots if file_utils.is_inside(directory, root)]
+        return max(roots, key=len, default=None)
+
+    def prune(self, directories: Iterable[str]) -> int:
+        """Remove the emptied directories below their prune roots, deepest first.
+
+        Runs once every deletion has finished, so no worker can still be
+        adding to or emptying a directory being removed.
+        """
+        pruned = 0
+        unique = {os.path.normpath(directory) for directory in directories}
+        for directory in sorted(unique, key=lambda d: d.count(os.sep), reverse=True):
+            root = self.prune_root(directory)
+            if root is not None:
+                pruned += file_utils.prune_empty_parents(directory, root)
+        return pruned
+
+    def record(
+        self,
+        device_stats: DeviceStats,
+        path: str,
+        success: bool,
+        size: int,
+        error: str | None,
+        now: float,
+    ) -> None:
+        """Account for one finished deletion (caller holds cond)."""
+        stats = self.stats
+        if success:
+            device_stats.deleted += 1
+            device_stats.bytes_deleted += size
+            stats.deleted += 1
+            stats.bytes_deleted += size
+        else:
+            device_stats.failed += 1
+            stats.failed += 1
+            stats.errors.append(f"{path}: {error or 'not deleted'}")
+        device_stats.elapsed = now - self.start
+        if self.on_result:
+            try:
+                self.on_result(path, success, size, error)
+            except Exception as e:
+                logger.error(f"Progress callback failed for {path}: {e}")
+
+
+class DeletionExecutor:
+    """Delete plan targets using one worker pool per storage device.
+
+    Slow devices (network shares, HDDs) no longer hold up fast ones, and each
+    device only sees as many concurrent unlinks as it handles well.
+
+    Without explicit limits the worker count of each device is tuned at
+    runtime by an AIMD controller, seeded from the limit a previous run
+    stored in settings_db. Passing device_limits or default_limit pins the
+    corresponding devices to a fixed count instead. A pacer, shared by all
+    devices, throttles the run as a whole.
+
+    Each worker takes a batch of up to batch_size entries of one directory
+    (see order_by_locality), so consecutive unlinks hit the same, cached
+    directory instead of interleaving across the tree.
+
+    With a locked_files queue, deletions failing on a lock are retried in
+    the background and only recorded once resolved; run() returns after
+    the queue has finished.
+    """
+
+    def __init__(
+        self,
+        delete_func: DeleteFunc = file_utils.delete_file_simple,
+        device_limits: dict[int, int] | None = None,
+        default_limit: int | None = None,
+        adaptive: bool = True,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        pacer: Pacer | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        locked_files: LockedFileQueue | None = None,
+    ):
+        self.delete_func = delete_func
+        self.device_limits = dict(device_limits or {})
+        self.default_limit = default_limit
+        self.adaptive = adaptive
+        self.window_size = window_size
+        self.pacer = pacer
+        self.batch_size = max(1, batch_size)
+        self.locked_files = locked_files
+
+    def limit_for(self, device: int) -> int:
+        """Static concurrency limit for a device."""
+        if device in self.device_limits:
+            return max(1, self.device_limits[device])
+        if self.default_limit is not None:
+            return max(1, self.default_limit)
+        return DEVICE_CONCURRENCY[classify_device(device)]
+
+    def _is_tunable(self, device: int, target_count: int) -> bool:
+        # Tuning needs at least a couple of measurement windows to be useful
+        return (
+            self.adaptive
+            and device not in self.device_limits
+            and self.default_limit is None
+            and target_count >= 2 * self.window_size
+        )
+
+    def run(
+        self,
+        plan: CleaningPlan | Iterable[str],
+        on_result: ResultCallback | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+        prune_roots: Iterable[str] = (),
+    ) -> DeletionStats:
+        """Delete every target in plan.
+
+        Args:
+            plan: CleaningPlan or any iterable of paths
+            on_result: Optional callback(path, success, bytes, error), invoked
+                under a lock so callers need no synchronization of their own
+            should_cancel: Optional predicate polled before each deletion
+            prune_roots: Directories whose subdirectories may be removed
+                once this run has emptied them; the roots themselves and
+                anything outside them are never pruned. Pruning starts
+                after all workers and locked-file retries have finished
+
+        Returns: DeletionStats
+        """
+        orders = {
+            device: order_by_locality(paths, self.batch_size)
+            for device, paths in group_by_device(plan).items()
+        }
+        stats = DeletionStats(total=sum(len(order.paths) for order in orders.values()))
+        run = _RunState(stats, on_result, should_cancel, list(prune_roots))
+        pools: list[_DevicePool] = []
+
+        locked = self.locked_files
+        if locked is not None:
+            def on_resolved(path, success, size, error, device_stats):
+                with run.cond:
+                    run.record(device_stats, path, success, size, error, time.monotonic())
+                    if success:
+                        run.retried_dirs.add(os.path.dirname(path))
+
+            locked.start(self.delete_func, on_resolved)
+
+        with run.cond:
+            for device, order in orders.items():
+                paths = order.paths
+                controller = None
+                limit = self.limit_for(device)
+                if self._is_tunable(device, len(paths)):
+                    controller = AIMDController(
+                        initial=load_tuned_limit(device) or limit,
+                        window_size=self.window_size,
+                    )
+                    limit = controller.limit
+
+                device_stats = DeviceStats(device=device, limit=min(limit, len(paths)))
+                stats.devices[device] = device_stats
+                logger.debug(
+                    f"Device {device}: {len(paths)} targets, {limit} workers"
+                    f"{' (adaptive)' if controller else ''}"
+                )
+                pool = _DevicePool(self, device_stats, order, controller, run)
+                pools.append(pool)
+                pool.spawn_up_to_limit()
+
+            run.cond.wait_for(lambda: all(not pool.live for pool in pools))
+
+        if locked is not None:
+            locked.finish(cancelled=stats.cancelled)
+            stats.locked = locked.deferred
+            stats.reboot_pending = locked.reboot_pending
+
+        if run.prune_roots:
+            emptied = [directory for pool in pools for directory in pool.deleted_dirs()]
+            stats.pruned_dirs = run.prune(emptied + sorted(run.retried_dirs))
+
+        for pool in pools:
+            if pool.controller is not None:
+                save_tuned_limit(pool.device_stats.device, pool.controller)
+
+        return stats
@@ -0,0 +1,301 @@
+"""Crash-safe deletion journal
+
+Write-ahead journal for long cleaning runs:
+- The CleaningPlan is written before the first deletion
+- Completed targets are committed in batches while the run progresses
+- An interrupted run (reboot, power loss, kill) resumes from the last
+  committed batch without rescanning, and reports combined statistics
+
+The journal lives next to privacy_eraser.db as deletion_journal.db.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from .deletion_executor import CleaningPlan, DeletionStats
+from .path_table import PathTable
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILENAME = "deletion_journal.db"
+
+# Completed targets per journal transaction
+DEFAULT_BATCH_SIZE = 500
+
+# Interrupted runs older than this are discarded instead of resumed
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+
+def default_journal_path() -> Path:
+    """deletion_journal.db in the settings database directory."""
+    from .. import settings_db
+
+    return Path(settings_db.DB_PATH).parent / JOURNAL_FILENAME
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # WAL keeps committed batches intact across crashes without a full
+    # fsync per transaction
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class DeletionJournal:
+    """Persistent store of in-progress cleaning runs, keyed by run_key."""
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+    ):
+        self.path = Path(path) if path is not None else default_journal_path()
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self._ensure_database()
+
+    def _ensure_database(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = _connect(self.path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_key TEXT NOT NULL UNIQUE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    browser_counts TEXT,           -- JSON {browser: count}
+                    total INTEGER DEFAULT 0,
+                    deleted INTEGER DEFAULT 0,
+                    failed INTEGER DEFAULT 0,
+                    bytes_deleted INTEGER DEFAULT 0,
+                    elapsed REAL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS plan_targets (
+                    run_id INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    flags INTEGER NOT NULL DEFAULT 0,  -- PathTable flags
+                    PRIMARY KEY (run_id, seq)
+                ) WITHOUT ROWID
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(plan_targets)")}
+            if "flags" not in columns:
+                conn.execute("ALTER TABLE plan_targets ADD COLUMN flags INTEGER NOT NULL DEFAULT 0")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS completed (
+                    run_id INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    PRIMARY KEY (run_id, seq)
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def begin(self, run_key: str, plan: CleaningPlan) -> JournalRun:
+        """Journal a new plan, replacing any unfinished run with the same key."""
+        conn = _connect(self.path)
+        with conn:
+            self._delete_run(conn, run_key)
+            cursor = conn.execute(
+                "INSERT INTO runs (run_key, browser_counts, total) VALUES (?, ?, ?)",
+                (run_key, json.dumps(plan.browser_counts), len(plan)),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO plan_targets (run_id, seq, path, flags) VALUES (?, ?, ?, ?)",
+                (
+                    (run_id, seq, path, plan.targets.flags(seq))
+                    for seq, path in enumerate(plan.targets)
+                ),
+            )
+        logger.debug(f"Journaled plan {run_key}: {len(plan)} targets")
+        return JournalRun(self, conn, run_id, run_key, plan)
+
+    def resume(self, run_key: str) -> JournalRun | None:
+        """Return the interrupted run for run_key, or None."""
+        conn = _connect(self.path)
+        row = conn.execute(
+            "SELECT id, created_at, browser_counts, deleted, failed, bytes_deleted, elapsed "
+            "FROM runs WHERE run_key = ?",
+            (run_key,),
+        ).fetchone()
+        if row is None:
+            conn.close()
+            return None
+
+        run_id, created_at, browser_counts, deleted, failed, bytes_deleted, elapsed = row
+        # CURRENT_TIMESTAMP is naive UTC
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - self.max_age
+        if datetime.fromisoformat(created_at) < cutoff:
+            logger.info(f"Discarding stale journal for {run_key} from {created_at}")
+            with conn:
+                self._delete_run(conn, run_key)
+            conn.close()
+            return None
+
+        targets = PathTable()
+        for path, flags in conn.execute(
+            "SELECT path, flags FROM plan_targets WHERE run_id = ? ORDER BY seq", (run_id,)
+        ):
+            targets.append(path, flags=flags)
+        completed = {
+            seq for (seq,) in conn.execute(
+                "SELECT seq FROM completed WHERE run_id = ?", (run_id,)
+            )
+        }
+        plan = CleaningPlan(targets, json.loads(browser_counts or "{}"))
+        prior = DeletionStats(
+            total=len(targets),
+            deleted=deleted,
+            failed=failed,
+            bytes_deleted=bytes_deleted,
+        )
+        logger.info(
+            f"Resuming {run_key}: {len(completed)}/{len(targets)} targets already done"
+        )
+        return JournalRun(self, conn, run_id, run_key, plan, completed, prior, elapsed)
+
+    @staticmethod
+    def _delete_run(conn: sqlite3.Connection, run_key: str) -> None:
+        row = conn.execute("SELECT id FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM completed WHERE run_id = ?", row)
+        conn.execute("DELETE FROM plan_targets WHERE run_id = ?", row)
+        conn.execute("DELETE FROM runs WHERE id = ?", row)
+
+
+class JournalRun:
+    """One journaled run. Feed every deletion result to record()."""
+
+    def __init__(
+        self,
+        journal: DeletionJournal,
+        conn: sqlite3.Connection,
+        run_id: int,
+        run_key: str,
+        plan: CleaningPlan,
+        completed: set[int] | None = None,
+        prior: DeletionStats | None = None,
+        prior_elapsed: float = 0.0,
+    ):
+        self.journal = journal
+        self.conn = conn
+        self.run_id = run_id
+        self.run_key = run_key
+        self.plan = plan
+        self.completed = completed or set()
+        self.prior = prior or DeletionStats(total=len(plan))
+        self.prior_elapsed = prior_elapsed
+        self.resumed = prior is not None
+        self._pending: list[int] = []
+        self._pending_stats = DeletionStats()
+        self._started = time.monotonic()
+
+    def remaining(self) -> PathTable:
+        """Targets not committed as done.
+
+        After a crash the tail of the last batch may already be gone without
+        having been committed; those are dropped here (one lstat each)
+        instead of being reported as failures. Target flags are kept.
+        """
+        table = self.plan.targets
+        remaining = PathTable()
+        for seq, path in enumerate(table):
+            if seq not in self.completed and (not self.resumed or os.path.lexists(path)):
+                remaining.append(path, flags=table.flags(seq))
+        return remaining
+
+    def record(self, path: str, success: bool, size: int) -> None:
+        """Note a finished target; commits once a batch is full.
+
+        Not thread-safe: DeletionExecutor already serializes on_result calls.
+        """
+        seq = self.plan.targets.find(path)
+        if seq is None:
+            return
+        self._pending.append(seq)
+        if success:
+            self._pending_stats.deleted += 1
+            self._pending_stats.bytes_deleted += size
+        else:
+            self._pending_stats.failed += 1
+        if len(self._pending) >= self.journal.batch_size:
+            self.commit()
+
+    def commit(self) -> None:
+        """Commit pending completions and counters in one transaction."""
+        if not self._pending:
+            return
+        pending, stats = self._pending, self._pending_stats
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO completed (run_id, seq) VALUES (?, ?)",
+                ((self.run_id, seq) for seq in pending),
+            )
+            self.conn.execute(
+                "UPDATE runs SET deleted = deleted + ?, failed = failed + ?, "
+                "bytes_deleted = bytes_deleted + ?, elapsed = ? WHERE id = ?",
+                (
+                    stats.deleted,
+                    stats.failed,
+                    stats.bytes_deleted,
+                    self.prior_elapsed + time.monotonic() - self._started,
+                    self.run_id,
+                ),
+            )
+        self.completed.update(pending)
+        self._pending = []
+        self._pending_stats = DeletionStats()
+
+    def combined(self, stats: DeletionStats) -> DeletionStats:
+        """Add the counters of earlier, interrupted attempts to stats."""
+        return DeletionStats(
+            total=len(self.plan),
+            deleted=self.prior.deleted + stats.deleted,
+            failed=self.prior.failed + stats.failed,
+            bytes_deleted=self.prior.bytes_deleted + stats.bytes_deleted,
+            cancelled=stats.cancelled,
+            errors=stats.errors,
+            devices=stats.devices,
+            pruned_dirs=stats.pruned_dirs,
+            locked=stats.locked,
+            reboot_pending=stats.reboot_pending,
+            truncated=stats.truncated,
+            bytes_truncated=stats.bytes_truncated,
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """Wall time across all attempts, in seconds."""
+        return self.prior_elapsed + time.monotonic() - self._started
+
+    def finish(self) -> None:
+        """Drop the journal entry; the run completed."""
+        self._pending = []
+        with self.conn:
+            DeletionJournal._delete_run(self.conn, self.run_key)
+        self.close()
+
+    def close(self) -> None:
+        """Flush pending completions and release the connection.
+
+        The entry stays in the journal so the run can be resumed.
+        """
+        try:
+            self.commit()
+        except sqlite3.ProgrammingError:
+            pass  # already closed
+        self.conn.close()
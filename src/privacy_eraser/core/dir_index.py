@@ -0,0 +1,298 @@
+"""Persisted directory-mtime index for incremental cleaning
+
+Remembers, per directory, what the last run saw:
+(path, mtime, entry count, bytes, subdirectories).
+
+A directory whose mtime is unchanged has the same direct entries as last
+time, so:
+- walks skip listing it when it held no files (typical after a clean)
+- size queries reuse its recorded byte count instead of stat()ing files
+Subdirectories are still stat()ed individually, so a repeated scan over an
+unchanged profile costs one stat per directory instead of a full walk.
+
+Caveat: rewriting a file in place does not touch the directory mtime, so
+cached byte counts are estimates. Entry lists are exact: a directory whose
+mtime is too close to the scan to rule out a same-tick change is recorded
+as "racy", as git does for its index. A racy record is not trusted until
+the window has passed; then one listing of its names (no stat) confirms
+it and it becomes a normal record. Directories just emptied by a clean
+are racy, and are skipped again from the next run on.
+
+The index lives next to privacy_eraser.db as dir_index.db.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "dir_index.db"
+
+# Directories modified this close to their scan are not trusted as is.
+# 2s covers FAT timestamp granularity.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def default_index_path() -> Path:
+    """dir_index.db in the settings database directory."""
+    from .. import settings_db
+
+    return Path(settings_db.DB_PATH).parent / INDEX_FILENAME
+
+
+@dataclass(slots=True)
+class DirRecord:
+    """State of one directory as of the last scan."""
+    mtime_ns: int
+    file_count: int  # direct non-directory entries
+    bytes: int  # total size of those entries
+    subdirs: tuple[str, ...]  # names of direct subdirectories
+    # mtime too close to the scan: the entries must be confirmed once
+    # RACY_WINDOW_NS has passed
+    racy: bool = False
+
+
+class DirectoryIndex:
+    """In-memory view of dir_index.db; call save() after a run."""
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path is not None else default_index_path()
+        self._records: dict[str, DirRecord] | None = None
+        self._changed: set[str] = set()
+        self._removed: set[str] = set()
+        # Directories whose files were handed out for deletion this run
+        self._dirty: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0  # racy records confirmed by a listing
+
+    # ── persistence ────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                file_count INTEGER NOT NULL,
+                bytes INTEGER NOT NULL,
+                subdirs TEXT NOT NULL,         -- JSON array of names
+                racy INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(dirs)")}
+        if "racy" not in columns:
+            conn.execute("ALTER TABLE dirs ADD COLUMN racy INTEGER NOT NULL DEFAULT 0")
+        return conn
+
+    @property
+    def records(self) -> dict[str, DirRecord]:
+        if self._records is None:
+            self._records = {}
+            try:
+                conn = self._connect()
+                try:
+                    for path, mtime_ns, count, size, subdirs, racy in conn.execute(
+                        "SELECT path, mtime_ns, file_count, bytes, subdirs, racy FROM dirs"
+                    ):
+                        self._records[path] = DirRecord(
+                            mtime_ns, count, size, tuple(json.loads(subdirs)), bool(racy)
+                        )
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Directory index unreadable, starting fresh: {e}")
+        return self._records
+
+    def save(self) -> None:
+        """Write records changed since load; refreshes dirty directories first."""
+        self.refresh_dirty()
+        if not self._changed and not self._removed:
+            return
+        records = self.records
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM dirs WHERE path = ?",
+                    ((p,) for p in self._removed),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO dirs (path, mtime_ns, file_count, bytes, subdirs, racy) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (p, r.mtime_ns, r.file_count, r.bytes, json.dumps(r.subdirs), int(r.racy))
+                        for p in self._changed
+                        if (r := records.get(p)) is not None
+                    ),
+                )
+        finally:
+            conn.close()
+        logger.debug(
+            f"Directory index saved: {len(self._changed)} updated, {len(self._removed)} removed"
+        )
+        self._changed.clear()
+        self._removed.clear()
+
+    # ── scanning ───────────────────────────────────────────────
+
+    def _forget(self, directory: str) -> None:
+        """Drop directory and everything recorded below it."""
+        records = self.records
+        record = records.pop(directory, None)
+        if record is None:
+            return
+        self._changed.discard(directory)
+        self._removed.add(directory)
+        for name in record.subdirs:
+            self._forget(os.path.join(directory, name))
+
+    def _scan(self, directory: str) -> tuple[DirRecord, list[os.DirEntry]]:
+        """List directory and record it. Returns (record, file entries)."""
+        files: list[os.DirEntry] = []
+        subdirs: list[str] = []
+        size = 0
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                        continue
+                    size += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+                files.append(entry)
+
+        racy = time.time_ns() - mtime_ns < RACY_WINDOW_NS
+        record = DirRecord(mtime_ns, len(files), size, tuple(subdirs), racy)
+        old = self.records.get(directory)
+        if old is not None:
+            for name in set(old.subdirs) - set(subdirs):
+                self._forget(os.path.join(directory, name))
+        self.records[directory] = record
+        self._changed.add(directory)
+        self._removed.discard(directory)
+        return record, files
+
+    def _lookup(self, directory: str) -> DirRecord | None:
+        """Recorded state if directory is unchanged, else None.
+
+        Raises OSError (after forgetting the subtree) if it is gone.
+        """
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._forget(directory)
+            raise
+        record = self.records.get(directory)
+        if record is not None and record.mtime_ns == mtime_ns:
+            if not record.racy or self._revalidate(directory, record):
+                self.hits += 1
+                return record
+        self.misses += 1
+        return None
+
+    def _revalidate(self, directory: str, record: DirRecord) -> bool:
+        """Confirm a racy record once its window has passed.
+
+        Lists the names only: a same-tick change shows as a different
+        file count or subdirectory set. (A file swapped for another keeps
+        the count; walks list directories that hold files anyway.)
+        """
+        if time.time_ns() - record.mtime_ns < RACY_WINDOW_NS:
+            return False
+        file_count = 0
+        subdirs: list[str] = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                        continue
+                except OSError:
+                    pass
+                file_count += 1
+        if file_count != record.file_count or sorted(subdirs) != sorted(record.subdirs):
+            return False
+        record.racy = False
+        self._changed.add(directory)
+        self.revalidated += 1
+        return True
+
+    def _iter_dirs(self, root: str, need_files: bool) -> Iterator[tuple[str, DirRecord, list[os.DirEntry]]]:
+        """Top-down traversal yielding (dirpath, record, file entries).
+
+        File entries are only listed when needed: for changed directories,
+        or for unchanged ones that hold files if need_files is set.
+        """
+        stack = [os.path.normpath(root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                record = self._lookup(directory)
+                files: list[os.DirEntry] = []
+                if record is None or (need_files and record.file_count):
+                    record, files = self._scan(directory)
+            except OSError as e:
+                logger.debug(f"Skipping unreadable directory {directory}: {e}")
+                continue
+            yield directory, record, files
+            stack.extend(os.path.join(directory, name) for name in reversed(record.subdirs))
+
+    def walk_files(self, root: str) -> Iterator[str]:
+        """Yield every file below root (like file_utils.walk_directory_files)."""
+        for directory, _record, files in self._iter_dirs(root, need_files=True):
+            if files:
+                self._dirty.add(directory)
+            for entry in files:
+                yield entry.path
+
+    def walk_all(self, root: str) -> Iterator[str]:
+        """Yield files and directories below root, children before parents."""
+        visited: list[tuple[str, DirRecord, list[os.DirEntry]]] = list(
+            self._iter_dirs(root, need_files=True)
+        )
+        # Subdirectories that vanished were skipped by the traversal
+        present = {directory for directory, _record, _files in visited}
+        for directory, record, files in reversed(visited):
+            if files:
+                self._dirty.add(directory)
+            for entry in files:
+                yield entry.path
+            for name in record.subdirs:
+                subdir = os.path.join(directory, name)
+                if subdir in present:
+                    self._dirty.add(directory)
+                    yield subdir
+
+    def summarize(self, root: str) -> tuple[int, int]:
+        """Return (file_count, bytes) below root, reusing unchanged records."""
+        count = 0
+        size = 0
+        for _directory, record, _files in self._iter_dirs(root, need_files=False):
+            count += record.file_count
+            size += record.bytes
+        return count, size
+
+    def refresh_dirty(self) -> None:
+        """Re-record directories whose entries were handed out for deletion.
+
+        Called after deleting so the index reflects the post-clean state and
+        the next run finds those directories unchanged (and usually empty).
+        """
+        for directory in sorted(self._dirty, key=len, reverse=True):
+            try:
+                self._scan(directory)
+            except OSError:
+                self._forget(directory)
+        self._dirty.clear()
@@ -3,22 +3,45 @@
 Core file operations including:
 - Safe file deletion
 - Secure wiping (optional)
+- Truncation of files that cannot be deleted while in use
 - Whitelist checking
 - Size calculation
+- fd-relative deletion (POSIX): names are unlinked relative to an open
+  parent directory, reached from the action's root one component at a
+  time without following symlinks, and trees are walked with os.fwalk,
+  which never follows a directory swapped for a symlink mid-run
 """
 
 from __future__ import annotations
 
+import errno
 import glob
 import logging
 import os
 import shutil
 import stat
 from pathlib import Path
-from typing import Iterator
+from typing import Iterable, Iterator
+
+from .dir_index import DirectoryIndex
 
 logger = logging.getLogger(__name__)
 
+# Whether deletion can work on directory fds instead of full paths
+FD_OPS_SUPPORTED = hasattr(os, "fwalk") and {os.open, os.stat, os.unlink, os.rmdir} <= os.supports_dir_fd
+
+_DIR_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+_NOFOLLOW_DIR_FLAGS = _DIR_FLAGS | getattr(os, "O_NOFOLLOW", 0)
+
+# Files opened per truncation batch; O_NONBLOCK keeps a FIFO from hanging
+TRUNCATE_BATCH = 64
+_TRUNCATE_FLAGS = (
+    os.O_WRONLY
+    | getattr(os, "O_NOFOLLOW", 0)
+    | getattr(os, "O_NONBLOCK", 0)
+    | getattr(os, "O_CLOEXEC", 0)
+)
+
 # Whitelist patterns - files that should never be deleted
 WHITELIST_PATTERNS = [
     # System critical
@@ -50,12 +73,17 @@ def is_whitelisted(path: str) -> bool:
         return True  # Err on side of caution
 
 
-def get_file_size(path: str) -> int:
-    """Get size of file or directory in bytes."""
+def get_file_size(path: str, index: DirectoryIndex | None = None) -> int:
+    """Get size of file or directory in bytes.
+
+    With an index, unchanged directories reuse their recorded sizes.
+    """
     try:
         if os.path.isfile(path):
             return os.path.getsize(path)
         elif os.path.isdir(path):
+            if index is not None:
+                return index.summarize(path)[1]
             total = 0
             for dirpath, _dirnames, filenames in os.walk(path):
                 for filename in filenames:
@@ -70,8 +98,128 @@ def get_file_size(path: str) -> int:
         return 0
 
 
+def _file_bytes(st: os.stat_result) -> int:
+    # Symlinks and special files free no data blocks worth reporting
+    return st.st_size if stat.S_ISREG(st.st_mode) else 0
+
+
+def _raise_unless_gone(error: OSError) -> None:
+    if not isinstance(error, FileNotFoundError):
+        raise error
+
+
+def _remove_tree_at(dir_fd: int, name: str) -> int:
+    """Remove directory name (relative to dir_fd) and everything below it.
+
+    Returns bytes of the files removed. Subdirectories are opened without
+    following symlinks, so a symlink planted inside the tree is unlinked,
+    never descended into.
+    """
+    size = 0
+    for _root, dirs, files, root_fd in os.fwalk(name, topdown=False, onerror=_raise_unless_gone, dir_fd=dir_fd):
+        for file in files:
+            try:
+                st = os.stat(file, dir_fd=root_fd, follow_symlinks=False)
+                os.unlink(file, dir_fd=root_fd)
+            except FileNotFoundError:
+                continue  # Removed concurrently (browser eviction, overlapping target)
+            size += _file_bytes(st)
+        for dir_name in dirs:
+            try:
+                os.rmdir(dir_name, dir_fd=root_fd)
+            except NotADirectoryError:
+                os.unlink(dir_name, dir_fd=root_fd)  # Symlink to a directory
+            except FileNotFoundError:
+                continue
+    os.rmdir(name, dir_fd=dir_fd)
+    return size
+
+
+def _remove_at(dir_fd: int, name: str) -> int:
+    """Remove name relative to dir_fd; returns bytes deleted."""
+    st = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+    if not stat.S_ISDIR(st.st_mode):
+        os.unlink(name, dir_fd=dir_fd)
+        return _file_bytes(st)
+    try:
+        os.rmdir(name, dir_fd=dir_fd)
+        return 0
+    except OSError as e:
+        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+            raise
+    return _remove_tree_at(dir_fd, name)
+
+
+def _open_parent(head: str, root: str | None) -> int:
+    """Open directory head; below root, no component may be a symlink.
+
+    root itself is resolved as usual. Each directory under it is opened
+    relative to the previous one with O_NOFOLLOW, so a component swapped
+    for a symlink fails (ELOOP/ENOTDIR) instead of leading elsewhere.
+    """
+    head = os.path.normpath(head or os.curdir)
+    if root is None or not is_inside(head, root):
+        return os.open(head, _DIR_FLAGS)
+    fd = os.open(root, _DIR_FLAGS)
+    try:
+        for part in os.path.relpath(head, root).split(os.sep):
+            next_fd = os.open(part, _NOFOLLOW_DIR_FLAGS, dir_fd=fd)
+            os.close(fd)
+            fd = next_fd
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _delete_path_fd(path: str, root: str | None = None) -> int:
+    """Remove path via its parent directory fd; returns bytes deleted."""
+    head, name = os.path.split(path.rstrip(os.sep) or path)
+    if not name:
+        raise IsADirectoryError(errno.EISDIR, "Refusing to delete a root directory", path)
+    parent_fd = _open_parent(head, root)
+    try:
+        return _remove_at(parent_fd, name)
+    finally:
+        os.close(parent_fd)
+
+
+def _remove_path(path: str, root: str | None = None) -> int:
+    """Delete a file or directory tree (no whitelist check); raises OSError."""
+    if FD_OPS_SUPPORTED:
+        return _delete_path_fd(path, root)
+
+    st = os.lstat(path)
+    if stat.S_ISDIR(st.st_mode):
+        size = get_file_size(path)
+        shutil.rmtree(path, ignore_errors=False)
+        return size
+    if stat.S_ISREG(st.st_mode):
+        # Handle read-only files
+        try:
+            os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        except Exception:
+            pass
+    # Regular file, symlink or special file
+    os.remove(path)
+    return _file_bytes(st)
+
+
+def remove_path(path: str, root: str | None = None) -> int:
+    """Delete a file or directory tree; returns bytes deleted.
+
+    Unlike delete_file_simple, failures raise OSError, so callers can tell
+    a locked file from a missing one. Whitelisted paths raise
+    PermissionError. With root (see glob_base), the directories between
+    root and path are not followed if they are symlinks.
+    """
+    if is_whitelisted(path):
+        raise PermissionError(errno.EPERM, "Whitelisted path", path)
+    return _remove_path(path, root)
+
+
 def delete_file_simple(path: str) -> tuple[bool, int]:
-    """Delete a single file.
+    """Delete a single file (or directory tree).
     
     Returns: (success: bool, bytes_deleted: int)
     """
@@ -79,27 +227,12 @@ def delete_file_simple(path: str) -> tuple[bool, int]:
         return False, 0
         
     try:
-        if not os.path.lexists(path):
-            return False, 0
-            
-        size = get_file_size(path)
-        
-        # Handle read-only files
-        if os.path.isfile(path):
-            try:
-                os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
-            except Exception:
-                pass
-            os.remove(path)
-        elif os.path.isdir(path):
-            shutil.rmtree(path, ignore_errors=False)
-        else:
-            # Symlink or special file
-            os.remove(path)
-            
+        size = _remove_path(path)
         logger.debug(f"Deleted: {path} ({size} bytes)")
         return True, size
         
+    except FileNotFoundError:
+        return False, 0
     except PermissionError as e:
         logger.warning(f"Permission denied deleting {path}: {e}")
         return False, 0
@@ -108,6 +241,150 @@ def delete_file_simple(path: str) -> tuple[bool, int]:
         return False, 0
 
 
+def _allocated_bytes(st: os.stat_result) -> int:
+    """Disk space held by a file (blocks where reported, else its size)."""
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def truncate_files(paths: Iterable[str], batch_size: int = TRUNCATE_BATCH) -> tuple[int, int]:
+    """Shrink regular files to zero length, leaving them in place.
+
+    For logs and journals a running browser keeps open: it can't be
+    deleted, but it can be emptied. Files are opened batch_size at a time
+    and truncated through their fds, so a path swapped for a symlink after
+    listing is refused (O_NOFOLLOW) rather than followed. Whitelisted,
+    missing, empty and non-regular entries are skipped.
+
+    Returns: (files_truncated, bytes_reclaimed)
+    """
+    items_truncated = 0
+    bytes_reclaimed = 0
+    batch: list[tuple[str, int]] = []
+
+    def flush() -> None:
+        nonlocal items_truncated, bytes_reclaimed
+        for path, fd in batch:
+            try:
+                st = os.fstat(fd)
+                if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+                    continue
+                os.ftruncate(fd, 0)
+            except OSError as e:
+                logger.warning(f"Error truncating {path}: {e}")
+                continue
+            finally:
+                os.close(fd)
+            logger.debug(f"Truncated: {path} ({st.st_size} bytes)")
+            items_truncated += 1
+            bytes_reclaimed += _allocated_bytes(st)
+        batch.clear()
+
+    for path in paths:
+        if is_whitelisted(path):
+            continue
+        try:
+            fd = os.open(path, _TRUNCATE_FLAGS)
+        except (FileNotFoundError, IsADirectoryError):
+            continue
+        except OSError as e:
+            logger.warning(f"Error opening {path} for truncation: {e}")
+            continue
+        batch.append((path, fd))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return items_truncated, bytes_reclaimed
+
+
+def delete_directory_contents(
+    directory: str,
+    files_only: bool = False,
+    prune_emptied: bool = False,
+) -> tuple[int, int]:
+    """Delete what walk_directory_files/walk_directory_all would list.
+
+    The directory itself is kept. Where FD_OPS_SUPPORTED, the tree is
+    walked once with os.fwalk and each entry is removed relative to its
+    parent's fd: no path is resolved from the root again, and a
+    subdirectory replaced by a symlink during the run is not followed.
+
+    With files_only and prune_emptied, subdirectories left empty by this
+    call are removed bottom-up in the same pass; directories that were
+    already empty are kept.
+
+    Returns: (items_deleted, bytes_deleted)
+    """
+    items_deleted = 0
+    bytes_deleted = 0
+    prune_emptied = prune_emptied and files_only
+
+    if not FD_OPS_SUPPORTED:
+        walk = walk_directory_files if files_only else walk_directory_all
+        emptied: set[str] = set()
+        for path in list(walk(directory)):
+            success, size = delete_file_simple(path)
+            if success:
+                items_deleted += 1
+                bytes_deleted += size
+                emptied.add(os.path.dirname(path))
+        if prune_emptied:
+            prune_emptied_dirs(emptied, directory)
+        return items_deleted, bytes_deleted
+
+    def on_walk_error(error: OSError) -> None:
+        logger.warning(f"Error walking {error.filename}: {error}")
+
+    try:
+        top_fd = os.open(directory, _DIR_FLAGS)
+    except OSError as e:
+        logger.error(f"Error walking directory {directory}: {e}")
+        return 0, 0
+    # fwalk paths (relative to directory) of subdirectories this call
+    # removed something from; bottom-up order visits them before parents
+    emptied: set[str] = set()
+    pruned = 0
+    try:
+        for root, dirs, files, root_fd in os.fwalk(
+            os.curdir, topdown=False, onerror=on_walk_error, dir_fd=top_fd
+        ):
+            base = os.path.normpath(os.path.join(directory, root))
+            for name in files if files_only else files + dirs:
+                path = os.path.join(base, name)
+                if is_whitelisted(path):
+                    continue
+                try:
+                    size = _remove_at(root_fd, name)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning(f"Error deleting {path}: {e}")
+                    continue
+                logger.debug(f"Deleted: {path} ({size} bytes)")
+                items_deleted += 1
+                bytes_deleted += size
+                if prune_emptied:
+                    emptied.add(root)
+
+            if prune_emptied:
+                for name in dirs:
+                    child = os.path.join(root, name)
+                    if child not in emptied:
+                        continue
+                    emptied.discard(child)
+                    try:
+                        os.rmdir(name, dir_fd=root_fd)
+                    except OSError:
+                        continue  # Not empty (or not a directory)
+                    pruned += 1
+                    emptied.add(root)
+    finally:
+        os.close(top_fd)
+    if pruned:
+        logger.debug(f"Pruned {pruned} emptied directories below {directory}")
+    return items_deleted, bytes_deleted
+
+
 def expand_glob_pattern(pattern: str) -> Iterator[str]:
     """Expand glob pattern to matching paths."""
     expanded = os.path.expanduser(os.path.expandvars(pattern))
@@ -123,8 +400,67 @@ def expand_glob_pattern(pattern: str) -> Iterator[str]:
             yield expanded
 
 
-def walk_directory_files(directory: str) -> Iterator[str]:
-    """Recursively yield all files in directory."""
+def glob_base(pattern: str) -> str:
+    """Deepest directory of pattern (expanded) that holds every match.
+
+    The components before the first one with glob characters; for a
+    plain path, its parent.
+    """
+    expanded = os.path.normpath(os.path.expanduser(os.path.expandvars(pattern)))
+    parts = expanded.split(os.sep)
+    for i, part in enumerate(parts):
+        if any(c in part for c in "*?["):
+            return os.sep.join(parts[:i]) or (os.sep if os.path.isabs(expanded) else os.curdir)
+    return os.path.dirname(expanded)
+
+
+def is_inside(path: str, root: str) -> bool:
+    """Whether path lies strictly inside root."""
+    path = os.path.normcase(os.path.normpath(path))
+    root = os.path.normcase(os.path.normpath(root))
+    return path != root and path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def prune_empty_parents(directory: str, root: str) -> int:
+    """Remove directory and then each emptied ancestor, staying below root.
+
+    Stops at the first directory that is not empty. root itself is never
+    removed. Returns the number of directories removed.
+    """
+    pruned = 0
+    current = os.path.normpath(directory)
+    while is_inside(current, root) and not is_whitelisted(current):
+        try:
+            os.rmdir(current)
+        except OSError:
+            break
+        logger.debug(f"Pruned empty directory: {current}")
+        pruned += 1
+        current = os.path.dirname(current)
+    return pruned
+
+
+def prune_emptied_dirs(directories: Iterable[str], root: str) -> int:
+    """Bottom-up prune_empty_parents over directories a run deleted from.
+
+    Only directories strictly inside root are considered. Returns the
+    number of directories removed.
+    """
+    pruned = 0
+    inside = {os.path.normpath(d) for d in directories if is_inside(d, root)}
+    for directory in sorted(inside, key=lambda d: d.count(os.sep), reverse=True):
+        pruned += prune_empty_parents(directory, root)
+    return pruned
+
+
+def walk_directory_files(directory: str, index: DirectoryIndex | None = None) -> Iterator[str]:
+    """Recursively yield all files in directory.
+
+    With an index, unchanged directories that held no files are not listed.
+    """
+    if index is not None:
+        yield from index.walk_files(directory)
+        return
     try:
         for root, _dirs, files in os.walk(directory):
             for file in files:
@@ -133,8 +469,11 @@ def walk_directory_files(directory: str) -> Iterator[str]:
         logger.error(f"Error walking directory {directory}: {e}")
 
 
-def walk_directory_all(directory: str) -> Iterator[str]:
+def walk_directory_all(directory: str, index: DirectoryIndex | None = None) -> Iterator[str]:
     """Recursively yield all files and directories."""
+    if index is not None:
+        yield from index.walk_all(directory)
+        return
     try:
         for root, dirs, files in os.walk(directory, topdown=False):
             for file in files:
@@ -0,0 +1,230 @@
+"""Locked-file handling for deletion runs
+
+A running browser keeps some profile files open; deleting them fails with a
+sharing violation until the browser lets go. Instead of reporting those as
+errors straight away:
+- Failures are classified by a pluggable LockDetector
+- Locked files are retried with exponential backoff on a background
+  thread, so deletion workers never wait on them
+- Whatever is still locked when the run ends is scheduled for deletion on
+  reboot in one batch (Windows; elsewhere it is reported as locked)
+"""
+
+from __future__ import annotations
+
+import errno
+import heapq
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Win32 error codes of a file held open by another process
+ERROR_SHARING_VIOLATION = 32
+ERROR_LOCK_VIOLATION = 33
+
+# delete_func(path) -> (success, bytes_deleted), raising on failure
+DeleteFunc = Callable[[str], tuple[bool, int]]
+
+# on_resolved(path, success, bytes_deleted, error, context)
+ResolvedCallback = Callable[[str, bool, int, "str | None", Any], None]
+
+# reboot_scheduler(paths) -> paths actually scheduled
+RebootScheduler = Callable[[list[str]], list[str]]
+
+
+class LockDetector(Protocol):
+    """Decides whether a failed deletion was caused by a lock."""
+
+    def is_locked(self, path: str, error: BaseException) -> bool: ...
+
+
+class SharingViolationDetector:
+    """Windows sharing/lock violations; EBUSY and ETXTBSY elsewhere."""
+
+    def is_locked(self, path: str, error: BaseException) -> bool:
+        if not isinstance(error, OSError):
+            return False
+        if getattr(error, "winerror", None) in (ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION):
+            return True
+        return error.errno in (errno.EBUSY, errno.ETXTBSY)
+
+
+def schedule_on_reboot(paths: list[str]) -> list[str]:
+    """Default reboot scheduler: MoveFileEx on Windows, nothing elsewhere."""
+    if os.name != "nt":
+        return []
+    from . import windows_utils
+    return windows_utils.schedule_delete_on_reboot(paths)
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff for locked files."""
+    initial_delay: float = 0.5
+    factor: float = 2.0
+    max_delay: float = 8.0
+    max_attempts: int = 4
+
+    def delay(self, attempt: int) -> float:
+        """Wait before retry number attempt (1-based)."""
+        return min(self.max_delay, self.initial_delay * self.factor ** (attempt - 1))
+
+
+class LockedFileQueue:
+    """Deferred retries of locked files for one deletion run at a time.
+
+    Usage (DeletionExecutor does this when given a queue):
+        queue.start(delete_func, on_resolved)
+        ... workers call queue.offer(path, error) on failures ...
+        queue.finish()
+
+    Every offered path is resolved exactly once through on_resolved:
+    deleted by a retry, failed for another reason, or still locked at
+    finish() (then possibly scheduled for deletion on reboot).
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        detector: LockDetector | None = None,
+        reboot_scheduler: RebootScheduler = schedule_on_reboot,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.detector = detector or SharingViolationDetector()
+        self.reboot_scheduler = reboot_scheduler
+        self.deferred = 0
+        self.retried_ok = 0
+        self.reboot_pending = 0
+        self._cond = threading.Condition()
+        # (due, seq, attempt, path, context)
+        self._heap: list[tuple[float, int, int, str, Any]] = []
+        self._exhausted: list[tuple[str, Any]] = []
+        self._seq = 0
+        self._busy = 0
+        self._thread: threading.Thread | None = None
+        self._closing = False
+        self._delete_func: DeleteFunc | None = None
+        self._on_resolved: ResolvedCallback | None = None
+
+    def start(self, delete_func: DeleteFunc, on_resolved: ResolvedCallback) -> None:
+        """Bind the queue to a run."""
+        with self._cond:
+            self._delete_func = delete_func
+            self._on_resolved = on_resolved
+            self._closing = False
+            self.deferred = self.retried_ok = self.reboot_pending = 0
+
+    def offer(self, path: str, error: BaseException, context: Any = None) -> bool:
+        """Take over a failed deletion if it was caused by a lock.
+
+        Returns False (caller records the failure itself) otherwise.
+        """
+        if self._delete_func is None or not self.detector.is_locked(path, error):
+            return False
+        with self._cond:
+            if self._closing:
+                return False
+            self.deferred += 1
+            self._push(path, 1, context)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._retry_loop, name="locked-file-retry", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+        logger.debug(f"Locked, retrying later: {path}")
+        return True
+
+    def _push(self, path: str, attempt: int, context: Any) -> None:
+        # Caller holds _cond
+        due = time.monotonic() + self.policy.delay(attempt)
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, attempt, path, context))
+
+    def _retry_loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closing and not self._heap:
+                        self._thread = None
+                        self._cond.notify_all()
+                        return
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                _due, _seq, attempt, path, context = heapq.heappop(self._heap)
+                self._busy += 1
+
+            try:
+                self._retry(path, attempt, context)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._cond.notify_all()
+
+    def _retry(self, path: str, attempt: int, context: Any) -> None:
+        try:
+            success, size = self._delete_func(path)
+        except Exception as e:
+            if not self.detector.is_locked(path, e):
+                self._resolve(path, False, 0, str(e), context)
+            elif attempt < self.policy.max_attempts:
+                with self._cond:
+                    self._push(path, attempt + 1, context)
+            else:
+                with self._cond:
+                    self._exhausted.append((path, context))
+            return
+        if success:
+            with self._cond:
+                self.retried_ok += 1
+        self._resolve(path, success, size, None, context)
+
+    def _resolve(self, path: str, success: bool, size: int, error: str | None, context: Any) -> None:
+        try:
+            self._on_resolved(path, success, size, error, context)
+        except Exception as e:
+            logger.error(f"Locked-file callback failed for {path}: {e}")
+
+    def finish(self, cancelled: bool = False) -> list[str]:
+        """Wait for pending retries, then schedule what is left on reboot.
+
+        With cancelled, pending retries are abandoned. Returns the paths
+        scheduled for deletion on reboot.
+        """
+        with self._cond:
+            self._closing = True
+            if cancelled:
+                self._exhausted.extend((path, context) for *_, path, context in self._heap)
+                self._heap.clear()
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._thread is None and not self._busy)
+            still_locked, self._exhausted = self._exhausted, []
+
+        if not still_locked:
+            return []
+        scheduled: list[str] = []
+        if not cancelled:
+            try:
+                scheduled = self.reboot_scheduler([path for path, _ in still_locked])
+            except Exception as e:
+                logger.error(f"Scheduling locked files for reboot failed: {e}")
+        scheduled_set = set(scheduled)
+        self.reboot_pending += len(scheduled_set)
+        logger.info(
+            f"{len(still_locked)} files still locked, "
+            f"{len(scheduled_set)} scheduled for deletion on reboot"
+        )
+        for path, context in still_locked:
+            reason = "locked; scheduled for deletion on reboot" if path in scheduled_set else "locked"
+            self._resolve(path, False, 0, reason, context)
+        return scheduled
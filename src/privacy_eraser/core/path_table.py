@@ -0,0 +1,309 @@
+"""Compact storage for very large path lists
+
+A list of absolute path strings costs well over 100 bytes per entry,
+mostly for directory prefixes repeated across thousands of siblings.
+PathTable stores instead:
+- each distinct directory once (interned prefix table)
+- basenames back to back in one bytes buffer, hex names packed 2:1
+- per-entry directory id and name end offset in typed arrays
+- optional parallel size/flag arrays, allocated on first use
+
+It behaves as a read-mostly Sequence[str]: iteration, indexing, len() and
+equality yield and compare plain path strings, so existing callers work
+unchanged.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+
+# Encoding that round-trips every str os.fsdecode() can produce
+_ENCODING = "utf-8"
+_ERRORS = "surrogatepass"
+
+# High bits of a directory id: basename is stored hex-packed, and was
+# upper case (Firefox cache2 entries) rather than lower case (Chromium)
+_HEX_BIT = 0x80000000
+_UPPER_BIT = 0x40000000
+_NAME_BITS = _HEX_BIT | _UPPER_BIT
+_MAX_DIRS = _UPPER_BIT - 1
+_LOWER_HEX = frozenset("0123456789abcdef")
+_UPPER_HEX = frozenset("0123456789ABCDEF")
+
+UNKNOWN_SIZE = -1
+
+
+def _split(path: str) -> tuple[str, str]:
+    """(prefix, basename) with prefix + basename == path exactly."""
+    tail = os.path.basename(path)
+    return path[:len(path) - len(tail)], tail
+
+
+def _encode_name(name: str) -> tuple[bytes, int]:
+    """Stored bytes of a basename and its _NAME_BITS."""
+    if name and len(name) % 2 == 0:
+        if _LOWER_HEX.issuperset(name):
+            return bytes.fromhex(name), _HEX_BIT
+        if _UPPER_HEX.issuperset(name):
+            return bytes.fromhex(name), _HEX_BIT | _UPPER_BIT
+    return name.encode(_ENCODING, _ERRORS), 0
+
+
+class PathRecord:
+    """One entry of a PathTable with its size and flags."""
+
+    __slots__ = ("path", "size", "flags")
+
+    def __init__(self, path: str, size: int = UNKNOWN_SIZE, flags: int = 0):
+        self.path = path
+        self.size = size
+        self.flags = flags
+
+    def __repr__(self) -> str:
+        return f"PathRecord({self.path!r}, size={self.size}, flags={self.flags})"
+
+
+class PathTable(Sequence[str]):
+    """Append-only, memory-compact sequence of paths."""
+
+    __slots__ = (
+        "_dirs",
+        "_dir_ids",
+        "_dir_of",
+        "_names",
+        "_ends",
+        "_sizes",
+        "_flags",
+        "_order",
+        "_group_ends",
+    )
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._dirs: list[str] = []
+        self._dir_ids: dict[str, int] = {}
+        self._dir_of = array("I")
+        self._names = bytearray()
+        self._ends = array("I")
+        self._sizes: array | None = None
+        self._flags: bytearray | None = None
+        # Lookup index built lazily by find(): entry indices grouped by
+        # directory key and sorted by name within each group
+        self._order: array | None = None
+        self._group_ends: array | None = None
+        self.extend(paths)
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[str]) -> PathTable:
+        """Build a table, dropping duplicates while preserving order."""
+        table = cls()
+        # Transient: per-directory name sets, released once built
+        seen: dict[str, set[str]] = {}
+        table.extend_unique(paths, seen)
+        seen.clear()
+        return table
+
+    # ── building ───────────────────────────────────────────────
+
+    def append(self, path: str, size: int = UNKNOWN_SIZE, flags: int = 0) -> None:
+        head, tail = _split(path)
+        dir_id = self._dir_ids.get(head)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            if dir_id > _MAX_DIRS:
+                raise OverflowError("too many distinct directories")
+            self._dirs.append(head)
+            self._dir_ids[head] = dir_id
+
+        raw, bits = _encode_name(tail)
+        self._names += raw
+        dir_id |= bits
+
+        end = len(self._names)
+        if end > 0xFFFFFFFF and self._ends.typecode == "I":
+            self._ends = array("Q", self._ends)
+        self._ends.append(end)
+        self._dir_of.append(dir_id)
+
+        index = len(self._ends) - 1
+        # Parallel arrays, once allocated, grow with every entry
+        if self._sizes is not None:
+            self._sizes.append(size)
+        elif size != UNKNOWN_SIZE:
+            self.set_size(index, size)
+        if self._flags is not None:
+            self._flags.append(flags)
+        elif flags:
+            self.set_flags(index, flags)
+        self._order = None
+        self._group_ends = None
+
+    def extend(self, paths: Iterable[str]) -> None:
+        if isinstance(paths, PathTable):
+            paths = iter(paths)
+        for path in paths:
+            self.append(path)
+
+    def extend_unique(self, paths: Iterable[str], seen: dict[str, set[str]], flags: int = 0) -> int:
+        """Append the paths not in seen (directory -> names); returns how many.
+
+        seen is updated, so one dict de-duplicates several calls. Callers
+        clear it once the table is built. flags is set on every path added.
+        """
+        added = 0
+        for path in paths:
+            head, tail = _split(path)
+            names = seen.setdefault(head, set())
+            if tail in names:
+                continue
+            names.add(tail)
+            self.append(path, flags=flags)
+            added += 1
+        return added
+
+    def set_size(self, index: int, size: int) -> None:
+        if self._sizes is None:
+            self._sizes = array("q", [UNKNOWN_SIZE]) * len(self)
+        self._sizes[index] = size
+
+    def set_flags(self, index: int, flags: int) -> None:
+        if self._flags is None:
+            self._flags = bytearray(len(self))
+        self._flags[index] = flags
+
+    # ── access ─────────────────────────────────────────────────
+
+    def _raw(self, index: int) -> bytes:
+        start = self._ends[index - 1] if index else 0
+        return bytes(self._names[start:self._ends[index]])
+
+    def _path(self, index: int) -> str:
+        return self._dirs[self._dir_of[index] & ~_NAME_BITS] + self.name(index)
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._path(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PathTable index out of range")
+        return self._path(index)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._path(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PathTable, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PathTable({len(self)} paths, {len(self._dirs)} directories)"
+
+    def directories(self) -> list[tuple[str, array]]:
+        """(directory prefix, entry indices) pairs in first-seen order.
+
+        Uses the interned directory ids, so no path is rebuilt.
+        """
+        groups: dict[int, array] = {}
+        for index, dir_id in enumerate(self._dir_of):
+            dir_id &= ~_NAME_BITS
+            members = groups.get(dir_id)
+            if members is None:
+                members = groups[dir_id] = array("I")
+            members.append(index)
+        return [(self._dirs[dir_id], members) for dir_id, members in groups.items()]
+
+    def name(self, index: int) -> str:
+        """Basename of entry index (path minus its directory prefix)."""
+        dir_id = self._dir_of[index]
+        raw = self._raw(index)
+        if dir_id & _UPPER_BIT:
+            return raw.hex().upper()
+        if dir_id & _HEX_BIT:
+            return raw.hex()
+        return raw.decode(_ENCODING, _ERRORS)
+
+    def size(self, index: int) -> int:
+        return self._sizes[index] if self._sizes is not None else UNKNOWN_SIZE
+
+    def flags(self, index: int) -> int:
+        return self._flags[index] if self._flags is not None else 0
+
+    def flagged(self, mask: int) -> Iterator[str]:
+        """Paths with any of the mask bits set."""
+        if self._flags is None:
+            return
+        for index, flags in enumerate(self._flags):
+            if flags & mask:
+                yield self._path(index)
+
+    def record(self, index: int) -> PathRecord:
+        return PathRecord(self[index], self.size(index), self.flags(index))
+
+    @staticmethod
+    def _group_key(dir_id: int) -> int:
+        # Each name encoding of a directory forms its own group
+        return (dir_id & ~_NAME_BITS) * 4 + (dir_id >> 30)
+
+    def _build_order(self) -> None:
+        """Counting sort by group, then sort each group by stored name.
+
+        Only one group's name bytes are materialized at a time.
+        """
+        ends = array("Q", [0]) * (4 * len(self._dirs))
+        for dir_id in self._dir_of:
+            ends[self._group_key(dir_id)] += 1
+        for i in range(1, len(ends)):
+            ends[i] += ends[i - 1]
+
+        order = array("I", [0]) * len(self)
+        fill = array("Q", [0]) + ends[:-1] if len(ends) else array("Q")
+        for index, dir_id in enumerate(self._dir_of):
+            group = self._group_key(dir_id)
+            order[fill[group]] = index
+            fill[group] += 1
+
+        start = 0
+        for end in ends:
+            if end - start > 1:
+                order[start:end] = array("I", sorted(order[start:end], key=self._raw))
+            start = end
+        self._order = order
+        self._group_ends = ends
+
+    def find(self, path: str) -> int | None:
+        """Index of the first occurrence of path, or None.
+
+        O(log n) per lookup after a one-off index build.
+        """
+        head, tail = _split(path)
+        dir_id = self._dir_ids.get(head)
+        if dir_id is None:
+            return None
+        raw, bits = _encode_name(tail)
+        if self._order is None:
+            self._build_order()
+
+        group = self._group_key(dir_id | bits)
+        lo = self._group_ends[group - 1] if group else 0
+        hi = self._group_ends[group]
+        pos = bisect.bisect_left(self._order, raw, lo, hi, key=self._raw)
+        if pos < hi and self._raw(self._order[pos]) == raw:
+            return self._order[pos]
+        return None
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self.find(path) is not None
+
+    def index(self, path: str, start: int = 0, stop: int | None = None) -> int:
+        found = self.find(path)
+        if found is None or found < start or (stop is not None and found >= stop):
+            raise ValueError(f"{path!r} is not in PathTable")
+        return found
@@ -0,0 +1,378 @@
+"""Background scan of browser profile cache sizes and cookie counts
+
+Fills the browser_cache table of settings_db, which the browser cards show:
+- Profiles are found below each browser's user data roots (PROFILE_LAYOUTS)
+- Cache bytes come from DirectoryIndex.summarize: unchanged directories
+  cost one stat() each, so rescans of a quiet profile are cheap
+- Cookie and history databases are inspected in place (sqlite_inspect)
+  and again only when the file or its WAL changed since the last scan
+- Results are published per browser as soon as its profiles are done;
+  the per-profile breakdown is kept in settings_db (profile_scan.<browser>)
+
+The scan runs on its own thread, at idle priority where that can be set
+per thread (Linux), and pauses between profiles.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from .dir_index import DirectoryIndex
+from .sqlite_inspect import inspect_database
+
+logger = logging.getLogger(__name__)
+
+# settings_db key prefix for per-profile results; the browser name is appended
+SETTING_PREFIX = "profile_scan."
+
+# Pause between profiles, in seconds
+DEFAULT_PAUSE = 0.05
+
+
+@dataclass(frozen=True)
+class ProfileLayout:
+    """Where a browser keeps its profiles.
+
+    A root either is a profile itself (holds the marker file) or holds one
+    directory per profile. Roots that do not exist on this system (other
+    OS, unexpanded variables) are skipped.
+    """
+    roots: tuple[str, ...]
+    marker: str  # file present in every profile directory
+    cache_dirs: tuple[str, ...]  # relative to the profile's cache bases
+    # Roots mirroring the profile directories for cache data kept outside
+    # the profile (%LOCALAPPDATA% for Firefox, ~/.cache on Linux)
+    cache_roots: tuple[str, ...] = ()
+    cookie_dbs: tuple[str, ...] = ()  # relative to the profile directory
+    cookie_table: str = "cookies"
+    # Other SQLite files inspected for previews, relative to the profile
+    databases: tuple[str, ...] = ()
+
+
+def _chromium(user_data: tuple[str, ...], cache_roots: tuple[str, ...] = ()) -> ProfileLayout:
+    return ProfileLayout(
+        roots=user_data,
+        marker="Preferences",
+        cache_dirs=("Cache", "Code Cache", "GPUCache", "Media Cache", "Service Worker/CacheStorage"),
+        cache_roots=cache_roots,
+        cookie_dbs=("Network/Cookies", "Cookies"),
+        databases=("History", "Web Data", "Favicons"),
+    )
+
+
+PROFILE_LAYOUTS: dict[str, ProfileLayout] = {
+    "chrome": _chromium(
+        (
+            r"%LOCALAPPDATA%\Google\Chrome\User Data",
+            "~/.config/google-chrome",
+            "~/Library/Application Support/Google/Chrome",
+        ),
+        ("~/.cache/google-chrome", "~/Library/Caches/Google/Chrome"),
+    ),
+    "edge": _chromium(
+        (
+            r"%LOCALAPPDATA%\Microsoft\Edge\User Data",
+            "~/.config/microsoft-edge",
+            "~/Library/Application Support/Microsoft Edge",
+        ),
+        ("~/.cache/microsoft-edge", "~/Library/Caches/Microsoft Edge"),
+    ),
+    "brave": _chromium(
+        (
+            r"%LOCALAPPDATA%\BraveSoftware\Brave-Browser\User Data",
+            "~/.config/BraveSoftware/Brave-Browser",
+            "~/Library/Application Support/BraveSoftware/Brave-Browser",
+        ),
+        ("~/.cache/BraveSoftware/Brave-Browser", "~/Library/Caches/BraveSoftware/Brave-Browser"),
+    ),
+    "opera": _chromium(
+        (r"%APPDATA%\Opera Software\Opera Stable", "~/.config/opera"),
+        (r"%LOCALAPPDATA%\Opera Software\Opera Stable", "~/.cache/opera"),
+    ),
+    "whale": _chromium(
+        (r"%LOCALAPPDATA%\Naver\Naver Whale\User Data", "~/.config/naver-whale"),
+        ("~/.cache/naver-whale",),
+    ),
+    "firefox": ProfileLayout(
+        roots=(
+            r"%APPDATA%\Mozilla\Firefox\Profiles",
+            "~/.mozilla/firefox",
+            "~/Library/Application Support/Firefox/Profiles",
+        ),
+        marker="prefs.js",
+        cache_dirs=("cache2", "startupCache", "thumbnails"),
+        cache_roots=(
+            r"%LOCALAPPDATA%\Mozilla\Firefox\Profiles",
+            "~/.cache/mozilla/firefox",
+            "~/Library/Caches/Firefox/Profiles",
+        ),
+        cookie_dbs=("cookies.sqlite",),
+        cookie_table="moz_cookies",
+        databases=("places.sqlite", "formhistory.sqlite", "favicons.sqlite"),
+    ),
+}
+
+
+def _expand(path: str) -> str:
+    return os.path.normpath(os.path.expanduser(os.path.expandvars(path)))
+
+
+@dataclass
+class ProfileUsage:
+    """Cache size and cookie count of one profile."""
+    profile: str  # directory name ("Default", "Profile 1", "abcd.default-release")
+    path: str
+    cache_bytes: int = 0
+    cookie_count: int = 0
+    rows: dict[str, int] = field(default_factory=dict)  # table -> rows, over all databases
+    db_bytes: int = 0
+
+
+@dataclass
+class BrowserUsage:
+    """Totals of one browser over its profiles."""
+    browser: str
+    profiles: list[ProfileUsage] = field(default_factory=list)
+
+    @property
+    def cache_bytes(self) -> int:
+        return sum(p.cache_bytes for p in self.profiles)
+
+    @property
+    def cookie_count(self) -> int:
+        return sum(p.cookie_count for p in self.profiles)
+
+
+def find_profiles(layout: ProfileLayout) -> list[tuple[str, str, list[str]]]:
+    """(profile name, profile directory, cache bases) of every profile found."""
+    found: list[tuple[str, str, list[str]]] = []
+    for raw_root in layout.roots:
+        root = _expand(raw_root)
+        if os.path.isfile(os.path.join(root, layout.marker)):
+            profiles = [("", root)]
+        else:
+            try:
+                with os.scandir(root) as entries:
+                    profiles = sorted(
+                        (entry.name, entry.path)
+                        for entry in entries
+                        if entry.is_dir(follow_symlinks=False)
+                        and os.path.isfile(os.path.join(entry.path, layout.marker))
+                    )
+            except OSError:
+                continue
+        for name, path in profiles:
+            bases = [path] + [
+                os.path.join(_expand(cache_root), name) if name else _expand(cache_root)
+                for cache_root in layout.cache_roots
+            ]
+            found.append((name or os.path.basename(path), path, bases))
+    return found
+
+
+def _file_version(path: str) -> list[int] | None:
+    """(mtime_ns, size) of a database and its WAL, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    version = [st.st_mtime_ns, st.st_size]
+    try:
+        wal = os.stat(path + "-wal")
+        version += [wal.st_mtime_ns, wal.st_size]
+    except OSError:
+        pass
+    return version
+
+
+def _inspect(db_path: str, tables: tuple[str, ...] | None) -> dict:
+    """Stored form of one database's inspection."""
+    info = inspect_database(db_path, tables)
+    return {
+        "rows": info.rows,
+        "size": info.size_bytes,
+        "free": info.free_bytes,
+    }
+
+
+class ProfileScanner:
+    """Measure browser profiles and store the results in settings_db.
+
+    Args:
+        layouts: Lowercased browser name -> ProfileLayout
+        index: Directory index for cache sizes (default: dir_index.db)
+        on_browser: Called with each BrowserUsage once it is complete
+        pause: Seconds to sleep between profiles
+        low_priority: Run start()'s thread at idle priority where per-thread
+            priorities exist (Linux); elsewhere it would lower the whole
+            process, UI included
+    """
+
+    def __init__(
+        self,
+        layouts: dict[str, ProfileLayout] | None = None,
+        index: DirectoryIndex | None = None,
+        on_browser: Callable[[BrowserUsage], None] | None = None,
+        pause: float = DEFAULT_PAUSE,
+        low_priority: bool = True,
+    ):
+        self.layouts = PROFILE_LAYOUTS if layouts is None else layouts
+        self.index = index
+        self.on_browser = on_browser
+        self.pause = pause
+        self.low_priority = low_priority
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ── scanning ───────────────────────────────────────────────
+
+    def scan_browser(self, browser: str) -> BrowserUsage | None:
+        """Measure every profile of browser; None if it has no layout."""
+        layout = self.layouts.get(browser.lower())
+        if layout is None:
+            return None
+        if self.index is None:
+            self.index = DirectoryIndex()
+
+        previous = {p["path"]: p for p in _load_profiles(browser)}
+        usage = BrowserUsage(browser)
+        stored: list[dict] = []
+        for name, path, bases in find_profiles(layout):
+            if self._stop.is_set():
+                return None
+            profile = ProfileUsage(name, path)
+            for base in bases:
+                for cache_dir in layout.cache_dirs:
+                    cache_path = os.path.join(base, cache_dir)
+                    if os.path.isdir(cache_path):
+                        profile.cache_bytes += self.index.summarize(cache_path)[1]
+
+            databases = {}
+            known = previous.get(path, {}).get("databases", {})
+            for db_name in layout.cookie_dbs + layout.databases:
+                db_path = os.path.join(path, db_name)
+                version = _file_version(db_path)
+                if version is None:
+                    continue
+                stored_db = known.get(db_name)
+                if not (stored_db and stored_db["version"] == version):
+                    tables = (layout.cookie_table,) if db_name in layout.cookie_dbs else None
+                    try:
+                        stored_db = {"version": version, **_inspect(db_path, tables)}
+                    except sqlite3.Error as e:
+                        # Mid-write or not a database; keep what the last scan saw
+                        logger.debug(f"Cannot inspect {db_path}: {e}")
+                        if not stored_db:
+                            continue
+                databases[db_name] = stored_db
+                for table, count in stored_db["rows"].items():
+                    profile.rows[table] = profile.rows.get(table, 0) + count
+                profile.db_bytes += stored_db["size"]
+            profile.cookie_count = profile.rows.get(layout.cookie_table, 0)
+
+            usage.profiles.append(profile)
+            stored.append({
+                "profile": name,
+                "path": path,
+                "cache_bytes": profile.cache_bytes,
+                "cookie_count": profile.cookie_count,
+                "databases": databases,
+            })
+            self._stop.wait(self.pause)
+
+        _save(usage, stored)
+        return usage
+
+    def scan(self, browsers: Iterable[str]) -> dict[str, BrowserUsage]:
+        """Measure browsers one after another, publishing each as it completes."""
+        results: dict[str, BrowserUsage] = {}
+        try:
+            for browser in browsers:
+                if self._stop.is_set():
+                    break
+                try:
+                    usage = self.scan_browser(browser)
+                except Exception as e:
+                    logger.warning(f"Profile scan failed for {browser}: {e}")
+                    continue
+                if usage is None:
+                    continue
+                results[browser] = usage
+                logger.info(
+                    f"{browser}: {len(usage.profiles)} profiles, "
+                    f"{usage.cache_bytes} cache bytes, {usage.cookie_count} cookies"
+                )
+                if self.on_browser is not None:
+                    self.on_browser(usage)
+        finally:
+            if self.index is not None:
+                try:
+                    self.index.save()
+                except Exception as e:
+                    logger.warning(f"Failed to save directory index: {e}")
+        return results
+
+    # ── background thread ──────────────────────────────────────
+
+    def start(self, browsers: Iterable[str]) -> threading.Thread:
+        """Scan browsers on a daemon thread; returns the thread."""
+        browsers = list(browsers)
+        self._stop.clear()
+
+        def target() -> None:
+            if self.low_priority:
+                from .background_mode import lower_priority
+
+                # Per thread and gone when the scan ends; nothing to restore
+                lower_priority()
+            self.scan(browsers)
+
+        self._thread = threading.Thread(target=target, name="profile-scan", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Ask a running scan to finish after the current profile."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def cached_usage() -> dict[str, dict]:
+    """Results of earlier scans from browser_cache, keyed by browser name."""
+    try:
+        from .. import settings_db
+
+        return settings_db.get_database_manager().get_browser_cache_info()
+    except Exception as e:
+        logger.debug(f"No cached browser usage: {e}")
+        return {}
+
+
+def _load_profiles(browser: str) -> list[dict]:
+    try:
+        from .. import settings_db
+
+        raw = settings_db.get_database_manager().load_setting(SETTING_PREFIX + browser)
+        return json.loads(raw) if raw else []
+    except Exception as e:
+        logger.debug(f"No stored profile scan for {browser}: {e}")
+        return []
+
+
+def _save(usage: BrowserUsage, profiles: list[dict]) -> None:
+    try:
+        from .. import settings_db
+
+        db = settings_db.get_database_manager()
+        db.update_browser_cache(usage.browser, usage.cache_bytes, usage.cookie_count)
+        db.save_setting(SETTING_PREFIX + usage.browser, json.dumps(profiles))
+    except Exception as e:
+        logger.warning(f"Failed to save profile scan for {usage.browser}: {e}")
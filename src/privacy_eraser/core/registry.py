@@ -0,0 +1,328 @@
+"""Registry access with cached key handles, batched probes and tree deletion
+
+Every registry function used to open its key from the hive root. This
+layer keeps opened keys instead:
+- Keys are opened relative to the deepest already-open ancestor; keys
+  found to exist stay open as parents for later lookups until close()
+- keys_exist() checks many keys at once: keys are grouped by parent, the
+  parent is opened once, and a missing parent answers for all children
+- delete_tree() removes a key with everything below it, children first;
+  winreg.DeleteKey alone fails on keys that have subkeys
+
+The backend is winreg on Windows. Elsewhere it is the in-memory registry
+of mock_windows, which implements the same calls, so the layer can be
+tested and benchmarked on any platform.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+HIVE_NAMES = {
+    "HKCR": "HKEY_CLASSES_ROOT",
+    "HKEY_CLASSES_ROOT": "HKEY_CLASSES_ROOT",
+    "HKCU": "HKEY_CURRENT_USER",
+    "HKEY_CURRENT_USER": "HKEY_CURRENT_USER",
+    "HKLM": "HKEY_LOCAL_MACHINE",
+    "HKEY_LOCAL_MACHINE": "HKEY_LOCAL_MACHINE",
+    "HKU": "HKEY_USERS",
+    "HKEY_USERS": "HKEY_USERS",
+}
+
+
+def split_key(full_key: str) -> tuple[str, tuple[str, ...]]:
+    """'HKCU\\Software\\App' -> ('HKEY_CURRENT_USER', ('Software', 'App')).
+
+    Raises ValueError for an unknown hive.
+    """
+    hive, _sep, rest = full_key.strip("\\").partition("\\")
+    hive_name = HIVE_NAMES.get(hive.upper())
+    if hive_name is None:
+        raise ValueError(f"Unknown registry hive: {hive}")
+    return hive_name, tuple(part for part in rest.split("\\") if part)
+
+
+def default_backend() -> Any:
+    """winreg on Windows, the mock_windows registry elsewhere."""
+    if sys.platform == "win32":
+        import winreg
+
+        return winreg
+    from privacy_eraser import mock_windows
+
+    return mock_windows.MOCK_REGISTRY
+
+
+class Registry:
+    """Registry access through a cache of open key handles.
+
+    Only keys found to exist are cached, as parents for later lookups;
+    missing keys are remembered for one batch only, so keys created later
+    are seen. A cached handle whose key was deleted meanwhile is dropped
+    and the lookup retried from the hive. Thread-safe; close() (or the
+    context manager) releases the handles. Key paths are compared
+    case-insensitively, like the registry itself.
+    """
+
+    def __init__(self, backend: Any = None):
+        self.backend = backend if backend is not None else default_backend()
+        self.opens = 0  # OpenKey calls made
+        self._lock = threading.RLock()
+        # (hive, lowercased parts) -> open handle
+        self._handles: dict[tuple[str, tuple[str, ...]], Any] = {}
+        # cache key -> cached keys directly below it (parents are always cached first)
+        self._below: dict[tuple[str, tuple[str, ...]], set] = {}
+
+    def __enter__(self) -> Registry:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ── handles ────────────────────────────────────────────────
+
+    def _open_key(self, parent: Any, name: str, access: Any = None) -> Any:
+        self.opens += 1
+        return self.backend.OpenKey(
+            parent, name, 0, self.backend.KEY_READ if access is None else access
+        )
+
+    def _handle(self, hive: str, parts: tuple[str, ...], missing: set, lowered: tuple[str, ...] | None = None) -> Any:
+        """Cached handle of a key, None if it (or an ancestor) is missing."""
+        if not parts:
+            return getattr(self.backend, hive)
+        if lowered is None:
+            lowered = tuple(part.lower() for part in parts)
+        cache_key = (hive, lowered)
+        handle = self._handles.get(cache_key)
+        if handle is not None:
+            return handle
+        if cache_key in missing:
+            return None
+        parent = self._handle(hive, parts[:-1], missing, lowered[:-1])
+        if parent is None:
+            missing.add(cache_key)
+            return None
+        try:
+            handle = self._open_key(parent, parts[-1])
+        except FileNotFoundError:
+            missing.add(cache_key)
+            return None
+        self._store(cache_key, handle)
+        return handle
+
+    def _store(self, cache_key: tuple[str, tuple[str, ...]], handle: Any) -> None:
+        old = self._handles.get(cache_key)
+        if old is not None:
+            self.backend.CloseKey(old)
+        self._handles[cache_key] = handle
+        hive, lowered = cache_key
+        self._below.setdefault((hive, lowered[:-1]), set()).add(cache_key)
+
+    def _with_handle(self, hive: str, parts: tuple[str, ...], missing: set, func: Any) -> Any:
+        """func(handle of key), retried once if a cached handle went stale.
+
+        func is not called (None is returned) when the key is missing.
+        """
+        for attempt in (0, 1):
+            handle = self._handle(hive, parts, missing)
+            if handle is None:
+                return None
+            try:
+                return func(handle)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                # e.g. ERROR_KEY_DELETED on a handle opened earlier; the
+                # deleted key may be any ancestor, so reopen from the top
+                if attempt:
+                    raise
+                self._forget(hive, parts[:1])
+        return None
+
+    def _forget(self, hive: str, parts: tuple[str, ...]) -> None:
+        """Close and drop the cached handles of a key and its subkeys."""
+        lowered = tuple(part.lower() for part in parts)
+        if lowered:
+            self._below.get((hive, lowered[:-1]), set()).discard((hive, lowered))
+        stack = [(hive, lowered)]
+        while stack:
+            cache_key = stack.pop()
+            handle = self._handles.pop(cache_key, None)
+            if handle is not None:
+                try:
+                    self.backend.CloseKey(handle)
+                except OSError:
+                    pass
+            stack.extend(self._below.pop(cache_key, ()))
+
+    def close(self) -> None:
+        """Close every cached handle."""
+        with self._lock:
+            for handle in self._handles.values():
+                try:
+                    self.backend.CloseKey(handle)
+                except OSError:
+                    pass
+            self._handles.clear()
+            self._below.clear()
+
+    # ── queries ────────────────────────────────────────────────
+
+    def key_exists(self, full_key: str) -> bool:
+        return self.keys_exist([full_key])[full_key]
+
+    def keys_exist(self, full_keys: Iterable[str]) -> dict[str, bool]:
+        """Existence of each key.
+
+        Keys sharing a parent open it once; a missing parent answers for
+        all keys below it. Every key asked for is opened afresh from its
+        parent; it stays open only if it is the parent of a later key.
+        """
+        results: dict[str, bool] = {}
+        missing: set = set()
+        parsed = []
+        for full_key in full_keys:
+            try:
+                parsed.append((split_key(full_key), full_key))
+            except ValueError as e:
+                logger.debug(f"Invalid registry key {full_key}: {e}")
+                results[full_key] = False
+        # Siblings next to each other, ancestors right before descendants
+        keyed = sorted(
+            ((hive, tuple(part.lower() for part in parts)), parts, full_key)
+            for (hive, parts), full_key in parsed
+        )
+
+        with self._lock:
+            for i, (cache_key, parts, full_key) in enumerate(keyed):
+                if not parts:
+                    results[full_key] = True
+                    continue
+                hive, lowered = cache_key
+                following = keyed[i + 1][0] if i + 1 < len(keyed) else None
+                is_parent = (
+                    following is not None
+                    and following[0] == hive
+                    and len(following[1]) > len(lowered)
+                    and following[1][: len(lowered)] == lowered
+                )
+
+                def probe(parent: Any, name: str = parts[-1], keep: bool = is_parent, cache_key=cache_key) -> bool:
+                    handle = self._open_key(parent, name)
+                    if not keep:
+                        self.backend.CloseKey(handle)
+                        return True
+                    self._store(cache_key, handle)
+                    return True
+
+                try:
+                    results[full_key] = bool(self._with_handle(hive, parts[:-1], missing, probe))
+                except FileNotFoundError:
+                    missing.add(cache_key)
+                    results[full_key] = False
+                except OSError as e:
+                    logger.debug(f"Error checking registry key {full_key}: {e}")
+                    results[full_key] = False
+        return results
+
+    def read_value(self, full_key: str, value_name: str) -> Any:
+        """Data of a value, None if the key or value does not exist."""
+        try:
+            hive, parts = split_key(full_key)
+            with self._lock:
+                return self._with_handle(
+                    hive, parts, set(), lambda handle: self.backend.QueryValueEx(handle, value_name)[0]
+                )
+        except (OSError, ValueError) as e:
+            logger.debug(f"Error reading registry {full_key}\\{value_name}: {e}")
+            return None
+
+    def subkeys(self, full_key: str) -> list[str]:
+        """Names of the direct subkeys of a key (empty if it does not exist)."""
+        hive, parts = split_key(full_key)
+        with self._lock:
+            return self._with_handle(hive, parts, set(), self._enum) or []
+
+    def _enum(self, handle: Any) -> list[str]:
+        names = []
+        index = 0
+        while True:
+            try:
+                names.append(self.backend.EnumKey(handle, index))
+            except OSError:
+                return names
+            index += 1
+
+    # ── deletion ───────────────────────────────────────────────
+
+    def delete_tree(self, full_key: str) -> int:
+        """Delete a key with all its subkeys; returns the number of keys deleted.
+
+        Returns 0 if the key does not exist. Raises PermissionError (and
+        other OSErrors) from the backend; keys deleted before the failure
+        stay deleted.
+        """
+        hive, parts = split_key(full_key)
+        if not parts:
+            raise ValueError(f"Refusing to delete a registry hive: {full_key}")
+        with self._lock:
+            # Cached handles below the key would keep it from going away
+            self._forget(hive, parts)
+            try:
+                return self._with_handle(
+                    hive, parts[:-1], set(), lambda parent: self._delete_subtree(parent, parts[-1])
+                ) or 0
+            except FileNotFoundError:
+                return 0
+
+    def _delete_subtree(self, parent: Any, name: str) -> int:
+        """Delete parent\\name children first, with handles opened for the walk."""
+        handle = self._open_key(parent, name)
+        try:
+            deleted = sum(self._delete_subtree(handle, child) for child in self._enum(handle))
+        finally:
+            self.backend.CloseKey(handle)
+        self.backend.DeleteKey(parent, name)
+        return deleted + 1
+
+    def delete_value(self, full_key: str, value_name: str) -> bool:
+        """Delete a value; False if the key or value does not exist.
+
+        The key is opened with write access for this call only.
+        """
+        hive, parts = split_key(full_key)
+        if not parts:
+            return False
+
+        def delete(parent: Any) -> bool:
+            handle = self._open_key(parent, parts[-1], self.backend.KEY_SET_VALUE)
+            try:
+                self.backend.DeleteValue(handle, value_name)
+            finally:
+                self.backend.CloseKey(handle)
+            return True
+
+        with self._lock:
+            try:
+                return bool(self._with_handle(hive, parts[:-1], set(), delete))
+            except FileNotFoundError:
+                return False
+
+
+_registry: Registry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> Registry:
+    """Process-wide registry layer on the default backend."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = Registry()
+        return _registry
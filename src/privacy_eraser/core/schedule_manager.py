@@ -16,7 +16,7 @@ class ScheduleScenario:
     id: str
     name: str
     enabled: bool
-    schedule_type: str  # once, hourly, daily, weekly, monthly
+    schedule_type: str  # once, hourly, daily, weekly, monthly, watch
     time: str  # HH:MM format
     weekdays: list[int]  # 0=일요일, 1=월요일, ..., 6=토요일 (weekly용)
     day_of_month: Optional[int]  # 1-31 (monthly용)
@@ -94,7 +94,7 @@ class ScheduleManager:
 
         Args:
             name: 시나리오 이름
-            schedule_type: once, hourly, daily, weekly, monthly
+            schedule_type: once, hourly, daily, weekly, monthly, watch
             time: HH:MM 형식
             browsers: 브라우저 목록
             weekdays: 주별 반복 시 요일 목록 (0=일, 6=토)
@@ -0,0 +1,276 @@
+"""Secure wiping: overwrite file contents before unlinking
+
+Used for sensitive targets (cookies, Login Data, History) so their old
+contents are not left in freed blocks:
+- Page-aligned, preallocated buffers, one per thread, reused for every
+  file (random passes refill the buffer once per pass, not per write)
+- Large sequential writes in multiples of the filesystem block size,
+  covering the slack of the last block
+- fdatasync deferred and issued per batch of files, so the device sees
+  the whole batch before the first flush
+- Large files split into ranges written in parallel with pwrite
+
+CleaningService wipes the targets of SENSITIVE_OPTIONS when the
+secure_wipe.enabled setting is on (WipeSettings).
+
+Caveat: on SSDs and copy-on-write filesystems (btrfs, APFS, ZFS) an
+overwrite may land in new blocks; wiping is best effort there.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# settings_db keys: secure_wipe.<WipeSettings field>
+SETTING_PREFIX = "secure_wipe."
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_FSYNC_BATCH = 16
+# Files at least this large are overwritten by several threads at once
+DEFAULT_PARALLEL_THRESHOLD = 32 * 1024 * 1024
+
+_FALLBACK_BLOCK_SIZE = 4096
+_OPEN_FLAGS = (
+    os.O_WRONLY
+    | getattr(os, "O_BINARY", 0)
+    | getattr(os, "O_NOFOLLOW", 0)
+    | getattr(os, "O_CLOEXEC", 0)
+)
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+# wipe results: (path, success, bytes_wiped, error)
+WipeResult = tuple[str, bool, int, "str | None"]
+
+
+def _round_up(value: int, multiple: int) -> int:
+    return -(-value // multiple) * multiple
+
+
+class SecureWiper:
+    """Overwrite-then-unlink with reusable buffers.
+
+    Args:
+        passes: Number of overwrite passes (synced between passes)
+        random_data: Overwrite with random bytes instead of zeros
+        chunk_size: Bytes per write; rounded up to the block size
+        fsync_batch: Files written before their data is flushed and they
+            are unlinked; 1 flushes every file, 0 never flushes (fast, but
+            the overwrite may never reach the disk before the unlink)
+        workers: Threads used for files above parallel_threshold
+    """
+
+    def __init__(
+        self,
+        passes: int = 1,
+        random_data: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        fsync_batch: int = DEFAULT_FSYNC_BATCH,
+        workers: int = 4,
+        parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+    ):
+        self.passes = max(1, passes)
+        self.random_data = random_data
+        self.chunk_size = max(_FALLBACK_BLOCK_SIZE, chunk_size)
+        self.fsync_batch = max(0, fsync_batch)
+        self.workers = max(1, workers) if hasattr(os, "pwrite") else 1
+        self.parallel_threshold = parallel_threshold
+        self._local = threading.local()
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self) -> SecureWiper:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── buffers ────────────────────────────────────────────────
+
+    def _buffer(self, size: int, pass_index: int) -> memoryview:
+        """This thread's buffer, holding the pattern of pass_index."""
+        local = self._local
+        buf: mmap.mmap | None = getattr(local, "buf", None)
+        if buf is None or len(buf) < size:
+            if buf is not None:
+                buf.close()
+            # Anonymous mmap: page aligned, zero filled
+            buf = local.buf = mmap.mmap(-1, size)
+            local.pattern = None
+        pattern = ("random", pass_index) if self.random_data else "zeros"
+        if local.pattern != pattern:
+            buf.seek(0)
+            buf.write(os.urandom(len(buf)) if self.random_data else bytes(len(buf)))
+            local.pattern = pattern
+        return memoryview(buf)
+
+    # ── overwriting ────────────────────────────────────────────
+
+    def _write_range(self, fd: int, start: int, end: int, chunk: int, pass_index: int) -> None:
+        view = self._buffer(chunk, pass_index)
+        offset = start
+        if not hasattr(os, "pwrite"):
+            os.lseek(fd, start, os.SEEK_SET)
+        while offset < end:
+            data = view[:min(chunk, end - offset)]
+            if hasattr(os, "pwrite"):
+                written = os.pwrite(fd, data, offset)
+            else:
+                written = os.write(fd, data)
+            offset += written
+
+    def _overwrite(self, fd: int, length: int, block: int) -> None:
+        chunk = _round_up(self.chunk_size, block)
+        parallel = self.workers > 1 and length >= self.parallel_threshold
+        for pass_index in range(self.passes):
+            if parallel:
+                with self._pool_lock:
+                    if self._pool is None:
+                        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="wipe")
+                    pool = self._pool
+                span = _round_up(-(-length // self.workers), chunk)
+                futures = [
+                    pool.submit(self._write_range, fd, start, min(start + span, length), chunk, pass_index)
+                    for start in range(0, length, span)
+                ]
+                for future in futures:
+                    future.result()
+            else:
+                self._write_range(fd, 0, length, chunk, pass_index)
+            if pass_index + 1 < self.passes:
+                _datasync(fd)
+
+    def _open_and_overwrite(self, path: str) -> tuple[int, int]:
+        """Overwrite path in place; returns (open fd, original size)."""
+        fd = os.open(path, _OPEN_FLAGS)
+        try:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                raise IsADirectoryError(f"not a regular file: {path}")
+            if st.st_nlink > 1:
+                # Other names share these blocks; only this name is removed
+                logger.debug(f"Hard-linked, unlinking without overwrite: {path}")
+                return fd, st.st_size
+            block = getattr(st, "st_blksize", 0) or _FALLBACK_BLOCK_SIZE
+            self._overwrite(fd, _round_up(st.st_size, block), block)
+            return fd, st.st_size
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def _finish(self, path: str, fd: int, size: int) -> WipeResult:
+        """Flush, close and unlink one overwritten file."""
+        try:
+            if self.fsync_batch:
+                _datasync(fd)
+        except OSError as e:
+            return path, False, 0, str(e)
+        finally:
+            os.close(fd)
+        try:
+            os.unlink(path)
+        except OSError as e:
+            return path, False, 0, str(e)
+        logger.debug(f"Wiped: {path} ({size} bytes)")
+        return path, True, size, None
+
+    def _flush(self, batch: list[tuple[str, int, int]]) -> Iterator[WipeResult]:
+        """Finish the files of batch in order, removing each from it first.
+
+        Whatever is left in batch when the caller stops still holds an
+        open fd, and nothing else does.
+        """
+        while batch:
+            yield self._finish(*batch.pop(0))
+
+    def wipe_paths(self, paths: Iterable[str]) -> Iterator[WipeResult]:
+        """Overwrite and unlink each regular file in paths.
+
+        Results are yielded once a file's batch has been flushed. If the
+        consumer stops early, files already overwritten are still
+        flushed and unlinked (unreported); the rest are left untouched.
+        """
+        batch: list[tuple[str, int, int]] = []
+        limit = self.fsync_batch or DEFAULT_FSYNC_BATCH
+        try:
+            for path in paths:
+                try:
+                    fd, size = self._open_and_overwrite(path)
+                except OSError as e:
+                    yield path, False, 0, str(e)
+                    continue
+                batch.append((path, fd, size))
+                if len(batch) >= limit:
+                    yield from self._flush(batch)
+            yield from self._flush(batch)
+        finally:
+            for path, success, _size, error in self._flush(batch):
+                if not success:
+                    logger.warning(f"Wipe of {path} not finished: {error}")
+
+    def wipe_file(self, path: str) -> int:
+        """Overwrite, flush and unlink one file; returns its size.
+
+        Raises the OSError of the failing call, so a caller can tell a
+        locked file (see locked_files) from other failures.
+        """
+        fd, size = self._open_and_overwrite(path)
+        try:
+            if self.fsync_batch:
+                _datasync(fd)
+        finally:
+            os.close(fd)
+        os.unlink(path)
+        logger.debug(f"Wiped: {path} ({size} bytes)")
+        return size
+
+
+@dataclass
+class WipeSettings:
+    """Secure wiping of sensitive options in cleaning runs (off by default)."""
+    enabled: bool = False
+    passes: int = 1
+    random_data: bool = False
+
+    @classmethod
+    def load(cls) -> WipeSettings:
+        """Build settings from settings_db overrides (secure_wipe.<field>)."""
+        result = cls()
+        try:
+            from .. import settings_db
+
+            settings = settings_db.get_database_manager().get_all_settings()
+        except Exception as e:
+            logger.debug(f"Using default secure wipe settings: {e}")
+            return result
+
+        for name, default in vars(cls()).items():
+            raw = settings.get(f"{SETTING_PREFIX}{name}")
+            if raw is None:
+                continue
+            try:
+                if isinstance(default, bool):
+                    value = raw.lower() in ("1", "true", "yes", "on")
+                else:
+                    value = int(raw)
+                setattr(result, name, value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid setting {SETTING_PREFIX}{name}={raw!r}")
+        return result
+
+    def create_wiper(self) -> SecureWiper:
+        return SecureWiper(passes=self.passes, random_data=self.random_data)
@@ -0,0 +1,212 @@
+"""Approximate size of cleaning targets by sampling
+
+Stat()ing every file of a large cache before deletion starts can take
+longer than the deletion itself. Instead:
+- Count entries with scandir (no per-file stat on POSIX)
+- stat() a random sample and extrapolate, with confidence bounds
+- Refine towards the exact total from the sizes reported while deleting
+
+Small inputs (no larger than the sample) are measured exactly.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import random
+import stat
+import statistics
+from dataclasses import dataclass
+from typing import Callable, Iterable, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SIZE = 200
+DEFAULT_CONFIDENCE = 0.95
+
+
+@dataclass(frozen=True)
+class SizeEstimate:
+    """Total bytes with a confidence interval [low, high]."""
+    bytes: int
+    low: int
+    high: int
+    entries: int
+    exact: bool = False
+
+    @classmethod
+    def exact_total(cls, size: int, entries: int) -> SizeEstimate:
+        return cls(size, size, size, entries, exact=True)
+
+    def __str__(self) -> str:
+        mb = 1024 * 1024
+        if self.exact:
+            return f"{self.bytes / mb:.1f} MB"
+        return f"~{self.bytes / mb:.1f} MB ({self.low / mb:.1f}-{self.high / mb:.1f} MB)"
+
+
+def _lstat_or_none(path: str) -> os.stat_result | None:
+    try:
+        return os.lstat(path)
+    except OSError:
+        return None
+
+
+def _extrapolate(
+    sample: Sequence[int], population: int, confidence: float
+) -> SizeEstimate:
+    """Estimate sum over population from a simple random sample of it."""
+    n = len(sample)
+    if n == 0 or population == 0:
+        return SizeEstimate.exact_total(0, population)
+    if n >= population:
+        return SizeEstimate.exact_total(sum(sample), population)
+
+    mean = statistics.fmean(sample)
+    variance = statistics.variance(sample) if n > 1 else 0.0
+    # Standard error of the total, with finite population correction
+    stderr = population * math.sqrt(variance / n * (1 - n / population))
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    total = population * mean
+    observed = sum(sample)
+    return SizeEstimate(
+        bytes=round(total),
+        # The sampled bytes exist for sure
+        low=max(round(total - z * stderr), observed),
+        high=round(total + z * stderr),
+        entries=population,
+    )
+
+
+def estimate_directory(
+    root: str,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    confidence: float = DEFAULT_CONFIDENCE,
+    rng: random.Random | None = None,
+) -> SizeEstimate:
+    """Estimate the total file size below root.
+
+    Entries are counted while listing; only a reservoir sample of files is
+    stat()ed. DirEntry.stat() is free on Windows, so it is simply used there.
+    """
+    rng = rng or random.Random()
+    reservoir: list[os.DirEntry] = []
+    count = 0
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    count += 1
+                    if len(reservoir) < sample_size:
+                        reservoir.append(entry)
+                    else:
+                        slot = rng.randrange(count)
+                        if slot < sample_size:
+                            reservoir[slot] = entry
+        except OSError as e:
+            logger.debug(f"Cannot list {directory}: {e}")
+
+    sizes = []
+    for entry in reservoir:
+        try:
+            sizes.append(entry.stat(follow_symlinks=False).st_size)
+        except OSError:
+            sizes.append(0)
+    return _extrapolate(sizes, count, confidence)
+
+
+def estimate_paths(
+    paths: Sequence[str],
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    confidence: float = DEFAULT_CONFIDENCE,
+    rng: random.Random | None = None,
+    lstat: Callable[[str], os.stat_result | None] | None = None,
+) -> SizeEstimate:
+    """Estimate the total size of a list of targets (files or directories).
+
+    A sample of the targets is measured; directories in the sample are
+    themselves estimated with estimate_directory(). lstat (None for
+    missing paths) lets callers answer from a stat cache.
+    """
+    rng = rng or random.Random()
+    lstat = lstat or _lstat_or_none
+    population = len(paths)
+    if population <= sample_size:
+        chosen: Iterable[str] = paths
+    else:
+        chosen = [paths[i] for i in rng.sample(range(population), sample_size)]
+
+    sizes = []
+    low = high = 0
+    all_exact = True
+    for path in chosen:
+        st = lstat(path)
+        if st is not None and stat.S_ISDIR(st.st_mode):
+            sub = estimate_directory(path, sample_size, confidence, rng)
+            all_exact = all_exact and sub.exact
+            sizes.append(sub.bytes)
+            low += sub.low
+            high += sub.high
+        else:
+            size = st.st_size if st is not None else 0
+            sizes.append(size)
+            low += size
+            high += size
+
+    estimate = _extrapolate(sizes, population, confidence)
+    if estimate.exact and not all_exact:
+        # Every target was measured, but some directories only approximately
+        estimate = SizeEstimate(estimate.bytes, low, high, population)
+    return estimate
+
+
+class RefiningEstimate:
+    """An estimate that converges on the exact total as targets complete.
+
+    Feed observe() with the actual size of every finished target; the
+    current value is exact once all targets have been observed.
+    """
+
+    def __init__(self, initial: SizeEstimate):
+        self.initial = initial
+        self.observed_entries = 0
+        self.observed_bytes = 0
+
+    def observe(self, size: int) -> None:
+        self.observed_entries += 1
+        self.observed_bytes += size
+
+    @property
+    def current(self) -> SizeEstimate:
+        initial = self.initial
+        remaining = max(initial.entries - self.observed_entries, 0)
+        if remaining == 0:
+            return SizeEstimate.exact_total(self.observed_bytes, self.observed_entries)
+        if initial.exact:
+            # Remaining share of a known total
+            rest = max(initial.bytes - self.observed_bytes, 0)
+            return SizeEstimate.exact_total(self.observed_bytes + rest, initial.entries)
+
+        # Blend the per-target mean of the sample with what was observed
+        fraction = remaining / initial.entries
+        mean = initial.bytes / initial.entries
+        if self.observed_entries:
+            observed_mean = self.observed_bytes / self.observed_entries
+            mean = fraction * mean + (1 - fraction) * observed_mean
+        total = self.observed_bytes + remaining * mean
+        half_width = (initial.high - initial.low) / 2 * fraction
+        return SizeEstimate(
+            bytes=round(total),
+            low=max(round(total - half_width), self.observed_bytes),
+            high=round(total + half_width),
+            entries=initial.entries,
+        )
@@ -0,0 +1,150 @@
+"""Read-only inspection of browser SQLite databases, without copying them
+
+Browsers keep Cookies, History, places.sqlite and the like open (and on
+Windows often locked) while they run. Instead of copying those files to
+read them, they are opened in place:
+- file:...?mode=ro&immutable=1 URIs: no locks, no journal or WAL
+  recovery, nothing written next to the database
+- PRAGMA page_size/page_count/freelist_count give size and free space
+- Row counts use COUNT(*), which SQLite answers from the table's
+  narrowest b-tree (usually an index) without reading row data
+- Every query is timed (QueryTimings)
+
+Immutable mode reads the main file only, so rows still in a WAL are not
+seen: counts are as of the browser's last checkpoint, which is close
+enough for previews.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Tables worth counting, per database file name
+KNOWN_TABLES: dict[str, tuple[str, ...]] = {
+    # Chromium
+    "Cookies": ("cookies",),
+    "History": ("urls", "visits", "downloads"),
+    "Web Data": ("autofill",),
+    "Favicons": ("favicons",),
+    "Login Data": ("logins",),
+    # Firefox
+    "cookies.sqlite": ("moz_cookies",),
+    "places.sqlite": ("moz_places", "moz_historyvisits"),
+    "formhistory.sqlite": ("moz_formhistory",),
+    "favicons.sqlite": ("moz_icons",),
+}
+
+
+class QueryTimings:
+    """Wall time of each inspection query, by label."""
+
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, label: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[label] = self.seconds.get(label, 0.0) + elapsed
+            logger.debug(f"{label}: {elapsed * 1000:.2f} ms")
+
+    @property
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+
+@dataclass
+class DatabaseInfo:
+    """Size, free space and row counts of one SQLite file."""
+    path: str
+    page_size: int = 0
+    page_count: int = 0
+    freelist_count: int = 0
+    rows: dict[str, int] = field(default_factory=dict)  # missing tables are left out
+    timings: dict[str, float] = field(default_factory=dict)  # query label -> seconds
+
+    @property
+    def size_bytes(self) -> int:
+        return self.page_size * self.page_count
+
+    @property
+    def free_bytes(self) -> int:
+        return self.page_size * self.freelist_count
+
+    @property
+    def free_ratio(self) -> float:
+        return self.freelist_count / self.page_count if self.page_count else 0.0
+
+
+def readonly_uri(path: str | os.PathLike, immutable: bool = True) -> str:
+    """file: URI opening path read-only (and lock-free if immutable)."""
+    uri = Path(path).resolve().as_uri() + "?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+
+def open_readonly(path: str | os.PathLike, immutable: bool = True) -> sqlite3.Connection:
+    """Connection to the database at path, which must exist.
+
+    Raises sqlite3.Error if it cannot be opened.
+    """
+    if not os.path.isfile(path):
+        raise sqlite3.OperationalError(f"no such database: {path}")
+    return sqlite3.connect(readonly_uri(path, immutable), uri=True, check_same_thread=False)
+
+
+def inspect_database(
+    path: str | os.PathLike,
+    tables: Iterable[str] | None = None,
+    timings: QueryTimings | None = None,
+) -> DatabaseInfo:
+    """Page statistics and row counts of the database at path.
+
+    Args:
+        path: SQLite file
+        tables: Tables to count (default: KNOWN_TABLES for the file name);
+            tables the database does not have are skipped
+        timings: Accumulates query times across databases (optional)
+
+    Raises sqlite3.Error if the file is not a readable database.
+    """
+    path = os.fspath(path)
+    if tables is None:
+        tables = KNOWN_TABLES.get(os.path.basename(path), ())
+    own = QueryTimings()
+    info = DatabaseInfo(path)
+
+    conn = open_readonly(path)
+    try:
+        for pragma in ("page_size", "page_count", "freelist_count"):
+            with own.measure(pragma):
+                setattr(info, pragma, conn.execute(f"PRAGMA {pragma}").fetchone()[0])
+        with own.measure("schema"):
+            existing = {
+                name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+        for table in tables:
+            if table not in existing:
+                continue
+            with own.measure(f"count {table}"):
+                info.rows[table] = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    finally:
+        conn.close()
+
+    info.timings = own.seconds
+    if timings is not None:
+        for label, seconds in own.seconds.items():
+            timings.seconds[label] = timings.seconds.get(label, 0.0) + seconds
+    return info
+
@@ -3,7 +3,7 @@
 Provides Windows-specific operations:
 - Registry key operations
 - Locked file deletion (reboot-pending)
-- Process detection
+- Process detection and graceful close (WM_CLOSE)
 - Windows path operations
 """
 
@@ -14,6 +14,8 @@ import os
 import sys
 from typing import Any, Iterator
 
+from .registry import get_registry
+
 logger = logging.getLogger(__name__)
 
 # Windows-only imports
@@ -22,7 +24,10 @@ if sys.platform == "win32":
     import psutil
     try:
         import win32api
+        import win32con
         import win32file
+        import win32gui
+        import win32process
         HAS_WIN32 = True
     except ImportError:
         HAS_WIN32 = False
@@ -46,7 +51,7 @@ def parse_registry_key(full_key: str) -> tuple[Any, str]:
     if not winreg:
         raise RuntimeError("Registry operations not available on this platform")
     
-    parts = full_key.split("\\\\", 1)
+    parts = full_key.split("\\", 1)
     if len(parts) != 2:
         raise ValueError(f"Invalid registry key format: {full_key}")
     
@@ -63,16 +68,7 @@ def registry_key_exists(full_key: str) -> bool:
     if not winreg:
         return False
     
-    try:
-        hive, subkey = parse_registry_key(full_key)
-        key = winreg.OpenKey(hive, subkey, 0, winreg.KEY_READ)
-        winreg.CloseKey(key)
-        return True
-    except FileNotFoundError:
-        return False
-    except Exception as e:
-        logger.debug(f"Error checking registry key {full_key}: {e}")
-        return False
+    return get_registry().key_exists(full_key)
 
 
 def read_registry_value(full_key: str, value_name: str) -> str | None:
@@ -80,19 +76,12 @@ def read_registry_value(full_key: str, value_name: str) -> str | None:
     if not winreg:
         return None
     
-    try:
-        hive, subkey = parse_registry_key(full_key)
-        key = winreg.OpenKey(hive, subkey, 0, winreg.KEY_READ)
-        value, _type = winreg.QueryValueEx(key, value_name)
-        winreg.CloseKey(key)
-        return str(value) if value else None
-    except Exception as e:
-        logger.debug(f"Error reading registry {full_key}\\{value_name}: {e}")
-        return None
+    value = get_registry().read_value(full_key, value_name)
+    return str(value) if value else None
 
 
 def delete_registry_key(full_key: str) -> bool:
-    """Delete a registry key.
+    """Delete a registry key together with its subkeys.
     
     Returns True if deleted, False otherwise.
     """
@@ -100,12 +89,11 @@ def delete_registry_key(full_key: str) -> bool:
         return False
     
     try:
-        hive, subkey = parse_registry_key(full_key)
-        winreg.DeleteKey(hive, subkey)
-        logger.info(f"Deleted registry key: {full_key}")
+        deleted = get_registry().delete_tree(full_key)
+        if not deleted:
+            return False
+        logger.info(f"Deleted registry key: {full_key} ({deleted} keys)")
         return True
-    except FileNotFoundError:
-        return False
     except PermissionError as e:
         logger.warning(f"Permission denied deleting registry key {full_key}: {e}")
         return False
@@ -123,10 +111,8 @@ def delete_registry_value(full_key: str, value_name: str) -> bool:
         return False
     
     try:
-        hive, subkey = parse_registry_key(full_key)
-        key = winreg.OpenKey(hive, subkey, 0, winreg.KEY_SET_VALUE)
-        winreg.DeleteValue(key, value_name)
-        winreg.CloseKey(key)
+        if not get_registry().delete_value(full_key, value_name):
+            return False
         logger.info(f"Deleted registry value: {full_key}\\{value_name}")
         return True
     except FileNotFoundError:
@@ -169,6 +155,34 @@ def is_process_running(process_name: str, same_user: bool = True) -> bool:
     return False
 
 
+def post_close_to_windows(pids: set[int]) -> set[int]:
+    """Post WM_CLOSE to the top-level windows of pids (taskkill without /F).
+
+    One EnumWindows pass covers all processes. Returns the pids that had a
+    window to close; the rest need terminating some other way.
+    """
+    if not HAS_WIN32:
+        return set()
+
+    closed: set[int] = set()
+
+    def on_window(hwnd, _extra):
+        try:
+            _thread_id, pid = win32process.GetWindowThreadProcessId(hwnd)
+            if pid in pids and win32gui.IsWindowVisible(hwnd):
+                win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+                closed.add(pid)
+        except Exception as e:
+            logger.debug(f"WM_CLOSE failed for window {hwnd}: {e}")
+        return True
+
+    try:
+        win32gui.EnumWindows(on_window, None)
+    except Exception as e:
+        logger.error(f"Error enumerating windows: {e}")
+    return closed
+
+
 def delete_locked_file(path: str) -> bool:
     """Mark a locked file for deletion on reboot.
     
@@ -190,6 +204,20 @@ def delete_locked_file(path: str) -> bool:
         return False
 
 
+def schedule_delete_on_reboot(paths: list[str]) -> list[str]:
+    """Mark several locked files for deletion on reboot in one pass.
+    
+    Returns the paths that were scheduled.
+    """
+    if not HAS_WIN32:
+        logger.warning(f"pywin32 not available - {len(paths)} locked files left in place")
+        return []
+    
+    scheduled = [path for path in paths if delete_locked_file(path)]
+    logger.info(f"Scheduled {len(scheduled)}/{len(paths)} locked files for deletion on reboot")
+    return scheduled
+
+
 def expand_windows_path_vars(path_pattern: str) -> Iterator[str]:
     """Expand Windows environment variables including W6432 variants.
     
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import glob
+import json
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Callable, Iterable, Mapping
 
 import psutil
+from loguru import logger
+
+from .core.browser_processes import current_username, normalize_username
+from .core.registry import get_registry
 
 if os.name == "nt":  # guarded import
     import winreg
@@ -17,36 +25,18 @@ else:  # pragma: no cover - non-Windows fallback
     from . import mock_windows
 
 
-_HIVE = {
-    "HKCR": getattr(winreg, "HKEY_CLASSES_ROOT", None) if winreg else None,
-    "HKCU": getattr(winreg, "HKEY_CURRENT_USER", None) if winreg else None,
-    "HKLM": getattr(winreg, "HKEY_LOCAL_MACHINE", None) if winreg else None,
-    "HKU": getattr(winreg, "HKEY_USERS", None) if winreg else None,
-}
-
-
-def _split_registry_key(full_key: str):
-    hive, subkey = full_key.split("\\", 1)
-    hive_obj = _HIVE.get(hive.upper())
-    if hive_obj is None:
-        raise KeyError(f"Unknown hive: {hive}")
-    return hive_obj, subkey
+def registry_key_exists(full_key: str) -> bool:
+    return registry_keys_exist([full_key])[full_key]
 
 
-def registry_key_exists(full_key: str) -> bool:
+def registry_keys_exist(full_keys: Iterable[str]) -> dict[str, bool]:
+    """Existence of many keys in one pass (shared parents are opened once)."""
     if USE_MOCK:
-        return mock_windows.mock_registry_key_exists(full_key)
+        return {key: mock_windows.mock_registry_key_exists(key) for key in full_keys}
 
     if winreg is None:
-        return False
-    try:
-        hive, subkey = _split_registry_key(full_key)
-        winreg.OpenKey(hive, subkey)
-        return True
-    except FileNotFoundError:
-        return False
-    except OSError:
-        return False
+        return {key: False for key in full_keys}
+    return get_registry().keys_exist(full_keys)
 
 
 def _winapp_expand_vars(path_pattern: str) -> Iterable[str]:
@@ -70,29 +60,112 @@ def detect_file_glob(path_pattern: str) -> bool:
     return False
 
 
-def is_process_running_windows(exename: str, same_user: bool = True) -> bool:
+@dataclass
+class ProcessSnapshot:
+    """Process table at one point in time: lowercased exe name -> owners.
+
+    Owners are normalize_username() forms, None where access was denied. One
+    snapshot answers every probe of a detection pass, instead of a full
+    process_iter() per probe.
+    """
+    owners: dict[str, set[str | None]]
+    current_user: str = ""
+
+    @classmethod
+    def capture(cls) -> ProcessSnapshot:
+        current_user = current_username() or ""
+        owners: dict[str, set[str | None]] = {}
+        # Only the two attributes needed; vanished processes are skipped and
+        # denied attributes come back as None
+        for proc in psutil.process_iter(["name", "username"]):
+            info = proc.info
+            name = info.get("name")
+            if not name:
+                continue
+            owners.setdefault(name.lower(), set()).add(normalize_username(info.get("username")))
+        return cls(owners, current_user)
+
+    def is_running(self, exename: str, same_user: bool = True) -> bool:
+        users = self.owners.get(exename.lower())
+        if not users:
+            return False
+        return not same_user or (bool(self.current_user) and self.current_user in users)
+
+
+def is_process_running_windows(
+    exename: str,
+    same_user: bool = True,
+    snapshot: ProcessSnapshot | None = None,
+) -> bool:
+    """Whether exename is running; pass a snapshot when checking several names."""
     if USE_MOCK:
         return mock_windows.mock_is_process_running(exename, same_user)
 
-    target = exename.lower()
-    try:
-        current_user = psutil.Process().username().lower()
-    except Exception:
-        current_user = ""
-    for proc in psutil.process_iter():
-        try:
-            if proc.name().lower() != target:
-                continue
-            if not same_user:
-                return True
+    return (snapshot or ProcessSnapshot.capture()).is_running(exename, same_user)
+
+
+# Install roots scanned by ExecutableIndex besides PATH: (directory, depth).
+# Depth 0 lists the directory itself; per-user installers put browsers a
+# few levels below %LOCALAPPDATA%\Programs (Programs\Opera\<version>).
+INDEX_ROOTS: tuple[tuple[str, int], ...] = (
+    (r"%LOCALAPPDATA%\Programs", 3),
+    ("/var/lib/flatpak/exports/bin", 0),
+    ("~/.local/share/flatpak/exports/bin", 0),
+    ("/snap/bin", 0),
+)
+
+
+@dataclass
+class ExecutableIndex:
+    """Lowercased executable name -> paths, from one scan of the install roots.
+
+    Flatpak exports are named after the application id (com.google.Chrome),
+    Snap and PATH entries after the command (firefox, google-chrome).
+    """
+    paths: dict[str, list[str]]
+    directories: int = 0  # directories listed by build()
+
+    @classmethod
+    def build(
+        cls,
+        roots: Iterable[tuple[str, int]] = INDEX_ROOTS,
+        path_env: str | None = None,
+    ) -> ExecutableIndex:
+        path_env = os.environ.get("PATH", "") if path_env is None else path_env
+        pending = [(d, 0) for d in path_env.split(os.pathsep) if d]
+        pending += list(roots)
+        paths: dict[str, list[str]] = {}
+        seen: set[str] = set()
+        directories = 0
+        while pending:
+            raw, depth = pending.pop()
+            directory = os.path.expanduser(os.path.expandvars(raw))
             try:
-                if proc.username().lower() == current_user:
-                    return True
-            except psutil.AccessDenied:
+                real = os.path.realpath(directory)
+                if real in seen:
+                    continue
+                seen.add(real)
+                with os.scandir(directory) as entries:
+                    directories += 1
+                    for entry in entries:
+                        try:
+                            if entry.is_file():
+                                paths.setdefault(entry.name.lower(), []).append(entry.path)
+                            elif depth > 0 and entry.is_dir(follow_symlinks=False):
+                                pending.append((entry.path, depth - 1))
+                        except OSError:
+                            continue
+            except OSError:
                 continue
-        except psutil.NoSuchProcess:
-            continue
-    return False
+        return cls(paths, directories)
+
+    def find(self, names: Iterable[str]) -> str | None:
+        """First indexed path of any of names."""
+        for name in names:
+            found = self.paths.get(name.lower())
+            if found:
+                return found[0]
+        return None
 
 
 @dataclass
@@ -101,29 +174,64 @@ class ProgramProbe:
     registry_keys: tuple[str, ...] = ()
     file_patterns: tuple[str, ...] = ()
     process_names: tuple[str, ...] = ()
+    # Looked up in the ExecutableIndex (PATH, Flatpak, Snap, custom installs)
+    executables: tuple[str, ...] = ()
 
 
-def program_exists(probe: ProgramProbe) -> bool:
+def program_exists(
+    probe: ProgramProbe,
+    index: ExecutableIndex | None = None,
+    registry_hits: Mapping[str, bool] | None = None,
+) -> bool:
+    """registry_hits: results of registry_keys_exist for the probe's keys, if checked already."""
+    if registry_hits is None:
+        registry_hits = registry_keys_exist(probe.registry_keys)
     return (
-        any(registry_key_exists(k) for k in probe.registry_keys)
+        any(registry_hits.get(k, False) for k in probe.registry_keys)
         or any(detect_file_glob(p) for p in probe.file_patterns)
+        or (index is not None and index.find(probe.executables) is not None)
     )
 
 
-def collect_programs(probes: list[ProgramProbe]) -> list[dict[str, str]]:
+# Threads evaluating probes; registry and filesystem checks mostly wait on I/O
+PROBE_WORKERS = 8
+
+
+def collect_programs(
+    probes: list[ProgramProbe],
+    workers: int = PROBE_WORKERS,
+    index: ExecutableIndex | None = None,
+) -> list[dict[str, str]]:
     """Return table rows with detection details.
 
+    Probes are evaluated concurrently, alongside one process table walk
+    shared by all of them. The registry keys of all probes are checked in
+    one batch first, and probes naming executables share one
+    ExecutableIndex (built here unless given). Rows keep the order of probes.
+
     Columns: name, present, running, source
     """
     rows: list[dict[str, str]] = []
-    for probe in probes:
-        present = program_exists(probe)
-        running = any(is_process_running_windows(p, True) for p in probe.process_names)
+    with ThreadPoolExecutor(max(1, min(workers, len(probes) + 1)), thread_name_prefix="probe") as pool:
+        snapshot_future = None
+        if not USE_MOCK and any(probe.process_names for probe in probes):
+            snapshot_future = pool.submit(ProcessSnapshot.capture)
+        if index is None and any(probe.executables for probe in probes):
+            index = ExecutableIndex.build()
+        registry_hits = registry_keys_exist(key for probe in probes for key in probe.registry_keys)
+        present_futures = [pool.submit(program_exists, probe, index, registry_hits) for probe in probes]
+        snapshot = snapshot_future.result() if snapshot_future is not None else None
+        presence = [future.result() for future in present_futures]
+
+    for probe, present in zip(probes, presence):
+        running = any(is_process_running_windows(p, True, snapshot) for p in probe.process_names)
         source_bits: list[str] = []
         if probe.registry_keys:
             source_bits.append("registry")
         if probe.file_patterns:
             source_bits.append("files")
+        if probe.executables:
+            source_bits.append("index")
         if probe.process_names:
             source_bits.append("process")
         rows.append(
@@ -158,6 +266,7 @@ def detect_browsers() -> list[dict[str, str]]:
                 r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe",
             ),
             process_names=("chrome.exe",),
+            executables=("chrome.exe", "google-chrome", "google-chrome-stable", "com.google.Chrome"),
         ),
         ProgramProbe(
             name="Edge",
@@ -170,6 +279,7 @@ def detect_browsers() -> list[dict[str, str]]:
                 r"%ProgramFiles(x86)%\Microsoft\Edge\Application\msedge.exe",
             ),
             process_names=("msedge.exe",),
+            executables=("msedge.exe", "microsoft-edge", "microsoft-edge-stable", "com.microsoft.Edge"),
         ),
         ProgramProbe(
             name="Firefox",
@@ -182,6 +292,7 @@ def detect_browsers() -> list[dict[str, str]]:
                 r"%ProgramFiles(x86)%\Mozilla Firefox\firefox.exe",
             ),
             process_names=("firefox.exe",),
+            executables=("firefox.exe", "firefox", "org.mozilla.firefox"),
         ),
         ProgramProbe(
             name="Brave",
@@ -190,6 +301,7 @@ def detect_browsers() -> list[dict[str, str]]:
                 r"%ProgramFiles%\BraveSoftware\Brave-Browser\Application\brave.exe",
             ),
             process_names=("brave.exe",),
+            executables=("brave.exe", "brave-browser", "brave", "com.brave.Browser"),
         ),
         ProgramProbe(
             name="Opera",
@@ -203,6 +315,7 @@ def detect_browsers() -> list[dict[str, str]]:
                 r"%LOCALAPPDATA%\Programs\Opera\launcher.exe",
             ),
             process_names=("opera.exe",),
+            executables=("opera.exe", "opera", "com.opera.Opera"),
         ),
         ProgramProbe(
             name="Whale",
@@ -211,6 +324,7 @@ def detect_browsers() -> list[dict[str, str]]:
                 r"%ProgramFiles%\Naver\Naver Whale\Application\whale.exe",
             ),
             process_names=("whale.exe",),
+            executables=("whale.exe", "naver-whale", "naver-whale-stable"),
         ),
         ProgramProbe(
             name="Safari",
@@ -223,9 +337,153 @@ def detect_browsers() -> list[dict[str, str]]:
                 r"%ProgramFiles(x86)%\Safari\Safari.exe",
             ),
             process_names=("safari.exe",),
+            executables=("safari.exe",),
         ),
     ]
 
     return collect_programs(browser_probes)
 
 
+# Detection results are reused for this long before probing again (seconds)
+DETECTION_TTL = 6 * 60 * 60
+DETECTION_SETTING_KEY = "detection.browsers"
+
+
+def running_browsers(names: list[str]) -> list[str]:
+    """Names among names whose browser runs now, from the browser monitor."""
+    try:
+        from .core.browser_monitor import get_browser_monitor
+
+        running = set(get_browser_monitor().running(name.lower() for name in names))
+    except Exception as e:
+        logger.debug(f"Browser monitor unavailable: {e}")
+        return []
+    return [name for name in names if name.lower() in running]
+
+
+def _installation(row: dict[str, str]) -> dict[str, str]:
+    return {key: value for key, value in row.items() if key != "running"}
+
+
+class DetectionCache:
+    """Browser detection rows, kept in memory and in settings_db.
+
+    get() answers without probing, from memory or from the rows persisted
+    by an earlier run, and says whether they are still within the TTL.
+    refresh() probes and stores the new rows. Callers show get() at once
+    and refresh() in the background when the rows are missing or stale.
+
+    Only installation data is cached: the "running" column changes far
+    more often than the TTL, so it is dropped on put() and read from
+    running() on every get() and refresh().
+    """
+
+    def __init__(
+        self,
+        detect: Callable[[], list[dict[str, str]]] = detect_browsers,
+        ttl: float = DETECTION_TTL,
+        setting_key: str = DETECTION_SETTING_KEY,
+        clock: Callable[[], float] = time.time,
+        running: Callable[[list[str]], list[str]] = running_browsers,
+    ):
+        self.detect = detect
+        self.ttl = ttl
+        self.setting_key = setting_key
+        self.clock = clock
+        self.running = running
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._rows: list[dict[str, str]] | None = None
+        self._at = 0.0
+        self._loaded = False
+
+    def get(self) -> tuple[list[dict[str, str]] | None, bool]:
+        """(rows or None, fresh) without probing."""
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                stored = self._load()
+                if stored is not None and self._rows is None:
+                    self._at, self._rows = stored
+            if self._rows is None:
+                return None, False
+            rows, fresh = self._rows, self.clock() - self._at < self.ttl
+        return self._with_running(rows), fresh
+
+    def put(self, rows: list[dict[str, str]]) -> None:
+        """Store the installation data of rows as of now, in memory and in settings_db."""
+        at = self.clock()
+        stored = [_installation(row) for row in rows]
+        with self._lock:
+            self._rows = stored
+            self._at = at
+            self._loaded = True
+        self._save(at, stored)
+
+    def refresh(self) -> list[dict[str, str]]:
+        """Probe now and store the result.
+
+        Concurrent callers share one probe: a caller arriving while a
+        probe runs waits for it and gets its rows.
+        """
+        started = self.clock()
+        with self._refresh_lock:
+            with self._lock:
+                rows = self._rows if self._rows is not None and self._at >= started else None
+            if rows is None:
+                self.put(self.detect())
+                with self._lock:
+                    rows = self._rows
+            return self._with_running(rows)
+
+    def invalidate(self) -> None:
+        """Drop the rows, so the next get() is stale and refresh() probes."""
+        with self._lock:
+            self._rows = None
+            self._at = 0.0
+            self._loaded = True
+        self._save(0.0, None)
+
+    def _with_running(self, rows: list[dict[str, str]]) -> list[dict[str, str]]:
+        running = set(self.running([row["name"] for row in rows]))
+        return [dict(row, running="yes" if row["name"] in running else "no") for row in rows]
+
+    def _load(self) -> tuple[float, list[dict[str, str]]] | None:
+        try:
+            from . import settings_db
+
+            raw = settings_db.get_database_manager().load_setting(self.setting_key)
+            if not raw:
+                return None
+            data = json.loads(raw)
+            if not data.get("rows"):
+                return None
+            return float(data["at"]), [_installation(row) for row in data["rows"]]
+        except Exception as e:
+            logger.debug(f"No cached browser detection: {e}")
+            return None
+
+    def _save(self, at: float, rows: list[dict[str, str]] | None) -> None:
+        try:
+            from . import settings_db
+
+            settings_db.get_database_manager().save_setting(
+                self.setting_key, json.dumps({"at": at, "rows": rows})
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save browser detection: {e}")
+
+
+_detection_cache: DetectionCache | None = None
+_detection_cache_lock = threading.Lock()
+
+
+def get_detection_cache() -> DetectionCache:
+    """Process-wide detection cache for detect_browsers()."""
+    global _detection_cache
+    with _detection_cache_lock:
+        if _detection_cache is None:
+            _detection_cache = DetectionCache()
+        return _detection_cache
+
+
@@ -1,57 +1,320 @@
+"""Diagnostics report: browser profiles and cleaning options, sized
+
+One run produces a DiagnosticsReport, exportable as JSON for fleet analysis:
+- Browser executables found (ExecutableIndex, one scan of PATH and the
+  install roots)
+- Every profile of every browser in PROFILE_LAYOUTS, with its total and
+  cache bytes
+- Bytes each CleanerML option would remove, per browser
+- Wall time of each phase
+
+All trees are sized by one parallel walk (TreeSizer): worker threads
+scandir one directory at a time and subtree totals are summed afterwards,
+so a cache directory inside a profile, or targeted by several options, is
+listed once.
+"""
+
 from __future__ import annotations
 
+import json
 import os
-import shutil
-from pathlib import Path
+import queue
+import stat
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
 from typing import Iterable
 
 from loguru import logger
 
+from .core import file_utils
+from .core.cleaner_engine import ActionType
+from .core.cleaning_service import PlanCache
+from .core.profile_scanner import PROFILE_LAYOUTS, ProfileLayout, find_profiles
+from .core.sqlite_inspect import QueryTimings
+
+# Executable names looked up (".exe" is tried as well)
+TOOLS = ("chrome", "msedge", "brave", "firefox", "vivaldi", "opera", "whale")
+
+# Threads listing directories; scandir and lstat release the GIL
+SIZE_WORKERS = 8
+
+
+class TreeSizer:
+    """Bytes and file counts of directory trees, from parallel scandir walks.
+
+    Every directory walked keeps its subtree total, so later size() calls
+    for it or anything below it are dictionary lookups. Symlinks are
+    counted with their own size and not followed.
+    """
+
+    def __init__(self, workers: int = SIZE_WORKERS):
+        self.workers = max(1, workers)
+        self.directories = 0  # directories listed
+        self.errors = 0  # directories or entries that could not be read
+        self._own: dict[str, tuple[int, int]] = {}  # directory -> (bytes, files) directly in it
+        self._children: dict[str, list[str]] = {}
+        self._totals: dict[str, tuple[int, int]] = {}
+
+    def _scan(self, directory: str) -> tuple[list[str], int]:
+        """Subdirectories of directory and the number of entries that could not be read."""
+        size = files = errors = 0
+        subdirs: list[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        else:
+                            size += entry.stat(follow_symlinks=False).st_size
+                            files += 1
+                    except OSError:
+                        errors += 1
+        except OSError:
+            errors += 1
+        self._own[directory] = (size, files)
+        self._children[directory] = subdirs
+        return subdirs, errors
+
+    def walk(self, roots: Iterable[str]) -> None:
+        """Walk the directories among roots not covered by an earlier walk."""
+        pending: list[str] = []
+        for root in sorted({os.path.normpath(r) for r in roots}):
+            if root in self._totals or any(file_utils.is_inside(root, p) for p in pending):
+                continue
+            try:
+                if not stat.S_ISDIR(os.lstat(root).st_mode):
+                    continue
+            except OSError:
+                continue
+            pending.append(root)
+        if not pending:
+            return
+
+        work: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        lock = threading.Lock()
+        remaining = [len(pending)]
+        finished = threading.Event()
+        walked: list[str] = []
+
+        def worker() -> None:
+            while True:
+                directory = work.get()
+                if directory is None:
+                    return
+                subdirs, errors = self._scan(directory)
+                walked.append(directory)
+                with lock:
+                    self.errors += errors
+                    # Count the subdirectories before queueing them
+                    remaining[0] += len(subdirs) - 1
+                    done = remaining[0] == 0
+                for subdir in subdirs:
+                    work.put(subdir)
+                if done:
+                    finished.set()
+
+        for root in pending:
+            work.put(root)
+        threads = [
+            threading.Thread(target=worker, name=f"diag-size-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        finished.wait()
+        for _thread in threads:
+            work.put(None)
+        for thread in threads:
+            thread.join()
+        self.directories += len(walked)
+
+        # Subtree totals, deepest directories first
+        walked.sort(key=lambda d: d.count(os.sep), reverse=True)
+        for directory in walked:
+            size, files = self._own.pop(directory)
+            for child in self._children.pop(directory):
+                child_size, child_files = self._totals.get(child, (0, 0))
+                size += child_size
+                files += child_files
+            self._totals[directory] = (size, files)
+
+    def size(self, path: str) -> tuple[int, int]:
+        """(bytes, files) at path: a file's own size, or a directory's tree (walked if needed)."""
+        path = os.path.normpath(path)
+        total = self._totals.get(path)
+        if total is not None:
+            return total
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return 0, 0
+        if not stat.S_ISDIR(st.st_mode):
+            return st.st_size, 1
+        self.walk([path])
+        return self._totals.get(path, (0, 0))
+
 
-def _which_all(names: Iterable[str]) -> dict[str, str | None]:
-    return {name: shutil.which(name) for name in names}
+@dataclass
+class ProfileReport:
+    browser: str
+    profile: str
+    path: str
+    bytes: int = 0
+    files: int = 0
+    cache_bytes: int = 0  # cache directories, inside the profile or in its cache roots
 
 
-def _possible_paths() -> list[Path]:
-    user = os.environ.get("USERNAME", "user")
-    local = os.environ.get("LOCALAPPDATA", "")
-    appdata = os.environ.get("APPDATA", "")
-    candidates = [
-        Path(local) / "Google/Chrome/User Data/Default",
-        Path(local) / "Microsoft/Edge/User Data/Default",
-        Path(local) / "BraveSoftware/Brave-Browser/User Data/Default",
-        Path(appdata) / "Mozilla/Firefox/Profiles",
-        Path(local) / "Vivaldi/User Data/Default",
-        Path(local) / "Opera Software/Opera Stable",
-        Path(local) / "Naver/Whale/User Data/Default",
-        Path.home() / "AppData/Local/Temp",
-    ]
-    return [p for p in candidates if p]
+@dataclass
+class OptionReport:
+    browser: str
+    option: str  # CleanerML option id
+    bytes: int = 0  # what the option's actions would remove
+    files: int = 0
+    paths: int = 0  # existing paths its actions match
 
 
-def emit_startup_placeholders() -> None:
-    logger.info("Starting diagnostics: placeholder scan")
+@dataclass
+class DiagnosticsReport:
+    generated_at: float
+    platform: str
+    executables: dict[str, str | None] = field(default_factory=dict)
+    profiles: list[ProfileReport] = field(default_factory=list)
+    options: list[OptionReport] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)  # phase -> seconds
+    directories: int = 0  # directories listed by the walk
+    errors: int = 0
 
-    tools = ["chrome", "msedge", "brave", "firefox", "vivaldi", "opera", "whale"]
-    where = _which_all(tools)
-    for name, path in where.items():
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+
+def _cache_dirs(layout: ProfileLayout, bases: list[str]) -> list[str]:
+    return list(dict.fromkeys(
+        os.path.normpath(os.path.join(base, cache_dir)) for base in bases for cache_dir in layout.cache_dirs
+    ))
+
+
+def _option_paths(plans: PlanCache, browser: str) -> dict[str, list[str]]:
+    """Existing paths each option's DELETE and TRUNCATE actions match."""
+    try:
+        options = plans.options(browser)
+    except Exception as e:
+        logger.warning(f"Cannot load CleanerML for {browser}: {e}")
+        return {}
+    found: dict[str, list[str]] = {}
+    for option_id, actions in options.items():
+        paths: dict[str, None] = {}
+        for action in actions:
+            if action.action_type not in (ActionType.DELETE, ActionType.TRUNCATE):
+                continue
+            for path in file_utils.expand_glob_pattern(action.path):
+                paths[os.path.normpath(path)] = None
+        # A path inside another matched path is already counted with it
+        found[option_id] = [p for p in paths if not any(file_utils.is_inside(p, q) for q in paths)]
+    return found
+
+
+def run_diagnostics(
+    browsers: Iterable[str] | None = None,
+    layouts: dict[str, ProfileLayout] = PROFILE_LAYOUTS,
+    plans: PlanCache | None = None,
+    workers: int = SIZE_WORKERS,
+) -> DiagnosticsReport:
+    """Size the profiles and cleaning options of browsers (default: all in layouts)."""
+    from .detect_windows import ExecutableIndex
+
+    started = time.perf_counter()
+    browsers = list(layouts) if browsers is None else [b.lower() for b in browsers]
+    plans = plans or PlanCache()
+    timings = QueryTimings()
+    sizer = TreeSizer(workers)
+    report = DiagnosticsReport(generated_at=time.time(), platform=sys.platform)
+
+    with timings.measure("executables"):
+        index = ExecutableIndex.build()
+        report.executables = {tool: index.find([tool, f"{tool}.exe"]) for tool in TOOLS}
+
+    with timings.measure("profiles"):
+        profiles = {
+            browser: [(name, path, _cache_dirs(layouts[browser], bases)) for name, path, bases in find_profiles(layouts[browser])]
+            for browser in browsers
+            if browser in layouts
+        }
+
+    with timings.measure("options"):
+        option_paths = {browser: _option_paths(plans, browser) for browser in browsers}
+
+    with timings.measure("walk"):
+        roots: list[str] = []
+        for found in profiles.values():
+            for _name, path, cache_dirs in found:
+                roots.append(path)
+                roots.extend(cache_dirs)
+        for by_option in option_paths.values():
+            for paths in by_option.values():
+                roots.extend(paths)
+        sizer.walk(roots)
+
+    with timings.measure("classify"):
+        for browser, found in profiles.items():
+            for name, path, cache_dirs in found:
+                size, files = sizer.size(path)
+                cache = sum(sizer.size(d)[0] for d in cache_dirs)
+                report.profiles.append(ProfileReport(browser, name, path, size, files, cache))
+        for browser, by_option in option_paths.items():
+            for option_id, paths in by_option.items():
+                entry = OptionReport(browser, option_id, paths=len(paths))
+                for path in paths:
+                    size, files = sizer.size(path)
+                    entry.bytes += size
+                    entry.files += files
+                report.options.append(entry)
+
+    report.timings = dict(timings.seconds)
+    report.timings["total"] = time.perf_counter() - started
+    report.directories = sizer.directories
+    report.errors = sizer.errors
+    return report
+
+
+def emit_startup_report() -> DiagnosticsReport:
+    """Run the diagnostics and log a summary."""
+    report = run_diagnostics()
+    for name, path in report.executables.items():
         if path:
             logger.info(f"found executable: {name} -> {path}")
-        else:
-            logger.warning(f"executable not found: {name}")
+    for profile in report.profiles:
+        logger.info(
+            f"profile {profile.browser}/{profile.profile}: {profile.bytes / 1024 / 1024:.1f} MB "
+            f"({profile.files} files, cache {profile.cache_bytes / 1024 / 1024:.1f} MB)"
+        )
+    for option in report.options:
+        if option.bytes:
+            logger.info(f"option {option.browser}/{option.option}: {option.bytes / 1024 / 1024:.1f} MB")
+    phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in report.timings.items())
+    logger.info(f"diagnostics complete: {report.directories} directories, {phases}")
+    return report
 
-    for p in _possible_paths():
-        if p.exists():
-            try:
-                entries = len(list(p.iterdir()))
-                logger.info(f"path exists: {p} ({entries} entries)")
-            except Exception as e:
-                logger.warning(f"path exists but not listable: {p}: {e}")
-        else:
-            logger.warning(f"path missing: {p}")
 
-    logger.info("placeholder tasks: browser cache, cookies, history, session, autofill")
-    logger.info("placeholder system: temp files, recent docs, dns cache, recycle bin")
-    logger.info("diagnostics complete")
+def main(argv: list[str] | None = None) -> None:
+    """python -m privacy_eraser.diagnostics [report.json]"""
+    argv = sys.argv[1:] if argv is None else argv
+    report = emit_startup_report()
+    if argv:
+        report.write_json(argv[0])
+        logger.info(f"report written: {argv[0]}")
+    else:
+        print(report.to_json())
 
 
+if __name__ == "__main__":
+    main()
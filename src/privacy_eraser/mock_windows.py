@@ -12,7 +12,11 @@ from __future__ import annotations
 
 import os
 import random
-from typing import Iterator
+import re
+import threading
+from typing import Any, Iterator
+
+from loguru import logger
 
 
 # Mock browser detection data
@@ -164,40 +168,398 @@ class MockWinreg:
         pass
 
 
-def mock_registry_key_exists(full_key: str) -> bool:
-    """Mock registry key existence check.
-
-    Returns True for Chrome, Edge, Firefox, Brave, Whale.
-    Returns False for Opera (to simulate "not installed").
+class MockRegistryKey:
+    """A key of the in-memory registry: named subkeys and values."""
+
+    __slots__ = ("name", "subkeys", "values", "deleted", "_order")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.subkeys: dict[str, MockRegistryKey] = {}  # lowercased name -> key
+        self.values: dict[str, tuple[str, Any, int]] = {}  # lowercased name -> (name, data, type)
+        self.deleted = False
+        self._order: list[str] | None = None  # subkey names in enumeration order
+
+    def child(self, name: str, create: bool = False) -> MockRegistryKey | None:
+        node = self.subkeys.get(name.lower())
+        if node is None and create:
+            node = self.subkeys[name.lower()] = MockRegistryKey(name)
+            self._order = None
+        return node
+
+    def remove(self, name: str) -> MockRegistryKey | None:
+        node = self.subkeys.pop(name.lower(), None)
+        if node is not None:
+            self._order = None
+        return node
+
+    def order(self) -> list[str]:
+        """Subkey names sorted case-insensitively, as the registry enumerates them."""
+        if self._order is None:
+            self._order = [self.subkeys[lower].name for lower in sorted(self.subkeys)]
+        return self._order
+
+    def mark_deleted(self) -> int:
+        """Flag this key and everything below it as deleted; returns the key count."""
+        count = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node.deleted = True
+            count += 1
+            stack.extend(node.subkeys.values())
+        return count
+
+
+_NOT_FOUND = (2, "The system cannot find the file specified")
+
+# .reg hive names -> MockRegistry attribute
+_REG_HIVES = {
+    "HKEY_CLASSES_ROOT": "HKEY_CLASSES_ROOT",
+    "HKCR": "HKEY_CLASSES_ROOT",
+    "HKEY_CURRENT_USER": "HKEY_CURRENT_USER",
+    "HKCU": "HKEY_CURRENT_USER",
+    "HKEY_LOCAL_MACHINE": "HKEY_LOCAL_MACHINE",
+    "HKLM": "HKEY_LOCAL_MACHINE",
+    "HKEY_USERS": "HKEY_USERS",
+    "HKU": "HKEY_USERS",
+}
+
+
+_REG_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_REG_ESCAPE = re.compile(r"\\(.)")
+
+
+def _reg_string(text: str, start: int) -> tuple[str, int]:
+    """Parse the quoted .reg string at text[start]; returns (value, index after it)."""
+    match = _REG_STRING.match(text, start)
+    if match is None:
+        raise ValueError(f"Unterminated string: {text[start:]}")
+    value = match.group(1)
+    if "\\" in value:
+        value = _REG_ESCAPE.sub(r"\1", value)
+    return value, match.end()
+
+
+class MockRegistry:
+    """In-memory registry implementing the winreg calls the app uses.
+
+    Keys form a case-insensitive tree under the four hives, loadable from
+    .reg export files (load_reg_file). Semantics follow winreg where the
+    app depends on them:
+    - OpenKey / QueryValueEx / DeleteValue raise FileNotFoundError for a
+      missing key or value
+    - DeleteKey raises PermissionError for a key that still has subkeys
+    - EnumKey lists subkeys sorted case-insensitively and raises OSError
+      past the last one; EnumValue keeps the order values were set in
+    - A handle of a deleted key raises OSError when used
+    Handles are the key objects themselves; CloseKey is a no-op. opens
+    counts OpenKey calls.
     """
-    key_lower = full_key.lower()
 
-    # Chrome
-    if "google\\chrome" in key_lower or "chromium" in key_lower:
-        return True
+    HKEY_CLASSES_ROOT = MockWinreg.HKEY_CLASSES_ROOT
+    HKEY_CURRENT_USER = MockWinreg.HKEY_CURRENT_USER
+    HKEY_LOCAL_MACHINE = MockWinreg.HKEY_LOCAL_MACHINE
+    HKEY_USERS = MockWinreg.HKEY_USERS
+
+    KEY_READ = 0x20019
+    KEY_SET_VALUE = 0x0002
+    KEY_ALL_ACCESS = 0xF003F
+
+    REG_NONE = 0
+    REG_SZ = 1
+    REG_EXPAND_SZ = 2
+    REG_BINARY = 3
+    REG_DWORD = 4
+    REG_MULTI_SZ = 7
+    REG_QWORD = 11
+
+    def __init__(self):
+        self.roots = {
+            hive: MockRegistryKey(name)
+            for name, hive in (
+                ("HKEY_CLASSES_ROOT", self.HKEY_CLASSES_ROOT),
+                ("HKEY_CURRENT_USER", self.HKEY_CURRENT_USER),
+                ("HKEY_LOCAL_MACHINE", self.HKEY_LOCAL_MACHINE),
+                ("HKEY_USERS", self.HKEY_USERS),
+            )
+        }
+        self.opens = 0
+        self._lock = threading.RLock()
+
+    def _key(self, key: Any) -> MockRegistryKey:
+        if isinstance(key, MockRegistryKey):
+            if key.deleted:
+                raise OSError(1018, "Illegal operation attempted on a registry key that has been marked for deletion")
+            return key
+        try:
+            return self.roots[key]
+        except (KeyError, TypeError):
+            raise OSError(6, "The handle is invalid") from None
+
+    def _walk(self, key: Any, sub_key: str, create: bool = False) -> MockRegistryKey:
+        node = self._key(key)
+        for part in (sub_key or "").split("\\"):
+            if not part:
+                continue
+            child = node.child(part, create)
+            if child is None:
+                raise FileNotFoundError(*_NOT_FOUND)
+            node = child
+        return node
+
+    def find(self, full_key: str) -> MockRegistryKey | None:
+        """Key at 'HKCU\\Software\\App' (abbreviated or full hive name), or None."""
+        hive, _sep, sub_key = full_key.strip("\\").partition("\\")
+        attr = _REG_HIVES.get(hive.upper())
+        if attr is None:
+            return None
+        with self._lock:
+            try:
+                return self._walk(getattr(self, attr), sub_key)
+            except FileNotFoundError:
+                return None
+
+    # ── winreg calls ───────────────────────────────────────────
+
+    def OpenKey(self, key: Any, sub_key: str, reserved: int = 0, access: int = KEY_READ) -> MockRegistryKey:
+        with self._lock:
+            self.opens += 1
+            return self._walk(key, sub_key)
+
+    OpenKeyEx = OpenKey
+
+    def CreateKey(self, key: Any, sub_key: str) -> MockRegistryKey:
+        with self._lock:
+            return self._walk(key, sub_key, create=True)
+
+    def CloseKey(self, key: Any) -> None:
+        pass
 
-    # Edge
-    if "microsoft\\edge" in key_lower:
-        return True
+    def EnumKey(self, key: Any, index: int) -> str:
+        with self._lock:
+            names = self._key(key).order()
+            if not 0 <= index < len(names):
+                raise OSError(259, "No more data is available")
+            return names[index]
+
+    def EnumValue(self, key: Any, index: int) -> tuple[str, Any, int]:
+        with self._lock:
+            values = self._key(key).values
+            if not 0 <= index < len(values):
+                raise OSError(259, "No more data is available")
+            return list(values.values())[index]
+
+    def QueryInfoKey(self, key: Any) -> tuple[int, int, int]:
+        """(subkey count, value count, last write time (always 0))."""
+        with self._lock:
+            node = self._key(key)
+            return len(node.subkeys), len(node.values), 0
+
+    def QueryValueEx(self, key: Any, value_name: str) -> tuple[Any, int]:
+        with self._lock:
+            entry = self._key(key).values.get((value_name or "").lower())
+            if entry is None:
+                raise FileNotFoundError(*_NOT_FOUND)
+            return entry[1], entry[2]
+
+    def SetValueEx(self, key: Any, value_name: str, reserved: int, type: int, value: Any) -> None:
+        with self._lock:
+            self._key(key).values[(value_name or "").lower()] = (value_name or "", value, type)
+
+    def DeleteValue(self, key: Any, value_name: str) -> None:
+        with self._lock:
+            if self._key(key).values.pop((value_name or "").lower(), None) is None:
+                raise FileNotFoundError(*_NOT_FOUND)
+
+    def DeleteKey(self, key: Any, sub_key: str) -> None:
+        with self._lock:
+            parent_path, _sep, leaf = sub_key.rstrip("\\").rpartition("\\")
+            parent = self._walk(key, parent_path)
+            node = parent.child(leaf)
+            if node is None:
+                raise FileNotFoundError(*_NOT_FOUND)
+            if node.subkeys:
+                raise PermissionError(5, "Access is denied")
+            parent.remove(leaf)
+            node.deleted = True
+
+    # ── .reg files ─────────────────────────────────────────────
+
+    def load_reg_file(self, path: str) -> int:
+        """Merge a .reg export (regedit: UTF-16 with BOM, or REGEDIT4 ANSI); returns keys read."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+            text = data.decode("utf-16")
+        else:
+            try:
+                text = data.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                text = data.decode("latin-1")
+        return self.load_reg(text)
+
+    def load_reg(self, text: str) -> int:
+        """Merge .reg text into the tree; returns the number of key sections read.
+
+        Supports [KEY] and [-KEY] sections, "name"/@ values as strings,
+        dword:, hex: and hex(type): data (with line continuations), and
+        "name"=- deletions. Section paths resolved during the load are
+        remembered, so a section below one seen before costs one lookup.
+        """
+        wide = text.lstrip("\ufeff").startswith("Windows Registry Editor Version 5")
+        sections = 0
+        current: MockRegistryKey | None = None
+        # Lowercased key path -> key, for the sections of this load
+        seen: dict[str, MockRegistryKey | None] = {}
+
+        def resolve(full_key: str) -> MockRegistryKey | None:
+            lowered = full_key.lower()
+            if lowered in seen:
+                return seen[lowered]
+            parent_key, sep, leaf = full_key.rpartition("\\")
+            if not sep:
+                attr = _REG_HIVES.get(full_key.upper())
+                node = self.roots[getattr(self, attr)] if attr else None
+            elif not leaf:
+                node = resolve(parent_key)
+            else:
+                parent = resolve(parent_key)
+                node = parent.child(leaf, create=True) if parent is not None else None
+            seen[lowered] = node
+            return node
+
+        pending = ""
+        with self._lock:
+            for raw in text.splitlines():
+                line = pending + raw.strip() if pending else raw.strip()
+                if not line:
+                    continue
+                first = line[0]
+                if line[-1] == "\\" and first != "[":
+                    pending = line[:-1]
+                    continue
+                pending = ""
+
+                if first == "[" and line[-1] == "]":
+                    sections += 1
+                    full_key = line[1:-1].strip("\\")
+                    if full_key.startswith("-"):
+                        full_key = full_key[1:]
+                        parent_key, _sep, leaf = full_key.rpartition("\\")
+                        parent = self.find(parent_key) if parent_key else None
+                        node = parent.remove(leaf) if parent is not None else None
+                        if node is not None:
+                            node.mark_deleted()
+                        seen.clear()
+                        current = None
+                        continue
+                    current = resolve(full_key)
+                    if current is None:
+                        logger.debug(f"Skipping .reg section with unknown hive: {line}")
+                    continue
+
+                if current is None or first == ";":
+                    continue
+                try:
+                    if first == "@":
+                        name, rest = "", line[1:].lstrip()
+                    elif first == '"':
+                        name, end = _reg_string(line, 0)
+                        rest = line[end:].lstrip()
+                    else:
+                        raise ValueError("expected a value name")
+                    if not rest.startswith("="):
+                        raise ValueError("expected '='")
+                    rest = rest[1:].strip()
+                    if rest == "-":
+                        current.values.pop(name.lower(), None)
+                        continue
+                    value, value_type = _reg_data(rest, wide)
+                except ValueError as e:
+                    logger.debug(f"Skipping .reg line {line[:80]!r}: {e}")
+                    continue
+                current.values[name.lower()] = (name, value, value_type)
+        return sections
+
+
+def _reg_data(rest: str, wide: bool) -> tuple[Any, int]:
+    """Decode the data part of a .reg value line into (value, type) as winreg returns it."""
+    if rest.startswith('"'):
+        value, _end = _reg_string(rest, 0)
+        return value, MockRegistry.REG_SZ
+    if rest.lower().startswith("dword:"):
+        return int(rest[6:], 16), MockRegistry.REG_DWORD
+    if rest.lower().startswith("hex"):
+        kind, _sep, body = rest.partition(":")
+        value_type = int(kind[4:-1], 16) if kind.startswith("hex(") else MockRegistry.REG_BINARY
+        raw = bytes(int(byte, 16) for byte in body.replace(" ", "").split(",") if byte)
+        if value_type == MockRegistry.REG_BINARY:
+            return raw, value_type
+        if value_type == MockRegistry.REG_DWORD:
+            return int.from_bytes(raw[:4], "little"), value_type
+        if value_type == MockRegistry.REG_QWORD:
+            return int.from_bytes(raw[:8], "little"), value_type
+        if value_type in (MockRegistry.REG_SZ, MockRegistry.REG_EXPAND_SZ, MockRegistry.REG_MULTI_SZ):
+            decoded = raw.decode("utf-16-le" if wide else "latin-1", errors="replace")
+            if value_type == MockRegistry.REG_MULTI_SZ:
+                return [item for item in decoded.split("\0") if item], value_type
+            return decoded.rstrip("\0"), value_type
+        return raw, value_type
+    raise ValueError(f"unsupported data: {rest[:20]}")
+
+
+# Registry contents of the mock machine: the mock browsers' install keys
+# (Opera and Safari not installed) plus a few per-user traces
+MOCK_REG_FIXTURE = r"""Windows Registry Editor Version 5.00
+
+[HKEY_LOCAL_MACHINE\SOFTWARE\Google\Chrome]
+
+[HKEY_CURRENT_USER\SOFTWARE\Google\Chrome\BLBeacon]
+"version"="120.0.6099.130"
+"state"=dword:00000001
+
+[HKEY_LOCAL_MACHINE\SOFTWARE\Microsoft\Edge]
+
+[HKEY_CURRENT_USER\SOFTWARE\Microsoft\Edge\BLBeacon]
+"version"="120.0.2210.91"
+
+[HKEY_LOCAL_MACHINE\SOFTWARE\Mozilla\Mozilla Firefox]
+"CurrentVersion"="121.0 (x64 en-US)"
+
+[HKEY_CURRENT_USER\SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\RecentDocs\.html]
+"0"=hex:69,00,6e,00,64,00,65,00,78,00,2e,00,68,00,74,00,6d,00,6c,00,00,00
+"MRUListEx"=hex:00,00,00,00,ff,ff,ff,ff
+
+[HKEY_CURRENT_USER\SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\TypedPaths]
+"url1"="C:\\Users\\user\\Downloads"
+"""
 
-    # Firefox
-    if "mozilla\\firefox" in key_lower:
-        return True
+# Extra .reg files to load into MOCK_REGISTRY, separated by os.pathsep
+MOCK_REG_ENV = "PRIVACY_ERASER_MOCK_REG"
 
-    # Brave
-    if "bravesoftware\\brave" in key_lower:
-        return True
 
-    # Whale
-    if "naver\\whale" in key_lower:
-        return True
+def _load_mock_registry() -> MockRegistry:
+    registry = MockRegistry()
+    registry.load_reg(MOCK_REG_FIXTURE)
+    for path in filter(None, os.environ.get(MOCK_REG_ENV, "").split(os.pathsep)):
+        try:
+            registry.load_reg_file(path)
+        except OSError as e:
+            logger.warning(f"Cannot load mock registry file {path}: {e}")
+    return registry
 
-    # Opera - simulate not installed
-    if "opera" in key_lower:
-        return False
 
-    # Default: random true/false
-    return random.choice([True, False])
+# Shared registry for code running on the mock backend (core.registry)
+MOCK_REGISTRY = _load_mock_registry()
+
+
+def mock_registry_key_exists(full_key: str) -> bool:
+    """Mock registry key existence check, answered from MOCK_REGISTRY.
+
+    Chrome, Edge and Firefox keys exist; Opera and Safari are not installed.
+    """
+    return MOCK_REGISTRY.find(full_key) is not None
 
 
 def mock_detect_file_glob(path_pattern: str) -> bool:
@@ -333,6 +695,9 @@ def get_mock_cleaner_options(browser_name: str) -> list[dict]:
 # Export mock data and functions
 __all__ = [
     "MockWinreg",
+    "MockRegistry",
+    "MockRegistryKey",
+    "MOCK_REGISTRY",
     "mock_registry_key_exists",
     "mock_detect_file_glob",
     "mock_is_process_running",
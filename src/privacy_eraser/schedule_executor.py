@@ -4,12 +4,16 @@ Executes scheduled cleaning scenarios in DEV or PROD mode.
 """
 
 import time
-import os
 from pathlib import Path
 from loguru import logger
 
 from privacy_eraser.config import AppConfig
 from privacy_eraser.core.schedule_manager import ScheduleScenario
+from privacy_eraser.core.background_mode import (
+    BackgroundProfile,
+    run_in_background,
+)
+from privacy_eraser.core.browser_monitor import get_browser_monitor
 from privacy_eraser.notification_manager import (
     show_dev_notification,
     show_prod_notification,
@@ -41,7 +45,12 @@ def execute_scenario(scenario: ScheduleScenario):
                 file_count=result["total_files"],
             )
         else:
-            result = execute_prod_mode(scenario)
+            _wait_for_browsers(scenario.browsers)
+            # Low-priority, throttled thread so the user's foreground work
+            # is not disturbed
+            result = run_in_background(
+                BackgroundProfile.load(), execute_prod_mode, scenario
+            )
             show_prod_notification(
                 scenario_name=scenario.name,
                 browsers=scenario.browsers,
@@ -57,6 +66,31 @@ def execute_scenario(scenario: ScheduleScenario):
         show_error_notification(scenario.name, str(e))
 
 
+# Longest wait for a scenario's browsers to exit before cleaning anyway
+BROWSER_EXIT_WAIT = 15 * 60
+
+
+def _wait_for_browsers(browsers: list[str]) -> None:
+    """Hold a scheduled run until its browsers exit (up to BROWSER_EXIT_WAIT)
+
+    The browser monitor wakes the wait on the exit event, so cleaning
+    starts right after the browser closes. Past the deadline the run
+    goes ahead; files the browser keeps locked are retried.
+    """
+    try:
+        monitor = get_browser_monitor()
+        running = monitor.running(browsers)
+        if not running:
+            return
+        logger.info(f"[SCHEDULE] Waiting for {', '.join(running)} to exit")
+        if monitor.wait_until_exited(running, timeout=BROWSER_EXIT_WAIT):
+            logger.info("[SCHEDULE] Browsers exited, cleaning now")
+        else:
+            logger.warning("[SCHEDULE] Browsers still running, cleaning anyway")
+    except Exception as e:
+        logger.warning(f"[SCHEDULE] Browser monitor unavailable: {e}")
+
+
 # ═══════════════════════════════════════════════════════════
 # DEV Mode Execution (Simulation)
 # ═══════════════════════════════════════════════════════════
@@ -120,45 +154,63 @@ def execute_prod_mode(scenario: ScheduleScenario) -> dict:
 
     start_time = time.time()
 
-    # Use the same logic as FletCleanerWorker but synchronously
+    # Same engine as FletCleanerWorker, run synchronously
     from privacy_eraser.ui.core.data_config import get_cleaner_options
+    from privacy_eraser.core.cleaning_service import get_cleaning_service
+    from privacy_eraser.core.deletion_journal import DeletionJournal
 
-    total_files = 0
-    deleted_files = 0
-    deleted_size = 0
-    failed_files = 0
+    service = get_cleaning_service()
 
     options = get_cleaner_options(
         scenario.delete_bookmarks,
         scenario.delete_downloads,
     )
 
-    # Collect files to delete
-    files_to_delete = []
+    # Resume an interrupted run of this scenario without rescanning
+    journal = DeletionJournal()
+    journal_run = journal.resume(scenario.id)
 
-    for browser in scenario.browsers:
-        try:
-            browser_files = _get_browser_files(browser, options)
-            files_to_delete.extend(browser_files)
-            logger.info(f"[PROD] {browser}: {len(browser_files)} files to delete")
-        except Exception as e:
-            logger.warning(f"[PROD] Failed to collect files for {browser}: {e}")
+    if journal_run is None:
+        plan = service.collect(scenario.browsers, options, _get_browser_files)
+        journal_run = journal.begin(scenario.id, plan)
+    else:
+        logger.info(
+            f"[PROD] Resuming interrupted run: {len(journal_run.completed)}/"
+            f"{len(journal_run.plan)} files already processed"
+        )
 
-    total_files = len(files_to_delete)
+    total_files = len(journal_run.plan)
     logger.info(f"[PROD] Total files to delete: {total_files}")
 
-    # Delete files
-    for file_path in files_to_delete:
-        try:
-            file_size = _get_file_size(file_path) if os.path.exists(file_path) else 0
-            _safe_delete(file_path)
-            deleted_files += 1
-            deleted_size += file_size
-        except Exception as e:
-            failed_files += 1
-            logger.warning(f"[PROD] Failed to delete {file_path}: {e}")
+    def on_result(file_path: str, success: bool, size: int, error: str | None):
+        journal_run.record(file_path, success, size)
+        if not success:
+            logger.warning(f"[PROD] Failed to delete {file_path}: {error}")
+
+    # Delete files (one worker pool per storage device; paced and
+    # single-worker when running under a background profile). Files a
+    # running browser keeps locked are retried, then left for reboot.
+    try:
+        stats = journal_run.combined(
+            service.run(
+                journal_run.remaining(),
+                scenario.browsers,
+                options,
+                on_result=on_result,
+            )
+        )
+    except BaseException:
+        journal_run.close()  # keep the entry so the next run resumes
+        raise
+    resumed = journal_run.resumed
+    prior_duration = journal_run.prior_elapsed
+    journal_run.finish()
 
-    duration = time.time() - start_time
+    deleted_files = stats.deleted
+    deleted_size = stats.bytes_deleted
+    failed_files = stats.failed
+
+    duration = prior_duration + time.time() - start_time
     deleted_size_mb = deleted_size / (1024 * 1024)
 
     result = {
@@ -168,7 +220,10 @@ def execute_prod_mode(scenario: ScheduleScenario) -> dict:
         "deleted_files": deleted_files,
         "deleted_size_mb": deleted_size_mb,
         "failed_files": failed_files,
+        "reboot_pending": stats.reboot_pending,
+        "truncated_files": stats.truncated,
         "duration": duration,
+        "resumed": resumed,
     }
 
     logger.info(
@@ -180,102 +235,59 @@ def execute_prod_mode(scenario: ScheduleScenario) -> dict:
 
 
 # ═══════════════════════════════════════════════════════════
-# Helper Functions
+# Watch Mode (Continuous Cleaning)
 # ═══════════════════════════════════════════════════════════
 
 
-def _get_browser_files(browser_name: str, options: list[str]) -> list[str]:
-    """Get files for specific browser"""
-    from privacy_eraser.ui.core.data_config import get_browser_xml_path
-    from privacy_eraser.cleanerml_loader import load_cleaner_options_from_file
-    import glob as glob_module
-
-    files = []
-
-    try:
-        xml_path = get_browser_xml_path(browser_name)
-        if not xml_path:
-            logger.warning(f"CleanerML path not found: {browser_name}")
-            return files
-
-        cleaner_options = load_cleaner_options_from_file(xml_path)
-
-        for option_id in options:
-            try:
-                # Find matching CleanerOption by ID
-                matching_option = next((opt for opt in cleaner_options if opt.id == option_id), None)
-                if matching_option:
-                    for action in matching_option.actions:
-                        expanded = _expand_path(action.path)
-                        files.extend(expanded)
-            except Exception as e:
-                logger.debug(f"Failed to process option {option_id}: {e}")
-
-    except Exception as e:
-        logger.warning(f"Failed to load CleanerML for {browser_name}: {e}")
-
-    return files
-
+def create_scenario_watcher(scenario: ScheduleScenario):
+    """Create a CacheWatcher for a "watch" scenario (not started)
 
-def _expand_path(path: str) -> list[str]:
-    """Expand environment variables and glob patterns"""
-    import glob as glob_module
+    Args:
+        scenario: ScheduleScenario object
 
-    expanded_files = []
+    Returns:
+        CacheWatcher that deletes cache entries as they appear and the
+        scenario's other targets after each browser exits
+    """
+    from privacy_eraser.ui.core.data_config import get_cleaner_options
+    from privacy_eraser.core.cache_watcher import CacheWatcher, WatchSettings
+    from privacy_eraser.core.cleaning_service import get_cleaning_service
 
-    try:
-        # Normalize path separators for Windows (/ -> \)
-        normalized_path = path.replace('/', os.sep)
+    options = get_cleaner_options(
+        scenario.delete_bookmarks,
+        scenario.delete_downloads,
+    )
 
-        # Expand environment variables
-        expanded = os.path.expandvars(normalized_path)
+    actions = []
+    for browser in scenario.browsers:
+        browser_actions = _get_browser_actions(browser, options)
+        actions.extend(browser_actions)
+        logger.info(f"[WATCH] {browser}: {len(browser_actions)} actions")
+
+    return CacheWatcher(
+        actions,
+        WatchSettings.load(),
+        browsers=scenario.browsers,
+        options=options,
+        service=get_cleaning_service(),
+        name=f"watch-{scenario.id}",
+    )
 
-        # Normalize path (resolve .., ., remove duplicate separators)
-        expanded = os.path.normpath(expanded)
 
-        if "*" in expanded or "?" in expanded:
-            # Glob pattern matching
-            matched = glob_module.glob(expanded, recursive=True)
-            expanded_files.extend(matched)
-        else:
-            # Direct file/directory check
-            if os.path.exists(expanded):
-                expanded_files.append(expanded)
+# ═══════════════════════════════════════════════════════════
+# Helper Functions
+# ═══════════════════════════════════════════════════════════
 
-    except Exception as e:
-        logger.debug(f"Failed to expand path {path}: {e}")
 
-    return expanded_files
+def _get_browser_files(browser_name: str, options: list[str]) -> list[str]:
+    """Get deletion targets for specific browser"""
+    from privacy_eraser.core.cleaning_service import get_cleaning_service
 
+    return get_cleaning_service().browser_targets(browser_name, options)
 
-def _safe_delete(path: str):
-    """Safely delete file or directory"""
-    try:
-        if os.path.isdir(path):
-            import shutil
-            shutil.rmtree(path, ignore_errors=True)
-        else:
-            os.remove(path)
-    except Exception as e:
-        logger.debug(f"Failed to delete {path}: {e}")
-        raise
 
+def _get_browser_actions(browser_name: str, options: list[str]) -> list:
+    """Get CleanerML actions (core CleaningAction) for specific browser"""
+    from privacy_eraser.core.cleaning_service import get_cleaning_service
 
-def _get_file_size(path: str) -> int:
-    """Get file size in bytes"""
-    try:
-        if os.path.isfile(path):
-            return os.path.getsize(path)
-        elif os.path.isdir(path):
-            total = 0
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        total += os.path.getsize(filepath)
-                    except (OSError, IOError):
-                        pass
-            return total
-    except (OSError, IOError):
-        pass
-    return 0
+    return get_cleaning_service().actions(browser_name, options)
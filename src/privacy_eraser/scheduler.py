@@ -1,6 +1,7 @@
 """Background Scheduler for Privacy Eraser
 
 Manages scheduled cleaning tasks using APScheduler.
+"watch" scenarios run a CacheWatcher instead of a timed job.
 """
 
 from datetime import datetime, timedelta
@@ -13,7 +14,7 @@ from apscheduler.triggers.date import DateTrigger
 
 from privacy_eraser.config import AppConfig
 from privacy_eraser.core.schedule_manager import ScheduleManager, ScheduleScenario
-from privacy_eraser.schedule_executor import execute_scenario
+from privacy_eraser.schedule_executor import create_scenario_watcher, execute_scenario
 
 
 # ═══════════════════════════════════════════════════════════
@@ -55,6 +56,7 @@ class PrivacyEraserScheduler:
     def __init__(self):
         self.scheduler = BackgroundScheduler()
         self.schedule_manager = ScheduleManager()
+        self._watchers = {}  # scenario_id -> CacheWatcher
         self._running = False
 
     def start(self):
@@ -80,6 +82,7 @@ class PrivacyEraserScheduler:
             return
 
         try:
+            self._stop_all_watchers()
             self.scheduler.shutdown(wait=False)
             self._running = False
             logger.info("Scheduler stopped")
@@ -104,6 +107,10 @@ class PrivacyEraserScheduler:
         Args:
             scenario: ScheduleScenario object
         """
+        if scenario.schedule_type == "watch":
+            self._start_watcher(scenario)
+            return
+
         try:
             trigger = self._create_trigger(scenario)
 
@@ -135,6 +142,9 @@ class PrivacyEraserScheduler:
         Args:
             scenario_id: Scenario ID
         """
+        if self._stop_watcher(scenario_id):
+            return
+
         try:
             self.scheduler.remove_job(scenario_id)
             logger.info(f"Schedule removed: {scenario_id}")
@@ -147,10 +157,49 @@ class PrivacyEraserScheduler:
 
         # Remove all jobs
         self.scheduler.remove_all_jobs()
+        self._stop_all_watchers()
 
         # Reload from ScheduleManager
         self.load_all_schedules()
 
+    # ─────────────────────────────────────────────────────────
+    # Watch Mode
+    # ─────────────────────────────────────────────────────────
+
+    def _start_watcher(self, scenario: ScheduleScenario):
+        """Start continuous cleaning for a "watch" scenario"""
+        self._stop_watcher(scenario.id)
+
+        if AppConfig.is_dev_mode():
+            # DEV mode never deletes; there is nothing to simulate continuously
+            logger.info(f"[DEV] Watch mode not started: {scenario.name}")
+            return
+
+        try:
+            watcher = create_scenario_watcher(scenario)
+            watcher.start()
+            self._watchers[scenario.id] = watcher
+            logger.info(f"Watch started: {scenario.name}")
+        except Exception as e:
+            logger.error(f"Failed to start watch {scenario.name}: {e}")
+            raise
+
+    def _stop_watcher(self, scenario_id: str) -> bool:
+        """Stop the watcher of a scenario; False if it had none"""
+        watcher = self._watchers.pop(scenario_id, None)
+        if watcher is None:
+            return False
+        watcher.stop()
+        logger.info(
+            f"Watch stopped: {scenario_id} "
+            f"({watcher.stats.deleted} deleted, {watcher.stats.failed} failed)"
+        )
+        return True
+
+    def _stop_all_watchers(self):
+        for scenario_id in list(self._watchers):
+            self._stop_watcher(scenario_id)
+
     def get_next_run_time(self, scenario_id: str) -> datetime | None:
         """Get next run time for a scenario
 
@@ -14,21 +14,26 @@ import webbrowser
 
 import os
 import sys
-import glob
-import subprocess
 
-from privacy_eraser.detect_windows import detect_browsers
+from privacy_eraser.detect_windows import get_detection_cache
 from privacy_eraser.ui.core.browser_info import BrowserInfo, CleaningStats
 from privacy_eraser.ui.core.data_config import (
     get_browser_icon,
     get_browser_color,
     get_browser_display_name,
-    get_browser_xml_path,
     get_cleaner_options,
     BROWSER_PROCESSES,
 )
 from privacy_eraser.ui.core.backup_manager import BackupManager
 from privacy_eraser.core.schedule_manager import ScheduleManager, ScheduleScenario
+from privacy_eraser.core.browser_monitor import get_browser_monitor
+from privacy_eraser.core.browser_processes import BrowserTerminator
+from privacy_eraser.core.cleaning_service import StatCache, get_cleaning_service
+from privacy_eraser.core.deletion_executor import CleaningPlan
+from privacy_eraser.core.file_utils import format_bytes
+from privacy_eraser.core.path_table import PathTable
+from privacy_eraser.core.profile_scanner import ProfileScanner, cached_usage
+from privacy_eraser.core.size_estimator import RefiningEstimate
 from privacy_eraser.config import AppConfig
 
 
@@ -78,96 +83,41 @@ class AppColors:
 def check_running_browsers(browsers: list[str]) -> list[str]:
     """Check which browsers are currently running
 
+    Answered from the browser monitor's state, without a process scan.
+
     Args:
         browsers: List of browser names to check
 
     Returns:
         List of running browser names
     """
-    running = []
-
     try:
-        # Get list of running processes (Windows)
-        result = subprocess.run(
-            ['tasklist', '/FO', 'CSV', '/NH'],
-            capture_output=True,
-            text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-
-        if result.returncode == 0:
-            running_processes = result.stdout.lower()
-
-            for browser in browsers:
-                browser_lower = browser.lower()
-                if browser_lower in BROWSER_PROCESSES:
-                    process_names = BROWSER_PROCESSES[browser_lower]
-                    for process_name in process_names:
-                        if process_name.lower() in running_processes:
-                            running.append(browser)
-                            break  # Found one process for this browser
+        return get_browser_monitor().running(browsers)
     except Exception as e:
         logger.warning(f"Failed to check running browsers: {e}")
-
-    return running
+        return []
 
 
 def kill_browser_processes(browsers: list[str]) -> tuple[int, list[str]]:
     """Gracefully terminate browser processes
 
+    All processes are asked to close at once and share one deadline;
+    whatever is still running then is killed.
+
     Args:
         browsers: List of browser names to terminate
 
     Returns:
         Tuple of (killed_count, failed_browsers)
     """
-    killed_count = 0
-    failed = []
-
-    for browser in browsers:
-        browser_lower = browser.lower()
-        if browser_lower not in BROWSER_PROCESSES:
-            continue
-
-        process_names = BROWSER_PROCESSES[browser_lower]
-        browser_killed = False
-
-        for process_name in process_names:
-            try:
-                # Try graceful shutdown first (without /F flag)
-                result = subprocess.run(
-                    ['taskkill', '/IM', process_name],
-                    capture_output=True,
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
-                    timeout=5
-                )
-
-                if result.returncode == 0:
-                    logger.info(f"Gracefully terminated browser process: {process_name}")
-                    browser_killed = True
-                    killed_count += 1
-            except subprocess.TimeoutExpired:
-                # If graceful shutdown times out, force kill
-                try:
-                    logger.info(f"Graceful shutdown timed out, forcing kill: {process_name}")
-                    result = subprocess.run(
-                        ['taskkill', '/F', '/IM', process_name],
-                        capture_output=True,
-                        text=True,
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    if result.returncode == 0:
-                        browser_killed = True
-                        killed_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to force kill {process_name}: {e}")
-            except Exception as e:
-                logger.warning(f"Failed to terminate {process_name}: {e}")
-
-        if not browser_killed:
-            failed.append(browser)
+    try:
+        outcomes = BrowserTerminator(BROWSER_PROCESSES).terminate(browsers)
+    except Exception as e:
+        logger.warning(f"Failed to terminate browsers: {e}")
+        return 0, list(browsers)
 
+    killed_count = sum(outcome.closed + outcome.killed for outcome in outcomes.values())
+    failed = [browser for browser, outcome in outcomes.items() if not outcome.success]
     return killed_count, failed
 
 
@@ -176,19 +126,69 @@ def kill_browser_processes(browsers: list[str]) -> tuple[int, list[str]]:
 # ═════════════════════════════════════════════════════════════
 
 
+class _ProgressBatcher:
+    """Collect deleted files and hand them to a callback in batches
+
+    add() only appends, so it is safe under the deletion executor's result
+    lock; the callback runs on a separate thread every `interval` seconds,
+    and once more from stop() with whatever is left.
+    """
+
+    def __init__(self, callback, interval: float):
+        self.callback = callback
+        self.interval = interval
+        self._pending: list[tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, file_path: str, file_size: int):
+        if self.callback:
+            with self._lock:
+                self._pending.append((file_path, file_size))
+
+    def start(self):
+        if self.callback:
+            self._thread = threading.Thread(target=self._run, name="clean-progress", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        if self._thread:
+            self._thread.join()
+        self._flush()
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            try:
+                self.callback(batch)
+            except Exception as e:
+                logger.warning(f"Progress update failed: {e}")
+
+
 class FletCleanerWorker(threading.Thread):
     """Thread-based cleaner worker for Flet (no Qt dependency)"""
 
+    # Seconds between progress callbacks; deleted files are reported in batches
+    PROGRESS_INTERVAL = 0.1
+
     def __init__(
         self,
         browsers: list[str],
         delete_bookmarks: bool = False,
         delete_downloads: bool = False,
         on_started=None,
-        on_progress=None,
+        on_progress=None,  # callback(list of (file_path, file_size)), batched
         on_finished=None,
         on_error=None,
         on_browser_counts=None,  # NEW: callback for browser file counts
+        on_size_estimate=None,  # callback(SizeEstimate), refined while deleting
     ):
         super().__init__(daemon=True)
         self.browsers = browsers
@@ -203,6 +203,10 @@ class FletCleanerWorker(threading.Thread):
         self.on_finished = on_finished
         self.on_error = on_error
         self.on_browser_counts = on_browser_counts  # NEW
+        self.on_size_estimate = on_size_estimate
+
+        # 예약 실행과 같은 엔진 (계획 캐시 공유, stat 캐시는 실행마다 새로)
+        self.service = get_cleaning_service()
 
     def run(self):
         """Main cleaning logic"""
@@ -222,48 +226,64 @@ class FletCleanerWorker(threading.Thread):
 
         try:
             # Collect files (with browser counts)
-            all_files, browser_file_counts = self._collect_files_with_counts()
+            stat_cache = StatCache()
+            all_files, browser_file_counts = self._collect_files_with_counts(stat_cache)
             stats.total_files = len(all_files)
-            stats.total_size = sum(
-                self._get_file_size(f) for f in all_files if os.path.exists(f)
-            )
+
+            # Sampled estimate instead of a full stat pass; converges on the
+            # exact total from the sizes reported while deleting
+            size_estimate = RefiningEstimate(self.service.estimate(CleaningPlan(all_files), stat_cache))
+            stats.total_size = size_estimate.current.bytes
+            if self.on_size_estimate:
+                self.on_size_estimate(size_estimate.current)
 
             # Notify browser counts
             if self.on_browser_counts:
                 self.on_browser_counts(browser_file_counts)
 
-            logger.info(
-                f"삭제 대상: {stats.total_files} 파일, {stats.total_size / (1024 * 1024):.1f} MB"
-            )
+            logger.info(f"삭제 대상: {stats.total_files} 파일, {size_estimate.current}")
 
-            # Delete files
-            for file_path in all_files:
-                if self.is_cancelled:
-                    logger.info("삭제 작업 취소됨")
-                    break
-
-                try:
-                    file_size = (
-                        self._get_file_size(file_path)
-                        if os.path.exists(file_path)
-                        else 0
-                    )
-                    self._safe_delete(file_path)
+            # Delete files (one worker pool per storage device)
+            # Runs under the executor's result lock: no filesystem or UI calls
+            # here, deleted files are queued for the progress thread.
+            # Failed targets stay in the estimate's sampled remainder.
+            progress = _ProgressBatcher(self.on_progress, self.PROGRESS_INTERVAL)
 
+            def on_result(file_path: str, success: bool, file_size: int, error: str | None):
+                if success:
+                    size_estimate.observe(file_size)
                     stats.deleted_files += 1
                     stats.deleted_size += file_size
-
-                    if self.on_progress:
-                        self.on_progress(file_path, file_size)
-
-                    time.sleep(0.001)
-
-                except Exception as e:
+                    progress.add(file_path, file_size)
+                else:
                     stats.failed_files += 1
-                    error_msg = f"{file_path}: {str(e)}"
+                    error_msg = f"{file_path}: {error}"
                     stats.errors.append(error_msg)
                     logger.warning(f"삭제 실패: {error_msg}")
 
+            # 실행 중인 브라우저가 잠근 파일: 백그라운드 재시도 후 재부팅 시 삭제 예약
+            options = get_cleaner_options(self.delete_bookmarks, self.delete_downloads)
+            progress.start()
+            try:
+                result = self.service.run(
+                    CleaningPlan(all_files),
+                    [] if AppConfig.is_dev_mode() else self.browsers,
+                    options,
+                    on_result=on_result,
+                    should_cancel=lambda: self.is_cancelled,
+                )
+            finally:
+                progress.stop()
+            if result.cancelled:
+                logger.info("삭제 작업 취소됨")
+            if result.reboot_pending:
+                logger.info(f"잠긴 파일 {result.reboot_pending}개: 재부팅 시 삭제 예약됨")
+            if result.truncated:
+                logger.info(f"사용 중 파일 {result.truncated}개 비움")
+
+            stats.total_size = size_estimate.current.bytes
+            if self.on_size_estimate:
+                self.on_size_estimate(size_estimate.current)
             stats.duration = time.time() - start_time
             logger.info(f"삭제 완료: {stats.deleted_files}/{stats.total_files} 파일")
 
@@ -275,34 +295,22 @@ class FletCleanerWorker(threading.Thread):
             if self.on_error:
                 self.on_error(str(e))
 
-    def _collect_files_with_counts(self) -> tuple[list[str], dict[str, int]]:
-        """Collect files to delete and return browser file counts"""
+    def _collect_files_with_counts(
+        self, stat_cache: StatCache | None = None
+    ) -> tuple[PathTable, dict[str, int]]:
+        """Collect files to delete and return browser file counts
+
+        stat_cache keeps the collection's lstat() results for the estimate.
+        """
         # 개발 모드: test_data 폴더의 더미 파일 사용
         if AppConfig.is_dev_mode():
             logger.info("[DEV] Development mode: Using test data")
             return self._collect_dev_files_with_counts()
 
-        # 프로덕션 모드: 실제 브라우저 파일 수집
-        files = []
-        browser_counts = {}
+        # 프로덕션 모드: 실제 브라우저 파일 수집 (중복 제거, 경로 압축 저장)
         options = get_cleaner_options(self.delete_bookmarks, self.delete_downloads)
-
-        for browser in self.browsers:
-            try:
-                browser_files = self._get_browser_files(browser, options)
-                files.extend(browser_files)
-                browser_counts[browser] = len(browser_files)
-                logger.info(f"{browser}: {len(browser_files)} 파일 수집됨")
-            except Exception as e:
-                logger.warning(f"{browser} 파일 수집 실패: {e}")
-                browser_counts[browser] = 0
-
-        # 중복 제거
-        unique_files = list(dict.fromkeys(files))  # 순서 보존하면서 중복 제거
-        if len(unique_files) < len(files):
-            logger.info(f"중복 제거: {len(files)} -> {len(unique_files)} 파일")
-
-        return unique_files, browser_counts
+        plan = self.service.collect(self.browsers, options, stats=stat_cache)
+        return plan.targets, plan.browser_counts
 
     def _collect_files_to_delete(self) -> list[str]:
         """Backward compatibility wrapper"""
@@ -342,94 +350,10 @@ class FletCleanerWorker(threading.Thread):
         files, _ = self._collect_dev_files_with_counts()
         return files
 
-    def _get_browser_files(self, browser_name: str, options: list[str]) -> list[str]:
-        """Get files for specific browser"""
-        files = []
-
-        try:
-            xml_path = get_browser_xml_path(browser_name)
-            if not xml_path:
-                logger.warning(f"CleanerML 경로 없음: {browser_name}")
-                return files
-
-            from privacy_eraser.cleanerml_loader import load_cleaner_options_from_file
-
-            cleaner_options = load_cleaner_options_from_file(xml_path)
-
-            for option_id in options:
-                try:
-                    # Find matching CleanerOption by ID
-                    matching_option = next((opt for opt in cleaner_options if opt.id == option_id), None)
-                    if matching_option:
-                        for action in matching_option.actions:
-                            expanded = self._expand_path(action.path)
-                            files.extend(expanded)
-                except Exception as e:
-                    logger.debug(f"옵션 {option_id} 처리 실패: {e}")
-
-        except Exception as e:
-            logger.warning(f"{browser_name} CleanerML 처리 실패: {e}")
-
-        return files
-
-    def _expand_path(self, path: str) -> list[str]:
-        """Expand environment variables and glob patterns"""
-        expanded_files = []
-
-        try:
-            # Normalize path separators for Windows (/ -> \)
-            normalized_path = path.replace('/', os.sep)
-
-            # Expand environment variables
-            expanded = os.path.expandvars(normalized_path)
 
-            # Normalize path (resolve .., ., remove duplicate separators)
-            expanded = os.path.normpath(expanded)
-
-            if "*" in expanded or "?" in expanded:
-                # Glob pattern matching
-                matched = glob.glob(expanded, recursive=True)
-                expanded_files.extend(matched)
-            else:
-                # Direct file/directory check
-                if os.path.exists(expanded):
-                    expanded_files.append(expanded)
-
-        except Exception as e:
-            logger.debug(f"경로 확장 실패 {path}: {e}")
-
-        return expanded_files
-
-    def _safe_delete(self, path: str):
-        """Safely delete file or directory"""
-        try:
-            if os.path.isdir(path):
-                import shutil
-                shutil.rmtree(path, ignore_errors=True)
-            else:
-                os.remove(path)
-        except Exception as e:
-            logger.debug(f"삭제 실패 {path}: {e}")
-            raise
-
-    def _get_file_size(self, path: str) -> int:
-        """Get file size in bytes"""
-        try:
-            if os.path.isfile(path):
-                return os.path.getsize(path)
-            elif os.path.isdir(path):
-                total = 0
-                for dirpath, dirnames, filenames in os.walk(path):
-                    for filename in filenames:
-                        filepath = os.path.join(dirpath, filename)
-                        try:
-                            total += os.path.getsize(filepath)
-                        except (OSError, IOError):
-                            pass
-                return total
-        except (OSError, IOError):
-            pass
-        return 0
+def _presence(rows: list[dict]) -> list[tuple[str, str]]:
+    """(name, present) of detection rows; what the browser cards show"""
+    return [(row.get("name", ""), row.get("present", "")) for row in rows]
 
 
 # ═════════════════════════════════════════════════════════════
@@ -456,6 +380,18 @@ class BrowserCard(ft.Container):
             "safari": get_resource_path("static/images/safari.png"),
         }
 
+        # 캐시 크기 / 쿠키 수 (프로필 스캔 결과)
+        self.usage_text = ft.Text("", size=9, color=AppColors.TEXT_HINT, visible=False)
+        # 실행 중 표시 (브라우저 모니터 이벤트)
+        self.running_dot = ft.Container(
+            width=6,
+            height=6,
+            border_radius=3,
+            bgcolor=AppColors.SUCCESS,
+            tooltip="실행 중",
+            visible=False,
+        )
+
         # 브라우저 이름 소문자로 변환하여 매칭
         browser_key = browser_info.name.lower()
         icon_src = icon_image_map.get(browser_key, get_resource_path("static/images/chrome.png"))
@@ -470,22 +406,30 @@ class BrowserCard(ft.Container):
                     fit=ft.ImageFit.CONTAIN,
                     opacity=1.0 if browser_info.installed else 0.4,
                 ),
-                ft.Text(
-                    browser_info.name,
-                    size=11,  # 13 → 11 (80%)
-                    weight=ft.FontWeight.W_500,
-                    color=AppColors.TEXT_PRIMARY,
+                ft.Row(
+                    [
+                        ft.Text(
+                            browser_info.name,
+                            size=11,  # 13 → 11 (80%)
+                            weight=ft.FontWeight.W_500,
+                            color=AppColors.TEXT_PRIMARY,
+                        ),
+                        self.running_dot,
+                    ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    spacing=4,
                 ),
+                self.usage_text,
             ],
             alignment=ft.MainAxisAlignment.CENTER,
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            spacing=5,  # 6 → 5
+            spacing=3,  # 5 → 3 (사용량 표시 공간)
         )
 
         super().__init__(
             content=content,
             width=128,  # 160 → 128 (80%)
-            height=80,  # 100 → 80 (80%)
+            height=92,  # 80 → 92 (사용량 표시)
             bgcolor=self._get_bg_color(),
             border=ft.border.all(2, self._get_border_color()),
             border_radius=8,  # 10 → 8 (80%)
@@ -497,6 +441,17 @@ class BrowserCard(ft.Container):
             else None,
         )
 
+    def set_usage(self, cache_bytes: int, cookie_count: int):
+        """Show cache size and cookie count (call update() if already shown)"""
+        if not self.browser_info.installed:
+            return
+        self.usage_text.value = f"{format_bytes(cache_bytes)} · 쿠키 {cookie_count:,}"
+        self.usage_text.visible = True
+
+    def set_running(self, running: bool):
+        """Show or hide the running indicator (call update() if already shown)"""
+        self.running_dot.visible = running
+
     def _get_bg_color(self):
         if not self.browser_info.installed:
             return "#F9F9F9"
@@ -558,6 +513,8 @@ def main(page: ft.Page):
     # Cleanup on app close
     def on_disconnect(e):
         """Cleanup when app closes"""
+        profile_scanner.stop()
+        unsubscribe_browser_events()
         try:
             scheduler.stop()
             logger.info("Background scheduler stopped")
@@ -577,6 +534,37 @@ def main(page: ft.Page):
     delete_downloads = False
     delete_downloads_folder = False
 
+    def on_browser_usage(usage):
+        """Profile scan finished a browser: refresh its card (scanner thread)"""
+        card = browser_cards_dict.get(usage.browser)
+        if card is None:
+            return
+        card.set_usage(usage.cache_bytes, usage.cookie_count)
+        try:
+            card.update()
+        except Exception as ex:
+            logger.debug(f"Browser card not updated: {ex}")
+
+    profile_scanner = ProfileScanner(on_browser=on_browser_usage)
+
+    def on_browser_event(event):
+        """Browser started/exited (monitor thread): toggle its card's indicator"""
+        card = browser_cards_dict.get(get_browser_display_name(event.browser))
+        if card is None:
+            return
+        card.set_running(event.kind == "started")
+        try:
+            card.update()
+        except Exception as ex:
+            logger.debug(f"Browser card not updated: {ex}")
+
+    unsubscribe_browser_events = get_browser_monitor().subscribe(on_browser_event)
+
+    def start_usage_scan():
+        """Measure installed browsers' profiles in the background"""
+        profile_scanner.stop()
+        profile_scanner.start([b.name for b in detected_browsers if b.installed])
+
     # ─────────────────────────────────────────────────────────
     # UI Components
     # ─────────────────────────────────────────────────────────
@@ -859,67 +847,94 @@ def main(page: ft.Page):
         delete_downloads_folder = value
         logger.info(f"Delete downloads folder: {delete_downloads_folder}")
 
-    def detect_browsers_async():
-        """Detect browsers in background thread"""
+    def render_browsers(browsers_raw: list[dict]):
+        """Rebuild the browser cards from detection rows"""
         nonlocal detected_browsers, browser_cards_dict, selected_browsers
 
-        try:
-            # Detect browsers
-            browsers_raw = detect_browsers()
-            browsers = []
-
-            for browser in browsers_raw:
-                browser_name = browser.get("name", "Unknown").lower()
-                icon = get_browser_icon(browser_name)
-                color = get_browser_color(browser_name)
-
-                browser_info = BrowserInfo(
-                    name=browser.get("name", "Unknown"),
-                    icon=icon,
-                    color=color,
-                    installed=browser.get("present") == "yes",
-                )
-                browsers.append(browser_info)
+        browsers = []
+        for browser in browsers_raw:
+            browser_name = browser.get("name", "Unknown").lower()
+            icon = get_browser_icon(browser_name)
+            color = get_browser_color(browser_name)
+
+            browser_info = BrowserInfo(
+                name=browser.get("name", "Unknown"),
+                icon=icon,
+                color=color,
+                installed=browser.get("present") == "yes",
+            )
+            browsers.append(browser_info)
 
-            detected_browsers = browsers
+        # 새로고침 시 설치 상태가 같은 브라우저는 사용자 선택 유지
+        previous = {b.name: b.installed for b in detected_browsers}
+        previous_selection = dict(selected_browsers)
+        detected_browsers = browsers
 
-            # Create browser cards (2x4 grid: 2 rows, 4 columns)
-            browser_grid.controls.clear()
+        # Create browser cards (2x4 grid: 2 rows, 4 columns)
+        browser_grid.controls.clear()
+        browser_cards_dict.clear()
+        selected_browsers.clear()
 
-            # 브라우저를 2행으로 나누기
-            browsers_to_show = browsers[:8]  # Max 8 browsers (2x4)
+        # 브라우저를 2행으로 나누기
+        browsers_to_show = browsers[:8]  # Max 8 browsers (2x4)
 
-            # 첫 번째 행 (4개)
-            if len(browsers_to_show) > 0:
-                row1 = ft.Row(
-                    spacing=12,
-                    alignment=ft.MainAxisAlignment.CENTER,
-                )
-                for browser_info in browsers_to_show[:4]:
-                    card = BrowserCard(browser_info, on_browser_clicked)
-                    browser_cards_dict[browser_info.name] = card
-                    selected_browsers[browser_info.name] = browser_info.installed
-                    row1.controls.append(card)
-                browser_grid.controls.append(row1)
-
-            # 두 번째 행 (4개)
-            if len(browsers_to_show) > 4:
-                row2 = ft.Row(
-                    spacing=12,
-                    alignment=ft.MainAxisAlignment.CENTER,
-                )
-                for browser_info in browsers_to_show[4:8]:
-                    card = BrowserCard(browser_info, on_browser_clicked)
-                    browser_cards_dict[browser_info.name] = card
-                    selected_browsers[browser_info.name] = browser_info.installed
-                    row2.controls.append(card)
-                browser_grid.controls.append(row2)
-
-            # Hide loading indicator
-            loading_indicator.visible = False
+        # 이전 스캔 결과를 바로 표시, 백그라운드 스캔이 끝나면 갱신
+        usage = cached_usage()
+        running = set(get_browser_monitor().running())
 
-            logger.info(f"Detected {len(browsers)} browsers")
-            page.update()
+        for row_browsers in (browsers_to_show[:4], browsers_to_show[4:8]):
+            if not row_browsers:
+                continue
+            row = ft.Row(
+                spacing=12,
+                alignment=ft.MainAxisAlignment.CENTER,
+            )
+            for browser_info in row_browsers:
+                card = BrowserCard(browser_info, on_browser_clicked)
+                selected = browser_info.installed
+                if previous.get(browser_info.name) == browser_info.installed:
+                    selected = previous_selection.get(browser_info.name, selected)
+                    card.selected = selected
+                    card.bgcolor = card._get_bg_color()
+                    card.border = ft.border.all(2, card._get_border_color())
+                if browser_info.name in usage:
+                    card.set_usage(
+                        usage[browser_info.name]["cache_size_bytes"],
+                        usage[browser_info.name]["cookie_count"],
+                    )
+                card.set_running(browser_info.name.lower() in running)
+                browser_cards_dict[browser_info.name] = card
+                selected_browsers[browser_info.name] = selected
+                row.controls.append(card)
+            browser_grid.controls.append(row)
+
+        # Hide loading indicator
+        loading_indicator.visible = False
+        page.update()
+
+    def detect_browsers_async():
+        """Detect browsers in background thread
+
+        Cached detection rows (memory or settings DB) are shown at once;
+        when they are missing or past their TTL the probes run here and
+        the cards are rebuilt if the result differs.
+        """
+        detection = get_detection_cache()
+
+        try:
+            cached, fresh = detection.get()
+            if cached:
+                render_browsers(cached)
+                logger.info(f"Showing {len(cached)} cached browsers (fresh: {fresh})")
+            if not fresh:
+                browsers_raw = detection.refresh()
+                if cached and _presence(cached) == _presence(browsers_raw):
+                    logger.info("Browser detection unchanged")
+                else:
+                    render_browsers(browsers_raw)
+                    logger.info(f"Detected {len(browsers_raw)} browsers")
+
+            start_usage_scan()
 
         except Exception as e:
             logger.error(f"Browser detection failed: {e}")
@@ -1312,8 +1327,8 @@ def main(page: ft.Page):
             if failed:
                 logger.warning(f"Failed to kill browsers: {', '.join(failed)}")
 
-            # Wait a moment for processes to fully terminate
-            time.sleep(0.5)
+            # 모니터가 종료를 확인할 때까지 대기 (최대 2초)
+            get_browser_monitor().wait_until_exited(running_browsers, timeout=2.0)
 
         show_progress_dialog(selected_browsers_list)
 
@@ -1395,6 +1410,7 @@ def main(page: ft.Page):
                 ft.dropdown.Option("daily", "매일"),
                 ft.dropdown.Option("weekly", "매주"),
                 ft.dropdown.Option("monthly", "매월"),
+                ft.dropdown.Option("watch", "실시간"),
             ],
         )
 
@@ -1777,8 +1793,12 @@ def main(page: ft.Page):
                 "daily": "매일",
                 "weekly": "매주",
                 "monthly": "매월",
+                "watch": "실시간",
             }
 
+            if scenario.schedule_type == "watch":
+                return type_map["watch"]
+
             schedule_str = f"{type_map.get(scenario.schedule_type, scenario.schedule_type)} {scenario.time}"
 
             if scenario.schedule_type == "weekly" and scenario.weekdays:
@@ -2173,12 +2193,14 @@ def main(page: ft.Page):
         # 전체 진행 상태
         overall_progress_bar = ft.ProgressBar(width=450, value=0)
         overall_text = ft.Text("준비 중...", size=13, weight=ft.FontWeight.W_500)
+        size_text = ft.Text("", size=11, color=AppColors.TEXT_SECONDARY)
 
         progress_content = ft.Container(
             content=ft.Column(
                 [
                     overall_text,
                     overall_progress_bar,
+                    size_text,
                     ft.Divider(height=1, color=AppColors.BORDER),
                     ft.Text("브라우저별 진행 상황", size=12, weight=ft.FontWeight.W_600),
                     browser_progress_column,
@@ -2234,24 +2256,30 @@ def main(page: ft.Page):
             page.update()
             logger.info(f"Browser counts: {counts}, Total: {total_files_count}")
 
-        def on_progress(file_path: str, file_size: int):
-            """Called for each deleted file"""
+        def on_size_estimate(estimate):
+            """Called with the (sampled, then refined) total size"""
+            size_text.value = f"삭제 대상 크기: {estimate}"
+            page.update()
+
+        def on_progress(files: list[tuple[str, int]]):
+            """Called with the files deleted since the last call (batched)"""
             nonlocal deleted_files_count
 
-            deleted_files_count += 1
+            deleted_files_count += len(files)
 
             # 파일이 속한 브라우저 찾기
-            file_browser = None
-            for browser in selected_browsers_list:
-                if browser.lower() in file_path.lower():
-                    file_browser = browser
-                    break
+            updated_browsers = set()
+            for file_path, _ in files:
+                for browser in selected_browsers_list:
+                    if browser.lower() in file_path.lower():
+                        if browser in browser_progress:
+                            browser_progress[browser]["current"] += 1
+                            updated_browsers.add(browser)
+                        break
 
             # 브라우저별 진행률 업데이트 (배경색 채우기)
-            if file_browser and file_browser in browser_progress:
+            for file_browser in updated_browsers:
                 bp = browser_progress[file_browser]
-                bp["current"] += 1
-
                 if bp["total"] > 0:
                     progress_value = bp["current"] / bp["total"]
                     # 배경 Container의 width를 조절 (230px 카드 전체 너비)
@@ -2265,19 +2293,15 @@ def main(page: ft.Page):
                 overall_text.value = f"전체: {deleted_files_count}/{total_files_count} 파일 ({overall_progress*100:.0f}%)"
 
             # 파일 목록에 추가 (최근 100개만 유지)
-            file_name = Path(file_path).name
-
-            # 최대 100개만 유지 (먼저 체크)
-            if len(file_list_column.controls) >= 100:
-                file_list_column.controls.pop(0)
-
-            file_list_column.controls.append(
-                ft.Text(
-                    f"[OK] {file_name}",
-                    size=10,
-                    color=AppColors.TEXT_SECONDARY,
+            for file_path, _ in files[-100:]:
+                file_list_column.controls.append(
+                    ft.Text(
+                        f"[OK] {Path(file_path).name}",
+                        size=10,
+                        color=AppColors.TEXT_SECONDARY,
+                    )
                 )
-            )
+            del file_list_column.controls[:-100]
 
             # 맨 아래로 스크롤 (명시적으로)
             try:
@@ -2289,6 +2313,9 @@ def main(page: ft.Page):
 
         def on_finished(stats: CleaningStats):
             """Called when cleaning finishes"""
+            # 삭제 후 캐시 크기 / 쿠키 수 다시 측정
+            start_usage_scan()
+
             # 통계 화면으로 전환
             overall_progress_bar.value = 1.0
             overall_text.value = "[완료] 삭제 완료!"
@@ -2400,6 +2427,7 @@ def main(page: ft.Page):
             delete_downloads=delete_downloads,
             on_started=on_started,
             on_browser_counts=on_browser_counts,
+            on_size_estimate=on_size_estimate,
             on_progress=on_progress,
             on_finished=on_finished,
             on_error=on_error,
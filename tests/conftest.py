@@ -31,6 +31,20 @@ def sandbox(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
     return sandbox_root
 
 
+@pytest.fixture(autouse=True)
+def isolated_settings_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point settings_db at a temporary database for every test.
+
+    The deletion journal and the directory index live next to the settings
+    database, so this keeps all three out of the real ~/.privacy_eraser.
+    """
+    from privacy_eraser import settings_db
+
+    db_path = tmp_path / "settings" / "privacy_eraser.db"
+    monkeypatch.setattr(settings_db, "DB_PATH", db_path)
+    return db_path
+
+
 def _write_file(path: Path, size: int = 3) -> int:
     path.parent.mkdir(parents=True, exist_ok=True)
     data = b"x" * size
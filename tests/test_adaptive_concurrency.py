@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from privacy_eraser import settings_db
+from privacy_eraser.core import adaptive_concurrency as ac
+from privacy_eraser.core import deletion_executor as de
+from privacy_eraser.core.adaptive_concurrency import AIMDController
+
+
+def _feed_window(controller: AIMDController, now: float, throughput: float, latency: float = 0.001):
+    """Complete one window at the given throughput; return the new clock."""
+    step = 1.0 / throughput
+    result = None
+    for _ in range(controller.window_size):
+        now += step
+        result = controller.record(latency, now)
+    return now, result
+
+
+def test_aimd_increases_while_throughput_improves():
+    c = AIMDController(initial=2, window_size=4)
+    now = c._window_start
+
+    now, new_limit = _feed_window(c, now, throughput=100)
+    assert new_limit == 3
+    now, new_limit = _feed_window(c, now, throughput=150)
+    assert new_limit == 4
+    assert c.best_limit == 3
+
+
+def test_aimd_steps_back_to_knee_and_halves_on_degradation():
+    c = AIMDController(initial=4, window_size=4, decay=1.0)
+    now = c._window_start
+
+    now, _ = _feed_window(c, now, throughput=400)  # best at 4 -> probe 5
+    now, new_limit = _feed_window(c, now, throughput=200)  # worse: back to 4
+    assert new_limit == 4
+    now, new_limit = _feed_window(c, now, throughput=400)  # plateau: hold
+    assert new_limit is None
+    now, new_limit = _feed_window(c, now, throughput=100)  # degraded at best
+    assert new_limit == 2
+    assert [s.limit for s in c.history] == [4, 5, 4, 4]
+
+
+def test_aimd_clamps_to_bounds():
+    c = AIMDController(initial=100, max_limit=8, window_size=2)
+    assert c.limit == 8
+    c = AIMDController(initial=1, window_size=2, decay=1.0)
+    now = c._window_start
+    now, _ = _feed_window(c, now, throughput=100)
+    now, _ = _feed_window(c, now, throughput=10)  # overshoot -> back to 1
+    now, _ = _feed_window(c, now, throughput=1)  # halve, but never below 1
+    assert c.limit == 1
+
+
+def test_tuned_limit_round_trips_through_settings_db(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings_db, "DB_PATH", tmp_path / "settings.db")
+    assert ac.load_tuned_limit(42) is None
+
+    c = AIMDController(initial=3, window_size=2)
+    _feed_window(c, c._window_start, throughput=50)
+    ac.save_tuned_limit(42, c)
+
+    assert ac.load_tuned_limit(42) == 3
+    stored = json.loads(settings_db.get_database_manager().load_setting("deletion_concurrency.42"))
+    assert stored["limit"] == 3
+
+
+def test_executor_seeds_from_and_records_tuned_limit(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings_db, "DB_PATH", tmp_path / "settings.db")
+    monkeypatch.setattr(de, "device_of", lambda path, cache=None: 7)
+    settings_db.get_database_manager().save_setting("deletion_concurrency.7", json.dumps({"limit": 5}))
+
+    executor = de.DeletionExecutor(lambda path: (True, 1), window_size=4)
+    stats = executor.run([f"/t/{i}" for i in range(40)])
+
+    assert stats.deleted == 40
+    assert ac.load_tuned_limit(7) is not None
+
+
+def test_executor_fixed_limits_skip_tuning(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings_db, "DB_PATH", tmp_path / "settings.db")
+    monkeypatch.setattr(de, "device_of", lambda path, cache=None: 7)
+
+    executor = de.DeletionExecutor(lambda path: (True, 1), default_limit=2, window_size=4)
+    stats = executor.run([f"/t/{i}" for i in range(40)])
+
+    assert stats.devices[7].limit == 2
+    assert ac.load_tuned_limit(7) is None
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from privacy_eraser import settings_db
+from privacy_eraser.core import background_mode as bm
+from privacy_eraser.core.background_mode import BackgroundProfile, Pacer
+
+
+@pytest.fixture
+def sample_files(sandbox: Path) -> list[str]:
+    files = []
+    for i in range(3):
+        p = sandbox / "cache" / f"f{i}"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(b"x")
+        files.append(str(p))
+    return files
+
+
+def _pacer(monkeypatch, cpu=0.0, **profile_kwargs):
+    monkeypatch.setattr(bm.psutil, "cpu_percent", lambda interval=None: cpu)
+    waits: list[float] = []
+    return Pacer(BackgroundProfile(**profile_kwargs), sleep=waits.append), waits
+
+
+def test_pacer_limits_ops_per_second(monkeypatch):
+    pacer, waits = _pacer(monkeypatch, max_ops_per_sec=10, max_mb_per_sec=None, load_threshold=None)
+
+    for _ in range(5):
+        pacer.before_delete()
+
+    # First op starts immediately, the rest are spaced 0.1s apart on the virtual clock
+    assert pacer.total_wait == pytest.approx(0.1 + 0.2 + 0.3 + 0.4, abs=0.05)
+    assert len(waits) == 4
+
+
+def test_pacer_charges_deleted_bytes(monkeypatch):
+    pacer, _ = _pacer(monkeypatch, max_ops_per_sec=None, max_mb_per_sec=1, load_threshold=None)
+
+    pacer.before_delete()
+    pacer.after_delete(512 * 1024)  # half a second of budget
+    pacer.before_delete()
+
+    assert pacer.total_wait == pytest.approx(0.5, abs=0.05)
+
+
+def test_pacer_yields_under_load_but_not_forever(monkeypatch):
+    pacer, _ = _pacer(
+        monkeypatch, cpu=95.0, max_ops_per_sec=None, max_mb_per_sec=None,
+        load_threshold=75, yield_seconds=0.5, max_yield_seconds=1.0,
+    )
+    clock = [100.0]
+    monkeypatch.setattr(bm.time, "monotonic", lambda: clock[0])
+
+    pacer.before_delete()
+    assert pacer.total_wait == pytest.approx(0.5)
+
+    clock[0] += 2.0  # busy for longer than max_yield_seconds
+    pacer.before_delete()
+    assert pacer.total_wait == pytest.approx(0.5)
+
+
+def test_profile_load_reads_settings_overrides(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings_db, "DB_PATH", tmp_path / "settings.db")
+    db = settings_db.get_database_manager()
+    db.save_setting("background.max_mb_per_sec", "5")
+    db.save_setting("background.load_threshold", "off")
+    db.save_setting("background.workers", "2")
+    db.save_setting("background.lower_priority", "false")
+    db.save_setting("background.max_ops_per_sec", "fast")  # invalid -> default
+
+    profile = BackgroundProfile.load()
+
+    assert profile.max_mb_per_sec == 5.0
+    assert profile.load_threshold is None
+    assert profile.workers == 2
+    assert profile.lower_priority is False
+    assert profile.max_ops_per_sec == BackgroundProfile().max_ops_per_sec
+
+
+def test_run_in_background_exposes_profile_and_propagates(monkeypatch):
+    monkeypatch.setattr(bm, "lower_priority", lambda: (lambda: None))
+    profile = BackgroundProfile()
+
+    assert bm.run_in_background(profile, lambda x: (x, bm.current_profile()), 3) == (3, profile)
+    assert bm.current_profile() is None
+
+    def boom():
+        raise RuntimeError("fail")
+
+    with pytest.raises(RuntimeError, match="fail"):
+        bm.run_in_background(profile, boom)
+
+
+def test_prod_mode_runs_under_background_profile(monkeypatch, sample_files):
+    from privacy_eraser import schedule_executor as se
+    from privacy_eraser.core.schedule_manager import ScheduleScenario
+
+    monkeypatch.setattr(bm, "lower_priority", lambda: (lambda: None))
+    monkeypatch.setattr(se, "_get_browser_files", lambda browser, options: sample_files)
+    scenario = ScheduleScenario(
+        id="bg", name="bg", enabled=True, schedule_type="daily", time="00:00",
+        weekdays=[], day_of_month=None, browsers=["Chrome"], delete_bookmarks=False,
+        delete_downloads=False, delete_downloads_folder=False, created_at="",
+    )
+    profile = BackgroundProfile(max_ops_per_sec=None, max_mb_per_sec=None, load_threshold=None)
+
+    result = bm.run_in_background(profile, se.execute_prod_mode, scenario)
+
+    assert result["deleted_files"] == len(sample_files)
+
+
+def test_lower_priority_leaves_other_platforms_alone(monkeypatch):
+    monkeypatch.setattr(bm, "PER_THREAD_PRIORITY", False)
+    monkeypatch.setattr(bm.psutil, "Process", lambda *a: pytest.fail("process priority changed"))
+
+    bm.lower_priority()()
+
+
+@pytest.mark.skipif(not bm.PER_THREAD_PRIORITY, reason="per-thread priority is Linux only")
+def test_lower_priority_only_affects_the_calling_thread():
+    import threading
+
+    import psutil
+
+    seen: dict[str, int] = {}
+
+    def worker() -> None:
+        bm.lower_priority()
+        seen["thread"] = psutil.Process(threading.get_native_id()).nice()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen["thread"] == 19
+    assert psutil.Process().nice() != 19
+
+
+def test_failed_restore_is_logged(monkeypatch, caplog):
+    class Proc:
+        def __init__(self, pid):
+            self.value = 0
+
+        def nice(self, value=None):
+            if value is None:
+                return self.value
+            if value < self.value:
+                raise PermissionError("raising priority needs CAP_SYS_NICE")
+            self.value = value
+
+        def ionice(self, *args):
+            raise OSError("unsupported")
+
+    monkeypatch.setattr(bm, "PER_THREAD_PRIORITY", True)
+    monkeypatch.setattr(bm.psutil, "Process", Proc)
+    restore = bm.lower_priority()
+
+    with caplog.at_level("WARNING", logger=bm.__name__):
+        restore()
+
+    assert "Could not restore thread priority" in caplog.text
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+
+from privacy_eraser.core.browser_monitor import BrowserEvent, BrowserMonitor
+
+
+class FakeTable:
+    """PID table: pid -> (name, username); counts the per-PID reads."""
+
+    def __init__(self, processes: dict[int, tuple[str, str | None]]):
+        self.processes = dict(processes)
+        self.reads: list[int] = []
+        self.lock = threading.Lock()
+
+    def pids(self) -> list[int]:
+        with self.lock:
+            return list(self.processes)
+
+    def info(self, pid: int):
+        self.reads.append(pid)
+        with self.lock:
+            return self.processes.get(pid)
+
+
+def _monitor(table: FakeTable, **kwargs) -> BrowserMonitor:
+    return BrowserMonitor(
+        {"Chrome": ["chrome.exe"], "Firefox": ["firefox.exe"]},
+        same_user=False,
+        pids=table.pids,
+        process_info=table.info,
+        **kwargs,
+    )
+
+
+def test_poll_reads_only_new_pids_and_publishes_transitions():
+    table = FakeTable({1: ("init", None), 10: ("chrome.exe", "me"), 11: ("chrome.exe", "me")})
+    monitor = _monitor(table)
+    events: list[BrowserEvent] = []
+    monitor.subscribe(events.append)
+
+    assert monitor.running(["Chrome", "Firefox"]) == ["Chrome"]
+    assert events == [BrowserEvent("chrome", "started", frozenset({10, 11}))]
+    assert sorted(table.reads) == [1, 10, 11]
+
+    table.processes[20] = ("Firefox.EXE", "me")
+    del table.processes[10]
+    table.reads.clear()
+    assert monitor.poll() == [BrowserEvent("firefox", "started", frozenset({20}))]
+    assert table.reads == [20]
+
+    del table.processes[11]
+    assert monitor.poll() == [BrowserEvent("chrome", "exited", frozenset({11}))]
+    assert monitor.running() == ["firefox"]
+
+
+def test_interval_backs_off_while_quiet_and_resets_on_change():
+    table = FakeTable({1: ("init", None)})
+    monitor = _monitor(table, min_interval=0.5, max_interval=2.0)
+    intervals = []
+    for _ in range(5):
+        monitor.poll()
+        intervals.append(monitor.interval)
+    assert intervals == [0.75, 1.125, 1.6875, 2.0, 2.0]
+
+    table.processes[30] = ("chrome.exe", "me")
+    monitor.poll()
+    assert monitor.interval == 0.5
+
+
+def test_wait_until_exited_wakes_on_the_exit_event():
+    table = FakeTable({10: ("chrome.exe", "me")})
+    monitor = _monitor(table, min_interval=0.01, max_interval=0.05)
+    monitor.start()
+    try:
+        assert not monitor.wait_until_exited(["Chrome"], timeout=0.1)
+
+        timer = threading.Timer(0.05, lambda: table.processes.pop(10))
+        timer.start()
+        assert monitor.wait_until_exited(["Chrome"], timeout=5)
+        timer.join()
+    finally:
+        monitor.stop()
+
+    # Without the thread the wait polls by itself
+    table.processes[11] = ("firefox.exe", "me")
+    monitor.poll()
+    assert monitor.running(["Firefox"]) == ["Firefox"]
+    threading.Timer(0.05, lambda: table.processes.pop(11)).start()
+    assert monitor.wait_until_exited(["Firefox"], timeout=5)
+
+
+def test_same_user_ignores_case_of_owner_names(monkeypatch):
+    from privacy_eraser.core import browser_monitor
+
+    monkeypatch.setattr(browser_monitor, "current_username", lambda: "host\\me")
+    table = FakeTable({10: ("chrome.exe", "HOST\\Me"), 20: ("firefox.exe", "host\\other")})
+    monitor = BrowserMonitor(
+        {"Chrome": ["chrome.exe"], "Firefox": ["firefox.exe"]},
+        pids=table.pids,
+        process_info=table.info,
+    )
+
+    assert monitor.running(["Chrome", "Firefox"]) == ["Chrome"]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from privacy_eraser.core import browser_processes
+from privacy_eraser.core.browser_processes import BrowserTerminator, normalize_username
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Uses SIGTERM semantics")
+
+OBEYS = "import time; time.sleep(60)"
+IGNORES = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print(flush=True); time.sleep(60)"
+
+
+@pytest.fixture
+def fake_browsers():
+    """Child processes posing as chrome.exe (exits on SIGTERM) and firefox.exe (ignores it)."""
+    children = {
+        "chrome.exe": subprocess.Popen([sys.executable, "-c", OBEYS]),
+        "firefox.exe": subprocess.Popen([sys.executable, "-c", IGNORES], stdout=subprocess.PIPE),
+    }
+    children["firefox.exe"].stdout.readline()  # SIGTERM handler installed
+    by_pid = {child.pid: name for name, child in children.items()}
+    user = psutil.Process().username()
+
+    def process_iter(attrs=None):
+        for pid, name in by_pid.items():
+            proc = psutil.Process(pid)
+            proc.info = {"name": name, "username": user}
+            yield proc
+
+    yield process_iter
+    for child in children.values():
+        child.kill()
+        child.wait()
+
+
+def test_running_browsers_from_one_pass(fake_browsers):
+    terminator = BrowserTerminator(
+        {"chrome": ["chrome.exe"], "firefox": ["firefox.exe"], "edge": ["msedge.exe"]},
+        process_iter=fake_browsers,
+    )
+    assert terminator.running(["Edge", "Firefox", "Chrome"]) == ["Firefox", "Chrome"]
+
+
+def test_terminate_shares_one_deadline_then_kills(fake_browsers):
+    closed = []
+
+    def closer(processes):
+        closed.append(sorted(proc.pid for proc in processes))
+        for proc in processes:
+            proc.terminate()
+
+    terminator = BrowserTerminator(
+        {"chrome": ["chrome.exe"], "firefox": ["firefox.exe"]},
+        timeout=0.5,
+        kill_timeout=2.0,
+        closer=closer,
+        process_iter=fake_browsers,
+    )
+    started = time.monotonic()
+    outcomes = terminator.terminate(["Chrome", "Firefox"])
+
+    assert len(closed) == 1 and len(closed[0]) == 2  # One request for all
+    chrome, firefox = outcomes["Chrome"], outcomes["Firefox"]
+    assert (chrome.closed, chrome.killed, chrome.failed) == (1, 0, 0)
+    assert (firefox.closed, firefox.killed, firefox.failed) == (0, 1, 0)
+    assert chrome.success and firefox.success
+    assert time.monotonic() - started < 2.0
+
+
+def test_normalize_username():
+    assert normalize_username("HOST\\Me") == normalize_username("host\\me") == "host\\me"
+    assert normalize_username("") is None
+    assert normalize_username(None) is None
+
+
+def test_same_user_ignores_case_of_owner_names(monkeypatch):
+    class Proc:
+        def __init__(self, pid, name, username):
+            self.pid = pid
+            self.info = {"name": name, "username": username}
+
+    table = [Proc(-10, "chrome.exe", "HOST\\Me"), Proc(-20, "firefox.exe", "host\\other")]
+    monkeypatch.setattr(browser_processes, "current_username", lambda: "host\\me")
+    terminator = BrowserTerminator(
+        {"chrome": ["chrome.exe"], "firefox": ["firefox.exe"]},
+        process_iter=lambda attrs=None: iter(table),
+    )
+
+    assert terminator.running(["Chrome", "Firefox"]) == ["Chrome"]
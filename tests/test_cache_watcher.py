@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from privacy_eraser.core.browser_monitor import BrowserMonitor
+from privacy_eraser.core.cache_watcher import (
+    MAX_RECENT_ERRORS,
+    CacheWatcher,
+    InotifyBackend,
+    PollingBackend,
+    WatchSettings,
+    is_cache_action,
+    resolve_watch_targets,
+)
+from privacy_eraser.core.cleaner_engine import ActionType, CleaningAction, SearchType
+from privacy_eraser.core.cleaning_service import CleaningService, PlanCache
+
+
+def _action(search: SearchType, path: Path | str) -> CleaningAction:
+    return CleaningAction(ActionType.DELETE, search, str(path))
+
+
+def _age(path: Path) -> None:
+    """Backdate mtimes so a change right after setup is always visible."""
+    old = 1_600_000_000 * 10**9
+    for dirpath, _dirs, _files in os.walk(path):
+        os.utime(dirpath, ns=(old, old))
+
+
+BACKENDS = [pytest.param(lambda: PollingBackend(poll_interval=0.01), id="polling")]
+if sys.platform.startswith("linux"):
+    BACKENDS.append(pytest.param(InotifyBackend, id="inotify"))
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.mark.parametrize(
+    ("search", "path", "expected"),
+    [
+        (SearchType.WALK_FILES, "$$profile$$/Cache/", True),
+        (SearchType.WALK_FILES, "%LocalAppData%\\Opera\\Opera*\\cache\\", True),
+        (SearchType.WALK_ALL, "~/.mozilla/firefox/*/cache2", True),
+        (SearchType.WALK_ALL, "$$profile$$/Service Worker/CacheStorage", True),
+        (SearchType.WALK_FILES, "~/.cache/google-chrome/Default/Other", True),  # Below a cache root
+        (SearchType.WALK_ALL, "$$profile$$/Service Worker", False),
+        (SearchType.WALK_ALL, "$$profile$$/Local Storage/leveldb", False),
+        (SearchType.WALK_FILES, "$$profile$$/Session Storage/", False),
+        (SearchType.GLOB, "$$profile$$/Cache/*", False),
+        (SearchType.FILE, "$$profile$$/Cookies", False),
+    ],
+)
+def test_is_cache_action(search: SearchType, path: str, expected: bool):
+    assert is_cache_action(_action(search, path)) is expected
+
+
+def test_resolve_watch_targets_only_watches_cache_directories(sandbox: Path):
+    (sandbox / "Cache" / "sub").mkdir(parents=True)
+    (sandbox / "Local Storage").mkdir()
+    (sandbox / "Logs").mkdir()
+
+    targets = resolve_watch_targets([
+        _action(SearchType.WALK_FILES, sandbox / "Cache"),
+        _action(SearchType.WALK_ALL, sandbox / "Local Storage"),
+        _action(SearchType.GLOB, sandbox / "Logs" / "*.log"),
+        _action(SearchType.FILE, sandbox / "Cookies"),
+    ])
+
+    assert [(t.root, t.recursive) for t in targets] == [(str(sandbox / "Cache"), True)]
+
+
+@pytest.mark.parametrize("make_backend", BACKENDS)
+def test_new_entries_are_deleted_after_quiet_period(sandbox: Path, make_backend):
+    cache = sandbox / "Cache"
+    (cache / "keep_dir").mkdir(parents=True)
+    logs = sandbox / "Logs"
+    logs.mkdir()
+    _age(sandbox)
+    watcher = CacheWatcher(
+        [
+            _action(SearchType.WALK_FILES, cache),
+            _action(SearchType.GLOB, logs / "*.log"),
+        ],
+        WatchSettings(quiet_period=0.2, max_delay=60, batch_size=2, batch_pause=0),
+        service=CleaningService(),
+        backend=make_backend(),
+    )
+    watcher._resolve(mark_pending=False)
+
+    for name in ("a", "b", "c"):
+        (cache / name).write_bytes(b"x")
+    (cache / "keep_dir" / "nested").write_bytes(b"y")
+    (logs / "old.log").write_bytes(b"z")
+    (logs / "notes.txt").write_bytes(b"z")
+
+    # Still changing: nothing is deleted yet
+    assert watcher.poll(0.05) == 0
+    assert (cache / "a").exists()
+
+    time.sleep(0.25)
+    assert watcher.poll(0) == 4
+
+    assert sorted(os.listdir(cache)) == ["keep_dir"]
+    assert os.listdir(cache / "keep_dir") == []
+    # Not a cache directory: left for the run after the browser exits
+    assert sorted(os.listdir(logs)) == ["notes.txt", "old.log"]
+    assert watcher.stats.deleted == 4
+    assert watcher.stats.batches >= 2
+    watcher.backend.close()
+
+
+def test_busy_directory_is_cleaned_after_max_delay(sandbox: Path):
+    cache = sandbox / "Cache"
+    cache.mkdir()
+    (cache / "old").write_bytes(b"x")
+    watcher = CacheWatcher(
+        [_action(SearchType.WALK_FILES, cache)],
+        WatchSettings(quiet_period=60, max_delay=0),
+        service=CleaningService(),
+        backend=PollingBackend(poll_interval=0.01),
+    )
+    watcher._resolve(mark_pending=True)  # initial clean
+
+    assert watcher.poll(0) == 1
+    assert os.listdir(cache) == []
+
+
+def test_error_log_is_bounded(sandbox: Path):
+    cache = sandbox / "Cache"
+    cache.mkdir()
+    for i in range(MAX_RECENT_ERRORS + 20):
+        (cache / f"locked{i:03d}").write_bytes(b"x")
+
+    def locked(path: str) -> tuple[bool, int]:
+        raise PermissionError(f"in use: {os.path.basename(path)}")
+
+    watcher = CacheWatcher(
+        [_action(SearchType.WALK_FILES, cache)],
+        WatchSettings(quiet_period=60, max_delay=0, batch_pause=0),
+        service=CleaningService(),
+        delete_func=locked,
+        backend=PollingBackend(poll_interval=0.01),
+    )
+    watcher._resolve(mark_pending=True)
+
+    assert watcher.poll(0) == 0
+    assert watcher.stats.failed == watcher.stats.error_count == MAX_RECENT_ERRORS + 20
+    assert len(watcher.stats.errors) == MAX_RECENT_ERRORS
+    assert watcher.stats.errors[-1].endswith(f"locked{MAX_RECENT_ERRORS + 19:03d}")
+
+
+def test_start_and_stop_thread(sandbox: Path):
+    cache = sandbox / "Cache"
+    cache.mkdir()
+    (cache / "old").write_bytes(b"x")
+    watcher = CacheWatcher(
+        [_action(SearchType.WALK_ALL, cache)],
+        WatchSettings(quiet_period=0, poll_interval=0.01),
+        service=CleaningService(),
+        backend=PollingBackend(poll_interval=0.01),
+    )
+
+    watcher.start()
+    _wait_for(lambda: not os.listdir(cache))
+    watcher.stop()
+
+    assert os.listdir(cache) == []
+    assert not watcher.running
+
+
+def test_other_targets_are_cleaned_after_the_browser_exits(sandbox: Path):
+    profile = sandbox / "Default"
+    cache = profile / "Cache"
+    cache.mkdir(parents=True)
+    (cache / "old").write_bytes(b"x")
+    (profile / "Cookies").write_bytes(b"c")
+    (profile / "Cookies-journal").write_bytes(b"j")
+
+    def loader(_xml_path: str) -> dict[str, list[CleaningAction]]:
+        return {
+            "cache": [_action(SearchType.WALK_FILES, cache)],
+            "cookies": [_action(SearchType.GLOB, profile / "Cookies*")],
+        }
+
+    service = CleaningService(PlanCache(xml_path_for=lambda browser: "chrome.xml", loader=loader))
+    pids = {100}
+    monitor = BrowserMonitor(
+        {"chrome": ["chrome"]},
+        same_user=False,
+        pids=lambda: set(pids),
+        process_info=lambda pid: ("chrome", None),
+    )
+    options = ["cache", "cookies"]
+    watcher = CacheWatcher(
+        service.actions("Chrome", options),
+        WatchSettings(quiet_period=0, poll_interval=0.01),
+        browsers=["Chrome"],
+        options=options,
+        service=service,
+        monitor=monitor,
+        backend=PollingBackend(poll_interval=0.01),
+    )
+
+    watcher.start()
+    try:
+        # The running browser's cache is cleaned, its cookies are not
+        assert _wait_for(lambda: not os.listdir(cache))
+        time.sleep(0.05)
+        assert (profile / "Cookies").exists() and (profile / "Cookies-journal").exists()
+
+        pids.clear()
+        assert [event.kind for event in monitor.poll()] == ["exited"]
+        assert _wait_for(lambda: not any(profile.glob("Cookies*")))
+    finally:
+        watcher.stop()
+    assert watcher.stats.deleted == 3
+    assert monitor._subscribers == []
+
+
+def test_initial_clean_runs_selection_of_browsers_not_running(sandbox: Path):
+    cookies = sandbox / "Cookies"
+    cookies.write_bytes(b"c")
+
+    def loader(_xml_path: str) -> dict[str, list[CleaningAction]]:
+        return {"cookies": [_action(SearchType.FILE, cookies)]}
+
+    service = CleaningService(PlanCache(xml_path_for=lambda browser: "chrome.xml", loader=loader))
+    monitor = BrowserMonitor({"chrome": ["chrome"]}, same_user=False, pids=lambda: set())
+    watcher = CacheWatcher(
+        service.actions("Chrome", ["cookies"]),
+        WatchSettings(poll_interval=0.01),
+        browsers=["Chrome"],
+        options=["cookies"],
+        service=service,
+        monitor=monitor,
+        backend=PollingBackend(poll_interval=0.01),
+    )
+
+    watcher.start()
+    try:
+        assert _wait_for(lambda: not cookies.exists())
+    finally:
+        watcher.stop()
+    assert watcher.targets == []
@@ -68,3 +68,19 @@ def test_load_cleaner_options_from_file_var_expansion_and_delete(sandbox: Path,
     assert not any(logs.rglob("*"))
 
 
+def test_truncate_actions_are_loaded_as_truncate(sandbox: Path):
+    log = sandbox / "chrome_debug.log"
+    log.write_text("x" * 100)
+    xml_path = sandbox / "cleaner.xml"
+    xml_path.write_text(
+        "<cleaner><option id=\"logs\"><label>Logs</label>"
+        f"<action command=\"truncate\" search=\"file\" path=\"{log}\" />"
+        "</option></cleaner>"
+    )
+
+    (option,) = load_cleaner_options_from_file(str(xml_path))
+
+    assert option.actions[0].command == "truncate"
+    items, reclaimed = option.execute()
+    assert items == 1 and reclaimed >= 100  # Allocated blocks
+    assert log.exists() and log.stat().st_size == 0
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from privacy_eraser.core import file_utils
+from privacy_eraser.core.cleaning_service import CleaningService, PlanCache, StatCache
+from privacy_eraser.core.dir_index import DirectoryIndex
+
+
+def _write_cleaner(xml_path: Path, actions: dict[str, list[tuple[str, str, str]]]) -> None:
+    """CleanerML with one option per key; actions are (command, search, path)."""
+    options = "".join(
+        f'<option id="{option_id}"><label>{option_id}</label>'
+        + "".join(
+            f'<action command="{command}" search="{search}" path="{path}" />'
+            for command, search, path in option_actions
+        )
+        + "</option>"
+        for option_id, option_actions in actions.items()
+    )
+    xml_path.write_text(f"<cleaner>{options}</cleaner>")
+
+
+def _service(xml_path: Path) -> CleaningService:
+    return CleaningService(PlanCache(xml_path_for=lambda browser: str(xml_path)))
+
+
+def test_plan_cache_reparses_only_changed_files(sandbox: Path):
+    xml_path = sandbox / "chrome.xml"
+    _write_cleaner(xml_path, {"cache": [("delete", "walk.all", str(sandbox / "Cache"))]})
+    plans = PlanCache(xml_path_for=lambda browser: str(xml_path))
+
+    first = plans.actions("Chrome", ["cache", "cookies"])
+    assert [a.path for a in first] == [str(sandbox / "Cache")]
+    assert plans.actions("Chrome", ["cache"]) == first
+    assert (plans.hits, plans.misses) == (1, 1)
+
+    _write_cleaner(xml_path, {"cache": [("delete", "file", str(sandbox / "Other"))]})
+    os.utime(xml_path, ns=(0, 0))
+    assert [a.path for a in plans.actions("Chrome", ["cache"])] == [str(sandbox / "Other")]
+    assert plans.misses == 2
+
+
+def test_targets_are_top_most_paths(sandbox: Path, seed_walk_tree):
+    seed_walk_tree(sandbox / "Cache", {"": ("a",), "sub/deep": ("b", "c")})
+    seed_walk_tree(sandbox / "Logs", {"": ("x",), "old": ("y",)})
+    seed_walk_tree(sandbox / "GPUCache", {"": ("z",)})
+    xml_path = sandbox / "chrome.xml"
+    _write_cleaner(xml_path, {
+        "cache": [
+            ("delete", "walk.all", str(sandbox / "Cache")),
+            ("delete", "file", str(sandbox / "Cache" / "sub" / "deep" / "b")),  # Overlaps
+        ],
+        "logs": [("delete", "walk.files", str(sandbox / "Logs"))],
+        "gpu": [("delete", "walk.top", str(sandbox / "GPUCache"))],
+    })
+    service = _service(xml_path)
+
+    plan = service.collect(["Chrome"], ["cache", "logs", "gpu"])
+    assert sorted(os.path.relpath(p, sandbox) for p in plan) == sorted([
+        "Cache/a", "Cache/sub", "Cache/sub/deep/b", "Logs/x", "Logs/old/y", "GPUCache",
+    ])
+    assert plan.browser_counts == {"Chrome": 6}
+
+    stats = service.run(plan, ["Chrome"], ["cache", "logs", "gpu"])
+    assert (stats.deleted, stats.failed) == (6, 0)
+    assert stats.bytes_deleted == 6 * 3
+    # walk.all keeps its root, walk.files prunes the emptied "old" only
+    assert (sandbox / "Cache").is_dir() and not any((sandbox / "Cache").iterdir())
+    assert (sandbox / "Logs").is_dir() and not any((sandbox / "Logs").iterdir())
+    assert not (sandbox / "GPUCache").exists()
+
+
+def test_run_truncates_and_reports_failures(sandbox: Path):
+    log = sandbox / "debug.log"
+    log.write_bytes(b"x" * 100)
+    xml_path = sandbox / "chrome.xml"
+    _write_cleaner(xml_path, {"logs": [
+        ("truncate", "file", str(log)),
+        ("delete", "glob", str(sandbox / "*.tmp")),
+    ]})
+    (sandbox / "a.tmp").write_bytes(b"abc")
+    service = _service(xml_path)
+    stat_cache = StatCache()
+    plan = service.collect(["Chrome"], ["logs"], stats=stat_cache)
+    assert list(plan) == [str(sandbox / "a.tmp")]
+    assert service.estimate(plan, stat_cache).bytes == 3
+    assert stat_cache.hits >= 1  # Answered from the collection's lstat
+
+    def denied(path: str) -> tuple[bool, int]:
+        raise PermissionError("denied")
+
+    results = []
+    stats = service.run(
+        plan,
+        ["Chrome"],
+        ["logs"],
+        on_result=lambda path, ok, size, error: results.append((ok, size)),
+        delete_func=denied,
+    )
+
+    assert results == [(False, 0)] and stats.failed == 1
+    assert stats.truncated == 1 and stats.bytes_truncated >= 100
+    assert log.exists() and log.stat().st_size == 0
+
+
+def test_collect_drops_targets_shared_by_browsers(sandbox: Path):
+    for name in ("a.tmp", "b.tmp"):
+        (sandbox / name).write_bytes(b"abc")
+    xml_path = sandbox / "chrome.xml"
+    _write_cleaner(xml_path, {"logs": [("delete", "glob", str(sandbox / "*.tmp"))]})
+
+    plan = _service(xml_path).collect(["Chrome", "Chromium"], ["logs"])
+
+    assert sorted(plan) == [str(sandbox / "a.tmp"), str(sandbox / "b.tmp")]
+    assert plan.browser_counts == {"Chrome": 2, "Chromium": 2}
+
+
+def test_run_prunes_only_below_directories_walk_actions_matched(sandbox: Path, seed_walk_tree):
+    user_data = sandbox / "User Data"
+    seed_walk_tree(user_data, {
+        "Default/Cache": ("a",),
+        "Default/Code Cache/js/ab": ("b",),
+        "Profile 1/Cache": ("c",),
+    })
+    xml_path = sandbox / "chrome.xml"
+    _write_cleaner(xml_path, {"cache": [
+        ("delete", "glob", str(user_data / "*" / "Cache")),
+        ("delete", "walk.files", str(user_data / "*" / "Code Cache")),
+    ]})
+    service = _service(xml_path)
+    assert service.prune_roots(["Chrome"], ["cache"]) == [str(user_data / "Default" / "Code Cache")]
+
+    stats = service.run(service.collect(["Chrome"], ["cache"]), ["Chrome"], ["cache"])
+
+    assert stats.deleted == 3 and stats.pruned_dirs == 2  # js/ab and js
+    # The profiles the glob's Cache directories sat in stay, even when emptied
+    assert sorted(p.name for p in user_data.iterdir()) == ["Default", "Profile 1"]
+    assert [p.name for p in (user_data / "Default").iterdir()] == ["Code Cache"]
+    assert not any((user_data / "Default" / "Code Cache").iterdir())
+
+
+@pytest.mark.skipif(not file_utils.FD_OPS_SUPPORTED, reason="needs dir_fd support")
+def test_run_does_not_follow_directories_swapped_for_symlinks(sandbox: Path, seed_walk_tree):
+    user_data = sandbox / "User Data"
+    seed_walk_tree(user_data, {"Default": ("Cookies",)})
+    outside = sandbox / "outside"
+    seed_walk_tree(outside, {".": ("Cookies",)})
+    xml_path = sandbox / "chrome.xml"
+    _write_cleaner(xml_path, {"cookies": [("delete", "file", str(user_data / "*" / "Cookies"))]})
+    service = _service(xml_path)
+    plan = service.collect(["Chrome"], ["cookies"])
+
+    (user_data / "Default" / "Cookies").unlink()
+    (user_data / "Default").rmdir()
+    (user_data / "Default").symlink_to(outside, target_is_directory=True)
+    stats = service.run(plan, ["Chrome"], ["cookies"])
+
+    assert (stats.deleted, stats.failed) == (0, 1)
+    assert (outside / "Cookies").exists()
+
+
+def test_stat_cache_is_shared_safely_between_threads(sandbox: Path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    paths = []
+    for i in range(50):
+        path = sandbox / f"f{i}"
+        path.write_bytes(b"x" * i)
+        paths.append(str(path))
+    cache = StatCache()
+
+    with ThreadPoolExecutor(8) as pool:
+        sizes = list(pool.map(cache.size, paths * 8))
+
+    assert sizes == list(range(50)) * 8
+    assert cache.hits + cache.misses == 400
+    assert cache.misses >= 50
+
+
+def test_runs_use_and_save_the_directory_index(sandbox: Path, seed_walk_tree, tmp_path: Path):
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a": ("1", "2"), "a/b": ("3",), "e/f": ()})
+    old = 1_600_000_000 * 10**9
+    for dirpath, _dirs, _files in os.walk(base):
+        os.utime(dirpath, ns=(old, old))  # Not racy: trusted by the next run
+    xml_path = sandbox / "chrome.xml"
+    _write_cleaner(xml_path, {"cache": [("delete", "walk.files", str(base))]})
+    plans = PlanCache(xml_path_for=lambda browser: str(xml_path))
+    index_path = tmp_path / "dir_index.db"
+
+    service = CleaningService(plans, DirectoryIndex(index_path))
+    stats = service.run(service.collect(["Chrome"], ["cache"]), ["Chrome"], ["cache"])
+    assert stats.deleted == 3
+    for dirpath, _dirs, _files in os.walk(base):
+        os.utime(dirpath, ns=(old, old))
+
+    # Next process: the saved index answers for the unchanged, emptied tree
+    again = CleaningService(plans, DirectoryIndex(index_path))
+    assert list(again.collect(["Chrome"], ["cache"])) == []
+    assert again.index.misses == 0 and again.index.hits == 3  # Cache, e, e/f
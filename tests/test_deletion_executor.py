@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+from privacy_eraser.core import deletion_executor as de
+from privacy_eraser.core.deletion_executor import CleaningPlan, DeletionExecutor
+
+
+def test_cleaning_plan_from_paths_dedupes_in_order():
+    plan = CleaningPlan.from_paths(["/b", "/a", "/b", "/c"], {"Chrome": 3})
+    assert plan.targets == ["/b", "/a", "/c"]
+    assert len(plan) == 3
+    assert plan.browser_counts == {"Chrome": 3}
+
+
+def test_group_by_device_uses_parent_and_falls_back(sandbox: Path):
+    (sandbox / "a").mkdir()
+    (sandbox / "a" / "f1").write_bytes(b"x")
+    missing = str(sandbox / "missing" / "deeper" / "f2")
+
+    groups = de.group_by_device([str(sandbox / "a" / "f1"), missing])
+
+    dev = os.stat(sandbox).st_dev
+    assert groups == {dev: [str(sandbox / "a" / "f1"), missing]}
+
+
+def test_executor_deletes_files_and_reports_stats(sandbox: Path, seed_walk_tree):
+    base = sandbox / "cache"
+    seed_walk_tree(base, {"": ("a", "b"), "sub": ("c",)})
+    targets = [str(p) for p in base.rglob("*") if p.is_file()]
+
+    seen: list[str] = []
+    stats = DeletionExecutor(default_limit=3).run(
+        CleaningPlan(targets), on_result=lambda p, ok, size, err: seen.append(p)
+    )
+
+    assert stats.total == 3
+    assert stats.deleted == 3
+    assert stats.bytes_deleted == 9
+    assert sorted(seen) == sorted(targets)
+    assert all(not os.path.exists(p) for p in targets)
+    (device_stats,) = stats.devices.values()
+    assert device_stats.deleted == 3
+    assert device_stats.limit == 3
+
+
+def test_executor_respects_per_device_limit(monkeypatch):
+    monkeypatch.setattr(de, "device_of", lambda path, cache=None: 1 if path.startswith("/slow") else 2)
+    active = {1: 0, 2: 0}
+    peak = {1: 0, 2: 0}
+    lock = threading.Lock()
+    barrier = threading.Event()
+
+    def fake_delete(path: str) -> tuple[bool, int]:
+        dev = 1 if path.startswith("/slow") else 2
+        with lock:
+            active[dev] += 1
+            peak[dev] = max(peak[dev], active[dev])
+        barrier.wait(0.01)
+        with lock:
+            active[dev] -= 1
+        return True, 1
+
+    paths = [f"/slow/{i}" for i in range(10)] + [f"/fast/{i}" for i in range(10)]
+    stats = DeletionExecutor(fake_delete, device_limits={1: 1, 2: 4}).run(paths)
+
+    assert stats.deleted == 20
+    assert peak[1] == 1
+    assert 1 <= peak[2] <= 4
+    assert stats.devices[1].limit == 1
+    assert stats.devices[2].limit == 4
+
+
+def test_executor_records_failures_and_cancellation():
+    calls: list[str] = []
+
+    def flaky_delete(path: str) -> tuple[bool, int]:
+        calls.append(path)
+        if path == "/x/bad":
+            raise PermissionError("locked")
+        return True, 5
+
+    stats = DeletionExecutor(flaky_delete, default_limit=1).run(["/x/ok", "/x/bad"])
+    assert stats.deleted == 1
+    assert stats.failed == 1
+    assert stats.errors == ["/x/bad: locked"]
+
+    stats = DeletionExecutor(flaky_delete, default_limit=1).run(
+        ["/x/never"], should_cancel=lambda: True
+    )
+    assert stats.cancelled is True
+    assert stats.deleted == 0
+    assert "/x/never" not in calls
+
+
+def test_order_by_locality_batches_per_directory_deepest_first(sandbox: Path, seed_walk_tree):
+    base = sandbox / "cache"
+    seed_walk_tree(base, {"": ("a", "b", "c"), "sub": ("d",)})
+    paths = [str(base / "a"), str(base / "sub"), str(base / "b"), str(base / "sub" / "d"), str(base / "c")]
+
+    order = de.order_by_locality(paths, batch_size=2)
+
+    assert list(order.paths)[0] == str(base / "sub" / "d")
+    assert sorted(order.paths[1:]) == sorted(set(paths) - {str(base / "sub" / "d")})
+    assert [order.dirs[d] for d in order.batch_dirs] == [str(base / "sub"), str(base), str(base)]
+    assert [len(order.batch(i)) for i in range(len(order.batch_ends))] == [1, 2, 2]
+    # Same directory: inode order
+    names = [os.path.basename(p) for p in order.paths[1:]]
+    assert names == sorted(names, key=lambda n: os.stat(base / n).st_ino)
+
+
+def test_executor_prunes_only_directories_it_emptied(sandbox: Path, seed_walk_tree):
+    base = sandbox / "cache"
+    seed_walk_tree(base, {"x/y": ("1", "2"), "keep": ("3",), "idle": ()})
+    targets = [str(base / "x" / "y" / "1"), str(base / "x" / "y" / "2")]
+
+    stats = DeletionExecutor(default_limit=2, batch_size=1).run(targets, prune_roots=[str(base)])
+
+    assert stats.deleted == 2
+    assert stats.pruned_dirs == 2
+    assert sorted(p.name for p in base.iterdir()) == ["idle", "keep"]
+
+    (base / "keep" / "4").write_bytes(b"x")
+    stats = DeletionExecutor().run([str(base / "keep" / "3")])
+    assert stats.pruned_dirs == 0 and (base / "keep").is_dir()
+    stats = DeletionExecutor().run([str(base / "keep" / "4")], prune_roots=[str(base / "keep")])
+    assert stats.pruned_dirs == 0 and (base / "keep").is_dir()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+from privacy_eraser import settings_db
+from privacy_eraser.core.deletion_executor import CleaningPlan, DeletionStats
+from privacy_eraser.core.deletion_journal import DeletionJournal
+from privacy_eraser.core.path_table import PathTable
+
+
+def _make_files(base: Path, n: int) -> list[str]:
+    base.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(n):
+        p = base / f"f{i}"
+        p.write_bytes(b"xyz")
+        paths.append(str(p))
+    return paths
+
+
+def test_journal_resumes_from_last_committed_batch(tmp_path: Path):
+    files = _make_files(tmp_path / "cache", 5)
+    journal = DeletionJournal(tmp_path / "journal.db", batch_size=2)
+    run = journal.begin("sched-1", CleaningPlan(files, {"Chrome": 5}))
+
+    # Three targets finish, but only the first full batch gets committed
+    for path in files[:3]:
+        Path(path).unlink()
+        run.record(path, True, 3)
+    run.conn.close()  # simulated crash: pending record for files[2] is lost
+
+    resumed = DeletionJournal(tmp_path / "journal.db").resume("sched-1")
+
+    assert resumed is not None and resumed.resumed
+    assert resumed.plan.browser_counts == {"Chrome": 5}
+    assert resumed.completed == {0, 1}
+    # files[2] is uncommitted but already gone, so it is dropped rather than retried
+    assert resumed.remaining() == files[3:]
+
+    for path in resumed.remaining():
+        resumed.record(path, True, 3)
+    stats = resumed.combined(DeletionStats(deleted=2, bytes_deleted=6))
+    resumed.finish()
+
+    assert stats.total == 5
+    assert stats.deleted == 4
+    assert stats.bytes_deleted == 12
+    assert DeletionJournal(tmp_path / "journal.db").resume("sched-1") is None
+
+
+def test_begin_replaces_unfinished_run(tmp_path: Path):
+    journal = DeletionJournal(tmp_path / "journal.db")
+    journal.begin("k", CleaningPlan(["/a", "/b"])).close()
+    journal.begin("k", CleaningPlan(["/c"])).close()
+
+    resumed = journal.resume("k")
+    assert resumed.plan.targets == ["/c"]
+    resumed.close()
+
+
+def test_resumed_plan_keeps_target_flags(tmp_path: Path):
+    files = _make_files(tmp_path / "profile", 3)
+    targets = PathTable()
+    for path, flags in zip(files, (1, 0, 1)):
+        targets.append(path, flags=flags)
+    journal = DeletionJournal(tmp_path / "journal.db", batch_size=1)
+    run = journal.begin("k", CleaningPlan(targets))
+    run.record(files[0], True, 3)
+    run.conn.close()
+
+    resumed = DeletionJournal(tmp_path / "journal.db").resume("k")
+    assert list(resumed.remaining().flagged(1)) == [files[2]]
+    resumed.close()
+
+
+def test_prod_mode_resumes_without_rescanning(sandbox: Path, monkeypatch):
+    from privacy_eraser.schedule_executor import execute_prod_mode
+    from privacy_eraser.core.schedule_manager import ScheduleScenario
+
+    monkeypatch.setattr(settings_db, "DB_PATH", sandbox / "db" / "privacy_eraser.db")
+    files = _make_files(sandbox / "cache", 4)
+    journal = DeletionJournal(batch_size=1)
+    assert journal.path == sandbox / "db" / "deletion_journal.db"
+    run = journal.begin("resume-me", CleaningPlan(files))
+    Path(files[0]).unlink()
+    run.record(files[0], True, 3)
+    run.conn.close()
+
+    scenario = ScheduleScenario(
+        id="resume-me", name="Resume", enabled=True, schedule_type="daily",
+        time="00:00", weekdays=[], day_of_month=None, browsers=["Chrome"],
+        delete_bookmarks=False, delete_downloads=False,
+        delete_downloads_folder=False, created_at="",
+    )
+    with patch("privacy_eraser.schedule_executor._get_browser_files") as mock_get_files:
+        result = execute_prod_mode(scenario)
+
+    mock_get_files.assert_not_called()
+    assert result["resumed"] is True
+    assert result["total_files"] == 4
+    assert result["deleted_files"] == 4
+    assert result["failed_files"] == 0
+    assert not any(Path(p).exists() for p in files)
+    assert DeletionJournal().resume("resume-me") is None
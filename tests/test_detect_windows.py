@@ -1,13 +1,195 @@
 from __future__ import annotations
 
+import json
 import os
 from pathlib import Path
 
 import pytest
 
-pytestmark = pytest.mark.skipif(os.name != "nt", reason="Windows-only detection tests")
+windows_only = pytest.mark.skipif(os.name != "nt", reason="Windows-only detection tests")
 
 
+class FakeProcess:
+    def __init__(self, name, username):
+        self.info = {"name": name, "username": username}
+
+
+def _fake_process_table(monkeypatch, table, current_user="host\\me"):
+    """Serve table [(name, username)] from process_iter; count the walks."""
+    from privacy_eraser import detect_windows as dw
+
+    walks = []
+
+    def process_iter(attrs=None):
+        walks.append(attrs)
+        return iter([FakeProcess(name, user) for name, user in table])
+
+    class CurrentProcess:
+        def username(self):
+            return current_user
+
+    monkeypatch.setattr(dw, "USE_MOCK", False)
+    monkeypatch.setattr(dw.psutil, "process_iter", process_iter)
+    monkeypatch.setattr(dw.psutil, "Process", CurrentProcess)
+    return walks
+
+
+def test_process_snapshot_matches_name_and_owner(monkeypatch):
+    from privacy_eraser.detect_windows import ProcessSnapshot
+
+    _fake_process_table(monkeypatch, [
+        ("Chrome.exe", "HOST\\me"),
+        ("firefox.exe", "host\\other"),
+        ("msedge.exe", None),  # Owner not readable
+        (None, "host\\me"),
+    ])
+    snapshot = ProcessSnapshot.capture()
+
+    assert snapshot.is_running("chrome.exe")
+    assert not snapshot.is_running("firefox.exe")
+    assert snapshot.is_running("FIREFOX.EXE", same_user=False)
+    assert not snapshot.is_running("msedge.exe")
+    assert snapshot.is_running("msedge.exe", same_user=False)
+    assert not snapshot.is_running("brave.exe", same_user=False)
+
+
+def test_collect_programs_walks_the_process_table_once(monkeypatch):
+    from privacy_eraser import detect_windows as dw
+
+    walks = _fake_process_table(monkeypatch, [("whale.exe", "host\\me"), ("opera.exe", "host\\me")])
+    monkeypatch.setattr(dw, "program_exists", lambda probe, index=None, registry_hits=None: False)
+    probes = [
+        dw.ProgramProbe(name=name, process_names=(f"{name.lower()}.exe",))
+        for name in ("Chrome", "Edge", "Firefox", "Opera", "Whale")
+    ]
+
+    rows = dw.collect_programs(probes)
+
+    assert [row["running"] for row in rows] == ["no", "no", "no", "yes", "yes"]
+    assert walks == [["name", "username"]]
+
+
+def test_collect_programs_runs_probes_concurrently(monkeypatch):
+    import threading
+
+    from privacy_eraser import detect_windows as dw
+
+    probes = [dw.ProgramProbe(name=f"P{i}") for i in range(4)]
+    # Every probe waits for the others: only completes if all run at once
+    barrier = threading.Barrier(len(probes), timeout=5)
+
+    def program_exists(probe, index=None, registry_hits=None):
+        barrier.wait()
+        return probe.name in ("P1", "P3")
+
+    monkeypatch.setattr(dw, "program_exists", program_exists)
+
+    rows = dw.collect_programs(probes, workers=len(probes))
+
+    assert [(row["name"], row["present"]) for row in rows] == [
+        ("P0", "no"), ("P1", "yes"), ("P2", "no"), ("P3", "yes"),
+    ]
+
+
+def test_detection_cache_ttl_and_persistence(monkeypatch, tmp_path):
+    from privacy_eraser import settings_db
+    from privacy_eraser.detect_windows import DetectionCache
+
+    monkeypatch.setattr(settings_db, "DB_PATH", tmp_path / "settings.db")
+    now = [1000.0]
+    probes = []
+    running = []
+
+    def detect():
+        probes.append(now[0])
+        return [{"name": "Chrome", "present": "yes", "running": "no", "source": "file"}]
+
+    def make_cache(ttl=60):
+        return DetectionCache(detect, ttl=ttl, clock=lambda: now[0], running=lambda names: running)
+
+    cache = make_cache()
+    assert cache.get() == (None, False)
+    rows = cache.refresh()
+    assert cache.get() == (rows, True)
+
+    # A new process starts from the persisted rows, without probing
+    restarted = make_cache()
+    assert restarted.get() == (rows, True)
+    now[0] += 61
+    assert restarted.get() == (rows, False)
+    assert probes == [1000.0]
+
+    restarted.refresh()
+    assert restarted.get() == (rows, True)
+    assert probes == [1000.0, 1061.0]
+
+    restarted.invalidate()
+    assert make_cache().get() == (None, False)
+
+
+def test_detection_cache_reads_running_state_live(monkeypatch, tmp_path):
+    from privacy_eraser import settings_db
+    from privacy_eraser.detect_windows import DetectionCache
+
+    monkeypatch.setattr(settings_db, "DB_PATH", tmp_path / "settings.db")
+    running = []
+    cache = DetectionCache(
+        lambda: [
+            {"name": "Chrome", "present": "yes", "running": "yes", "source": "file"},
+            {"name": "Firefox", "present": "yes", "running": "no", "source": "file"},
+        ],
+        running=lambda names: [name for name in names if name in running],
+    )
+
+    assert [row["running"] for row in cache.refresh()] == ["no", "no"]
+    running.append("Firefox")
+    rows, fresh = cache.get()
+    assert fresh and [row["running"] for row in rows] == ["no", "yes"]
+    # Only installation data is persisted
+    stored = json.loads(settings_db.get_database_manager().load_setting(cache.setting_key))
+    assert all("running" not in row for row in stored["rows"])
+
+
+def test_executable_index_scans_install_roots_once(monkeypatch, tmp_path):
+    from privacy_eraser import detect_windows as dw
+
+    bin_dir = tmp_path / "usr" / "bin"
+    flatpak = tmp_path / "flatpak" / "exports" / "bin"
+    programs = tmp_path / "Programs"
+    for path in (
+        bin_dir / "google-chrome",
+        flatpak / "org.mozilla.firefox",
+        programs / "Opera" / "115.0" / "opera.exe",
+        programs / "Deep" / "a" / "b" / "c" / "whale.exe",  # Below the depth limit
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    roots = ((str(flatpak), 0), (str(programs), 2), (str(tmp_path / "missing"), 0))
+    index = dw.ExecutableIndex.build(roots, path_env=os.pathsep.join([str(bin_dir), str(bin_dir)]))
+
+    assert index.find(["chrome.exe", "google-chrome"]) == str(bin_dir / "google-chrome")
+    assert index.find(["ORG.MOZILLA.FIREFOX"]) == str(flatpak / "org.mozilla.firefox")
+    assert index.find(["opera.exe"]) == str(programs / "Opera" / "115.0" / "opera.exe")
+    assert index.find(["whale.exe"]) is None
+
+    builds = []
+    monkeypatch.setattr(dw.ExecutableIndex, "build", classmethod(lambda cls: builds.append(1) or index))
+    monkeypatch.setattr(dw, "registry_key_exists", lambda key: False)
+    monkeypatch.setattr(dw, "detect_file_glob", lambda pattern: False)
+    probes = [
+        dw.ProgramProbe(name="Chrome", executables=("chrome.exe", "google-chrome")),
+        dw.ProgramProbe(name="Firefox", executables=("org.mozilla.firefox",)),
+        dw.ProgramProbe(name="Whale", executables=("whale.exe",)),
+    ]
+
+    rows = dw.collect_programs(probes)
+
+    assert [row["present"] for row in rows] == ["yes", "yes", "no"]
+    assert rows[0]["source"] == "index"
+    assert builds == [1]
+
+
+@windows_only
 def test_detect_file_glob(monkeypatch):
     from privacy_eraser.detect_windows import detect_file_glob
 
@@ -41,21 +223,24 @@ def test_detect_file_glob(monkeypatch):
 
 def test_registry_key_exists(monkeypatch):
     from privacy_eraser import detect_windows as dw
+    from privacy_eraser.core.registry import Registry
+    from privacy_eraser.mock_windows import MockRegistry
 
-    if dw.winreg is None:
-        pytest.skip("winreg not available")
+    backend = MockRegistry()
+    backend.CreateKey(backend.HKEY_LOCAL_MACHINE, "SOFTWARE\\Vendor\\App")
+    registry = Registry(backend)
+    monkeypatch.setattr(dw, "USE_MOCK", False)
+    monkeypatch.setattr(dw, "winreg", backend)
+    monkeypatch.setattr(dw, "get_registry", lambda: registry)
 
-    # Create a fake key by monkeypatching winreg.OpenKey behavior
-    class Dummy:
-        pass
-
-    def fake_open_key(hive, subkey):  # noqa: ARG001
-        if subkey == "SOFTWARE\\Vendor\\App":
-            return Dummy()
-        raise FileNotFoundError
-
-    monkeypatch.setattr(dw.winreg, "OpenKey", fake_open_key)
     assert dw.registry_key_exists("HKLM\\SOFTWARE\\Vendor\\App") is True
     assert dw.registry_key_exists("HKLM\\SOFTWARE\\Missing") is False
 
+    probes = [
+        dw.ProgramProbe(name="App", registry_keys=("HKCU\\Software\\Vendor\\App", "HKLM\\SOFTWARE\\Vendor\\App")),
+        dw.ProgramProbe(name="Other", registry_keys=("HKLM\\SOFTWARE\\Other",)),
+    ]
+    monkeypatch.setattr(dw, "detect_file_glob", lambda pattern: False)
+    assert [row["present"] for row in dw.collect_programs(probes)] == ["yes", "no"]
+
 
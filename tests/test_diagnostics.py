@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from privacy_eraser.core.cleaner_engine import ActionType, CleaningAction, SearchType
+from privacy_eraser.core.cleaning_service import PlanCache
+from privacy_eraser.core.profile_scanner import ProfileLayout
+from privacy_eraser.diagnostics import TreeSizer, run_diagnostics
+
+
+def _tree_bytes(root: Path) -> tuple[int, int]:
+    size = files = 0
+    for dirpath, _dirs, names in os.walk(root):
+        for name in names:
+            size += os.lstat(os.path.join(dirpath, name)).st_size
+            files += 1
+    return size, files
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_tree_sizer_matches_os_walk_and_answers_nested_paths(sandbox: Path, seed_walk_tree, workers):
+    root = sandbox / "tree"
+    seed_walk_tree(root, {
+        ".": ["a", "b"],
+        "x": ["c"],
+        "x/y": ["d", "e"],
+        "x/y/z": ["f"],
+        "w": [],
+    })
+    (root / "big").write_bytes(b"0" * 1000)
+    sizer = TreeSizer(workers)
+
+    assert sizer.size(str(root)) == _tree_bytes(root) == (1018, 7)
+    assert sizer.directories == 5
+    assert sizer.size(str(root / "x" / "y")) == (9, 3)
+    assert sizer.size(str(root / "big")) == (1000, 1)
+    assert sizer.size(str(root / "missing")) == (0, 0)
+    assert sizer.directories == 5  # Nested directories came from the first walk
+
+
+def test_run_diagnostics_sizes_profiles_and_options(sandbox: Path, seed_walk_tree):
+    config = sandbox / "config"
+    seed_walk_tree(config, {
+        "Default": ["Preferences", "History", "Cookies"],
+        "Default/Cache": ["c1", "c2", "c3", "c4"],
+        "Default/GPUCache": ["g1"],
+        "Profile 1": ["Preferences"],
+    })
+    seed_walk_tree(sandbox / "cache", {"Default/Cache": ["x1", "x2"]})
+    layouts = {
+        "chrome": ProfileLayout(
+            roots=(str(config),),
+            marker="Preferences",
+            cache_dirs=("Cache", "GPUCache"),
+            cache_roots=(str(sandbox / "cache"),),
+        )
+    }
+    profile = config / "Default"
+
+    def loader(_xml_path: str) -> dict[str, list[CleaningAction]]:
+        delete = ActionType.DELETE
+        return {
+            "cache": [
+                CleaningAction(delete, SearchType.WALK_FILES, str(profile / "Cache")),
+                CleaningAction(delete, SearchType.GLOB, str(profile / "Cache" / "c*")),  # Inside the walk above
+                CleaningAction(delete, SearchType.WALK_ALL, str(profile / "GPUCache")),
+            ],
+            "history": [
+                CleaningAction(delete, SearchType.FILE, str(profile / "History")),
+                CleaningAction(delete, SearchType.FILE, str(profile / "History-journal")),
+            ],
+            "registry": [CleaningAction(ActionType.REGISTRY_DELETE_KEY, registry_key="HKCU\\Software\\X")],
+        }
+
+    plans = PlanCache(xml_path_for=lambda browser: "chrome.xml", loader=loader)
+    report = run_diagnostics(["Chrome"], layouts=layouts, plans=plans, workers=2)
+
+    assert [(p.profile, p.bytes, p.files, p.cache_bytes) for p in report.profiles] == [
+        ("Default", 24, 8, 21),
+        ("Profile 1", 3, 1, 0),
+    ]
+    assert [(o.option, o.bytes, o.files, o.paths) for o in report.options] == [
+        ("cache", 15, 5, 2),
+        ("history", 3, 1, 1),
+        ("registry", 0, 0, 0),
+    ]
+    # Two profiles, their cache directories and the external Cache, each listed once
+    assert report.directories == 5
+    assert set(report.timings) == {"executables", "profiles", "options", "walk", "classify", "total"}
+
+    exported = json.loads(report.to_json())
+    assert exported["profiles"][0]["cache_bytes"] == 21
+    assert exported["options"][0] == {"browser": "chrome", "option": "cache", "bytes": 15, "files": 5, "paths": 2}
+    path = sandbox / "report.json"
+    report.write_json(str(path))
+    assert json.loads(path.read_text(encoding="utf-8")) == exported
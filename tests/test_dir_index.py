@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from pathlib import Path
+
+from privacy_eraser.core import dir_index, file_utils
+from privacy_eraser.core.cleaner_engine import (
+    ActionType,
+    CleanerOption,
+    CleaningAction,
+    SearchType,
+)
+from privacy_eraser.core.dir_index import DirectoryIndex
+
+
+def _age(base: Path) -> None:
+    """Backdate directory mtimes so scans are not treated as racy."""
+    old = 1_600_000_000 * 10**9
+    for dirpath, _dirs, _files in os.walk(base):
+        os.utime(dirpath, ns=(old, old))
+
+
+def _cache_option(base: Path) -> CleanerOption:
+    return CleanerOption(
+        id="cache",
+        label="Cache",
+        description="",
+        actions=[CleaningAction(ActionType.DELETE, SearchType.WALK_FILES, str(base))],
+    )
+
+
+def test_second_run_skips_unchanged_directories(sandbox: Path, seed_walk_tree, tmp_path: Path):
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a": ("1", "2"), "a/b": ("3",), "c": ("4",), "e/f": ()})
+    _age(base)
+    option = _cache_option(base)
+
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    assert option.execute(index=index) == (4, 12)
+    # Emptied by the run and pruned; e and e/f were empty already
+    assert sorted(p.name for p in base.iterdir()) == ["e"]
+    _age(base)
+    index.save()
+
+    again = DirectoryIndex(tmp_path / "dir_index.db")
+    assert option.preview(again) == []
+    # base, e, e/f: stat only, nothing listed
+    assert again.hits == 3
+    assert again.misses == 0
+
+
+def test_changed_directory_is_rescanned(sandbox: Path, seed_walk_tree, tmp_path: Path):
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a": ("1",), "c": ("2",)})
+    _age(base)
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    assert len(list(file_utils.walk_directory_files(str(base), index))) == 2
+    index.save()
+
+    (base / "c" / "new").write_bytes(b"x")
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    files = sorted(file_utils.walk_directory_files(str(base), index))
+
+    assert [os.path.basename(p) for p in files] == ["1", "2", "new"]
+    assert index.misses == 1  # only c changed
+
+
+def test_recently_modified_directory_is_not_trusted(sandbox: Path, seed_walk_tree, tmp_path: Path):
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a": ("1",)})
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    list(file_utils.walk_directory_files(str(base), index))
+    index.save()
+
+    # A file created within the same mtime tick as the scan must not be missed
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    list(index.walk_files(str(base)))
+    assert index.hits == 0
+
+
+def test_directories_emptied_by_a_clean_are_skipped_next_run(
+    sandbox: Path, seed_walk_tree, tmp_path: Path, monkeypatch
+):
+    monkeypatch.setattr(dir_index, "RACY_WINDOW_NS", 50_000_000)
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {".": ("1", "2"), "e/f": ()})
+    _age(base)
+    option = _cache_option(base)
+
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    assert option.execute(index=index) == (2, 6)
+    index.save()
+    # Just modified by the clean: racy, but with the real mtime kept
+    saved = DirectoryIndex(tmp_path / "dir_index.db").records[os.path.normpath(base)]
+    assert saved.racy and saved.mtime_ns == os.stat(base).st_mtime_ns
+
+    time.sleep(0.1)
+    again = DirectoryIndex(tmp_path / "dir_index.db")
+    assert option.preview(again) == []
+    assert (again.hits, again.misses, again.revalidated) == (3, 0, 1)  # base confirmed, e and e/f aged
+    again.save()
+
+    third = DirectoryIndex(tmp_path / "dir_index.db")
+    assert option.preview(third) == []
+    assert (third.hits, third.misses, third.revalidated) == (3, 0, 0)
+
+
+def test_summarize_reuses_recorded_sizes(sandbox: Path, seed_walk_tree, tmp_path: Path):
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a": ("1", "2"), "a/b": ("3",)})
+    _age(base)
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    assert file_utils.get_file_size(str(base), index) == 9
+    index.save()
+
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    assert index.summarize(str(base)) == (3, 9)
+    assert index.misses == 0
+
+
+def test_removed_directories_are_forgotten(sandbox: Path, seed_walk_tree, tmp_path: Path):
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a/deep": ("1",), "b": ("2",)})
+    _age(base)
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    list(index.walk_all(str(base)))
+    index.save()
+
+    shutil.rmtree(base / "a")
+    index = DirectoryIndex(tmp_path / "dir_index.db")
+    remaining = list(index.walk_all(str(base)))
+    index.save()
+
+    assert sorted(os.path.relpath(p, base) for p in remaining) == ["b", os.path.join("b", "2")]
+    assert set(DirectoryIndex(tmp_path / "dir_index.db").records) == {
+        os.path.normpath(base), os.path.normpath(base / "b")
+    }
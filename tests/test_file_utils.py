@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from privacy_eraser.core import file_utils
+from privacy_eraser.core.cleaner_engine import ActionType, CleaningAction, SearchType
+
+posix_fd = pytest.mark.skipif(not file_utils.FD_OPS_SUPPORTED, reason="needs dir_fd support")
+
+
+def test_delete_file_simple_removes_trees_and_files(sandbox: Path, seed_walk_tree):
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a": ("1", "2"), "a/b": ("3",)})
+
+    assert file_utils.delete_file_simple(str(base / "a" / "1")) == (True, 3)
+    assert file_utils.delete_file_simple(str(base) + os.sep) == (True, 6)
+    assert not base.exists()
+    assert file_utils.delete_file_simple(str(base)) == (False, 0)
+
+
+@posix_fd
+def test_symlinks_inside_trees_are_unlinked_not_followed(sandbox: Path, seed_walk_tree):
+    outside = sandbox / "outside"
+    seed_walk_tree(outside, {".": ("keep",)})
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {"a": ("1",)})
+    (base / "a" / "dir_link").symlink_to(outside, target_is_directory=True)
+    (base / "file_link").symlink_to(outside / "keep")
+
+    assert file_utils.delete_file_simple(str(base))[0]
+
+    assert not base.exists()
+    assert (outside / "keep").read_bytes() == b"xxx"
+
+
+@posix_fd
+def test_walk_actions_delete_in_one_pass(sandbox: Path, seed_walk_tree):
+    outside = sandbox / "outside"
+    seed_walk_tree(outside, {"d": ("keep",)})
+    base = sandbox / "Cache"
+    seed_walk_tree(base, {".": ("1",), "a": ("2",), "a/b": ("3",)})
+    (base / "a" / "link").symlink_to(outside / "d", target_is_directory=True)
+
+    files = CleaningAction(ActionType.DELETE, SearchType.WALK_FILES, str(base))
+    assert files.execute() == (3, 9)
+    # a/b was emptied and pruned; a still holds the symlink
+    assert sorted(p.name for p in base.rglob("*")) == ["a", "link"]
+
+    everything = CleaningAction(ActionType.DELETE, SearchType.WALK_ALL, str(base))
+    assert everything.execute() == (2, 0)
+    assert base.is_dir() and not any(base.iterdir())
+    assert (outside / "d" / "keep").exists()
+
+    top = CleaningAction(ActionType.DELETE, SearchType.WALK_TOP, str(base))
+    assert top.execute() == (1, 0)
+    assert not base.exists()
+
+
+def test_walk_files_prunes_only_directories_it_emptied(sandbox: Path, seed_walk_tree, monkeypatch):
+    for fd_ops in {file_utils.FD_OPS_SUPPORTED, False}:
+        monkeypatch.setattr(file_utils, "FD_OPS_SUPPORTED", fd_ops)
+        base = sandbox / f"Code Cache{fd_ops}"
+        seed_walk_tree(base, {"js/index-dir": ("the-real-index",), "js/0a": ("1", "2"), "js/empty": ()})
+
+        action = CleaningAction(ActionType.DELETE, SearchType.WALK_FILES, str(base / "js"))
+        assert action.execute() == (3, 9)
+
+        # The action root and the directory that was already empty are kept
+        assert [p.name for p in (base / "js").iterdir()] == ["empty"]
+
+
+def test_truncate_action_empties_files_in_place(sandbox: Path, monkeypatch):
+    logs = sandbox / "logs"
+    logs.mkdir()
+    for i in range(5):
+        (logs / f"{i}.log").write_bytes(b"x" * 5000)
+    (logs / "empty.log").touch()
+    (logs / "sub").mkdir()
+    monkeypatch.setattr(file_utils, "WHITELIST_PATTERNS", [str(logs / "4.log")])
+
+    held = open(logs / "0.log", "ab")  # Still open by its "browser"
+    try:
+        action = CleaningAction(ActionType.TRUNCATE, SearchType.GLOB, str(logs / "*"))
+        items, reclaimed = action.execute()
+    finally:
+        held.close()
+
+    assert items == 4
+    assert reclaimed >= 4 * 5000
+    assert [(logs / f"{i}.log").stat().st_size for i in range(5)] == [0, 0, 0, 0, 5000]
+    assert (logs / "sub").is_dir() and (logs / "empty.log").exists()
+
+
+def test_truncate_files_batches_and_skips_missing(sandbox: Path):
+    paths = []
+    for i in range(7):
+        path = sandbox / f"f{i}"
+        path.write_bytes(b"abc")
+        paths.append(str(path))
+
+    items, _ = file_utils.truncate_files(paths + [str(sandbox / "missing")], batch_size=3)
+
+    assert items == 7
+    assert all(os.path.getsize(p) == 0 for p in paths)
+
+
+def test_glob_base():
+    assert file_utils.glob_base("/data/User Data/*/Cache") == os.path.normpath("/data/User Data")
+    assert file_utils.glob_base("/data/User Data/Default/Cookies") == os.path.normpath("/data/User Data/Default")
+    assert file_utils.glob_base("/data/Cache/") == os.path.normpath("/data")
+
+
+@posix_fd
+def test_remove_path_does_not_follow_a_parent_swapped_for_a_symlink(sandbox: Path, seed_walk_tree):
+    user_data = sandbox / "User Data"
+    seed_walk_tree(user_data, {"Default/Cache": ("a",)})
+    outside = sandbox / "outside"
+    seed_walk_tree(outside, {"Cache": ("a",)})
+    target = user_data / "Default" / "Cache" / "a"
+
+    # Listed, then the profile directory is replaced by a symlink
+    (user_data / "Default" / "Cache" / "a").unlink()
+    (user_data / "Default" / "Cache").rmdir()
+    (user_data / "Default").rmdir()
+    (user_data / "Default").symlink_to(outside, target_is_directory=True)
+
+    with pytest.raises(OSError):
+        file_utils.remove_path(str(target), root=str(user_data))
+    assert (outside / "Cache" / "a").exists()
+
+    # The root itself may be reached through a symlink
+    link = sandbox / "link"
+    link.symlink_to(outside, target_is_directory=True)
+    assert file_utils.remove_path(str(link / "Cache" / "a"), root=str(link)) == 3
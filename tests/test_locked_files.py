@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import errno
+import threading
+import time
+
+from privacy_eraser.core.deletion_executor import DeletionExecutor
+from privacy_eraser.core.locked_files import (
+    LockedFileQueue,
+    RetryPolicy,
+    SharingViolationDetector,
+)
+
+FAST = RetryPolicy(initial_delay=0.01, factor=2.0, max_delay=0.05, max_attempts=3)
+
+
+class FakeLocks:
+    """Simulated sharing violations: a path stays locked for N attempts."""
+
+    def __init__(self, locked: dict[str, int]):
+        self.locked = dict(locked)
+        self.attempts: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def delete(self, path: str) -> tuple[bool, int]:
+        with self.lock:
+            self.attempts[path] = self.attempts.get(path, 0) + 1
+            if self.attempts[path] <= self.locked.get(path, 0):
+                raise RuntimeError(f"simulated lock: {path}")
+        return True, 10
+
+    def is_locked(self, path: str, error: BaseException) -> bool:
+        return "simulated lock" in str(error)
+
+
+def test_locked_files_are_retried_off_the_hot_path():
+    locks = FakeLocks({"/p/a": 2})
+    queue = LockedFileQueue(FAST, detector=locks, reboot_scheduler=lambda paths: paths)
+    results = []
+
+    stats = DeletionExecutor(locks.delete, default_limit=1, locked_files=queue).run(
+        ["/p/a", "/p/b", "/p/c"], on_result=lambda p, ok, size, err: results.append((p, ok))
+    )
+
+    assert stats.deleted == 3 and stats.failed == 0
+    assert stats.locked == 1 and stats.reboot_pending == 0
+    assert locks.attempts["/p/a"] == 3
+    # The other targets were not held up behind the locked one
+    assert [p for p, _ in results] == ["/p/b", "/p/c", "/p/a"]
+
+
+def test_still_locked_files_are_scheduled_for_reboot_in_one_batch():
+    locks = FakeLocks({"/p/a": 99, "/p/b": 99})
+    batches = []
+    queue = LockedFileQueue(FAST, detector=locks, reboot_scheduler=lambda paths: batches.append(paths) or paths)
+
+    stats = DeletionExecutor(locks.delete, default_limit=2, locked_files=queue).run(["/p/a", "/p/b", "/p/c"])
+
+    assert stats.deleted == 1
+    assert stats.failed == 2
+    assert stats.reboot_pending == 2
+    assert [sorted(b) for b in batches] == [["/p/a", "/p/b"]]
+    assert all("scheduled for deletion on reboot" in e for e in stats.errors)
+    assert locks.attempts["/p/a"] == 1 + FAST.max_attempts
+
+
+def test_other_errors_are_not_deferred():
+    def delete(path: str) -> tuple[bool, int]:
+        raise PermissionError("denied")
+
+    queue = LockedFileQueue(FAST, reboot_scheduler=lambda paths: paths)
+    started = time.monotonic()
+    stats = DeletionExecutor(delete, locked_files=queue).run(["/p/a"])
+
+    assert stats.failed == 1 and stats.locked == 0
+    assert stats.errors == ["/p/a: denied"]
+    assert time.monotonic() - started < 1
+
+
+def test_default_detector_recognizes_busy_files():
+    detector = SharingViolationDetector()
+    assert detector.is_locked("/p", OSError(errno.EBUSY, "busy"))
+    assert not detector.is_locked("/p", PermissionError(errno.EACCES, "denied"))
+    assert not detector.is_locked("/p", ValueError("x"))
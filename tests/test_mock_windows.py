@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pytest
+
+from privacy_eraser import mock_windows
+from privacy_eraser.core.registry import Registry
+from privacy_eraser.mock_windows import MockRegistry
+
+REG = r"""Windows Registry Editor Version 5.00
+
+; Exported test tree
+[HKEY_CURRENT_USER\Software\App]
+@="default"
+"Path"="C:\\Program Files\\App \"quoted\""
+"Count"=dword:0000002a
+"Expand"=hex(2):25,00,54,00,45,00,4d,00,50,00,25,00,00,00
+"Multi"=hex(7):61,00,00,00,62,00,00,00,00,00
+"Big"=hex(b):01,00,00,00,00,00,00,00
+"Blob"=hex:de,ad,\
+  be,ef
+
+[HKEY_CURRENT_USER\Software\App\Recent\b]
+[HKEY_CURRENT_USER\Software\App\Recent\A]
+"Gone"="x"
+"Gone"=-
+[HKEY_CURRENT_USER\Software\App\Recent\c\Deep]
+[HKCU\Software\Other]
+[HKEY_BOGUS\Software\Ignored]
+"Value"="ignored"
+"""
+
+
+def test_load_reg_values_and_tree():
+    backend = MockRegistry()
+    assert backend.load_reg(REG) == 6
+
+    app = backend.OpenKey(backend.HKEY_CURRENT_USER, "software\\APP")
+    assert backend.QueryValueEx(app, "") == ("default", backend.REG_SZ)
+    assert backend.QueryValueEx(app, "path") == ('C:\\Program Files\\App "quoted"', backend.REG_SZ)
+    assert backend.QueryValueEx(app, "Count") == (42, backend.REG_DWORD)
+    assert backend.QueryValueEx(app, "Expand") == ("%TEMP%", backend.REG_EXPAND_SZ)
+    assert backend.QueryValueEx(app, "Multi") == (["a", "b"], backend.REG_MULTI_SZ)
+    assert backend.QueryValueEx(app, "Big") == (1, backend.REG_QWORD)
+    assert backend.QueryValueEx(app, "Blob") == (b"\xde\xad\xbe\xef", backend.REG_BINARY)
+    assert backend.EnumValue(app, 1)[0] == "Path"
+    assert backend.QueryInfoKey(app) == (1, 7, 0)
+
+    recent = backend.OpenKey(app, "Recent")
+    names = []
+    with pytest.raises(OSError):
+        while True:
+            names.append(backend.EnumKey(recent, len(names)))
+    assert names == ["A", "b", "c"]
+    with pytest.raises(FileNotFoundError):
+        backend.QueryValueEx(backend.OpenKey(recent, "A"), "Gone")
+    assert backend.find("HKCU\\Software\\Other") is not None
+    assert backend.find("HKEY_BOGUS\\Software\\Ignored") is None
+
+
+def test_delete_semantics_and_reg_deletions():
+    backend = MockRegistry()
+    backend.load_reg(REG)
+    recent = backend.OpenKey(backend.HKEY_CURRENT_USER, "Software\\App\\Recent")
+    deep = backend.OpenKey(recent, "c\\Deep")
+
+    with pytest.raises(PermissionError):
+        backend.DeleteKey(recent, "c")
+    with pytest.raises(FileNotFoundError):
+        backend.DeleteKey(recent, "missing")
+
+    backend.load_reg("REGEDIT4\n\n[-HKEY_CURRENT_USER\\Software\\App\\Recent]\n")
+    assert backend.find("HKCU\\Software\\App\\Recent") is None
+    assert backend.find("HKCU\\Software\\App") is not None
+    # Open handles below the deleted key go stale
+    with pytest.raises(OSError):
+        backend.EnumKey(deep, 0)
+    with pytest.raises(FileNotFoundError):
+        backend.OpenKey(backend.HKEY_CURRENT_USER, "Software\\App\\Recent")
+
+
+def test_load_reg_file_utf16_and_registry_layer(tmp_path):
+    path = tmp_path / "export.reg"
+    path.write_bytes(REG.encode("utf-16"))
+    backend = MockRegistry()
+    assert backend.load_reg_file(str(path)) == 6
+
+    registry = Registry(backend)
+    assert registry.read_value("HKCU\\Software\\App", "Count") == 42
+    assert registry.delete_tree("HKCU\\Software\\App") == 6
+    assert registry.subkeys("HKCU\\Software") == ["Other"]
+
+
+def test_mock_registry_key_exists_uses_fixture_tree():
+    assert mock_windows.mock_registry_key_exists("HKLM\\SOFTWARE\\Google\\Chrome")
+    assert mock_windows.mock_registry_key_exists("HKLM\\SOFTWARE\\Mozilla\\Mozilla Firefox")
+    assert not mock_windows.mock_registry_key_exists("HKLM\\SOFTWARE\\Opera Software")
+    assert not mock_windows.mock_registry_key_exists("HKXX\\SOFTWARE\\Google\\Chrome")
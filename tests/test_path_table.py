@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import random
+import sys
+
+from privacy_eraser.core.deletion_executor import CleaningPlan
+from privacy_eraser.core.path_table import PathTable
+
+
+def synthetic_profile(n: int, seed: int = 0):
+    """Chromium Cache_Data, Firefox cache2 and Code Cache style paths."""
+    rng = random.Random(seed)
+    chrome = "/home/user/.cache/google-chrome/Profile {}/Cache/Cache_Data/"
+    firefox = "/home/user/.cache/mozilla/firefox/a1b2c3d4.default-release/cache2/entries/"
+    code = "/home/user/.config/google-chrome/Profile {}/Code Cache/js/"
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            yield chrome.format(i % 4) + f"f_{i:06x}"
+        elif kind == 1:
+            yield firefox + "%040X" % rng.getrandbits(160)
+        else:
+            yield code.format(i % 4) + "%016x_0" % rng.getrandbits(64)
+
+
+def _table_bytes(table: PathTable) -> int:
+    return (
+        sys.getsizeof(table._names)
+        + sys.getsizeof(table._ends)
+        + sys.getsizeof(table._dir_of)
+        + sys.getsizeof(table._dirs)
+        + sys.getsizeof(table._dir_ids)
+        + sum(sys.getsizeof(d) for d in table._dirs)
+    )
+
+
+def test_round_trips_paths_exactly():
+    paths = [
+        "/a/b", "/a//c", "/x/00ff", "/x/00FF", "/x/0aF1", "/", "/x/dir/",
+        "C:\\Users\\me\\AppData\\f_000001", "/odd/\udcff\u00e9", "relative",
+    ]
+    table = PathTable(paths)
+
+    assert list(table) == paths
+    assert table == paths
+    assert table[-1] == "relative"
+    assert table[1:3] == paths[1:3]
+    for i, path in enumerate(paths):
+        assert table.find(path) == i
+        assert path in table
+    assert table.find("/a/missing") is None
+    assert "/nope/b" not in table
+
+
+def test_from_paths_drops_duplicates_in_order():
+    table = PathTable.from_paths(["/b", "/a", "/b", "/c/ab", "/c/ab"])
+
+    assert table == ["/b", "/a", "/c/ab"]
+    assert CleaningPlan.from_paths(["/b", "/a", "/b"]).targets == ["/b", "/a"]
+
+
+def test_extend_unique_dedupes_across_calls():
+    table = PathTable()
+    seen: dict[str, set[str]] = {}
+
+    assert table.extend_unique(["/a/x", "/a/y", "/a/x"], seen) == 2
+    assert table.extend_unique(["/a/y", "/b/x"], seen) == 1
+    assert table == ["/a/x", "/a/y", "/b/x"]
+
+
+def test_sizes_and_flags_are_allocated_lazily():
+    table = PathTable(["/a", "/b"])
+    assert table._sizes is None and table._flags is None
+
+    table.append("/c", size=10, flags=1)
+
+    record = table.record(2)
+    assert (record.path, record.size, record.flags) == ("/c", 10, 1)
+    assert table.size(0) == -1 and table.flags(0) == 0
+
+
+def test_flagged_paths():
+    table = PathTable()
+    seen: dict[str, set[str]] = {}
+    assert list(table.flagged(1)) == []
+
+    table.extend_unique(["/a/x", "/a/y"], seen, flags=1)
+    table.extend_unique(["/a/x", "/b/z"], seen)
+
+    assert list(table.flagged(1)) == ["/a/x", "/a/y"]
+    assert table.flags(2) == 0
+
+
+def test_uses_at_least_5x_less_memory_than_a_list():
+    paths = list(synthetic_profile(60_000))
+    list_bytes = sys.getsizeof(paths) + sum(sys.getsizeof(p) for p in paths)
+
+    table = PathTable(paths)
+
+    assert table == paths
+    assert list_bytes / _table_bytes(table) >= 5
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+from privacy_eraser import settings_db
+from privacy_eraser.core import profile_scanner
+from privacy_eraser.core.dir_index import DirectoryIndex
+from privacy_eraser.core.profile_scanner import ProfileLayout, ProfileScanner, find_profiles
+
+
+def _cookie_db(path: Path, table: str, rows: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(f"CREATE TABLE {table} (host TEXT)")
+        conn.executemany(f"INSERT INTO {table} VALUES (?)", [(f"h{i}",) for i in range(rows)])
+    conn.close()
+
+
+def _chromium_layout(sandbox: Path) -> ProfileLayout:
+    return ProfileLayout(
+        roots=(str(sandbox / "config"),),
+        marker="Preferences",
+        cache_dirs=("Cache", "GPUCache"),
+        cache_roots=(str(sandbox / "cache"),),
+        cookie_dbs=("Network/Cookies",),
+    )
+
+
+def _seed_chromium(sandbox: Path, seed_walk_tree) -> None:
+    for profile, cookies in (("Default", 3), ("Profile 1", 2)):
+        (sandbox / "config" / profile).mkdir(parents=True)
+        (sandbox / "config" / profile / "Preferences").write_text("{}")
+        _cookie_db(sandbox / "config" / profile / "Network" / "Cookies", "cookies", cookies)
+    (sandbox / "config" / "Crashpad").mkdir()  # Not a profile
+    seed_walk_tree(sandbox / "config" / "Default" / "GPUCache", {"": ("a", "b")})
+    seed_walk_tree(sandbox / "cache" / "Default" / "Cache", {"": ("c",), "sub": ("d", "e")})
+    seed_walk_tree(sandbox / "cache" / "Profile 1" / "Cache", {"": ("f",)})
+    # Older than the index's racy window, so unchanged directories are reused
+    for root in ("config", "cache"):
+        for dirpath, _dirs, _files in os.walk(sandbox / root):
+            os.utime(dirpath, (1_000_000_000, 1_000_000_000))
+
+
+def test_find_profiles_with_separate_cache_roots(sandbox: Path):
+    layout = _chromium_layout(sandbox)
+    for profile in ("Default", "Profile 1"):
+        (sandbox / "config" / profile).mkdir(parents=True)
+        (sandbox / "config" / profile / "Preferences").write_text("{}")
+    (sandbox / "config" / "System Profile").mkdir()
+
+    found = find_profiles(layout)
+
+    assert [(name, os.path.relpath(path, sandbox)) for name, path, _bases in found] == [
+        ("Default", os.path.join("config", "Default")),
+        ("Profile 1", os.path.join("config", "Profile 1")),
+    ]
+    assert found[0][2] == [str(sandbox / "config" / "Default"), str(sandbox / "cache" / "Default")]
+
+    # A root that is itself the profile (Opera)
+    single = ProfileLayout(roots=(str(sandbox / "config" / "Default"),), marker="Preferences", cache_dirs=())
+    assert [name for name, _path, _bases in find_profiles(single)] == ["Default"]
+
+
+def test_scan_fills_browser_cache_and_reuses_cookie_counts(sandbox: Path, seed_walk_tree, monkeypatch):
+    monkeypatch.setattr(settings_db, "DB_PATH", sandbox / "settings.db")
+    _seed_chromium(sandbox, seed_walk_tree)
+    published = []
+    scanner = ProfileScanner(
+        layouts={"chrome": _chromium_layout(sandbox)},
+        index=DirectoryIndex(sandbox / "dir_index.db"),
+        on_browser=published.append,
+        pause=0,
+    )
+
+    results = scanner.scan(["Chrome", "Safari"])
+
+    usage = results["Chrome"]
+    assert [(p.profile, p.cache_bytes, p.cookie_count) for p in usage.profiles] == [
+        ("Default", 5 * 3, 3),
+        ("Profile 1", 1 * 3, 2),
+    ]
+    assert published == [usage]
+    info = profile_scanner.cached_usage()
+    assert info["Chrome"]["cache_size_bytes"] == 18
+    assert info["Chrome"]["cookie_count"] == 5
+
+    # Unchanged databases are not opened again
+    def fail(db_path, tables=None):
+        raise AssertionError(f"inspected {db_path} again")
+
+    monkeypatch.setattr(profile_scanner, "inspect_database", fail)
+    rescan = ProfileScanner(
+        layouts={"chrome": _chromium_layout(sandbox)},
+        index=DirectoryIndex(sandbox / "dir_index.db"),
+        pause=0,
+    )
+    assert rescan.scan(["Chrome"])["Chrome"].cookie_count == 5
+    assert rescan.index.hits > 0
+
+
+def test_unreadable_cookie_db_keeps_last_count(sandbox: Path, seed_walk_tree, monkeypatch):
+    monkeypatch.setattr(settings_db, "DB_PATH", sandbox / "settings.db")
+    _seed_chromium(sandbox, seed_walk_tree)
+    layouts = {"chrome": _chromium_layout(sandbox)}
+    ProfileScanner(layouts, DirectoryIndex(sandbox / "dir_index.db"), pause=0).scan(["Chrome"])
+
+    _cookie_db(sandbox / "config" / "Default" / "Network" / "Cookies2", "cookies", 1)
+    os.replace(
+        sandbox / "config" / "Default" / "Network" / "Cookies2",
+        sandbox / "config" / "Default" / "Network" / "Cookies",
+    )
+
+    def malformed(db_path, tables=None):
+        raise sqlite3.DatabaseError("database disk image is malformed")
+
+    inspect_database = profile_scanner.inspect_database
+    monkeypatch.setattr(profile_scanner, "inspect_database", malformed)
+    usage = ProfileScanner(layouts, DirectoryIndex(sandbox / "dir_index.db"), pause=0).scan(["Chrome"])["Chrome"]
+    assert usage.cookie_count == 5
+
+    monkeypatch.setattr(profile_scanner, "inspect_database", inspect_database)
+    usage = ProfileScanner(layouts, DirectoryIndex(sandbox / "dir_index.db"), pause=0).scan(["Chrome"])["Chrome"]
+    assert usage.cookie_count == 1 + 2
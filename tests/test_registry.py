@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import pytest
+
+from privacy_eraser.core.registry import Registry, split_key
+from privacy_eraser.mock_windows import MockRegistry
+
+
+def _backend(*keys: str) -> MockRegistry:
+    backend = MockRegistry()
+    for key in keys:
+        hive, parts = split_key(key)
+        backend.CreateKey(getattr(backend, hive), "\\".join(parts))
+    return backend
+
+
+def test_split_key():
+    assert split_key("HKCU\\Software\\App") == ("HKEY_CURRENT_USER", ("Software", "App"))
+    assert split_key("hkey_local_machine\\SOFTWARE\\") == ("HKEY_LOCAL_MACHINE", ("SOFTWARE",))
+    assert split_key("HKLM") == ("HKEY_LOCAL_MACHINE", ())
+    with pytest.raises(ValueError):
+        split_key("HKXX\\Software")
+
+
+def test_keys_exist_opens_shared_parents_once():
+    backend = _backend(
+        "HKLM\\SOFTWARE\\Google\\Chrome",
+        "HKLM\\SOFTWARE\\Google\\Update",
+        "HKCU\\Software\\Mozilla\\Firefox",
+    )
+    registry = Registry(backend)
+    keys = [
+        "HKLM\\SOFTWARE\\Google\\Chrome",
+        "HKLM\\software\\google\\Update",
+        "HKLM\\SOFTWARE\\Google\\Drive",
+        "HKLM\\SOFTWARE\\Opera Software\\Opera",
+        "HKLM\\SOFTWARE\\Opera Software\\Opera GX",
+        "HKCU\\Software\\Mozilla\\Firefox",
+        "HKXX\\Software\\Invalid",
+    ]
+
+    assert registry.keys_exist(keys) == {
+        "HKLM\\SOFTWARE\\Google\\Chrome": True,
+        "HKLM\\software\\google\\Update": True,
+        "HKLM\\SOFTWARE\\Google\\Drive": False,
+        "HKLM\\SOFTWARE\\Opera Software\\Opera": False,
+        "HKLM\\SOFTWARE\\Opera Software\\Opera GX": False,
+        "HKCU\\Software\\Mozilla\\Firefox": True,
+        "HKXX\\Software\\Invalid": False,
+    }
+    # SOFTWARE, Google, Opera Software (missing: answers both Opera keys),
+    # Chrome, Update, Drive; Software, Mozilla, Firefox
+    assert registry.opens == 9
+
+    # Parents stay open: a second pass opens the leaves only
+    registry.opens = 0
+    assert registry.key_exists("HKLM\\SOFTWARE\\Google\\Chrome")
+    assert registry.opens == 1
+
+
+def test_missing_keys_are_not_cached_and_stale_handles_reopen():
+    backend = _backend("HKCU\\Software\\Vendor\\App\\Settings")
+    registry = Registry(backend)
+
+    assert not registry.key_exists("HKCU\\Software\\Vendor\\New")
+    backend.CreateKey(backend.HKEY_CURRENT_USER, "Software\\Vendor\\New")
+    assert registry.key_exists("HKCU\\Software\\Vendor\\New")
+
+    assert registry.key_exists("HKCU\\Software\\Vendor\\App\\Settings")
+    # Deleted and recreated behind the layer's back: the cached Vendor\App
+    # handle is stale
+    backend.DeleteKey(backend.HKEY_CURRENT_USER, "Software\\Vendor\\App\\Settings")
+    backend.DeleteKey(backend.HKEY_CURRENT_USER, "Software\\Vendor\\App")
+    backend.CreateKey(backend.HKEY_CURRENT_USER, "Software\\Vendor\\App\\Settings")
+    assert registry.key_exists("HKCU\\Software\\Vendor\\App\\Settings")
+
+
+def test_delete_tree_removes_subkeys_first():
+    backend = _backend(
+        "HKCU\\Software\\App\\Recent\\Files",
+        "HKCU\\Software\\App\\Recent\\Folders\\Deep",
+        "HKCU\\Software\\App\\Settings",
+        "HKCU\\Software\\Other",
+    )
+    with pytest.raises(PermissionError):
+        backend.DeleteKey(backend.HKEY_CURRENT_USER, "Software\\App")
+
+    registry = Registry(backend)
+    assert registry.key_exists("HKCU\\Software\\App\\Recent\\Folders\\Deep")  # caches handles below
+    assert registry.delete_tree("HKCU\\Software\\App") == 6
+    assert registry.keys_exist(["HKCU\\Software\\App", "HKCU\\Software\\Other"]) == {
+        "HKCU\\Software\\App": False,
+        "HKCU\\Software\\Other": True,
+    }
+    assert registry.subkeys("HKCU\\Software") == ["Other"]
+
+    assert registry.delete_tree("HKCU\\Software\\App") == 0
+    assert registry.delete_tree("HKCU\\Missing\\Parent") == 0
+    with pytest.raises(ValueError):
+        registry.delete_tree("HKCU")
+
+
+def test_values():
+    backend = _backend("HKCU\\Software\\App")
+    key = backend.OpenKey(backend.HKEY_CURRENT_USER, "Software\\App")
+    backend.SetValueEx(key, "LastFile", 0, backend.REG_SZ, "C:\\secret.txt")
+    registry = Registry(backend)
+
+    assert registry.read_value("HKCU\\Software\\App", "lastfile") == "C:\\secret.txt"
+    assert registry.read_value("HKCU\\Software\\App", "Missing") is None
+    assert registry.read_value("HKCU\\Software\\Missing", "LastFile") is None
+
+    assert registry.delete_value("HKCU\\Software\\App", "LastFile")
+    assert not registry.delete_value("HKCU\\Software\\App", "LastFile")
+    assert not registry.delete_value("HKCU\\Software\\Missing", "LastFile")
+    assert registry.read_value("HKCU\\Software\\App", "LastFile") is None
@@ -10,10 +10,10 @@ from privacy_eraser.schedule_executor import (
     execute_dev_mode,
     execute_prod_mode,
     _get_browser_files,
-    _expand_path,
-    _safe_delete,
-    _get_file_size,
 )
+from privacy_eraser.core import background_mode, file_utils
+from privacy_eraser.core.background_mode import BackgroundProfile
+from privacy_eraser.core.cleaning_service import CleaningService
 from privacy_eraser.core.schedule_manager import ScheduleScenario
 from privacy_eraser.config import AppConfig
 
@@ -43,6 +43,15 @@ def sample_scenario():
     )
 
 
+@pytest.fixture
+def background_profile(monkeypatch):
+    """Inject the PROD-mode background profile instead of loading settings_db"""
+    profile = BackgroundProfile(max_ops_per_sec=None, max_mb_per_sec=None, load_threshold=None)
+    monkeypatch.setattr(BackgroundProfile, "load", classmethod(lambda cls: profile))
+    monkeypatch.setattr(background_mode, "lower_priority", lambda: (lambda: None))
+    return profile
+
+
 @pytest.fixture
 def temp_test_data(tmp_path):
     """Create temporary test data files"""
@@ -134,20 +143,15 @@ def test_execute_dev_mode_browser_error(mock_count, sample_scenario):
 
 
 @patch("privacy_eraser.schedule_executor._get_browser_files")
-@patch("privacy_eraser.schedule_executor._safe_delete")
-@patch("privacy_eraser.schedule_executor._get_file_size")
-@patch("os.path.exists")
-def test_execute_prod_mode_single_browser(
-    mock_exists, mock_size, mock_delete, mock_get_files, sample_scenario
-):
+@patch("privacy_eraser.core.file_utils.remove_path")
+def test_execute_prod_mode_single_browser(mock_remove, mock_get_files, sample_scenario):
     """Test PROD mode execution with single browser"""
     sample_scenario.browsers = ["Chrome"]
 
     # Mock files to delete
     test_files = ["/path/to/cache", "/path/to/cookies"]
     mock_get_files.return_value = test_files
-    mock_exists.return_value = True  # Files exist
-    mock_size.return_value = 1024  # 1 KB per file
+    mock_remove.return_value = 1024  # 1 KB per file
 
     result = execute_prod_mode(sample_scenario)
 
@@ -156,28 +160,25 @@ def test_execute_prod_mode_single_browser(
     assert result["deleted_files"] == 2
     assert result["deleted_size_mb"] > 0
     assert result["failed_files"] == 0
-    assert mock_delete.call_count == 2
+    assert mock_remove.call_count == 2
 
 
 @patch("privacy_eraser.schedule_executor._get_browser_files")
-@patch("privacy_eraser.schedule_executor._safe_delete")
-@patch("privacy_eraser.schedule_executor._get_file_size")
-def test_execute_prod_mode_multiple_browsers(
-    mock_size, mock_delete, mock_get_files, sample_scenario
-):
+@patch("privacy_eraser.core.file_utils.remove_path")
+def test_execute_prod_mode_multiple_browsers(mock_remove, mock_get_files, sample_scenario):
     """Test PROD mode execution with multiple browsers"""
     # Mock different files for each browser
     mock_get_files.side_effect = [
         ["/chrome/cache", "/chrome/cookies"],  # Chrome
         ["/firefox/cache"],  # Firefox
     ]
-    mock_size.return_value = 2048  # 2 KB per file
+    mock_remove.return_value = 2048  # 2 KB per file
 
     result = execute_prod_mode(sample_scenario)
 
     assert result["total_files"] == 3
     assert result["deleted_files"] == 3
-    assert mock_delete.call_count == 3
+    assert mock_remove.call_count == 3
 
 
 @patch("privacy_eraser.schedule_executor._get_browser_files")
@@ -194,20 +195,21 @@ def test_execute_prod_mode_with_bookmarks(mock_get_files, sample_scenario):
 
 
 @patch("privacy_eraser.schedule_executor._get_browser_files")
-@patch("privacy_eraser.schedule_executor._safe_delete")
-@patch("privacy_eraser.schedule_executor._get_file_size")
-def test_execute_prod_mode_deletion_failure(
-    mock_size, mock_delete, mock_get_files, sample_scenario
-):
+@patch("privacy_eraser.core.file_utils.remove_path")
+def test_execute_prod_mode_deletion_failure(mock_remove, mock_get_files, sample_scenario):
     """Test PROD mode handles deletion failures"""
     sample_scenario.browsers = ["Chrome"]
 
     test_files = ["/path/file1", "/path/file2", "/path/file3"]
     mock_get_files.return_value = test_files
-    mock_size.return_value = 1024
 
     # Second deletion fails
-    mock_delete.side_effect = [None, Exception("Permission denied"), None]
+    def remove(path, root=None):
+        if path == "/path/file2":
+            raise Exception("Permission denied")
+        return 1024
+
+    mock_remove.side_effect = remove
 
     result = execute_prod_mode(sample_scenario)
 
@@ -217,18 +219,37 @@ def test_execute_prod_mode_deletion_failure(
 
 
 @patch("privacy_eraser.schedule_executor._get_browser_files")
-@patch("privacy_eraser.schedule_executor._safe_delete")
-@patch("privacy_eraser.schedule_executor._get_file_size")
-@patch("os.path.exists")
-def test_execute_prod_mode_calculates_size(
-    mock_exists, mock_size, mock_delete, mock_get_files, sample_scenario
+@patch("privacy_eraser.core.file_utils.remove_path")
+def test_execute_prod_mode_counts_missing_targets_as_deleted(
+    mock_remove, mock_get_files, sample_scenario
 ):
+    """A target already gone is deleted with 0 bytes, as in interactive runs"""
+    sample_scenario.browsers = ["Chrome"]
+
+    mock_get_files.return_value = ["/path/gone", "/path/file"]
+
+    def remove(path, root=None):
+        if path == "/path/gone":
+            raise FileNotFoundError(path)
+        return 1024
+
+    mock_remove.side_effect = remove
+
+    result = execute_prod_mode(sample_scenario)
+
+    assert result["deleted_files"] == 2
+    assert result["failed_files"] == 0
+    assert result["deleted_size_mb"] == pytest.approx(1024 / (1024 * 1024))
+
+
+@patch("privacy_eraser.schedule_executor._get_browser_files")
+@patch("privacy_eraser.core.file_utils.remove_path")
+def test_execute_prod_mode_calculates_size(mock_remove, mock_get_files, sample_scenario):
     """Test PROD mode calculates deleted size correctly"""
     sample_scenario.browsers = ["Chrome"]
 
     mock_get_files.return_value = ["/file1", "/file2"]
-    mock_exists.return_value = True  # Files exist
-    mock_size.side_effect = [1024 * 1024, 2 * 1024 * 1024]  # 1 MB, 2 MB
+    mock_remove.side_effect = lambda path, root=None: {"/file1": 1024 * 1024, "/file2": 2 * 1024 * 1024}[path]
 
     result = execute_prod_mode(sample_scenario)
 
@@ -261,21 +282,55 @@ def test_execute_scenario_dev_mode(mock_notify, mock_exec, sample_scenario, monk
 
 @patch("privacy_eraser.schedule_executor.execute_prod_mode")
 @patch("privacy_eraser.schedule_executor.show_prod_notification")
-def test_execute_scenario_prod_mode(mock_notify, mock_exec, sample_scenario, monkeypatch):
+def test_execute_scenario_prod_mode(
+    mock_notify, mock_exec, sample_scenario, background_profile, monkeypatch
+):
     """Test execute_scenario in PROD mode"""
     monkeypatch.setattr(AppConfig, "_dev_mode", False)
+    monkeypatch.setattr(
+        "privacy_eraser.schedule_executor.get_browser_monitor",
+        lambda: Mock(running=Mock(return_value=[])),
+    )
 
-    mock_exec.return_value = {
+    profiles = []
+    result = {
         "mode": "prod",
         "deleted_files": 50,
         "deleted_size_mb": 10.5,
         "duration": 1.5,
     }
+    mock_exec.side_effect = lambda scenario: profiles.append(background_mode.current_profile()) or result
 
     execute_scenario(sample_scenario)
 
     mock_exec.assert_called_once_with(sample_scenario)
     mock_notify.assert_called_once()
+    assert profiles == [background_profile]
+
+
+@patch("privacy_eraser.schedule_executor.execute_prod_mode")
+@patch("privacy_eraser.schedule_executor.show_prod_notification")
+def test_execute_scenario_prod_waits_for_browsers_to_exit(
+    mock_notify, mock_exec, sample_scenario, background_profile, monkeypatch
+):
+    """PROD runs start once the scenario's running browsers have exited"""
+    monkeypatch.setattr(AppConfig, "_dev_mode", False)
+    calls = []
+    monitor = Mock()
+    monitor.running.return_value = ["Firefox"]
+    monitor.wait_until_exited.side_effect = lambda browsers, timeout: calls.append("waited") or True
+    monkeypatch.setattr("privacy_eraser.schedule_executor.get_browser_monitor", lambda: monitor)
+    mock_exec.side_effect = lambda scenario: calls.append("cleaned") or {
+        "deleted_files": 0,
+        "deleted_size_mb": 0.0,
+        "duration": 0.0,
+    }
+
+    execute_scenario(sample_scenario)
+
+    monitor.running.assert_called_once_with(["Chrome", "Firefox"])
+    assert monitor.wait_until_exited.call_args[0][0] == ["Firefox"]
+    assert calls == ["waited", "cleaned"]
 
 
 @patch("privacy_eraser.schedule_executor.execute_dev_mode")
@@ -299,91 +354,35 @@ def test_execute_scenario_handles_exception(
 # ═══════════════════════════════════════════════════════════
 
 
-def test_expand_path_simple(tmp_path):
-    """Test _expand_path with simple file"""
-    test_file = tmp_path / "test.txt"
-    test_file.write_text("test")
-
-    result = _expand_path(str(test_file))
-
-    assert len(result) == 1
-    assert str(test_file) in result
-
-
-def test_expand_path_glob_pattern(tmp_path):
-    """Test _expand_path with glob pattern"""
-    # Create test files
-    (tmp_path / "file1.txt").write_text("test")
-    (tmp_path / "file2.txt").write_text("test")
-
-    pattern = str(tmp_path / "*.txt")
-    result = _expand_path(pattern)
-
-    assert len(result) == 2
-
-
-def test_expand_path_nonexistent():
-    """Test _expand_path with nonexistent file"""
-    result = _expand_path("/nonexistent/file.txt")
-
-    assert len(result) == 0
-
-
-def test_safe_delete_file(tmp_path):
-    """Test _safe_delete with file"""
+def test_service_delete_file(tmp_path):
+    """PROD deletions go through CleaningService.delete"""
     test_file = tmp_path / "test.txt"
     test_file.write_text("test content")
 
-    _safe_delete(str(test_file))
-
+    assert CleaningService().delete(str(test_file)) == (True, len("test content"))
     assert not test_file.exists()
 
 
-def test_safe_delete_directory(tmp_path):
-    """Test _safe_delete with directory"""
-    test_dir = tmp_path / "test_dir"
-    test_dir.mkdir()
-    (test_dir / "file.txt").write_text("test")
-
-    _safe_delete(str(test_dir))
-
-    assert not test_dir.exists()
-
-
-def test_safe_delete_nonexistent():
-    """Test _safe_delete with nonexistent path"""
-    # Should raise exception
-    with pytest.raises(Exception):
-        _safe_delete("/nonexistent/file.txt")
-
-
-def test_get_file_size_file(tmp_path):
-    """Test _get_file_size with file"""
-    test_file = tmp_path / "test.txt"
-    test_file.write_text("test content")
-
-    size = _get_file_size(str(test_file))
-
-    assert size == len("test content")
-
-
-def test_get_file_size_directory(tmp_path):
-    """Test _get_file_size with directory"""
+def test_service_delete_directory(tmp_path):
+    """A directory is removed in one pass, its size counted on the way"""
     test_dir = tmp_path / "test_dir"
     test_dir.mkdir()
     (test_dir / "file1.txt").write_text("hello")
     (test_dir / "file2.txt").write_text("world")
 
-    size = _get_file_size(str(test_dir))
+    assert CleaningService().delete(str(test_dir)) == (True, len("hello") + len("world"))
+    assert not test_dir.exists()
 
-    assert size == len("hello") + len("world")
 
+def test_service_delete_nonexistent():
+    """A target already gone counts as deleted with 0 bytes"""
+    assert CleaningService().delete("/nonexistent/file.txt") == (True, 0)
 
-def test_get_file_size_nonexistent():
-    """Test _get_file_size with nonexistent path"""
-    size = _get_file_size("/nonexistent/file.txt")
 
-    assert size == 0
+def test_remove_path_nonexistent_raises():
+    """file_utils.remove_path itself reports the missing target"""
+    with pytest.raises(FileNotFoundError):
+        file_utils.remove_path("/nonexistent/file.txt")
 
 
 # ═══════════════════════════════════════════════════════════
@@ -555,6 +555,28 @@ def test_multiple_schedules_coexist(scheduler, schedule_manager):
         assert next_run is not None
 
 
+def test_watch_schedule_runs_watcher_instead_of_job(scheduler, schedule_manager, monkeypatch):
+    """Test "watch" scenarios start a CacheWatcher rather than an APScheduler job"""
+    from unittest.mock import MagicMock
+
+    watcher = MagicMock()
+    monkeypatch.setattr("privacy_eraser.scheduler.create_scenario_watcher", lambda s: watcher)
+    monkeypatch.setattr(AppConfig, "_dev_mode", False)
+    scheduler.start()
+    scenario = schedule_manager.create_schedule(
+        name="Live", schedule_type="watch", time="00:00", browsers=["Chrome"]
+    )
+
+    scheduler.add_schedule(scenario)
+
+    watcher.start.assert_called_once()
+    assert scheduler.scheduler.get_jobs() == []
+    assert scheduler.get_next_run_time(scenario.id) is None
+
+    scheduler.remove_schedule(scenario.id)
+    watcher.stop.assert_called_once()
+
+
 # ═══════════════════════════════════════════════════════════
 # Global Scheduler Tests
 # ═══════════════════════════════════════════════════════════
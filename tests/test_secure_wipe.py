@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from privacy_eraser import settings_db
+from privacy_eraser.core.cleaner_engine import (
+    ActionType,
+    Cleaner,
+    CleanerOption,
+    CleaningAction,
+    SearchType,
+)
+from privacy_eraser.core.cleaning_service import SENSITIVE_TARGET, CleaningService, PlanCache
+from privacy_eraser.core.secure_wipe import SecureWiper, WipeSettings
+
+
+def _held_contents(path: Path):
+    """Open path now; the returned reader sees its blocks after unlink."""
+    fd = os.open(path, os.O_RDONLY)
+
+    def read() -> bytes:
+        try:
+            return os.pread(fd, 1 << 24, 0)
+        finally:
+            os.close(fd)
+
+    return read
+
+
+def test_files_are_overwritten_before_unlink(sandbox: Path):
+    small = sandbox / "Cookies"
+    small.write_bytes(b"secret" * 100)
+    large = sandbox / "History"
+    large.write_bytes(os.urandom(300_000))
+    readers = [_held_contents(small), _held_contents(large)]
+
+    wiper = SecureWiper(chunk_size=4096, fsync_batch=2, workers=4, parallel_threshold=64 * 1024)
+    with wiper:
+        results = list(wiper.wipe_paths([str(small), str(sandbox / "missing"), str(large)]))
+
+    # Failures are reported at once, wiped files after their batch is flushed
+    assert [(os.path.basename(p), ok, size) for p, ok, size, _e in results] == [
+        ("missing", False, 0), ("Cookies", True, 600), ("History", True, 300_000)
+    ]
+    assert not small.exists() and not large.exists()
+    for read in readers:
+        data = read()
+        assert data and data.count(0) == len(data)
+
+
+def test_random_passes_and_hard_links(sandbox: Path):
+    target = sandbox / "Login Data"
+    target.write_bytes(b"\0" * 10_000)
+    read = _held_contents(target)
+    assert SecureWiper(passes=2, random_data=True).wipe_file(str(target)) == 10_000
+    assert read().count(0) < 1000
+
+    linked = sandbox / "Web Data"
+    linked.write_bytes(b"keep")
+    os.link(linked, sandbox / "other-name")
+    assert SecureWiper().wipe_file(str(linked)) == 4
+    assert (sandbox / "other-name").read_bytes() == b"keep"
+
+
+def test_consumer_stopping_early_leaks_no_fds(sandbox: Path):
+    paths = []
+    for i in range(5):
+        path = sandbox / f"f{i}"
+        path.write_bytes(b"secret")
+        paths.append(str(path))
+
+    def open_fds() -> int:
+        return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 0
+
+    before = open_fds()
+
+    results = SecureWiper(fsync_batch=4).wipe_paths(paths)
+    assert next(results)[:2] == (paths[0], True)
+    results.close()  # e.g. CleaningService.wipe raising on a failure
+
+    assert open_fds() == before
+    # The rest of the overwritten batch is unlinked; f4 was never opened
+    assert sorted(os.listdir(sandbox)) == ["f4"]
+    assert (sandbox / "f4").read_bytes() == b"secret"
+
+
+def test_engine_wipes_sensitive_options_only(sandbox: Path, seed_walk_tree):
+    seed_walk_tree(sandbox / "Cookies", {"": ("a", "b"), "sub": ("c",)})
+    seed_walk_tree(sandbox / "Cache", {"": ("d",)})
+    read = _held_contents(sandbox / "Cookies" / "a")
+
+    def option(option_id: str, path: Path) -> CleanerOption:
+        action = CleaningAction(ActionType.DELETE, SearchType.WALK_ALL, str(path))
+        return CleanerOption(id=option_id, label=option_id, description="", actions=[action])
+
+    cleaner = Cleaner(
+        id="chrome",
+        name="Chrome",
+        description="",
+        options={"cookies": option("cookies", sandbox / "Cookies"), "cache": option("cache", sandbox / "Cache")},
+    )
+    wiped = []
+
+    class RecordingWiper(SecureWiper):
+        def wipe_paths(self, paths):
+            paths = list(paths)
+            wiped.extend(paths)
+            return super().wipe_paths(paths)
+
+    assert cleaner.execute_options(["cookies", "cache"], wiper=RecordingWiper()) == (5, 12)
+    assert sorted(os.path.basename(p) for p in wiped) == ["a", "b", "c"]
+    data = read()  # Slack of the last block is overwritten too
+    assert len(data) >= 3 and data.count(0) == len(data)
+    assert not any((sandbox / "Cookies").iterdir())
+
+
+def test_service_wipes_sensitive_targets_when_enabled(sandbox: Path, seed_walk_tree, monkeypatch):
+    seed_walk_tree(sandbox / "Default", {"": ("Cookies", "History"), "Cache": ("d",), "Sessions": ("s",)})
+    cookies = _held_contents(sandbox / "Default" / "Cookies")
+    session = _held_contents(sandbox / "Default" / "Sessions" / "s")
+    cache = _held_contents(sandbox / "Default" / "Cache" / "d")
+    profile = sandbox / "Default"
+    delete = ActionType.DELETE
+    options = {
+        "cookies": [
+            CleaningAction(delete, SearchType.FILE, str(profile / "Cookies")),
+            CleaningAction(delete, SearchType.GLOB, str(profile / "Sess*")),  # A directory target
+        ],
+        "cache": [CleaningAction(delete, SearchType.WALK_FILES, str(profile / "Cache"))],
+    }
+    service = CleaningService(PlanCache(xml_path_for=lambda browser: "chrome.xml", loader=lambda _xml: options))
+    assert WipeSettings.load() == WipeSettings(enabled=False)
+
+    db = settings_db.get_database_manager()
+    db.save_setting("secure_wipe.enabled", "true")
+    db.save_setting("secure_wipe.passes", "2")
+    assert WipeSettings.load() == WipeSettings(enabled=True, passes=2)
+    plan = service.collect(["Chrome"], ["cookies", "cache"])
+    assert sorted(plan.targets.flagged(SENSITIVE_TARGET)) == [str(profile / "Cookies"), str(profile / "Sessions")]
+
+    # The run wipes what the plan is tagged with, without collecting again
+    def no_walk(*args, **kwargs):
+        raise AssertionError("targets collected again")
+
+    monkeypatch.setattr(service, "browser_targets", no_walk)
+    stats = service.run(plan, ["Chrome"], ["cookies", "cache"])
+
+    assert (stats.deleted, stats.failed) == (3, 0)
+    assert sorted(p.name for p in profile.iterdir()) == ["Cache", "History"]
+    for read in (cookies, session):
+        data = read()
+        assert data and data.count(0) == len(data)
+    assert cache() == b"xxx"  # Not sensitive: unlinked only
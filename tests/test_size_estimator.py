@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from privacy_eraser.core.size_estimator import (
+    RefiningEstimate,
+    SizeEstimate,
+    estimate_directory,
+    estimate_paths,
+)
+
+
+def _make_cache(base: Path, n: int, rng: random.Random) -> tuple[list[str], int]:
+    paths = []
+    total = 0
+    for i in range(n):
+        p = base / f"d{i % 10}" / f"f{i}"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        size = rng.randint(100, 5000)
+        p.write_bytes(b"x" * size)
+        paths.append(str(p))
+        total += size
+    return paths, total
+
+
+def test_small_inputs_are_exact(sandbox: Path):
+    paths, total = _make_cache(sandbox / "cache", 20, random.Random(1))
+
+    estimate = estimate_paths(paths + [str(sandbox / "missing")], sample_size=50)
+
+    assert estimate.exact
+    assert estimate.bytes == estimate.low == estimate.high == total
+    assert estimate_directory(str(sandbox / "cache"), sample_size=50).bytes == total
+
+
+def test_sampled_estimate_bounds_the_true_total(sandbox: Path):
+    paths, total = _make_cache(sandbox / "cache", 1000, random.Random(2))
+
+    covered = 0
+    for seed in range(40):
+        by_paths = estimate_paths(paths, sample_size=100, rng=random.Random(seed))
+        by_dir = estimate_directory(str(sandbox / "cache"), sample_size=100, rng=random.Random(seed))
+        for estimate in (by_paths, by_dir):
+            assert not estimate.exact
+            assert estimate.entries == 1000
+            assert abs(estimate.bytes - total) / total < 0.25
+            covered += estimate.low <= total <= estimate.high
+
+    # 95% intervals
+    assert covered >= 0.85 * 80
+
+
+def test_directory_targets_are_expanded(sandbox: Path):
+    _, total = _make_cache(sandbox / "cache", 30, random.Random(5))
+
+    estimate = estimate_paths([str(sandbox / "cache")], sample_size=50)
+
+    assert estimate.bytes == total
+
+
+def test_refining_estimate_converges_to_exact():
+    refining = RefiningEstimate(SizeEstimate(bytes=1000, low=800, high=1200, entries=4))
+
+    for size in (300, 300):
+        refining.observe(size)
+    halfway = refining.current
+    assert not halfway.exact
+    assert halfway.low >= 600
+    assert halfway.high - halfway.low < 400
+
+    for size in (300, 300):
+        refining.observe(size)
+    assert refining.current == SizeEstimate.exact_total(1200, 4)
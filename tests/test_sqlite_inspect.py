@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from privacy_eraser.core.sqlite_inspect import (
+    QueryTimings,
+    inspect_database,
+    open_readonly,
+    readonly_uri,
+)
+
+
+def _history_db(path: Path, urls: int, deleted: int = 0) -> None:
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT, title TEXT)")
+        conn.execute("CREATE INDEX urls_url_index ON urls (url)")
+        conn.executemany(
+            "INSERT INTO urls (url, title) VALUES (?, ?)",
+            [(f"https://example.com/{i}", "x" * 200) for i in range(urls)],
+        )
+        conn.execute("DELETE FROM urls WHERE id <= ?", (deleted,))
+    conn.close()
+
+
+def test_inspect_counts_known_tables_and_free_pages(sandbox: Path):
+    db_path = sandbox / "User Data" / "History"
+    db_path.parent.mkdir()
+    _history_db(db_path, urls=5000, deleted=4000)
+    timings = QueryTimings()
+
+    info = inspect_database(db_path, timings=timings)
+
+    assert info.rows == {"urls": 1000}  # visits/downloads do not exist here
+    assert info.size_bytes == db_path.stat().st_size
+    assert info.freelist_count > 0 and 0 < info.free_ratio < 1
+    assert set(info.timings) == {"page_size", "page_count", "freelist_count", "schema", "count urls"}
+    assert timings.seconds.keys() == info.timings.keys() and timings.total >= 0
+
+
+def test_inspect_ignores_locks_held_by_the_browser(sandbox: Path):
+    db_path = sandbox / "Cookies"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("CREATE TABLE cookies (host_key TEXT)")
+    conn.executemany("INSERT INTO cookies VALUES (?)", [("a",), ("b",)])
+    conn.execute("BEGIN EXCLUSIVE")
+    try:
+        locked = sqlite3.connect(readonly_uri(db_path, immutable=False), uri=True, timeout=0)
+        with pytest.raises(sqlite3.OperationalError):
+            locked.execute("SELECT COUNT(*) FROM cookies").fetchone()
+        locked.close()
+
+        assert inspect_database(db_path).rows == {"cookies": 2}
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def test_open_readonly_does_not_create_or_write(sandbox: Path):
+    with pytest.raises(sqlite3.Error):
+        open_readonly(sandbox / "missing.sqlite")
+    assert not (sandbox / "missing.sqlite").exists()
+
+    db_path = sandbox / "places.sqlite"
+    _history_db(db_path, urls=1)
+    conn = open_readonly(db_path)
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM urls")
+    finally:
+        conn.close()